@@ -1,8 +1,28 @@
-from . import aerodynamics
-from . import aeroelasticity
-from . import control
-from . import flight_mechanics
-from . import geometry
-from . import structures
-from . import visualization
-from . import mathematics
+import importlib
+
+# Subpackages are imported when first accessed, importing flyingcircus does not load matplotlib
+# or compile any numba kernel
+__all__ = [
+    "aerodynamics",
+    "aeroelasticity",
+    "control",
+    "flight_mechanics",
+    "geometry",
+    "loads",
+    "structures",
+    "visualization",
+    "mathematics",
+]
+
+
+def __getattr__(name):
+
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+
+    return sorted(list(globals()) + __all__)
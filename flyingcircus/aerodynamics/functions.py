@@ -8,7 +8,7 @@ from numba import jit
 # ==================================================================================================
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def horse_shoe_ind_vel(point_a, point_b, target_point, circulation, vortex_radius=0.001):
     """
     reference: Flight Vehicle Aerodynamics - Mark Drela
@@ -55,7 +55,103 @@ def horse_shoe_ind_vel(point_a, point_b, target_point, circulation, vortex_radiu
 
 # ==================================================================================================
 
-@jit(nopython=True)
+
+def horse_shoes_ind_vel_matrix(points_a, points_b, target_points, vortex_radius=0.001):
+    """Calculates the velocity induced by each one of several horse shoe vortices with unitary
+    circulation at several points, with the same formulation of horse_shoe_ind_vel.
+
+    Args:
+        points_a (np.array([n_vortices, 3], dtype=float)): left point of each bound vortex
+        points_b (np.array([n_vortices, 3], dtype=float)): right point of each bound vortex
+        target_points (np.array([n_points, 3], dtype=float)): points where the velocity is
+                                                              calculated
+        vortex_radius (float): points closer than this to a vortex line are not influenced by it
+
+    Returns:
+        ind_velocities (np.array([n_points, n_vortices, 3], dtype=float)): velocity induced by
+                                                                           each vortex at each
+                                                                           point
+    """
+
+    points_a = np.reshape(np.asarray(points_a, dtype=float), (-1, 3))
+    points_b = np.reshape(np.asarray(points_b, dtype=float), (-1, 3))
+    target_points = np.reshape(np.asarray(target_points, dtype=float), (-1, 3))
+
+    X = np.array([1.0, 0.0, 0.0])
+    segment_length = np.linalg.norm(points_b - points_a, axis=1)
+
+    a = target_points[:, np.newaxis, :] - points_a
+    b = target_points[:, np.newaxis, :] - points_b
+
+    norm_a = np.linalg.norm(a, axis=2)
+    norm_b = np.linalg.norm(b, axis=2)
+    a_cross_b = np.cross(a, b)
+    a_cross_x = np.cross(a, X)
+    b_cross_x = np.cross(b, X)
+
+    # Points on the vortex lines give divisions by zero, they are masked afterwards
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        seg_vel = (a_cross_b / (norm_a * norm_b + np.sum(a * b, axis=2))[:, :, np.newaxis]) * (
+            1 / norm_a + 1 / norm_b
+        )[:, :, np.newaxis]
+        wake_a_vel = a_cross_x / ((norm_a - a[:, :, 0]) * norm_a)[:, :, np.newaxis]
+        wake_b_vel = b_cross_x / ((norm_b - b[:, :, 0]) * norm_b)[:, :, np.newaxis]
+
+    seg_vel[np.linalg.norm(a_cross_b, axis=2) / segment_length <= vortex_radius] = 0
+    wake_a_vel[np.linalg.norm(a_cross_x, axis=2) <= vortex_radius] = 0
+    wake_b_vel[np.linalg.norm(b_cross_x, axis=2) <= vortex_radius] = 0
+
+    ind_velocities = 0.25 * (seg_vel + wake_a_vel - wake_b_vel) / np.pi
+
+    return ind_velocities
+
+# ==================================================================================================
+
+
+def horse_shoes_ind_vel(
+    points_a, points_b, target_points, circulations, vortex_radius=0.001, chunk_size=256
+):
+    """Calculates the total velocity induced by several horse shoe vortices at several points,
+    see horse_shoes_ind_vel_matrix. The influence of all the vortices is evaluated at once for
+    chunk_size target points at a time.
+
+    Args:
+        points_a (np.array([n_vortices, 3], dtype=float)): left point of each bound vortex
+        points_b (np.array([n_vortices, 3], dtype=float)): right point of each bound vortex
+        target_points (np.array([n_points, 3], dtype=float)): points where the velocity is
+                                                              calculated
+        circulations (np.array([n_vortices], dtype=float)): circulation of each vortex
+        vortex_radius (float): points closer than this to a vortex line are not influenced by it
+        chunk_size (int): number of target points evaluated at once
+
+    Returns:
+        ind_velocities (np.array([n_points, 3], dtype=float)): total velocity induced at each
+                                                               point
+    """
+
+    target_points = np.reshape(np.asarray(target_points, dtype=float), (-1, 3))
+    circulations = np.asarray(circulations, dtype=float).ravel()
+
+    n_points = len(target_points)
+    ind_velocities = np.zeros((n_points, 3))
+
+    for start in range(0, n_points, chunk_size):
+
+        end = min(start + chunk_size, n_points)
+        ind_velocities[start:end] = np.einsum(
+            "pvk,v->pk",
+            horse_shoes_ind_vel_matrix(
+                points_a, points_b, target_points[start:end], vortex_radius
+            ),
+            circulations,
+        )
+
+    return ind_velocities
+
+# ==================================================================================================
+
+@jit(nopython=True, cache=True)
 def horse_shoe_aero_force(point_a, point_b, circulation, flow_vector, air_density):
     """
     reference: Flight Vehicle Aerodynamics - Mark Drela
@@ -232,6 +328,8 @@ def Atmosphere(alt):
     sigma   density/sea-level standard density
     delta   pressure/sea-level standard pressure
     theta   temperature/sea-level std. temperature
+    alt can also be an array of altitudes, the ratios are then arrays
+    with the same shape.
     """
 
     REARTH = 6369.0     # radius of the Earth (km)
@@ -246,6 +344,9 @@ def Atmosphere(alt):
     6.6063531E-4, 3.9046834E-5, 3.68501E-6 ]
     gtab = [ -6.5, 0.0, 1.0, 2.8, 0, -2.8, -2.0, 0.0 ]
 
+    if isinstance(alt, (np.ndarray, list, tuple)):
+        return ArrayAtmosphere(alt, REARTH, GMR, htab, ttab, ptab, gtab)
+
     h = alt*REARTH/(alt+REARTH) # geometric to geopotential altitude
 
     i=0; j=len(htab)
@@ -269,6 +370,35 @@ def Atmosphere(alt):
     return ( sigma, delta, theta )
 
 
+def ArrayAtmosphere(alt, REARTH, GMR, htab, ttab, ptab, gtab):
+    """ Atmosphere for an array of altitudes, all the altitudes are
+    computed at once with the layers tables of Atmosphere.
+    """
+
+    htab, ttab, ptab, gtab = (np.array(tab) for tab in (htab, ttab, ptab, gtab))
+
+    alt = np.asarray(alt, dtype=float)
+    h = alt*REARTH/(alt+REARTH) # geometric to geopotential altitude
+
+    # local layer of every altitude, the last layer with base below h
+    i = np.clip(np.searchsorted(htab, h, side="right") - 1, 0, len(htab) - 1)
+
+    tgrad = gtab[i]     # temp. gradient of local layer
+    tbase = ttab[i]     # base  temp. of local layer
+    deltah=h-htab[i]        # height above local base
+    tlocal=tbase+tgrad*deltah   # local temperature
+    theta = tlocal/ttab[0]  # temperature ratio
+
+    isothermal = 0.0 == tgrad
+    delta = ptab[i]*np.where(
+        isothermal,
+        np.exp(-GMR*deltah/tbase),
+        np.power(tbase/tlocal, GMR/np.where(isothermal, 1.0, tgrad)),
+    )
+    sigma = delta/theta
+    return ( sigma, delta, theta )
+
+
 def SimpleAtmosphere(alt):
     """ Compute temperature, density, and pressure in simplified
     standard atmosphere.
@@ -299,7 +429,7 @@ def SimpleAtmosphere(alt):
 
 def MetricViscosity(theta):
     t=theta*TZERO
-    return BETAVISC*math.sqrt(t*t*t)/(t+SUTH)
+    return BETAVISC*np.sqrt(t*t*t)/(t+SUTH)
 
 
 def main():
@@ -321,7 +451,11 @@ def main():
 def ISA(altitude):
     """
         Args:
-            altitude [float]: altitude in meters
+            altitude [float or np.array]: altitude in meters
+
+        Returns:
+            density, pressure and temperature, arrays with the shape of altitude when it is an
+            array
     """
 
     # Convert altitude from meters to kilometers
@@ -343,5 +477,24 @@ def ISA(altitude):
     return density, pressure, temperature
 
 
+def ISA_properties(altitude):
+    """
+        Args:
+            altitude [float or np.array]: altitude in meters
+
+        Returns:
+            density [kg/m^3], pressure [Pa], temperature [K], speed of sound [m/s] and dynamic
+            viscosity [kg/(m.s)], arrays with the shape of altitude when it is an array
+    """
+
+    density, pressure, temperature = ISA(altitude)
+
+    temperature_ratio = temperature / TZERO
+    speed_of_sound = AZERO * np.sqrt(temperature_ratio)
+    viscosity = MetricViscosity(temperature_ratio)
+
+    return density, pressure, temperature, speed_of_sound, viscosity
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,5 @@
+import numpy as np
+
 from . import functions
 from .. import geometry as geo
 
@@ -27,3 +29,148 @@ class PanelHorseShoe(geo.objects.Panel):
 
 # ==================================================================================================
 
+
+class AtmosphereTable(object):
+    """Precomputed ISA atmosphere table, the properties are interpolated with monotone piecewise
+    cubic Hermite (PCHIP) interpolation. Density and pressure are interpolated in logarithmic
+    scale and every layer is interpolated separately, so the interpolation does not cross the
+    temperature gradient discontinuities at the layers boundaries.
+
+    The number of table points is doubled until the largest relative error, measured against
+    functions.ISA_properties at the quarters of every table interval, is smaller than half of
+    the tolerance, the margin covers the error between the checked points.
+
+    Args:
+        min_altitude (float): lowest altitude of the table [m]
+        max_altitude (float): highest altitude of the table [m]
+        tolerance (float): maximum relative error of the interpolated properties
+        n_points (int): initial number of table points
+
+    Attributes:
+        altitudes (np.array([n_points], dtype=float)): table altitudes [m]
+        interpolator (scipy.interpolate.PPoly): piecewise polynomial of the log of density, log
+                                                of pressure, temperature, speed of sound and
+                                                viscosity
+        max_relative_error (float): largest relative error measured at the intervals quarters
+    """
+
+    # Geopotential altitudes of the layers bases used by functions.Atmosphere [km]
+    LAYERS_ALTITUDES = np.array([0.0, 11.0, 20.0, 32.0, 47.0, 51.0, 71.0, 84.852])
+    EARTH_RADIUS = 6369.0  # [km]
+
+    def __init__(self, min_altitude=-2000.0, max_altitude=86000.0, tolerance=1e-6, n_points=256):
+
+        if max_altitude <= min_altitude:
+            raise ValueError("AtmosphereTable max_altitude must be larger than min_altitude")
+
+        # Imported here, scipy.interpolate would add to the import time of the whole package
+        from scipy.interpolate import PchipInterpolator, PPoly
+
+        # Geometric altitudes of the layers bases [m]
+        layers_altitudes = (
+            1000
+            * self.LAYERS_ALTITUDES
+            * self.EARTH_RADIUS
+            / (self.EARTH_RADIUS - self.LAYERS_ALTITUDES)
+        )
+
+        layers_altitudes = layers_altitudes[
+            (layers_altitudes > min_altitude) & (layers_altitudes < max_altitude)
+        ]
+        boundaries = np.concatenate([[min_altitude], layers_altitudes, [max_altitude]])
+
+        while True:
+
+            step = (max_altitude - min_altitude) / (n_points - 1)
+
+            # Every layer is evenly spaced, its piecewise polynomial coefficients are joined in a
+            # single piecewise polynomial
+            points_altitudes = []
+            coefficients = []
+
+            for start, end in zip(boundaries[:-1], boundaries[1:]):
+                altitudes = np.linspace(start, end, max(3, int(np.ceil((end - start) / step)) + 1))
+
+                # The layer end points are taken just inside the layer, functions.Atmosphere
+                # pressure has a small jump at the layers boundaries
+                table_altitudes = np.copy(altitudes)
+                table_altitudes[0] += 1e-7
+                table_altitudes[-1] -= 1e-7
+                table = self._to_table(functions.ISA_properties(table_altitudes))
+
+                points_altitudes.append(altitudes[:-1])
+                coefficients.append(PchipInterpolator(altitudes, table, axis=0).c)
+
+            altitudes = np.append(np.concatenate(points_altitudes), max_altitude)
+
+            self.altitudes = altitudes
+            self.interpolator = PPoly(np.concatenate(coefficients, axis=1), altitudes)
+
+            # Error checked at the quarters of every table interval
+            check_altitudes = np.concatenate(
+                [
+                    (1 - fraction) * altitudes[:-1] + fraction * altitudes[1:]
+                    for fraction in (0.25, 0.5, 0.75)
+                ]
+            )
+            exact_properties = np.array(functions.ISA_properties(check_altitudes))
+            table_properties = np.array(self(check_altitudes))
+
+            self.max_relative_error = np.max(
+                np.abs(table_properties - exact_properties) / np.abs(exact_properties)
+            )
+
+            if self.max_relative_error <= 0.5 * tolerance:
+                break
+
+            if n_points > 2 ** 20:
+                raise ValueError(
+                    f"AtmosphereTable could not reach the tolerance {tolerance}, the smallest "
+                    f"relative error was {self.max_relative_error}"
+                )
+
+            n_points *= 2
+
+    @staticmethod
+    def _to_table(properties):
+
+        density, pressure, temperature, speed_of_sound, viscosity = properties
+
+        return np.stack(
+            [np.log(density), np.log(pressure), temperature, speed_of_sound, viscosity], axis=-1
+        )
+
+    def __call__(self, altitude):
+        """Interpolates the atmosphere properties at one or several altitudes [m].
+
+        Returns:
+            density [kg/m^3], pressure [Pa], temperature [K], speed of sound [m/s] and dynamic
+            viscosity [kg/(m.s)], arrays with the shape of altitude when it is an array
+        """
+
+        altitude = np.asarray(altitude, dtype=float)
+
+        if np.any(altitude < self.altitudes[0]) or np.any(altitude > self.altitudes[-1]):
+            raise ValueError(
+                f"AtmosphereTable altitude out of the table range [{self.altitudes[0]}, "
+                f"{self.altitudes[-1]}]"
+            )
+
+        table = self.interpolator(altitude)
+
+        density = np.exp(table[..., 0])
+        pressure = np.exp(table[..., 1])
+        temperature = table[..., 2]
+        speed_of_sound = table[..., 3]
+        viscosity = table[..., 4]
+
+        if 0 == np.ndim(altitude):
+            return (
+                float(density),
+                float(pressure),
+                float(temperature),
+                float(speed_of_sound),
+                float(viscosity),
+            )
+
+        return density, pressure, temperature, speed_of_sound, viscosity
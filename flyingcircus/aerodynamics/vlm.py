@@ -16,13 +16,13 @@ import scipy as sc
 import time
 
 from numpy import sin, cos, tan, pi
+import scipy.linalg as sla
 import scipy.sparse.linalg as spla
 
 from .. import mathematics as m
 from .. import geometry as geo
 from . import objects
 from . import functions
-from numba import jit
 
 # ==================================================================================================
 # VORTEX LATTICE METHOD
@@ -82,7 +82,6 @@ def flatten(panel_matrix):
 # --------------------------------------------------------------------------------------------------
 
 
-@jit
 def gamma_solver(influence_coef_matrix, right_hand_side_vector):
     """Receives a vector of panel objects and the airflow velocity. Using this information
     calculates the influence matrix, the right hand side velocity vector and solves the resulting
@@ -119,12 +118,188 @@ def aero_loads(
     altitude,
     center,
     influence_coef_matrix=None,
+    turbulence_function=None,
 ):
 
     velocity_field_function = geo.functions.velocity_field_function_generator(
-        velocity_vector, rotation_vector, attitude_vector, center
+        velocity_vector, rotation_vector, attitude_vector, center, turbulence_function
     )
 
+    (
+        aircraft_panel_vector,
+        shapes,
+        components_panel_grid,
+        components_panel_vector,
+    ) = create_aircraft_panel_vector(aircraft_aero_mesh)
+
+    # Calculate Influence Coefficient Matrix
+    #print("Calculating Influence Coefficient Matrix")
+    if influence_coef_matrix is None:
+        influence_coef_matrix = calc_influence_matrix(aircraft_panel_vector)
+
+    # Calculate right hand side vector
+    #print("Calculating Right Hand Side Vector")
+    right_hand_side_vector = calc_rhs_vector(
+        aircraft_panel_vector, velocity_field_function
+    )
+
+    # Calculate vortex circulation intensity
+    #print("Solving system to find gamma")
+    gamma_vector = gamma_solver(influence_coef_matrix, right_hand_side_vector)
+
+    if gamma_vector is None:
+
+        print("FATAL ERROR")
+        return None
+
+    (
+        components_force_vector,
+        components_gamma_vector,
+        components_force_grid,
+        components_gamma_grid,
+    ) = calc_aero_forces(
+        aircraft_panel_vector,
+        shapes,
+        gamma_vector,
+        velocity_vector,
+        rotation_vector,
+        attitude_vector,
+        altitude,
+        center,
+        turbulence_function,
+    )
+
+    return (
+        components_force_vector,
+        components_panel_vector,
+        components_gamma_vector,
+        components_force_grid,
+        components_panel_grid,
+        components_gamma_grid,
+        influence_coef_matrix,
+    )
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def aero_loads_batch(aircraft_aero_meshes, flight_conditions_list, influence_coef_matrix):
+    """Calculates the aerodynamic loads of several aircraft meshes, each one at its own flight
+    condition, sharing the same influence coefficient matrix. The matrix is factorized only
+    once and all the circulation vectors are found by a single multiple right hand side solve.
+    The velocities induced at the panels aerodynamic centers are calculated with array
+    operations, see calc_panels_flow_vector.
+
+    Args:
+        aircraft_aero_meshes (list): aircraft aerodynamic mesh of each case
+        flight_conditions_list (list): flight condition description of each case
+        influence_coef_matrix (np.array or tuple): influence coefficient matrix or its LU
+                                                   factorization, as returned by
+                                                   scipy.linalg.lu_factor
+
+    Returns:
+        cases_results (list): for each case the same tuple returned by aero_loads
+    """
+
+    if isinstance(influence_coef_matrix, tuple):
+        influence_coef_lu = influence_coef_matrix
+        influence_coef_matrix = None
+    else:
+        influence_coef_lu = sla.lu_factor(influence_coef_matrix)
+
+    cases_panels = []
+    cases_velocity_field_functions = []
+    right_hand_side_vectors = []
+
+    for aircraft_aero_mesh, flight_condition in zip(
+        aircraft_aero_meshes, flight_conditions_list
+    ):
+
+        velocity_field_function = geo.functions.velocity_field_function_generator(
+            flight_condition["translation_velocity"],
+            flight_condition["rotation_velocity"],
+            flight_condition["attitude_angles_deg"],
+            flight_condition["center_of_rotation"],
+            flight_condition.get("atm_turbulenc_function"),
+        )
+        cases_velocity_field_functions.append(velocity_field_function)
+
+        case_panels = create_aircraft_panel_vector(aircraft_aero_mesh)
+        cases_panels.append(case_panels)
+
+        right_hand_side_vectors.append(
+            calc_rhs_vector(case_panels[0], velocity_field_function)
+        )
+
+    gamma_vectors = sla.lu_solve(influence_coef_lu, np.hstack(right_hand_side_vectors))
+
+    cases_results = []
+
+    for case_panels, gamma_vector, flight_condition, velocity_field_function in zip(
+        cases_panels,
+        gamma_vectors.transpose(),
+        flight_conditions_list,
+        cases_velocity_field_functions,
+    ):
+
+        (
+            aircraft_panel_vector,
+            shapes,
+            components_panel_grid,
+            components_panel_vector,
+        ) = case_panels
+
+        (
+            components_force_vector,
+            components_gamma_vector,
+            components_force_grid,
+            components_gamma_grid,
+        ) = calc_aero_forces(
+            aircraft_panel_vector,
+            shapes,
+            gamma_vector,
+            flight_condition["translation_velocity"],
+            flight_condition["rotation_velocity"],
+            flight_condition["attitude_angles_deg"],
+            flight_condition["altitude"],
+            flight_condition["center_of_rotation"],
+            flight_condition.get("atm_turbulenc_function"),
+            flow_vector=calc_panels_flow_vector(
+                aircraft_panel_vector, gamma_vector, velocity_field_function
+            ),
+        )
+
+        cases_results.append(
+            (
+                components_force_vector,
+                components_panel_vector,
+                components_gamma_vector,
+                components_force_grid,
+                components_panel_grid,
+                components_gamma_grid,
+                influence_coef_matrix,
+            )
+        )
+
+    return cases_results
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def create_aircraft_panel_vector(aircraft_aero_mesh):
+    """Creates the panels of all the aircraft components.
+
+    Args:
+        aircraft_aero_mesh (list): aerodynamic mesh of each component
+
+    Returns:
+        aircraft_panel_vector (np.array(dtype=object)): panels of all components
+        shapes (list): panel grid shape of each component
+        components_panel_grid (list): panel grid of each component
+        components_panel_vector (list): panel vector of each component
+    """
+
     aircraft_panel_vector = np.array([], dtype="object")
     shapes = []
     components_panel_grid = []
@@ -150,36 +325,58 @@ def aero_loads(
         components_panel_grid.append(component_panel_grid)
         components_panel_vector.append(component_panel_vector)
 
-    # Calculate Influence Coefficient Matrix
-    #print("Calculating Influence Coefficient Matrix")
-    if influence_coef_matrix is None:
-        influence_coef_matrix = calc_influence_matrix(aircraft_panel_vector)
+    return aircraft_panel_vector, shapes, components_panel_grid, components_panel_vector
 
-    # Calculate right hand side vector
-    #print("Calculating Right Hand Side Vector")
-    right_hand_side_vector = calc_rhs_vector(
-        aircraft_panel_vector, velocity_field_function
-    )
 
-    # Calculate vortex circulation intensity
-    #print("Solving system to find gamma")
-    gamma_vector = gamma_solver(influence_coef_matrix, right_hand_side_vector)
+# --------------------------------------------------------------------------------------------------
 
-    if gamma_vector is None:
 
-        print("FATAL ERROR")
-        return None
+def calc_aero_forces(
+    aircraft_panel_vector,
+    shapes,
+    gamma_vector,
+    velocity_vector,
+    rotation_vector,
+    attitude_vector,
+    altitude,
+    center,
+    turbulence_function=None,
+    flow_vector=None,
+):
+    """Calculates the panels aerodynamic forces and separates the results by component.
 
-    # Calculate Local Flow Vector
+    Args:
+        aircraft_panel_vector (np.array(dtype=object)): panels of all components
+        shapes (list): panel grid shape of each component
+        gamma_vector (np.array): panels circulation
+        velocity_vector (np.array): aircraft velocity
+        rotation_vector (np.array): aircraft rotation velocity
+        attitude_vector (np.array): aircraft attitude angles [deg]
+        altitude (float): flight altitude [m]
+        center (np.array): center of rotation
+        turbulence_function (function): atmospheric turbulence velocity function, None if there
+                                        is no turbulence
+        flow_vector (np.array): local flow velocity at each panel aerodynamic center, calculated
+                                with calc_local_flow_vector if None
 
-    flow_vector = calc_local_flow_vector(
-        aircraft_panel_vector,
-        gamma_vector,
-        velocity_vector,
-        rotation_vector,
-        attitude_vector,
-        center,
-    )
+    Returns:
+        components_force_vector (list): force vector of each component
+        components_gamma_vector (list): circulation vector of each component
+        components_force_grid (list): force grid of each component
+        components_gamma_grid (list): circulation grid of each component
+    """
+
+    # Calculate Local Flow Vector
+    if flow_vector is None:
+        flow_vector = calc_local_flow_vector(
+            aircraft_panel_vector,
+            gamma_vector,
+            velocity_vector,
+            rotation_vector,
+            attitude_vector,
+            center,
+            turbulence_function,
+        )
 
     # Calculate Aerodynamic Forces
     air_density, air_pressure, air_temperature = functions.ISA(altitude)
@@ -218,18 +415,15 @@ def aero_loads(
 
     return (
         components_force_vector,
-        components_panel_vector,
         components_gamma_vector,
         components_force_grid,
-        components_panel_grid,
         components_gamma_grid,
-        influence_coef_matrix,
     )
 
 
 # --------------------------------------------------------------------------------------------------
 
-@jit
+
 def calc_influence_matrix(panel_vector):
 
     n_panels = len(panel_vector)
@@ -250,24 +444,103 @@ def calc_influence_matrix(panel_vector):
 
 # --------------------------------------------------------------------------------------------------
 
-@jit
-def calc_rhs_vector(panel_vector, velocity_field_function):
 
-    n_panels = len(panel_vector)
-    right_hand_side_vector = np.zeros((n_panels, 1))
+def update_panel_vector(panel_vector, aircraft_aero_mesh, panel_indexes):
+    """Creates again some panels of the aircraft panel vector, the panels whose corners were moved
+    by geometry.objects.MacroSurfaceMorpher, for example. The other panels are kept.
 
-    # For each colocation point i calculate the influence of panel j with a cirulation of 1
+    Args:
+        panel_vector (np.array(dtype=object)): panels of all components, modified in place
+        aircraft_aero_mesh (list): aerodynamic mesh of each component
+        panel_indexes (np.array(dtype=int)): indexes of the panels in the panel vector
 
-    for i, panel in enumerate(panel_vector):
-        flow_velocity = velocity_field_function(panel.col_point)
-        right_hand_side_vector[i][0] = -m.dot(flow_velocity, panel.n)
+    Returns:
+        panel_vector (np.array(dtype=object)): panels of all components
+    """
+
+    panel_indexes = np.asarray(panel_indexes, dtype=int)
+
+    panel_corners = np.concatenate(
+        [
+            geo.functions.macrosurface_panel_corners(component_mesh)
+            for component_mesh in aircraft_aero_mesh
+        ]
+    )
+
+    for index in panel_indexes:
+
+        # Panel grid points, leading edge in the first row and trailing edge in the second
+        point_a, point_b, point_c, point_d = panel_corners[index]
+        panel_grid = np.array([[point_b, point_c], [point_a, point_d]])
+
+        panel_vector[index] = objects.PanelHorseShoe(
+            panel_grid[:, :, 0], panel_grid[:, :, 1], panel_grid[:, :, 2]
+        )
+
+    return panel_vector
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def update_influence_matrix(influence_coef_matrix, panel_vector, panel_indexes):
+    """Calculates again the rows and columns of the influence matrix of some panels, after the
+    panels were changed by update_panel_vector.
+
+    Args:
+        influence_coef_matrix (np.array([n_panels, n_panels])): influence matrix, modified in
+                                                                place
+        panel_vector (np.array(dtype=object)): panels of all components
+        panel_indexes (np.array(dtype=int)): indexes of the changed panels
+
+    Returns:
+        influence_coef_matrix (np.array([n_panels, n_panels])): influence matrix
+    """
+
+    panel_indexes = np.asarray(panel_indexes, dtype=int)
+
+    col_points = np.array([panel.col_point for panel in panel_vector], dtype=float)
+    normals = np.array([panel.n for panel in panel_vector], dtype=float)
+    points_a = np.array([panel.horse_shoe_point_a for panel in panel_vector], dtype=float)
+    points_b = np.array([panel.horse_shoe_point_b for panel in panel_vector], dtype=float)
+
+    # Rows of the changed colocation points
+    ind_velocities = functions.horse_shoes_ind_vel_matrix(
+        points_a, points_b, col_points[panel_indexes]
+    )
+    influence_coef_matrix[panel_indexes, :] = np.sum(
+        ind_velocities * normals[panel_indexes, np.newaxis, :], axis=2
+    )
+
+    # Columns of the changed horse shoes
+    ind_velocities = functions.horse_shoes_ind_vel_matrix(
+        points_a[panel_indexes], points_b[panel_indexes], col_points
+    )
+    influence_coef_matrix[:, panel_indexes] = np.sum(
+        ind_velocities * normals[:, np.newaxis, :], axis=2
+    )
+
+    return influence_coef_matrix
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def calc_rhs_vector(panel_vector, velocity_field_function):
+
+    col_points = np.array([panel.col_point for panel in panel_vector], dtype=float)
+    normals = np.array([panel.n for panel in panel_vector], dtype=float)
+
+    # The flow velocity at all the colocation points is evaluated at once
+    flow_velocity = geo.functions.evaluate_velocity_field(velocity_field_function, col_points)
+    right_hand_side_vector = -np.sum(flow_velocity * normals, axis=1)[:, np.newaxis]
 
     return right_hand_side_vector
 
 
 # --------------------------------------------------------------------------------------------------
 
-@jit
+
 def calc_panels_ind_velocity(panel_vector, gamma_vector, point):
 
     total_ind_velocity = np.zeros(3)
@@ -283,7 +556,7 @@ def calc_panels_ind_velocity(panel_vector, gamma_vector, point):
 
 # --------------------------------------------------------------------------------------------------
 
-@jit
+
 def calc_local_flow_vector(
     panel_vector,
     gamma_vector,
@@ -291,39 +564,67 @@ def calc_local_flow_vector(
     rotation_vector,
     attitude_vector,
     attitude_center,
+    turbulence_function=None,
 ):
 
     flow_vector = np.empty(len(gamma_vector), dtype="object")
 
     velocity_field_function = geo.functions.velocity_field_function_generator(
-        velocity_vector, rotation_vector, attitude_vector, attitude_center
+        velocity_vector, rotation_vector, attitude_vector, attitude_center, turbulence_function
     )
 
+    aero_centers = np.array([panel.aero_center for panel in panel_vector], dtype=float)
+    flow_velocity = velocity_field_function(aero_centers)
+
     for i, panel in enumerate(panel_vector):
 
         # Calculate Flow vector at panel aerodynamic center
 
         flow_vector[i] = calc_panels_ind_velocity(
             panel_vector, gamma_vector, panel.aero_center
-        ) + velocity_field_function(panel.aero_center)
+        ) + flow_velocity[i]
 
     return flow_vector
 
 
 # --------------------------------------------------------------------------------------------------
 
-@jit
-def calc_panels_delta_pressure(panel_grid, force_grid):
 
-    n_chord_panels = np.shape(panel_grid)[0]
-    n_spam_panels = np.shape(panel_grid)[1]
+def calc_panels_flow_vector(panel_vector, gamma_vector, velocity_field_function):
+    """Calculates the local flow velocity at the aerodynamic center of every panel, the same as
+    calc_local_flow_vector but with the induced velocities of all the horse shoes evaluated with
+    array operations.
+
+    Args:
+        panel_vector (np.array(dtype=object)): horse shoe panels
+        gamma_vector (np.array): panels circulation
+        velocity_field_function (function): flight condition velocity field
+
+    Returns:
+        flow_vector (np.array([n_panels, 3], dtype=float)): flow velocity at each panel
+                                                            aerodynamic center
+    """
+
+    aero_centers = np.array([panel.aero_center for panel in panel_vector], dtype=float)
+    points_a = np.array([panel.horse_shoe_point_a for panel in panel_vector], dtype=float)
+    points_b = np.array([panel.horse_shoe_point_b for panel in panel_vector], dtype=float)
+
+    flow_vector = geo.functions.evaluate_velocity_field(
+        velocity_field_function, aero_centers
+    ) + functions.horse_shoes_ind_vel(points_a, points_b, aero_centers, gamma_vector)
+
+    return flow_vector
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def calc_panels_delta_pressure(panel_grid, force_grid):
 
-    delta_p_grid = np.zeros(np.shape(panel_grid))
-    force_magnitude_grid = np.zeros(np.shape(panel_grid))
+    forces = np.array(list(np.ravel(force_grid)), dtype=float)
+    areas = np.array([panel.area for panel in np.ravel(panel_grid)], dtype=float)
 
-    for i in range(n_chord_panels):
-        for j in range(n_spam_panels):
-            force_magnitude_grid[i][j] = m.norm(force_grid[i][j])
-            delta_p_grid[i][j] = force_magnitude_grid[i][j] / panel_grid[i][j].area
+    force_magnitude_grid = np.reshape(m.norm_many(forces), np.shape(panel_grid))
+    delta_p_grid = force_magnitude_grid / np.reshape(areas, np.shape(panel_grid))
 
     return delta_p_grid, force_magnitude_grid
@@ -1 +1,2 @@
 from . import functions
+from . import objects
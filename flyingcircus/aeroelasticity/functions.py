@@ -6,58 +6,44 @@ import datetime
 import time
 
 import numpy as np
-
-from pyquaternion import Quaternion
-from numba import jit
+import scipy.linalg as sla
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
 
 from .. import geometry as geo
 from .. import aerodynamics as aero
 from .. import structures as struct
 from .. import mathematics as m
-from .. import visualization as vis
 
 # ==================================================================================================
 
-@jit
+
 def calculate_loads_to_nodes_weight_matrix(
     macrosurface_aero_grid, macrosurface_struct_grid, algorithm="closest"
 ):
 
     node_vector = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
-    panel_grid = aero.vlm.create_panel_grid(macrosurface_aero_grid)
-    panel_vector = aero.vlm.flatten(panel_grid)
-
-    weight_matrix = np.zeros((len(node_vector), len(panel_vector)))
-
-    if algorithm == "closest":
-
-        closest_node = None
-        min_distance = float("inf")
 
-        for j, panel in enumerate(panel_vector):
+    panel_corners = geo.functions.macrosurface_panel_corners(macrosurface_aero_grid)
+    aero_centers = geo.functions.panels_reference_points(panel_corners)["aero_center"]
 
-            for i, node in enumerate(node_vector):
+    weight_matrix = np.zeros((len(node_vector), len(aero_centers)))
 
-                distance = geo.functions.distance_between_points(
-                    panel.aero_center, node.xyz
-                )
-
-                if distance <= min_distance:
-
-                    closest_node_index = i
-                    min_distance = distance
+    if algorithm == "closest":
 
-            weight_matrix[closest_node_index][j] = 1
+        # Closest node of each panel aerodynamic center
+        closest_node_indexes = geo.functions.closest_points_indexes(
+            aero_centers, node_vector.positions
+        )
 
-            closest_node = None
-            min_distance = float("inf")
+        weight_matrix[closest_node_indexes, np.arange(len(aero_centers))] = 1
 
         return weight_matrix
 
 
 # ==================================================================================================
 
-@jit
+
 def calculate_deformation_to_aero_grid_weight_matrix(
     macrosurface_aero_grid, macrosurface_struct_grid, algorithm="closest"
 ):
@@ -76,42 +62,34 @@ def calculate_deformation_to_aero_grid_weight_matrix(
 
     if algorithm == "closest":
 
-        closest_node = None
-        min_distance = float("inf")
-
-        for i, point in enumerate(aero_points_vector):
-
-            for j, node in enumerate(node_vector):
-
-                distance = geo.functions.distance_between_points(point, node.xyz)
-
-                if distance <= min_distance:
-
-                    closest_node_index = j
-                    min_distance = distance
-
-            weight_matrix[i][closest_node_index] = 1
+        # Closest node of each aerodynamic grid point
+        closest_node_indexes = geo.functions.closest_points_indexes(
+            aero_points_vector, node_vector.positions
+        )
 
-            closest_node = None
-            min_distance = float("inf")
+        weight_matrix[np.arange(len(aero_points_vector)), closest_node_indexes] = 1
 
         return weight_matrix
 
 
 # ==================================================================================================
 
-@jit
+
 def generated_aero_loads(
     macrosurface_aero_grid,
     macrosurface_force_grid,
     macrosurface_struct_grid,
     algorithm="closest",
     weight_matrix=None,
+    node_table=None,
 ):
 
     macrosurface_loads = []
 
-    node_vector = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
+    if node_table is None:
+        node_table = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
+
+    node_vector = node_table
     panel_grid = aero.vlm.create_panel_grid(macrosurface_aero_grid)
     panel_vector = aero.vlm.flatten(panel_grid)
     force_vector = aero.vlm.flatten(macrosurface_force_grid)
@@ -125,34 +103,24 @@ def generated_aero_loads(
             macrosurface_aero_grid, macrosurface_struct_grid, algorithm=algorithm
         )
 
-    for i, node_line in enumerate(weight_matrix):
+    aero_centers = np.array([panel.aero_center for panel in panel_vector], dtype=float)
 
-        node = node_vector[i]
+    # Panels with zero weight do not load the node
+    node_indexes, panel_indexes = np.nonzero(weight_matrix)
+    panel_weights = np.asarray(weight_matrix)[node_indexes, panel_indexes]
 
-        node_force = np.zeros(3)
-        node_moment = np.zeros(3)
+    forces = force_vector[panel_indexes] * panel_weights[:, np.newaxis]
+    r = aero_centers[panel_indexes] - node_table.positions[node_indexes]
+    moments = m.cross_many(r, forces)
 
-        for j, panel_weight in enumerate(node_line):
+    nodes_force = np.zeros((len(node_table), 3))
+    nodes_moment = np.zeros((len(node_table), 3))
+    np.add.at(nodes_force, node_indexes, forces)
+    np.add.at(nodes_moment, node_indexes, moments)
 
-            panel = panel_vector[j]
+    for i, node in enumerate(node_vector):
 
-            force = force_vector[j] * panel_weight
-            r = panel.aero_center - node.xyz
-            moment = m.cross(r, force)
-
-            node_force += force
-            node_moment += moment
-
-        load_components = np.array(
-            [
-                node_force[0],
-                node_force[1],
-                node_force[2],
-                node_moment[0],
-                node_moment[1],
-                node_moment[2],
-            ]
-        )
+        load_components = np.concatenate([nodes_force[i], nodes_moment[i]])
 
         load = struct.objects.Load(application_node=node, load=load_components)
 
@@ -163,16 +131,18 @@ def generated_aero_loads(
 
 # ==================================================================================================
 
-@jit
+
 def deform_aero_grid(
     macrosurface_aero_grid,
     macrosurface_struct_grid,
     struct_deformations,
     algorithm="closest",
     weight_matrix=None,
+    node_table=None,
 ):
 
-    node_vector = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
+    if node_table is None:
+        node_table = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
 
     surface_grids_shapes = []
     for surface_aero_grid in macrosurface_aero_grid:
@@ -193,48 +163,47 @@ def deform_aero_grid(
             macrosurface_aero_grid, macrosurface_struct_grid, algorithm="closest"
         )
 
-    x_axis = np.array([1.0, 0.0, 0.0])
-    y_axis = np.array([0.0, 1.0, 0.0])
-    z_axis = np.array([0.0, 0.0, 1.0])
-
-    deformed_points_vector = np.zeros(np.shape(aero_points_vector))
+    macrosurface_struct_deformations = np.asarray(struct_deformations)[node_table.numbers]
 
-    macrosurface_struct_deformations = []
+    # Nodes with zero weight do not move the points
+    point_indexes, node_indexes = np.nonzero(weight_matrix)
+    node_weights = np.asarray(weight_matrix)[point_indexes, node_indexes]
 
-    for node in node_vector:
-        node_deformation = struct_deformations[node.number]
-        macrosurface_struct_deformations.append(node_deformation)
+    deformations = macrosurface_struct_deformations[node_indexes] * node_weights[:, np.newaxis]
+    rot_centers = node_table.positions[node_indexes]
 
-    for i, point_line in enumerate(weight_matrix):
+    # Rotations around the node, X -> Y -> Z, very small rotations are commutative, kind of
+    n_pairs = len(point_indexes)
+    rotation_matrices = np.identity(3)
 
-        # Use Node Object to rotate and translate point
-
-        point = aero_points_vector[i]
-        point_node_object = geo.objects.Node(point, Quaternion())
-
-        for j, node_weight in enumerate(point_line):
+    for axis in range(3):
+        rot_axes = np.zeros((n_pairs, 3))
+        rot_axes[:, axis] = 1.0
+        rotation_matrices = (
+            m.rotations.axis_angle_to_matrix(rot_axes, deformations[:, 3 + axis])
+            @ rotation_matrices
+        )
 
-            node = node_vector[j]
-            deformation = macrosurface_struct_deformations[j]
+    # The nodes that deform a point are applied one after the other, in order, the points are
+    # deformed by one of their nodes at a time
+    pair_ranks = np.arange(n_pairs) - np.searchsorted(point_indexes, point_indexes)
 
-            # Apply rotations to point in relation to its correspondent structural node
-            x_rot_quat = Quaternion(axis=x_axis, angle=(deformation[3] * node_weight))
-            y_rot_quat = Quaternion(axis=y_axis, angle=(deformation[4] * node_weight))
-            z_rot_quat = Quaternion(axis=z_axis, angle=(deformation[5] * node_weight))
+    deformed_points_vector = np.array(aero_points_vector, dtype=float)
 
-            # X -> Y -> Z rotation
-            # very small rotations are commutative, kind of
-            point_node_object = point_node_object.rotate(x_rot_quat, node.xyz)
-            point_node_object = point_node_object.rotate(y_rot_quat, node.xyz)
-            point_node_object = point_node_object.rotate(z_rot_quat, node.xyz)
+    for rank in range(pair_ranks.max(initial=-1) + 1):
 
-            # Apply translation
-            translation_vector = deformation[:3] * node_weight
-            point_node_object = point_node_object.translate(translation_vector)
+        pairs = np.flatnonzero(pair_ranks == rank)
+        points = point_indexes[pairs]
 
-        deformed_points_vector[i][0] = point_node_object.x
-        deformed_points_vector[i][1] = point_node_object.y
-        deformed_points_vector[i][2] = point_node_object.z
+        deformed_points_vector[points] = (
+            np.einsum(
+                "nij,nj->ni",
+                rotation_matrices[pairs],
+                deformed_points_vector[points] - rot_centers[pairs],
+            )
+            + rot_centers[pairs]
+            + deformations[pairs, :3]
+        )
 
     x_grid, y_grid, z_grid = geo.functions.vector_to_grid(
         deformed_points_vector.transpose(), np.shape(aero_grid["xx"])
@@ -242,31 +211,168 @@ def deform_aero_grid(
 
     deformed_macrosurface_single_aero_grid = {"xx": x_grid, "yy": y_grid, "zz": z_grid}
 
-    deformed_macrosurface_aero_grid = []
+    deformed_macrosurface_aero_grid = geo.functions.single_grid_to_macrosurface_aero_grid(
+        deformed_macrosurface_single_aero_grid,
+        [shape[1] for shape in surface_grids_shapes],
+    )
+
+    return deformed_macrosurface_aero_grid
+
+
+# ==================================================================================================
+
+
+def sparse_block_matrix(row_starts, column_starts, blocks, shape):
+    """Assembles a sparse matrix from a list of dense blocks, overlapping blocks are summed.
+
+    Args:
+        row_starts (np.array([n], dtype=int)): first row of each block
+        column_starts (np.array([n], dtype=int)): first column of each block
+        blocks (np.array([n, n_rows, n_columns])): blocks values
+        shape (tuple): shape of the assembled matrix
+
+    Returns:
+        matrix (scipy.sparse.csr_matrix): assembled matrix
+    """
+
+    blocks = np.asarray(blocks, dtype=float)
+    n_blocks, n_rows, n_columns = np.shape(blocks)
+
+    rows = np.asarray(row_starts)[:, np.newaxis, np.newaxis] + np.arange(n_rows)[
+        np.newaxis, :, np.newaxis
+    ]
+    columns = np.asarray(column_starts)[:, np.newaxis, np.newaxis] + np.arange(
+        n_columns
+    )[np.newaxis, np.newaxis, :]
+
+    rows = np.broadcast_to(rows, np.shape(blocks)).flatten()
+    columns = np.broadcast_to(columns, np.shape(blocks)).flatten()
+
+    matrix = sps.coo_matrix((blocks.flatten(), (rows, columns)), shape=shape).tocsr()
+
+    return matrix
+
+
+# ==================================================================================================
+
+
+def calculate_deformation_transfer_matrix(
+    macrosurface_aero_grid, macrosurface_struct_grid, n_nodes, weight_matrix=None
+):
+    """Linearized version of deform_aero_grid, for small rotations the displacement of an
+    aerodynamic grid point p caused by the deformation u of the aircraft structure is given by
+    dp = T @ u.
+
+    Args:
+        macrosurface_aero_grid (list(dict)): macrosurface aerodynamic grids
+        macrosurface_struct_grid (list(list(Node))): macrosurface structural grids
+        n_nodes (int): total number of structural nodes of the aircraft
+        weight_matrix (np.array): deformation to aero grid weight matrix, calculated if None
+
+    Returns:
+        transfer_matrix (scipy.sparse.csr_matrix): matrix with shape (3 * n_points, 6 * n_nodes),
+                                                   the rows follow the point vector of the
+                                                   macrosurface single grid
+    """
+
+    node_vector = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
+
+    aero_grid = geo.functions.macrosurface_aero_grid_to_single_grid(
+        macrosurface_aero_grid
+    )
+
+    aero_points_vector = geo.functions.grid_to_vector(
+        aero_grid["xx"], aero_grid["yy"], aero_grid["zz"]
+    ).transpose()
+
+    if weight_matrix is None:
+
+        weight_matrix = calculate_deformation_to_aero_grid_weight_matrix(
+            macrosurface_aero_grid, macrosurface_struct_grid, algorithm="closest"
+        )
+
+    nodes_xyz = node_vector.positions
+    nodes_number = node_vector.numbers
+
+    point_index, node_index = np.nonzero(weight_matrix)
+    weights = np.asarray(weight_matrix)[point_index, node_index]
+
+    # dp = w * (dt + dr x (p - node)) = w * (dt - [p - node] @ dr)
+    lever_arms = aero_points_vector[point_index] - nodes_xyz[node_index]
+
+    blocks = np.zeros((len(point_index), 3, 6))
+    blocks[:, :, :3] = np.identity(3)
+    blocks[:, :, 3:] = -m.cross_product_matrices(lever_arms)
+    blocks *= weights[:, np.newaxis, np.newaxis]
+
+    transfer_matrix = sparse_block_matrix(
+        3 * point_index,
+        6 * nodes_number[node_index],
+        blocks,
+        (3 * len(aero_points_vector), 6 * n_nodes),
+    )
+
+    return transfer_matrix
+
+
+# ==================================================================================================
+
+
+def calculate_loads_transfer_matrix(
+    macrosurface_aero_grid, macrosurface_struct_grid, n_nodes, weight_matrix=None
+):
+    """Matrix version of generated_aero_loads, the loads applied to the aircraft structural
+    nodes by the panel forces f are given by F = S @ f.
+
+    Args:
+        macrosurface_aero_grid (list(dict)): macrosurface aerodynamic grids
+        macrosurface_struct_grid (list(list(Node))): macrosurface structural grids
+        n_nodes (int): total number of structural nodes of the aircraft
+        weight_matrix (np.array): loads to nodes weight matrix, calculated if None
 
-    slices = []
-    slice_ends = 0
-    for i in range(len(surface_grids_shapes) - 1):
-        span_n_points = surface_grids_shapes[i][1]
-        slice_ends += span_n_points
-        slices.append(slice_ends)
+    Returns:
+        transfer_matrix (scipy.sparse.csr_matrix): matrix with shape (6 * n_nodes, 3 * n_panels),
+                                                   the columns follow the flattened panel grid
+    """
 
-    x_grids = np.split(deformed_macrosurface_single_aero_grid["xx"], slices, axis=1)
-    y_grids = np.split(deformed_macrosurface_single_aero_grid["yy"], slices, axis=1)
-    z_grids = np.split(deformed_macrosurface_single_aero_grid["zz"], slices, axis=1)
+    node_vector = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
+    panel_grid = aero.vlm.create_panel_grid(macrosurface_aero_grid)
+    panel_vector = aero.vlm.flatten(panel_grid)
 
-    for x_grid, y_grid, z_grid in zip(x_grids, y_grids, z_grids):
+    if weight_matrix is None:
 
-        deformed_macrosurface_aero_grid.append(
-            {"xx": x_grid, "yy": y_grid, "zz": z_grid}
+        weight_matrix = calculate_loads_to_nodes_weight_matrix(
+            macrosurface_aero_grid, macrosurface_struct_grid, algorithm="closest"
         )
 
-    return deformed_macrosurface_aero_grid
+    nodes_xyz = node_vector.positions
+    nodes_number = node_vector.numbers
+    aero_centers = np.array([panel.aero_center for panel in panel_vector])
+
+    node_index, panel_index = np.nonzero(weight_matrix)
+    weights = np.asarray(weight_matrix)[node_index, panel_index]
+
+    # Force is copied to the node, moment is r x f
+    lever_arms = aero_centers[panel_index] - nodes_xyz[node_index]
+
+    blocks = np.zeros((len(node_index), 6, 3))
+    blocks[:, :3, :] = np.identity(3)
+    blocks[:, 3:, :] = m.cross_product_matrices(lever_arms)
+    blocks *= weights[:, np.newaxis, np.newaxis]
+
+    transfer_matrix = sparse_block_matrix(
+        6 * nodes_number[node_index],
+        3 * panel_index,
+        blocks,
+        (6 * n_nodes, 3 * len(panel_vector)),
+    )
+
+    return transfer_matrix
 
 
 # ==================================================================================================
 
-@jit
+
 def generate_aircraft_grids(aircraft_object, aircraft_grid_data):
 
     macrosurfaces_aero_grids = []
@@ -362,18 +468,26 @@ def generate_aircraft_grids(aircraft_object, aircraft_grid_data):
             aircraft_connections_list.append(connection)
 
     # Number the aircraft structural nodes
-    struct.fem.number_nodes(
+    node_numbers = struct.fem.number_nodes(
         aircraft_components_list,
         aircraft_components_nodes_list,
         aircraft_connections_list,
     )
 
+    # Sorted node tables of the macrosurfaces, created once and reused by every iteration
+    macrosurfaces_node_tables = [
+        geo.functions.create_structure_node_vector(macrosurface_struct_grid)
+        for macrosurface_struct_grid in macrosurfaces_struct_grids
+    ]
+
     if aircraft_object.beams:
 
         aircraft_grids = {
             "macrosurfaces_aero_grids": macrosurfaces_aero_grids,
             "macrosurfaces_struct_grids": macrosurfaces_struct_grids,
             "beams_struct_grids": beams_struct_grids,
+            "node_numbers": node_numbers,
+            "macrosurfaces_node_tables": macrosurfaces_node_tables,
         }
 
     else:
@@ -382,6 +496,8 @@ def generate_aircraft_grids(aircraft_object, aircraft_grid_data):
             "macrosurfaces_aero_grids": macrosurfaces_aero_grids,
             "macrosurfaces_struct_grids": macrosurfaces_struct_grids,
             "beams_struct_grids": None,
+            "node_numbers": node_numbers,
+            "macrosurfaces_node_tables": macrosurfaces_node_tables,
         }
 
     return aircraft_grids
@@ -389,7 +505,7 @@ def generate_aircraft_grids(aircraft_object, aircraft_grid_data):
 
 # ==================================================================================================
 
-@jit
+
 def generate_aircraft_constraints(aircraft, aircraft_grids, constraints_data_list):
 
     aircraft_constraints = []
@@ -460,6 +576,154 @@ def generate_aircraft_constraints(aircraft, aircraft_grids, constraints_data_lis
 # ==================================================================================================
 
 
+def calculate_fsi_weight_matrices(aircraft_object, aircraft_grids, interaction_algorithm):
+    """Calculates the fluid/structure interaction weight matrices of all the aircraft
+    macrosurfaces.
+
+    Args:
+        aircraft_object (geometry.objects.Aircraft): aircraft
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        interaction_algorithm (string): fluid/structure interaction algorithm
+
+    Returns:
+        loads_to_nodes_weight_matrices (list): loads to nodes weight matrix of each macrosurface
+        deformation_to_aero_grid_weight_matrices (list): deformation to aero grid weight matrix of
+                                                         each macrosurface
+    """
+
+    loads_to_nodes_weight_matrices = []
+    deformation_to_aero_grid_weight_matrices = []
+
+    for macrosurface_aero_grid, macrosurface_struct_grid in zip(
+        aircraft_grids["macrosurfaces_aero_grids"],
+        aircraft_grids["macrosurfaces_struct_grids"],
+    ):
+
+        loads_to_nodes_weight_matrices.append(
+            calculate_loads_to_nodes_weight_matrix(
+                macrosurface_aero_grid, macrosurface_struct_grid, interaction_algorithm
+            )
+        )
+
+        deformation_to_aero_grid_weight_matrices.append(
+            calculate_deformation_to_aero_grid_weight_matrix(
+                macrosurface_aero_grid, macrosurface_struct_grid, interaction_algorithm
+            )
+        )
+
+    return loads_to_nodes_weight_matrices, deformation_to_aero_grid_weight_matrices
+
+
+# ==================================================================================================
+
+
+def create_aircraft_structural_model(
+    aircraft_object,
+    aircraft_grids,
+    aircraft_fem_elements,
+    aircraft_constraints,
+    n_modes=None,
+    superelements=False,
+    factorize=True,
+):
+    """Creates the structural model of the aircraft, see structures.fem.create_structural_model.
+
+    Args:
+        aircraft_object (geometry.objects.Aircraft): aircraft
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        aircraft_fem_elements (dict): aircraft finite elements
+        aircraft_constraints (list): aircraft structural constraints
+        n_modes (int): number of vibration modes of the reduced order structural model, the
+                       full structural model is used if None
+        superelements (bool): condense each aircraft component into a superelement
+        factorize (bool): factorize the reduced stiffness matrix
+
+    Returns:
+        structural_model (dict): aircraft structural model
+    """
+
+    struct_grid = []
+    struct_fem_elements = []
+
+    for macrosurface_struct_grid in aircraft_grids["macrosurfaces_struct_grids"]:
+        struct_grid.extend(macrosurface_struct_grid)
+
+    for macrosurface_fem_elements in aircraft_fem_elements["macrosurfaces_fem_elements"]:
+        struct_fem_elements.extend(macrosurface_fem_elements)
+
+    if aircraft_object.beams:
+        struct_grid.extend(aircraft_grids["beams_struct_grids"])
+        struct_fem_elements.extend(aircraft_fem_elements["beams_fem_elements"])
+
+    structural_model = struct.fem.create_structural_model(
+        struct_grid,
+        struct_fem_elements,
+        aircraft_constraints,
+        n_modes=n_modes,
+        superelements=superelements,
+        factorize=factorize,
+    )
+
+    return structural_model
+
+
+# ==================================================================================================
+
+
+def calculate_aircraft_loads_transfer_matrix(
+    aircraft_grids, loads_to_nodes_weight_matrices, n_nodes
+):
+    """Assembles the loads transfer matrices of all the aircraft macrosurfaces, the structural
+    loads are given by F_global = S @ f, where f is the vector created by force_grid_to_vector.
+
+    Args:
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        loads_to_nodes_weight_matrices (list): loads to nodes weight matrix of each macrosurface
+        n_nodes (int): total number of structural nodes of the aircraft
+
+    Returns:
+        transfer_matrix (scipy.sparse.csr_matrix): matrix with shape (6 * n_nodes, 3 * n_panels)
+    """
+
+    transfer_matrices = [
+        calculate_loads_transfer_matrix(
+            macrosurface_aero_grid, macrosurface_struct_grid, n_nodes, weight_matrix
+        )
+        for macrosurface_aero_grid, macrosurface_struct_grid, weight_matrix in zip(
+            aircraft_grids["macrosurfaces_aero_grids"],
+            aircraft_grids["macrosurfaces_struct_grids"],
+            loads_to_nodes_weight_matrices,
+        )
+    ]
+
+    return sps.hstack(transfer_matrices).tocsr()
+
+
+# ==================================================================================================
+
+
+def force_grid_to_vector(aircraft_force_grid):
+    """Stacks the panels forces of all the aircraft macrosurfaces in a single vector, following
+    the columns of calculate_aircraft_loads_transfer_matrix.
+
+    Args:
+        aircraft_force_grid (list): force grid of each macrosurface
+
+    Returns:
+        force_vector (np.array([3 * n_panels])): panels forces
+    """
+
+    return np.concatenate(
+        [
+            np.reshape(np.stack(aero.vlm.flatten(macrosurface_force_grid)), -1)
+            for macrosurface_force_grid in aircraft_force_grid
+        ]
+    )
+
+
+# ==================================================================================================
+
+
 def calculate_aircraft_loads(
     aircraft_object,
     aircraft_grid_data,
@@ -479,7 +743,6 @@ def calculate_aircraft_loads(
 ):
 
     output_iter = simulation_options["output_iteration_results"]
-    iteration_results = []
 
     status = simulation_options["status_messages"]
     simulation_start_time = time.time()
@@ -493,9 +756,6 @@ def calculate_aircraft_loads(
 
     grid_start_time = time.time()
 
-    macrosurfaces_grid_data = aircraft_grid_data["macrosurfaces_grid_data"]
-    beams_grid_data = aircraft_grid_data["beams_grid_data"]
-
     aircraft_grids = generate_aircraft_grids(
         aircraft_object=aircraft_object, aircraft_grid_data=aircraft_grid_data
     )
@@ -503,8 +763,6 @@ def calculate_aircraft_loads(
     grid_end_time = time.time()
 
     aircraft_macrosurfaces_aero_grids = aircraft_grids["macrosurfaces_aero_grids"]
-    aircraft_macrosurfaces_struct_grids = aircraft_grids["macrosurfaces_struct_grids"]
-    aircraft_beams_struct_grids = aircraft_grids["beams_struct_grids"]
 
     control_node_string = simulation_options["control_node_string"]
     control_node_number = find_control_node_number(aircraft_object, aircraft_grids, control_node_string)
@@ -531,11 +789,6 @@ def calculate_aircraft_loads(
             prop_choice=fem_prop_choice,
         )
 
-        aircraft_macrosurfaces_fem_elements = aircraft_fem_elements[
-            "macrosurfaces_fem_elements"
-        ]
-        aircraft_beams_fem_elements = aircraft_fem_elements["beams_fem_elements"]
-
         fem_end_time = time.time()
 
         if status:
@@ -558,27 +811,14 @@ def calculate_aircraft_loads(
 
         matrix_start_time = time.time()
 
-        loads_to_nodes_macrosurfaces_weight_matrices = []
-        deformation_to_aero_grid_macrosurfaces_weight_matrices = []
         interaction_algorithm = simulation_options["interaction_algorithm"]
 
-        for i, macrosurface in enumerate(aircraft_object.macrosurfaces):
-
-            macrosurface_aero_grid = aircraft_macrosurfaces_aero_grids[i]
-            macrosurface_struct_grid = aircraft_macrosurfaces_struct_grids[i]
-
-            loads_to_nodes_matrix = calculate_loads_to_nodes_weight_matrix(
-                macrosurface_aero_grid, macrosurface_struct_grid, interaction_algorithm
-            )
-
-            deformation_to_aero_grid_weight_matrix = calculate_deformation_to_aero_grid_weight_matrix(
-                macrosurface_aero_grid, macrosurface_struct_grid, interaction_algorithm
-            )
-
-            loads_to_nodes_macrosurfaces_weight_matrices.append(loads_to_nodes_matrix)
-            deformation_to_aero_grid_macrosurfaces_weight_matrices.append(
-                deformation_to_aero_grid_weight_matrix
-            )
+        (
+            loads_to_nodes_macrosurfaces_weight_matrices,
+            deformation_to_aero_grid_macrosurfaces_weight_matrices,
+        ) = calculate_fsi_weight_matrices(
+            aircraft_object, aircraft_grids, interaction_algorithm
+        )
 
         matrix_end_time = time.time()
 
@@ -587,272 +827,330 @@ def calculate_aircraft_loads(
                 f"- Generating aircraft fluid/structure interaction matrices - Completed in {str(datetime.timedelta(seconds=(matrix_end_time - matrix_start_time)))}"
             )
 
-        # Aeroelastic Calculation Loop
+        # Monolithic linear solution, replaces the aeroelastic calculation loop
 
-        aelast_loop_start_time = time.time()
+        if simulation_options.get("coupling", "iterative") == "monolithic":
 
-        if status:
-            print(f"- Running aeroelastic calculation ...")
-
-        iteration_number = 0
-        bending_delta = float("inf")
-        torsion_delta = float("inf")
+            aelast_start_time = time.time()
 
-        max_iterations = simulation_options["max_iterations"]
-        bending_convergence_criteria = simulation_options[
-            "bending_convergence_criteria"
-        ]
-        torsion_convergence_criteria = simulation_options[
-            "torsion_convergence_criteria"
-        ]
+            if status:
+                print(f"- Running monolithic aeroelastic calculation ...")
+
+            monolithic_results = monolithic_aeroelastic_solver(
+                aircraft_object=aircraft_object,
+                aircraft_grids=aircraft_grids,
+                aircraft_fem_elements=aircraft_fem_elements,
+                aircraft_constraints=aircraft_constraints,
+                loads_to_nodes_weight_matrices=loads_to_nodes_macrosurfaces_weight_matrices,
+                deformation_to_aero_grid_weight_matrices=deformation_to_aero_grid_macrosurfaces_weight_matrices,
+                flight_condition_data=flight_condition_data,
+                interaction_algorithm=interaction_algorithm,
+                influence_coef_matrix=influence_coef_matrix,
+                status=status,
+            )
 
-        old_deformation = np.array([0, 0, 0, 0, 0, 0])
+            aelast_end_time = time.time()
 
-        while (bending_delta > bending_convergence_criteria) or (
-            torsion_delta > torsion_convergence_criteria
-        ):
+            if status:
+                print(
+                    f"- Running monolithic aeroelastic calculation - Completed in {str(datetime.timedelta(seconds=(aelast_end_time - aelast_start_time)))}"
+                )
 
-            if iteration_number >= max_iterations:
-                if status:
-                    print(
-                        f"    - Maximum number of iterarions, {max_iterations}, reached."
-                    )
-                break
+            final_results, iteration_results = monolithic_results_to_loop_results(
+                monolithic_results, control_node_number
+            )
 
-            else:
-                iteration_number += 1
+        else:
 
-            iteration_start_time = time.time()
+            # Aeroelastic Calculation Loop
 
-            if status:
-                print(f"    - Iteration {iteration_number}")
+            structural_model = create_aircraft_structural_model(
+                aircraft_object,
+                aircraft_grids,
+                aircraft_fem_elements,
+                aircraft_constraints,
+                n_modes=simulation_options.get("n_modes"),
+                superelements=simulation_options.get("superelements", False),
+            )
 
-            # Calculate aerodynamic loads
+            loads_transfer_matrix = calculate_aircraft_loads_transfer_matrix(
+                aircraft_grids,
+                loads_to_nodes_macrosurfaces_weight_matrices,
+                structural_model["n_nodes"],
+            )
 
-            if iteration_number == 1:
-                aircraft_deformed_macrosurfaces_aero_grids = (
-                    aircraft_macrosurfaces_aero_grids
-                )
+            aelast_loop_start_time = time.time()
 
-            aero_start_time = time.time()
-            (
-                aircraft_force_vector,
-                aircraft_panel_vector,
-                aircraft_gamma_vector,
-                aircraft_force_grid,
-                aircraft_panel_grid,
-                aircraft_gamma_grid,
-                influence_coef_matrix,
-            ) = aero.vlm.aero_loads(
-                aircraft_aero_mesh=aircraft_deformed_macrosurfaces_aero_grids,
-                velocity_vector=flight_condition_data["translation_velocity"],
-                rotation_vector=flight_condition_data["rotation_velocity"],
-                attitude_vector=flight_condition_data["attitude_angles_deg"],
-                altitude=flight_condition_data["altitude"],
-                center=flight_condition_data["center_of_rotation"],
+            if status:
+                print(f"- Running aeroelastic calculation ...")
+
+            final_results, iteration_results = iterative_aeroelastic_solver(
+                aircraft_grids=aircraft_grids,
+                structural_model=structural_model,
+                loads_transfer_matrix=loads_transfer_matrix,
+                deformation_to_aero_grid_weight_matrices=deformation_to_aero_grid_macrosurfaces_weight_matrices,
+                control_node_number=control_node_number,
+                flight_condition_data=flight_condition_data,
+                simulation_options=simulation_options,
                 influence_coef_matrix=influence_coef_matrix,
             )
-            aero_end_time = time.time()
 
-            if iteration_number == 1:
-                original_aircraft_panel_grid = aircraft_panel_grid
+            aelast_loop_end_time = time.time()
 
             if status:
                 print(
-                    f"        . Aerodynamic calculation completed in {str(datetime.timedelta(seconds=(aero_end_time - aero_start_time)))}"
+                    f"- Running aeroelastic calculation - Completed in {str(datetime.timedelta(seconds=(aelast_loop_end_time - aelast_loop_start_time)))}"
                 )
 
-            # Calculate structure deformation
-
-            struct_start_time = time.time()
-
-            # Calculate aerodynamic loads in the structure
-            aircraft_macrosurfaces_aero_loads = []
+        simulation_end_time = time.time()
+        if status:
+            print(
+                f"# Running simulation - Completed in {str(datetime.timedelta(seconds=(simulation_end_time - simulation_start_time)))}"
+            )
 
-            for (
-                macrosurface_aero_grid,
-                macrosurface_force_grid,
-                macrosurface_struct_grid,
-                loads_to_nodes_weight_matrix,
-            ) in zip(
-                aircraft_macrosurfaces_aero_grids,
-                aircraft_force_grid,
-                aircraft_macrosurfaces_struct_grids,
-                loads_to_nodes_macrosurfaces_weight_matrices,
-            ):
+        final_results["aircraft_original_grids"] = aircraft_grids
+        final_results["aircraft_struct_fem_elements"] = aircraft_fem_elements
 
-                macrosurface_aero_loads = generated_aero_loads(
-                    macrosurface_aero_grid,
-                    macrosurface_force_grid,
-                    macrosurface_struct_grid,
-                    interaction_algorithm,
-                    loads_to_nodes_weight_matrix,
-                )
+        if output_iter:
 
-                aircraft_macrosurfaces_aero_loads.append(macrosurface_aero_loads)
+            return final_results, iteration_results
 
-            # Prepare input for structural solver
+        else:
 
-            struct_grid = []
-            struct_fem_elements = []
-            struct_loads = []
-            struct_constraints = []
+            return final_results
 
-            # Add all surfaces grids to a vector
-            for macrosurface_struct_grid in aircraft_macrosurfaces_struct_grids:
+    else:
 
-                struct_grid.extend(macrosurface_struct_grid)
+        aero_start_time = time.time()
 
-            for macrosurface_fem_elements in aircraft_macrosurfaces_fem_elements:
+        (
+            aircraft_force_vector,
+            aircraft_panel_vector,
+            aircraft_gamma_vector,
+            aircraft_force_grid,
+            aircraft_panel_grid,
+            aircraft_gamma_grid,
+            influence_coef_matrix,
+        ) = aero.vlm.aero_loads(
+            aircraft_aero_mesh=aircraft_macrosurfaces_aero_grids,
+            velocity_vector=flight_condition_data["translation_velocity"],
+            rotation_vector=flight_condition_data["rotation_velocity"],
+            attitude_vector=flight_condition_data["attitude_angles_deg"],
+            altitude=flight_condition_data["altitude"],
+            center=flight_condition_data["center_of_rotation"],
+            turbulence_function=flight_condition_data.get("atm_turbulenc_function"),
+            influence_coef_matrix=influence_coef_matrix,
+        )
 
-                struct_fem_elements.extend(macrosurface_fem_elements)
+        aero_end_time = time.time()
 
-            # Add all beams to a vector
-            if aircraft_object.beams:
+        if status:
+            print(
+                f"        . Aerodynamic calculation completed in {str(datetime.timedelta(seconds=(aero_end_time - aero_start_time)))}"
+            )
 
-                struct_grid.extend(aircraft_beams_struct_grids)
+        results = {
+            "aircraft_macrosurfaces_panels": aircraft_panel_grid,
+            "aircraft_original_grids": aircraft_grids,
+            "aircraft_gamma_grid": aircraft_gamma_grid,
+            "aircraft_force_grid": aircraft_force_grid,
+            "influence_coef_matrix": influence_coef_matrix,
+        }
 
-                struct_fem_elements.extend(aircraft_beams_fem_elements)
+        return results
 
-            # Add all loads to a vector
-            for macrosurface_aero_loads in aircraft_macrosurfaces_aero_loads:
 
-                struct_loads.extend(macrosurface_aero_loads)
+# ==================================================================================================
 
-            # Add constraints to a vector
-            struct_constraints.extend(aircraft_constraints)
 
-            # Calculate structure deformations
-            deformations, internal_loads = struct.fem.structural_solver(
-                struct_grid, struct_fem_elements, struct_loads, struct_constraints
-            )
+def deform_aircraft_aero_grids(
+    aircraft_grids, deformations, deformation_to_aero_grid_weight_matrices
+):
+    """Deforms the aerodynamic grids of all the aircraft macrosurfaces.
 
-            struct_end_time = time.time()
-            if status:
-                print(
-                    f"        . Structural calculation completed in {str(datetime.timedelta(seconds=(struct_end_time - struct_start_time)))}"
-                )
+    Args:
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        deformations (np.array([n_nodes, 6])): structural nodes deformations
+        deformation_to_aero_grid_weight_matrices (list): deformation to aero grid weight matrix of
+                                                         each macrosurface
 
-            # Deform aerodynamic grid
+    Returns:
+        aircraft_deformed_macrosurfaces_aero_grids (list): deformed aerodynamic grids
+        aircraft_deformed_macrosurfaces_aero_panels (list): deformed panel grids
+    """
 
-            def_start_time = time.time()
+    aircraft_deformed_macrosurfaces_aero_grids = []
+    aircraft_deformed_macrosurfaces_aero_panels = []
 
-            aircraft_deformed_macrosurfaces_aero_grids = []
-            aircraft_deformed_macrosurfaces_aero_panels = []
+    macrosurfaces_node_tables = aircraft_grids.get(
+        "macrosurfaces_node_tables",
+        [None] * len(aircraft_grids["macrosurfaces_struct_grids"]),
+    )
 
-            for (
-                macrosurface_struct_grid,
-                macrosurface_aero_grid,
-                deformation_to_aero_grid_weight_matrix,
-            ) in zip(
-                aircraft_macrosurfaces_struct_grids,
-                aircraft_macrosurfaces_aero_grids,
-                deformation_to_aero_grid_macrosurfaces_weight_matrices,
-            ):
+    for (
+        macrosurface_struct_grid,
+        macrosurface_aero_grid,
+        deformation_to_aero_grid_weight_matrix,
+        macrosurface_node_table,
+    ) in zip(
+        aircraft_grids["macrosurfaces_struct_grids"],
+        aircraft_grids["macrosurfaces_aero_grids"],
+        deformation_to_aero_grid_weight_matrices,
+        macrosurfaces_node_tables,
+    ):
 
-                deformed_macrosurface_aero_grid = deform_aero_grid(
-                    macrosurface_aero_grid,
-                    macrosurface_struct_grid,
-                    deformations,
-                    weight_matrix=deformation_to_aero_grid_weight_matrix,
-                )
+        deformed_macrosurface_aero_grid = deform_aero_grid(
+            macrosurface_aero_grid,
+            macrosurface_struct_grid,
+            deformations,
+            weight_matrix=deformation_to_aero_grid_weight_matrix,
+            node_table=macrosurface_node_table,
+        )
 
-                deformed_macrosurface_aero_panels = aero.vlm.create_panel_grid(
-                    deformed_macrosurface_aero_grid
-                )
+        aircraft_deformed_macrosurfaces_aero_grids.append(deformed_macrosurface_aero_grid)
+        aircraft_deformed_macrosurfaces_aero_panels.append(
+            aero.vlm.create_panel_grid(deformed_macrosurface_aero_grid)
+        )
 
-                aircraft_deformed_macrosurfaces_aero_grids.append(
-                    deformed_macrosurface_aero_grid
-                )
-                aircraft_deformed_macrosurfaces_aero_panels.append(
-                    deformed_macrosurface_aero_panels
-                )
+    return aircraft_deformed_macrosurfaces_aero_grids, aircraft_deformed_macrosurfaces_aero_panels
 
-            def_end_time = time.time()
-            if status:
-                print(
-                    f"        . Aerodynamic Grid deformation completed in {str(datetime.timedelta(seconds=(def_end_time - def_start_time)))}"
-                )
 
-            iteration_end_time = time.time()
+# ==================================================================================================
 
-            # Check convergence
 
-            new_deformation = deformations[control_node_number]
+def deformation_convergence_deltas(new_deformation, old_deformation):
+    """Calculates the relative change of the control node deformation between two iterations.
 
-            if np.array_equal(old_deformation, np.zeros([6])):
-                delta_deformation = np.full((6), float("inf"))
+    Args:
+        new_deformation (np.array([6])): control node deformation of the current iteration
+        old_deformation (np.array([6])): control node deformation of the last iteration
 
-            else:
-                delta_deformation = np.abs(new_deformation - old_deformation) / np.abs(old_deformation)
+    Returns:
+        bending_delta (float): norm of the relative change of the translations
+        torsion_delta (float): norm of the relative change of the rotations
+    """
 
-            bending_delta = m.norm(delta_deformation[:3])
-            torsion_delta = m.norm(delta_deformation[3:])
+    if np.array_equal(old_deformation, np.zeros([6])):
+        delta_deformation = np.full((6), float("inf"))
 
-            old_deformation = np.copy(new_deformation)
+    else:
+        delta_deformation = np.abs(new_deformation - old_deformation) / np.abs(old_deformation)
 
-            if output_iter:
+    bending_delta = m.norm(delta_deformation[:3])
+    torsion_delta = m.norm(delta_deformation[3:])
 
-                this_iteration_results = {
-                    "iteration_number": iteration_number,
-                    "aircraft_deformed_macrosurfaces_aero_grids": aircraft_deformed_macrosurfaces_aero_grids,
-                    "aircraft_macrosurfaces_panel_grid": aircraft_deformed_macrosurfaces_aero_panels,
-                    "aircraft_gamma_grid": aircraft_gamma_grid,
-                    "aircraft_force_grid": aircraft_force_grid,
-                    "aircraft_struct_deformations": deformations,
-                    "aircraft_struct_internal_loads": internal_loads,
-                    "deformation_at_control_node": old_deformation,
-                    "influence_coef_matrix": influence_coef_matrix,
-                }
+    return bending_delta, torsion_delta
 
-                iteration_results.append(this_iteration_results)
 
-            print(f"        . Bending Delta: {bending_delta}")
-            print(f"        . Torsion Delta: {torsion_delta}")
+# ==================================================================================================
 
-            if status:
-                print(
-                    f"        . Iteration {iteration_number} completed in {str(datetime.timedelta(seconds=(iteration_end_time - iteration_start_time)))}"
-                )
-        aelast_loop_end_time = time.time()
 
-        if status:
-            print(
-                f"- Running aeroelastic calculation - Completed in {str(datetime.timedelta(seconds=(aelast_loop_end_time - aelast_loop_start_time)))}"
-            )
+def iterative_aeroelastic_solver(
+    aircraft_grids,
+    structural_model,
+    loads_transfer_matrix,
+    deformation_to_aero_grid_weight_matrices,
+    control_node_number,
+    flight_condition_data,
+    simulation_options,
+    influence_coef_matrix=None,
+    initial_deformations=None,
+):
+    """Aeroelastic calculation loop. The aerodynamic loads are calculated, transfered to the
+    structure, the structure deformations are found and the aerodynamic grid is deformed, until
+    the deformation at the control node converges.
+
+    The influence coefficient matrix is calculated only in the first iteration, with the
+    undeformed aerodynamic grid, and the factorization of the reduced stiffness matrix stored in
+    the structural model is reused by all the iterations.
+
+    If initial_deformations is given the aerodynamic grid is deformed before the first
+    aerodynamic calculation (warm start) and the first convergence check is done against the
+    initial deformation of the control node.
+
+    Args:
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        structural_model (dict): aircraft structural model, see create_aircraft_structural_model
+        loads_transfer_matrix (scipy.sparse.csr_matrix): see
+                                                         calculate_aircraft_loads_transfer_matrix
+        deformation_to_aero_grid_weight_matrices (list): deformation to aero grid weight matrix of
+                                                         each macrosurface
+        control_node_number (int): number of the node used to check the convergence
+        flight_condition_data (dict): flight condition description
+        simulation_options (dict): simulation options, as in calculate_aircraft_loads
+        influence_coef_matrix (np.array): influence coefficient matrix, calculated if None
+        initial_deformations (np.array([n_nodes, 6])): deformations used as starting point
+
+    Returns:
+        final_results (dict): results of the last iteration
+        iteration_results (list): results of each iteration, empty if the option
+                                  output_iteration_results is False
+    """
 
-        simulation_end_time = time.time()
-        if status:
-            print(
-                f"# Running simulation - Completed in {str(datetime.timedelta(seconds=(simulation_end_time - simulation_start_time)))}"
-            )
+    output_iter = simulation_options["output_iteration_results"]
+    iteration_results = []
 
-        final_results = {
-            "aircraft_deformed_macrosurfaces_aero_grids": aircraft_deformed_macrosurfaces_aero_grids,
-            "aircraft_deformed_macrosurfaces_aero_panels": aircraft_deformed_macrosurfaces_aero_panels,
-            "aircraft_gamma_grid": aircraft_gamma_grid,
-            "aircraft_force_grid": aircraft_force_grid,
-            "aircraft_struct_deformations": deformations,
-            "aircraft_struct_internal_loads": internal_loads,
-            "deformation_at_control_node": old_deformation,
-            "influence_coef_matrix": influence_coef_matrix,
-            "aircraft_original_grids": aircraft_grids,
-            "aircraft_struct_fem_elements": aircraft_fem_elements,
-            "original_aircraft_panel_grid": original_aircraft_panel_grid,
-        }
+    status = simulation_options["status_messages"]
 
-        if output_iter:
+    aircraft_macrosurfaces_aero_grids = aircraft_grids["macrosurfaces_aero_grids"]
+    aircraft_macrosurfaces_struct_grids = aircraft_grids["macrosurfaces_struct_grids"]
 
-            return final_results, iteration_results
+    n_nodes = structural_model["n_nodes"]
+    K_global = structural_model["K_global"]
+
+    iteration_number = 0
+    bending_delta = float("inf")
+    torsion_delta = float("inf")
+
+    max_iterations = simulation_options["max_iterations"]
+    bending_convergence_criteria = simulation_options["bending_convergence_criteria"]
+    torsion_convergence_criteria = simulation_options["torsion_convergence_criteria"]
+
+    old_deformation = np.array([0, 0, 0, 0, 0, 0])
+
+    # Warm start, the first aerodynamic calculation is done with the deformed grid
+    aircraft_deformed_macrosurfaces_aero_grids = aircraft_macrosurfaces_aero_grids
+
+    warm_start = initial_deformations is not None and np.any(initial_deformations)
+
+    if warm_start:
+
+        (
+            aircraft_panel_vector,
+            shapes,
+            original_aircraft_panel_grid,
+            components_panel_vector,
+        ) = aero.vlm.create_aircraft_panel_vector(aircraft_macrosurfaces_aero_grids)
+
+        if influence_coef_matrix is None:
+            influence_coef_matrix = aero.vlm.calc_influence_matrix(aircraft_panel_vector)
+
+        aircraft_deformed_macrosurfaces_aero_grids = deform_aircraft_aero_grids(
+            aircraft_grids, initial_deformations, deformation_to_aero_grid_weight_matrices
+        )[0]
+
+        old_deformation = np.copy(initial_deformations[control_node_number])
+
+    while (bending_delta > bending_convergence_criteria) or (
+        torsion_delta > torsion_convergence_criteria
+    ):
+
+        if iteration_number >= max_iterations:
+            if status:
+                print(f"    - Maximum number of iterarions, {max_iterations}, reached.")
+            break
 
         else:
+            iteration_number += 1
 
-            return final_results
+        iteration_start_time = time.time()
 
-    else:
+        if status:
+            print(f"    - Iteration {iteration_number}")
 
-        aero_start_time = time.time()
+        # Calculate aerodynamic loads
 
+        aero_start_time = time.time()
         (
             aircraft_force_vector,
             aircraft_panel_vector,
@@ -862,37 +1160,1223 @@ def calculate_aircraft_loads(
             aircraft_gamma_grid,
             influence_coef_matrix,
         ) = aero.vlm.aero_loads(
-            aircraft_aero_mesh=aircraft_macrosurfaces_aero_grids,
+            aircraft_aero_mesh=aircraft_deformed_macrosurfaces_aero_grids,
             velocity_vector=flight_condition_data["translation_velocity"],
             rotation_vector=flight_condition_data["rotation_velocity"],
             attitude_vector=flight_condition_data["attitude_angles_deg"],
             altitude=flight_condition_data["altitude"],
             center=flight_condition_data["center_of_rotation"],
+            turbulence_function=flight_condition_data.get("atm_turbulenc_function"),
             influence_coef_matrix=influence_coef_matrix,
         )
-
         aero_end_time = time.time()
 
+        if iteration_number == 1 and not warm_start:
+            original_aircraft_panel_grid = aircraft_panel_grid
+
         if status:
             print(
                 f"        . Aerodynamic calculation completed in {str(datetime.timedelta(seconds=(aero_end_time - aero_start_time)))}"
             )
 
-        results = {
-            "aircraft_macrosurfaces_panels": aircraft_panel_grid,
-            "aircraft_original_grids": aircraft_grids,
-            "aircraft_gamma_grid": aircraft_gamma_grid,
-            "aircraft_force_grid": aircraft_force_grid,
-            "influence_coef_matrix": influence_coef_matrix,
+        # Calculate structure deformation
+
+        struct_start_time = time.time()
+
+        # Aerodynamic loads in the structure, transfered with the undeformed geometry
+        F_global = loads_transfer_matrix @ force_grid_to_vector(aircraft_force_grid)
+
+        X_global = struct.fem.factorized_FEM_solver(structural_model, F_global)
+        force_vector = K_global @ X_global
+
+        deformations = np.reshape(X_global, (n_nodes, 6))
+        internal_loads = np.reshape(force_vector, (n_nodes, 6))
+
+        struct_end_time = time.time()
+        if status:
+            print(
+                f"        . Structural calculation completed in {str(datetime.timedelta(seconds=(struct_end_time - struct_start_time)))}"
+            )
+
+        # Deform aerodynamic grid
+
+        def_start_time = time.time()
+
+        (
+            aircraft_deformed_macrosurfaces_aero_grids,
+            aircraft_deformed_macrosurfaces_aero_panels,
+        ) = deform_aircraft_aero_grids(
+            aircraft_grids, deformations, deformation_to_aero_grid_weight_matrices
+        )
+
+        def_end_time = time.time()
+        if status:
+            print(
+                f"        . Aerodynamic Grid deformation completed in {str(datetime.timedelta(seconds=(def_end_time - def_start_time)))}"
+            )
+
+        iteration_end_time = time.time()
+
+        # Check convergence
+
+        new_deformation = deformations[control_node_number]
+
+        bending_delta, torsion_delta = deformation_convergence_deltas(
+            new_deformation, old_deformation
+        )
+
+        old_deformation = np.copy(new_deformation)
+
+        if output_iter:
+
+            this_iteration_results = {
+                "iteration_number": iteration_number,
+                "aircraft_deformed_macrosurfaces_aero_grids": aircraft_deformed_macrosurfaces_aero_grids,
+                "aircraft_macrosurfaces_panel_grid": aircraft_deformed_macrosurfaces_aero_panels,
+                "aircraft_gamma_grid": aircraft_gamma_grid,
+                "aircraft_force_grid": aircraft_force_grid,
+                "aircraft_struct_deformations": deformations,
+                "aircraft_struct_internal_loads": internal_loads,
+                "deformation_at_control_node": old_deformation,
+                "influence_coef_matrix": influence_coef_matrix,
+            }
+
+            iteration_results.append(this_iteration_results)
+
+        print(f"        . Bending Delta: {bending_delta}")
+        print(f"        . Torsion Delta: {torsion_delta}")
+
+        if status:
+            print(
+                f"        . Iteration {iteration_number} completed in {str(datetime.timedelta(seconds=(iteration_end_time - iteration_start_time)))}"
+            )
+
+    final_results = {
+        "aircraft_deformed_macrosurfaces_aero_grids": aircraft_deformed_macrosurfaces_aero_grids,
+        "aircraft_deformed_macrosurfaces_aero_panels": aircraft_deformed_macrosurfaces_aero_panels,
+        "aircraft_gamma_grid": aircraft_gamma_grid,
+        "aircraft_force_grid": aircraft_force_grid,
+        "aircraft_struct_deformations": deformations,
+        "aircraft_struct_internal_loads": internal_loads,
+        "deformation_at_control_node": old_deformation,
+        "influence_coef_matrix": influence_coef_matrix,
+        "original_aircraft_panel_grid": original_aircraft_panel_grid,
+        "number_of_iterations": iteration_number,
+    }
+
+    return final_results, iteration_results
+
+
+# ==================================================================================================
+
+
+def batch_aeroelastic_solver(
+    aircraft_grids,
+    structural_model,
+    loads_transfer_matrix,
+    deformation_to_aero_grid_weight_matrices,
+    control_node_number,
+    flight_conditions_list,
+    simulation_options,
+    influence_coef_matrix=None,
+    initial_deformations_list=None,
+):
+    """Aeroelastic calculation loop of several flight conditions iterated in lockstep. In each
+    iteration all the active conditions share the same work:
+
+        - the circulation of every condition is found by a single multiple right hand side solve
+          with the LU factorization of the influence coefficient matrix
+        - the panels forces are transfered to the structure by a single sparse matrix product
+        - the deformations are found by a single multiple right hand side solve with the
+          factorization of the reduced stiffness matrix
+
+    Each condition leaves the batch as soon as it converges.
+
+    Args:
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        structural_model (dict): aircraft structural model, see create_aircraft_structural_model
+        loads_transfer_matrix (scipy.sparse.csr_matrix): see
+                                                         calculate_aircraft_loads_transfer_matrix
+        deformation_to_aero_grid_weight_matrices (list): deformation to aero grid weight matrix of
+                                                         each macrosurface
+        control_node_number (int): number of the node used to check the convergence
+        flight_conditions_list (list): list of flight conditions descriptions
+        simulation_options (dict): simulation options, as in calculate_aircraft_loads
+        influence_coef_matrix (np.array): influence coefficient matrix of the undeformed
+                                          aircraft, calculated if None
+        initial_deformations_list (list): starting deformations of each condition, undeformed if
+                                          None
+
+    Returns:
+        cases_results (list): results of each flight condition, same keys as the final results
+                              of iterative_aeroelastic_solver
+    """
+
+    status = simulation_options["status_messages"]
+
+    max_iterations = simulation_options["max_iterations"]
+    bending_convergence_criteria = simulation_options["bending_convergence_criteria"]
+    torsion_convergence_criteria = simulation_options["torsion_convergence_criteria"]
+
+    n_nodes = structural_model["n_nodes"]
+    K_global = structural_model["K_global"]
+    n_cases = len(flight_conditions_list)
+
+    if initial_deformations_list is None:
+        initial_deformations_list = [None for i in range(n_cases)]
+
+    # Influence coefficient matrix of the undeformed aircraft, factorized only once
+    (
+        aircraft_panel_vector,
+        shapes,
+        original_aircraft_panel_grid,
+        components_panel_vector,
+    ) = aero.vlm.create_aircraft_panel_vector(aircraft_grids["macrosurfaces_aero_grids"])
+
+    if influence_coef_matrix is None:
+        influence_coef_matrix = aero.vlm.calc_influence_matrix(aircraft_panel_vector)
+
+    influence_coef_lu = sla.lu_factor(influence_coef_matrix)
+
+    # Initial state of each condition
+    cases_aero_grids = []
+    old_deformations = []
+
+    for initial_deformations in initial_deformations_list:
+
+        if initial_deformations is not None and np.any(initial_deformations):
+            cases_aero_grids.append(
+                deform_aircraft_aero_grids(
+                    aircraft_grids,
+                    initial_deformations,
+                    deformation_to_aero_grid_weight_matrices,
+                )[0]
+            )
+            old_deformations.append(np.copy(initial_deformations[control_node_number]))
+
+        else:
+            cases_aero_grids.append(aircraft_grids["macrosurfaces_aero_grids"])
+            old_deformations.append(np.zeros(6))
+
+    cases_results = [None for i in range(n_cases)]
+    active_cases = list(range(n_cases))
+    iteration_number = 0
+
+    while active_cases:
+
+        if iteration_number >= max_iterations:
+            if status:
+                print(f"    - Maximum number of iterarions, {max_iterations}, reached.")
+            break
+
+        else:
+            iteration_number += 1
+
+        iteration_start_time = time.time()
+
+        # Aerodynamic loads of all active conditions
+        cases_aero_results = aero.vlm.aero_loads_batch(
+            [cases_aero_grids[case] for case in active_cases],
+            [flight_conditions_list[case] for case in active_cases],
+            influence_coef_lu,
+        )
+
+        # Structural deformations of all active conditions
+        forces_matrix = np.column_stack(
+            [force_grid_to_vector(case_aero_results[3]) for case_aero_results in cases_aero_results]
+        )
+
+        F_global = loads_transfer_matrix @ forces_matrix
+        X_global = struct.fem.factorized_FEM_solver(structural_model, F_global)
+        force_vector = K_global @ X_global
+
+        converged_cases = []
+
+        for k, case in enumerate(active_cases):
+
+            deformations = np.reshape(X_global[:, k], (n_nodes, 6))
+            internal_loads = np.reshape(force_vector[:, k], (n_nodes, 6))
+
+            (
+                cases_aero_grids[case],
+                aircraft_deformed_macrosurfaces_aero_panels,
+            ) = deform_aircraft_aero_grids(
+                aircraft_grids, deformations, deformation_to_aero_grid_weight_matrices
+            )
+
+            new_deformation = deformations[control_node_number]
+
+            bending_delta, torsion_delta = deformation_convergence_deltas(
+                new_deformation, old_deformations[case]
+            )
+
+            old_deformations[case] = np.copy(new_deformation)
+
+            cases_results[case] = {
+                "aircraft_deformed_macrosurfaces_aero_grids": cases_aero_grids[case],
+                "aircraft_deformed_macrosurfaces_aero_panels": aircraft_deformed_macrosurfaces_aero_panels,
+                "aircraft_gamma_grid": cases_aero_results[k][5],
+                "aircraft_force_grid": cases_aero_results[k][3],
+                "aircraft_struct_deformations": deformations,
+                "aircraft_struct_internal_loads": internal_loads,
+                "deformation_at_control_node": old_deformations[case],
+                "influence_coef_matrix": influence_coef_matrix,
+                "original_aircraft_panel_grid": original_aircraft_panel_grid,
+                "number_of_iterations": iteration_number,
+            }
+
+            if (bending_delta <= bending_convergence_criteria) and (
+                torsion_delta <= torsion_convergence_criteria
+            ):
+                converged_cases.append(case)
+
+        iteration_end_time = time.time()
+
+        if status:
+            print(
+                f"    - Iteration {iteration_number}: {len(active_cases)} active conditions, {len(converged_cases)} converged, completed in {str(datetime.timedelta(seconds=(iteration_end_time - iteration_start_time)))}"
+            )
+
+        active_cases = [case for case in active_cases if case not in converged_cases]
+
+    return cases_results
+
+
+# ==================================================================================================
+
+
+def monolithic_results_to_loop_results(monolithic_results, control_node_number):
+    """Converts the results of monolithic_aeroelastic_solver to the format of the results of
+    iterative_aeroelastic_solver, the monolithic solution is reported as a single iteration.
+
+    Args:
+        monolithic_results (dict): results of monolithic_aeroelastic_solver
+        control_node_number (int): number of the control node
+
+    Returns:
+        final_results (dict): results of the solution
+        iteration_results (list): list with the results of the single iteration
+    """
+
+    deformation_at_control_node = np.copy(
+        monolithic_results["aircraft_struct_deformations"][control_node_number]
+    )
+
+    final_results = {
+        "aircraft_deformed_macrosurfaces_aero_grids": monolithic_results[
+            "aircraft_deformed_macrosurfaces_aero_grids"
+        ],
+        "aircraft_deformed_macrosurfaces_aero_panels": monolithic_results[
+            "aircraft_deformed_macrosurfaces_aero_panels"
+        ],
+        "aircraft_gamma_grid": monolithic_results["aircraft_gamma_grid"],
+        "aircraft_force_grid": monolithic_results["aircraft_force_grid"],
+        "aircraft_struct_deformations": monolithic_results["aircraft_struct_deformations"],
+        "aircraft_struct_internal_loads": monolithic_results[
+            "aircraft_struct_internal_loads"
+        ],
+        "deformation_at_control_node": deformation_at_control_node,
+        "influence_coef_matrix": monolithic_results["influence_coef_matrix"],
+        "original_aircraft_panel_grid": monolithic_results["original_aircraft_panel_grid"],
+        "number_of_iterations": 1,
+    }
+
+    iteration_results = [
+        {
+            "iteration_number": 1,
+            "aircraft_deformed_macrosurfaces_aero_grids": final_results[
+                "aircraft_deformed_macrosurfaces_aero_grids"
+            ],
+            "aircraft_macrosurfaces_panel_grid": final_results[
+                "aircraft_deformed_macrosurfaces_aero_panels"
+            ],
+            "aircraft_gamma_grid": final_results["aircraft_gamma_grid"],
+            "aircraft_force_grid": final_results["aircraft_force_grid"],
+            "aircraft_struct_deformations": final_results["aircraft_struct_deformations"],
+            "aircraft_struct_internal_loads": final_results[
+                "aircraft_struct_internal_loads"
+            ],
+            "deformation_at_control_node": deformation_at_control_node,
+            "influence_coef_matrix": final_results["influence_coef_matrix"],
         }
+    ]
+
+    return final_results, iteration_results
+
+
+# ==================================================================================================
+
+
+def flight_condition_features(flight_condition_data):
+    """Creates a vector with the parameters that describe a flight condition, used to measure
+    the distance between flight conditions.
+
+    Args:
+        flight_condition_data (dict): flight condition description
+
+    Returns:
+        features (np.array([10])): translation velocity, rotation velocity, attitude angles and
+                                   altitude
+    """
+
+    features = np.concatenate(
+        [
+            np.asarray(flight_condition_data["translation_velocity"], dtype=float),
+            np.asarray(flight_condition_data["rotation_velocity"], dtype=float),
+            np.asarray(flight_condition_data["attitude_angles_deg"], dtype=float),
+            [float(flight_condition_data["altitude"])],
+        ]
+    )
+
+    return features
+
+
+# ==================================================================================================
+
+
+def normalized_flight_conditions_features(flight_conditions_list):
+    """Creates the features of a list of flight conditions, see flight_condition_features, with
+    each parameter normalized by its range in the list. Parameters that do not change are zero.
+
+    Args:
+        flight_conditions_list (list): list of flight conditions descriptions
+
+    Returns:
+        features (np.array([n_conditions, 10])): normalized parameters of the flight conditions
+    """
+
+    features = np.array(
+        [flight_condition_features(condition) for condition in flight_conditions_list]
+    )
+
+    features_range = np.ptp(features, axis=0)
+    features_range[features_range == 0] = 1
+    features = (features - np.min(features, axis=0)) / features_range
+
+    return features
+
+
+# ==================================================================================================
+
+
+def order_flight_conditions(flight_conditions_list):
+    """Orders a list of flight conditions so that each condition is close to the previous one.
+    The parameters are normalized by normalized_flight_conditions_features and a nearest
+    neighbour path is built starting from the lexicographically smallest condition.
+
+    Args:
+        flight_conditions_list (list): list of flight conditions descriptions
+
+    Returns:
+        order (np.array(dtype=int)): indexes of the flight conditions in the solution order
+        features (np.array([n_conditions, 10])): normalized parameters of the flight conditions
+    """
+
+    features = normalized_flight_conditions_features(flight_conditions_list)
+
+    n_conditions = len(features)
+    visited = np.zeros(n_conditions, dtype=bool)
+
+    order = [np.lexsort(features.transpose()[::-1])[0]]
+    visited[order[0]] = True
+
+    for i in range(n_conditions - 1):
+        distances = np.linalg.norm(features - features[order[-1]], axis=1)
+        distances[visited] = np.inf
+        order.append(np.argmin(distances))
+        visited[order[-1]] = True
+
+    return np.array(order, dtype=int), features
+
+
+# ==================================================================================================
+
+
+def aeroelastic_sweep(
+    aeroelastic_model,
+    flight_conditions_list,
+    simulation_options,
+    warm_start="extrapolation",
+    order_conditions=True,
+    compare_cold_start=False,
+):
+    """Solves a sequence of flight conditions with continuation. Each condition is started from
+    the converged deformation of the previous one ("previous") or from a linear extrapolation of
+    the last two ("extrapolation"), instead of the undeformed aircraft.
+
+    Args:
+        aeroelastic_model (objects.AeroelasticModel): aeroelastic model of the aircraft
+        flight_conditions_list (list): list of flight conditions descriptions
+        simulation_options (dict): same options as AeroelasticModel.solve, the iteration results
+                                   are not stored
+        warm_start (string): "extrapolation", "previous" or None for cold starts
+        order_conditions (bool): if True the conditions are solved in the order given by
+                                 order_flight_conditions, else in the list order
+        compare_cold_start (bool): if True every condition is also solved from the undeformed
+                                   aircraft to find the number of iterations saved
+
+    Returns:
+        sweep_results (dict): results (list with the results of each condition, in the original
+                              order), number_of_iterations, cold_start_number_of_iterations,
+                              iterations_saved and solution_order
+    """
+
+    status = simulation_options["status_messages"]
+
+    simulation_options = dict(simulation_options)
+    simulation_options["output_iteration_results"] = False
+
+    n_conditions = len(flight_conditions_list)
+
+    if order_conditions:
+        order, features = order_flight_conditions(flight_conditions_list)
+    else:
+        order = np.arange(n_conditions)
+        features = normalized_flight_conditions_features(flight_conditions_list)
+
+    results = [None for i in range(n_conditions)]
+    number_of_iterations = np.zeros(n_conditions, dtype=int)
+
+    solved = []
+
+    for i in order:
+
+        initial_deformations = None
+
+        if warm_start is not None and len(solved) >= 1:
+
+            last = solved[-1]
+            initial_deformations = results[last]["aircraft_struct_deformations"]
+
+            if warm_start == "extrapolation" and len(solved) >= 2:
+
+                before_last = solved[-2]
+                step = features[last] - features[before_last]
+                step_norm = np.dot(step, step)
+
+                if step_norm > 0:
+
+                    # Projection of the new step on the last one, limited to avoid large jumps
+                    ratio = min(np.dot(features[i] - features[last], step) / step_norm, 2)
+
+                    if ratio > 0:
+                        initial_deformations = initial_deformations + ratio * (
+                            initial_deformations
+                            - results[before_last]["aircraft_struct_deformations"]
+                        )
+
+        results[i] = aeroelastic_model.solve(
+            flight_conditions_list[i],
+            simulation_options,
+            initial_deformations=initial_deformations,
+        )
+
+        number_of_iterations[i] = results[i]["number_of_iterations"]
+        solved.append(i)
+
+        if status:
+            print(f"- Flight condition {i}: {number_of_iterations[i]} iterations")
+
+    cold_start_number_of_iterations = None
+    iterations_saved = None
+
+    if compare_cold_start:
+
+        cold_start_number_of_iterations = np.array(
+            [
+                aeroelastic_model.solve(condition, simulation_options)[
+                    "number_of_iterations"
+                ]
+                for condition in flight_conditions_list
+            ],
+            dtype=int,
+        )
+
+        iterations_saved = np.sum(cold_start_number_of_iterations) - np.sum(
+            number_of_iterations
+        )
+
+        if status:
+            print(
+                f"- Iterations: {np.sum(number_of_iterations)}, cold start: {np.sum(cold_start_number_of_iterations)}, saved: {iterations_saved}"
+            )
+
+    sweep_results = {
+        "results": results,
+        "number_of_iterations": number_of_iterations,
+        "cold_start_number_of_iterations": cold_start_number_of_iterations,
+        "iterations_saved": iterations_saved,
+        "solution_order": order,
+    }
+
+    return sweep_results
+
+
+# ==================================================================================================
+
+
+def calculate_dynamic_pressure(flight_condition_data):
+    """Calculates the flight dynamic pressure, q = 0.5 * rho * V ** 2
+
+    Args:
+        flight_condition_data (dict): flight condition description
+
+    Returns:
+        dynamic_pressure (float): dynamic pressure [Pa]
+    """
+
+    air_density, air_pressure, air_temperature = aero.functions.ISA(
+        flight_condition_data["altitude"]
+    )
+
+    true_airspeed = flight_condition_data["translation_velocity"][0]
+
+    dynamic_pressure = 0.5 * air_density * true_airspeed ** 2
+
+    return dynamic_pressure
+
+
+# ==================================================================================================
+
+
+def calculate_aerodynamic_stiffness_matrix(
+    aircraft_macrosurfaces_aero_grids,
+    aircraft_macrosurfaces_struct_grids,
+    loads_to_nodes_weight_matrices,
+    deformation_to_aero_grid_weight_matrices,
+    aircraft_gamma_grid,
+    flight_condition_data,
+    n_nodes,
+    influence_coef_matrix=None,
+):
+    """Calculates the aerodynamic stiffness matrix As of the aircraft, the sensitivity of the
+    aerodynamic loads applied to the structural nodes to the nodal deformations, normalized by
+    the dynamic pressure. For small deformations dF = q * As @ u.
+
+    The chain of linear operators is: structural deformations -> aerodynamic grid points
+    displacements (deformation transfer) -> change in the panels normal vectors -> change in the
+    right hand side vector -> change in the circulation (influence coefficient matrix) -> change
+    in the panels forces (Kutta-Joukowski kernel) -> structural nodal loads (loads transfer).
+
+    The influence coefficient matrix is kept constant, as done in the iterative aeroelastic loop,
+    the Kutta-Joukowski kernel uses the free stream velocity at the panels aerodynamic centers and
+    the loads lever arms are taken at the undeformed geometry.
+
+    Args:
+        aircraft_macrosurfaces_aero_grids (list): undeformed aerodynamic grids of the aircraft
+        aircraft_macrosurfaces_struct_grids (list): structural grids of the aircraft
+        loads_to_nodes_weight_matrices (list): loads to nodes weight matrix of each macrosurface
+        deformation_to_aero_grid_weight_matrices (list): deformation to aero grid weight matrix of
+                                                         each macrosurface
+        aircraft_gamma_grid (list): circulation grids of the rigid aircraft solution
+        flight_condition_data (dict): flight condition description
+        n_nodes (int): total number of structural nodes of the aircraft
+        influence_coef_matrix (np.array): influence coefficient matrix, calculated if None
+
+    Returns:
+        aero_stiffness_matrix (np.array): matrix with shape (6 * n_nodes, 6 * n_nodes)
+    """
+
+    velocity_field_function = geo.functions.velocity_field_function_generator(
+        flight_condition_data["translation_velocity"],
+        flight_condition_data["rotation_velocity"],
+        flight_condition_data["attitude_angles_deg"],
+        flight_condition_data["center_of_rotation"],
+        flight_condition_data.get("atm_turbulenc_function"),
+    )
+
+    air_density, air_pressure, air_temperature = aero.functions.ISA(
+        flight_condition_data["altitude"]
+    )
+
+    dynamic_pressure = calculate_dynamic_pressure(flight_condition_data)
+
+    gamma_vector = np.concatenate(
+        [np.reshape(gamma_grid, np.size(gamma_grid)) for gamma_grid in aircraft_gamma_grid]
+    )
+
+    deformation_transfer_matrices = []
+    loads_transfer_matrices = []
+    rhs_sensitivity_matrices = []
+    circulation_force_matrices = []
+    geometry_force_matrices = []
+    aircraft_panel_vector = []
+
+    panel_counter = 0
+
+    for (
+        macrosurface_aero_grid,
+        macrosurface_struct_grid,
+        loads_to_nodes_weight_matrix,
+        deformation_to_aero_grid_weight_matrix,
+    ) in zip(
+        aircraft_macrosurfaces_aero_grids,
+        aircraft_macrosurfaces_struct_grids,
+        loads_to_nodes_weight_matrices,
+        deformation_to_aero_grid_weight_matrices,
+    ):
+
+        deformation_transfer_matrices.append(
+            calculate_deformation_transfer_matrix(
+                macrosurface_aero_grid,
+                macrosurface_struct_grid,
+                n_nodes,
+                deformation_to_aero_grid_weight_matrix,
+            )
+        )
+
+        loads_transfer_matrices.append(
+            calculate_loads_transfer_matrix(
+                macrosurface_aero_grid,
+                macrosurface_struct_grid,
+                n_nodes,
+                loads_to_nodes_weight_matrix,
+            )
+        )
+
+        if influence_coef_matrix is None:
+            aircraft_panel_vector.append(
+                aero.vlm.flatten(aero.vlm.create_panel_grid(macrosurface_aero_grid))
+            )
+
+        # Panels geometry
+        aero_grid = geo.functions.macrosurface_aero_grid_to_single_grid(
+            macrosurface_aero_grid
+        )
+        points = geo.functions.grid_to_vector(
+            aero_grid["xx"], aero_grid["yy"], aero_grid["zz"]
+        ).transpose()
+
+        corner_indexes = geo.functions.macrosurface_panel_corner_indexes(
+            macrosurface_aero_grid
+        )
+        n_panels = len(corner_indexes)
+        n_points = len(points)
+
+        point_a = points[corner_indexes[:, 0]]
+        point_b = points[corner_indexes[:, 1]]
+        point_c = points[corner_indexes[:, 2]]
+        point_d = points[corner_indexes[:, 3]]
+
+        vector_bd = point_d - point_b
+        vector_ac = point_c - point_a
+        normal = np.cross(vector_bd, vector_ac)
+        normal_norm = np.linalg.norm(normal, axis=1)
+        normal = normal / normal_norm[:, np.newaxis]
+
+        l_edge_1_2 = 0.5 * (point_b + point_c)
+        t_edge_1_2 = 0.5 * (point_a + point_d)
+        col_points = 0.75 * t_edge_1_2 + 0.25 * l_edge_1_2
+        aero_centers = 0.25 * t_edge_1_2 + 0.75 * l_edge_1_2
+        bound_vortex = (0.75 * point_c + 0.25 * point_d) - (
+            0.75 * point_b + 0.25 * point_a
+        )
+
+        col_velocity = velocity_field_function(col_points)
+        ac_velocity = velocity_field_function(aero_centers)
+
+        # Right hand side sensitivity, rhs = - V . n, n = (BD x AC) / |BD x AC|
+        # d(rhs) = - (P_n @ V) . (BD x dAC + dBD x AC) / |BD x AC|
+        projected_velocity = col_velocity - normal * np.sum(
+            normal * col_velocity, axis=1
+        )[:, np.newaxis]
+
+        d_rhs_d_ac = -np.cross(projected_velocity, vector_bd) / normal_norm[:, np.newaxis]
+        d_rhs_d_bd = np.cross(projected_velocity, vector_ac) / normal_norm[:, np.newaxis]
+
+        blocks = np.concatenate([-d_rhs_d_ac, -d_rhs_d_bd, d_rhs_d_ac, d_rhs_d_bd])
+        rhs_sensitivity_matrices.append(
+            sparse_block_matrix(
+                np.tile(np.arange(n_panels), 4),
+                3 * corner_indexes.transpose().flatten(),
+                blocks[:, np.newaxis, :],
+                (n_panels, 3 * n_points),
+            )
+        )
+
+        # Kutta-Joukowski kernel, f = rho * gamma * (V x l)
+        circulation_force_matrices.append(
+            sparse_block_matrix(
+                3 * np.arange(n_panels),
+                np.arange(n_panels),
+                air_density * np.cross(ac_velocity, bound_vortex)[:, :, np.newaxis],
+                (3 * n_panels, n_panels),
+            )
+        )
+
+        panels_gamma = gamma_vector[panel_counter : panel_counter + n_panels]
+        velocity_matrices = (
+            air_density
+            * panels_gamma[:, np.newaxis, np.newaxis]
+            * m.cross_product_matrices(ac_velocity)
+        )
+        blocks = np.concatenate(
+            [
+                -0.25 * velocity_matrices,
+                -0.75 * velocity_matrices,
+                0.75 * velocity_matrices,
+                0.25 * velocity_matrices,
+            ]
+        )
+        geometry_force_matrices.append(
+            sparse_block_matrix(
+                np.tile(3 * np.arange(n_panels), 4),
+                3 * corner_indexes.transpose().flatten(),
+                blocks,
+                (3 * n_panels, 3 * n_points),
+            )
+        )
+
+        panel_counter += n_panels
+
+    if influence_coef_matrix is None:
+        influence_coef_matrix = aero.vlm.calc_influence_matrix(
+            np.concatenate(aircraft_panel_vector)
+        )
+
+    deformation_transfer_matrix = sps.vstack(deformation_transfer_matrices).tocsr()
+    loads_transfer_matrix = sps.hstack(loads_transfer_matrices).tocsr()
+    rhs_sensitivity_matrix = sps.block_diag(rhs_sensitivity_matrices).tocsr()
+    circulation_force_matrix = sps.block_diag(circulation_force_matrices).tocsr()
+    geometry_force_matrix = sps.block_diag(geometry_force_matrices).tocsr()
+
+    # Circulation sensitivity, the influence coefficient matrix is factorized only once
+    influence_coef_lu = sla.lu_factor(influence_coef_matrix)
+    d_gamma = sla.lu_solve(
+        influence_coef_lu, (rhs_sensitivity_matrix @ deformation_transfer_matrix).toarray()
+    )
+
+    # Panels forces sensitivity
+    d_force = (
+        circulation_force_matrix @ d_gamma
+        + (geometry_force_matrix @ deformation_transfer_matrix).toarray()
+    )
+
+    aero_stiffness_matrix = loads_transfer_matrix @ d_force / dynamic_pressure
+
+    return aero_stiffness_matrix
 
-        return results
 
 # ==================================================================================================
 
-@jit
+
+def monolithic_aeroelastic_solver(
+    aircraft_object,
+    aircraft_grids,
+    aircraft_fem_elements,
+    aircraft_constraints,
+    loads_to_nodes_weight_matrices,
+    deformation_to_aero_grid_weight_matrices,
+    flight_condition_data,
+    interaction_algorithm="closest",
+    influence_coef_matrix=None,
+    status=True,
+    structural_model=None,
+    loads_transfer_matrix=None,
+):
+    """Solves the linear static aeroelastic problem in a single step. The aerodynamic loads of
+    the rigid aircraft are transfered to the structure and the coupled system
+
+        (K - q * As) @ u = F_rigid
+
+    is solved, where As is the aerodynamic stiffness matrix. The aerodynamic grid is then
+    deformed and the aerodynamic loads of the deformed aircraft are calculated.
+
+    Args:
+        aircraft_object (geometry.objects.Aircraft): aircraft
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        aircraft_fem_elements (dict): aircraft finite elements
+        aircraft_constraints (list): aircraft structural constraints
+        loads_to_nodes_weight_matrices (list): loads to nodes weight matrix of each macrosurface
+        deformation_to_aero_grid_weight_matrices (list): deformation to aero grid weight matrix of
+                                                         each macrosurface
+        flight_condition_data (dict): flight condition description
+        interaction_algorithm (string): fluid/structure interaction algorithm
+        influence_coef_matrix (np.array): influence coefficient matrix, calculated if None
+        status (bool): print status messages
+        structural_model (dict): aircraft structural model, created if None
+        loads_transfer_matrix (scipy.sparse.csr_matrix): aircraft loads transfer matrix, created
+                                                         if None
+
+    Returns:
+        results (dict): results of the simulation, same keys as the iterations results of
+                        calculate_aircraft_loads
+    """
+
+    aircraft_macrosurfaces_aero_grids = aircraft_grids["macrosurfaces_aero_grids"]
+    aircraft_macrosurfaces_struct_grids = aircraft_grids["macrosurfaces_struct_grids"]
+
+    # Aerodynamic loads of the rigid aircraft
+    aero_start_time = time.time()
+    (
+        aircraft_force_vector,
+        aircraft_panel_vector,
+        aircraft_gamma_vector,
+        aircraft_force_grid,
+        aircraft_panel_grid,
+        aircraft_gamma_grid,
+        influence_coef_matrix,
+    ) = aero.vlm.aero_loads(
+        aircraft_aero_mesh=aircraft_macrosurfaces_aero_grids,
+        velocity_vector=flight_condition_data["translation_velocity"],
+        rotation_vector=flight_condition_data["rotation_velocity"],
+        attitude_vector=flight_condition_data["attitude_angles_deg"],
+        altitude=flight_condition_data["altitude"],
+        center=flight_condition_data["center_of_rotation"],
+        turbulence_function=flight_condition_data.get("atm_turbulenc_function"),
+        influence_coef_matrix=influence_coef_matrix,
+    )
+    aero_end_time = time.time()
+
+    original_aircraft_panel_grid = aircraft_panel_grid
+
+    if status:
+        print(
+            f"    . Rigid aerodynamic calculation completed in {str(datetime.timedelta(seconds=(aero_end_time - aero_start_time)))}"
+        )
+
+    # Prepare input for structural solver
+    if structural_model is None:
+        structural_model = create_aircraft_structural_model(
+            aircraft_object, aircraft_grids, aircraft_fem_elements, aircraft_constraints
+        )
+
+    n_nodes = structural_model["n_nodes"]
+    K_global = structural_model["K_global"]
+
+    if loads_transfer_matrix is None:
+        loads_transfer_matrix = calculate_aircraft_loads_transfer_matrix(
+            aircraft_grids, loads_to_nodes_weight_matrices, n_nodes
+        )
+
+    F_global = np.reshape(
+        loads_transfer_matrix @ force_grid_to_vector(aircraft_force_grid), (-1, 1)
+    )
+
+    # Aerodynamic stiffness and coupled solution
+    coupling_start_time = time.time()
+
+    aero_stiffness_matrix = calculate_aerodynamic_stiffness_matrix(
+        aircraft_macrosurfaces_aero_grids,
+        aircraft_macrosurfaces_struct_grids,
+        loads_to_nodes_weight_matrices,
+        deformation_to_aero_grid_weight_matrices,
+        aircraft_gamma_grid,
+        flight_condition_data,
+        n_nodes,
+        influence_coef_matrix,
+    )
+
+    dynamic_pressure = calculate_dynamic_pressure(flight_condition_data)
+
+    X_global = struct.fem.FEM_solver(
+        sps.csr_matrix(K_global) - dynamic_pressure * sps.csr_matrix(aero_stiffness_matrix),
+        F_global,
+        aircraft_constraints,
+    )
+
+    force_vector = K_global @ X_global
+    deformations = np.reshape(X_global, (n_nodes, 6))
+    internal_loads = np.reshape(force_vector, (n_nodes, 6))
+
+    coupling_end_time = time.time()
+
+    if status:
+        print(
+            f"    . Coupled aeroelastic system solved in {str(datetime.timedelta(seconds=(coupling_end_time - coupling_start_time)))}"
+        )
+
+    # Deform aerodynamic grid and calculate the aerodynamic loads of the deformed aircraft
+    (
+        aircraft_deformed_macrosurfaces_aero_grids,
+        aircraft_deformed_macrosurfaces_aero_panels,
+    ) = deform_aircraft_aero_grids(
+        aircraft_grids, deformations, deformation_to_aero_grid_weight_matrices
+    )
+
+    (
+        aircraft_force_vector,
+        aircraft_panel_vector,
+        aircraft_gamma_vector,
+        aircraft_force_grid,
+        aircraft_panel_grid,
+        aircraft_gamma_grid,
+        influence_coef_matrix,
+    ) = aero.vlm.aero_loads(
+        aircraft_aero_mesh=aircraft_deformed_macrosurfaces_aero_grids,
+        velocity_vector=flight_condition_data["translation_velocity"],
+        rotation_vector=flight_condition_data["rotation_velocity"],
+        attitude_vector=flight_condition_data["attitude_angles_deg"],
+        altitude=flight_condition_data["altitude"],
+        center=flight_condition_data["center_of_rotation"],
+        turbulence_function=flight_condition_data.get("atm_turbulenc_function"),
+        influence_coef_matrix=influence_coef_matrix,
+    )
+
+    results = {
+        "aircraft_deformed_macrosurfaces_aero_grids": aircraft_deformed_macrosurfaces_aero_grids,
+        "aircraft_deformed_macrosurfaces_aero_panels": aircraft_deformed_macrosurfaces_aero_panels,
+        "aircraft_gamma_grid": aircraft_gamma_grid,
+        "aircraft_force_grid": aircraft_force_grid,
+        "aircraft_struct_deformations": deformations,
+        "aircraft_struct_internal_loads": internal_loads,
+        "influence_coef_matrix": influence_coef_matrix,
+        "aero_stiffness_matrix": aero_stiffness_matrix,
+        "dynamic_pressure": dynamic_pressure,
+        "original_aircraft_panel_grid": original_aircraft_panel_grid,
+    }
+
+    return results
+
+
+# ==================================================================================================
+
+
+def solve_divergence_eigenproblem(
+    K_global, aero_stiffness_matrix, constrained_dof, n_eigenvalues=None, shift=0.0
+):
+    """Solves the static divergence generalized eigenproblem
+
+        K @ u = q * As @ u
+
+    for the dynamic pressures q where the aeroelastic stiffness K - q * As becomes singular. The
+    constrained degrees of freedom are removed before solving.
+
+    If n_eigenvalues is None the complete dense problem As @ u = (1 / q) * K @ u is solved. Else,
+    only the n_eigenvalues dynamic pressures closest to shift are found with a sparse shift-invert
+    solver, the matrix K - shift * As is factorized only once.
+
+    Args:
+        K_global (np.array or scipy.sparse matrix): global stiffness matrix
+        aero_stiffness_matrix (np.array or scipy.sparse matrix): aerodynamic stiffness matrix
+                                                                 normalized by the dynamic pressure
+        constrained_dof (np.array(dtype=bool)): True for the constrained degrees of freedom
+        n_eigenvalues (int): number of eigenvalues found by the sparse solver
+        shift (float): dynamic pressure around which the sparse solver looks for eigenvalues
+
+    Returns:
+        dynamic_pressures (np.array): positive real dynamic pressures, sorted in increasing order
+        mode_shapes (np.array([n_dof, n_modes])): mode shapes of each dynamic pressure, zero at the
+                                                  constrained degrees of freedom
+    """
+
+    free_dof = np.flatnonzero(~np.asarray(constrained_dof))
+
+    red_K = sps.csc_matrix(K_global)[free_dof, :][:, free_dof]
+    red_As = sps.csc_matrix(aero_stiffness_matrix)[free_dof, :][:, free_dof]
+
+    if n_eigenvalues is None:
+
+        # As @ u = mu * K @ u, with mu = 1 / q, K is positive definite so mu is always finite
+        mu, red_modes = sla.eig(red_As.toarray(), red_K.toarray())
+        dynamic_pressures = np.full(len(mu), np.inf, dtype=complex)
+        valid = np.isfinite(mu) & (np.abs(mu) > 0)
+        dynamic_pressures[valid] = 1 / mu[valid]
+
+    else:
+
+        # (K - shift * As) ^ -1 @ As @ u = mu * u, with mu = 1 / (q - shift)
+        shifted_lu = spla.splu((red_K - shift * red_As).tocsc())
+
+        operator = spla.LinearOperator(
+            red_K.shape, matvec=lambda x: shifted_lu.solve(red_As @ x), dtype=float
+        )
+
+        mu, red_modes = spla.eigs(
+            operator, k=min(n_eigenvalues, red_K.shape[0] - 2), which="LM"
+        )
+        dynamic_pressures = shift + 1 / mu
+
+    # Only positive real dynamic pressures are physically meaningful
+    tolerance = 1e-6 * np.abs(dynamic_pressures)
+    physical = (
+        np.isfinite(dynamic_pressures)
+        & (np.abs(dynamic_pressures.imag) <= tolerance)
+        & (dynamic_pressures.real > 0)
+    )
+
+    dynamic_pressures = dynamic_pressures[physical].real
+    red_modes = red_modes[:, physical].real
+
+    order = np.argsort(dynamic_pressures)
+    dynamic_pressures = dynamic_pressures[order]
+    red_modes = red_modes[:, order]
+
+    mode_shapes = np.zeros((len(constrained_dof), len(dynamic_pressures)))
+    mode_shapes[free_dof, :] = red_modes / np.max(np.abs(red_modes), axis=0)
+
+    return dynamic_pressures, mode_shapes
+
+
+# ==================================================================================================
+
+
+def divergence(
+    aircraft_object,
+    aircraft_grid_data,
+    aircraft_constraints_data,
+    flight_condition_data,
+    simulation_options={
+        "status_messages": True,
+        "fem_prop_choice": "ROOT",
+        "interaction_algorithm": "closest",
+    },
+    n_eigenvalues=None,
+    shift=0.0,
+    influence_coef_matrix=None,
+):
+    """Calculates the static divergence dynamic pressures of the aircraft. The structural and
+    aerodynamic stiffness matrices are built only once, linearized around the rigid aircraft at
+    the flight condition, and a single generalized eigenproblem is solved.
+
+    Args:
+        aircraft_object (geometry.objects.Aircraft): aircraft
+        aircraft_grid_data (dict): aircraft grid description
+        aircraft_constraints_data (list): aircraft constraints description
+        flight_condition_data (dict): flight condition description, the airspeed is only used to
+                                      linearize the loads, the divergence pressure is independent
+                                      of it
+        simulation_options (dict): status_messages, fem_prop_choice and interaction_algorithm
+        n_eigenvalues (int): if not None, number of dynamic pressures found by the sparse
+                             shift-invert solver
+        shift (float): dynamic pressure around which the sparse solver looks for eigenvalues
+        influence_coef_matrix (np.array): influence coefficient matrix, calculated if None
+
+    Returns:
+        results (dict): divergence_dynamic_pressure, divergence_speed, dynamic_pressures,
+                        divergence_speeds, mode_shapes (list of np.array([n_nodes, 6])) and
+                        aero_stiffness_matrix
+    """
+
+    status = simulation_options.get("status_messages", True)
+    fem_prop_choice = simulation_options.get("fem_prop_choice", "ROOT")
+    interaction_algorithm = simulation_options.get("interaction_algorithm", "closest")
+
+    start_time = time.time()
+
+    if status:
+        print("# Running divergence analysis")
+
+    aircraft_grids = generate_aircraft_grids(
+        aircraft_object=aircraft_object, aircraft_grid_data=aircraft_grid_data
+    )
+
+    aircraft_macrosurfaces_aero_grids = aircraft_grids["macrosurfaces_aero_grids"]
+    aircraft_macrosurfaces_struct_grids = aircraft_grids["macrosurfaces_struct_grids"]
+
+    aircraft_fem_elements = struct.fem.generate_aircraft_fem_elements(
+        aircraft=aircraft_object,
+        aircraft_grids=aircraft_grids,
+        prop_choice=fem_prop_choice,
+    )
+
+    aircraft_constraints = generate_aircraft_constraints(
+        aircraft=aircraft_object,
+        aircraft_grids=aircraft_grids,
+        constraints_data_list=aircraft_constraints_data,
+    )
+
+    (
+        loads_to_nodes_weight_matrices,
+        deformation_to_aero_grid_weight_matrices,
+    ) = calculate_fsi_weight_matrices(aircraft_object, aircraft_grids, interaction_algorithm)
+
+    # Structural stiffness, only K_global and the constrained degrees of freedom are used
+    structural_model = create_aircraft_structural_model(
+        aircraft_object,
+        aircraft_grids,
+        aircraft_fem_elements,
+        aircraft_constraints,
+        factorize=False,
+    )
+
+    n_nodes = structural_model["n_nodes"]
+
+    # Aerodynamic stiffness, linearized around the rigid aircraft
+    (
+        aircraft_force_vector,
+        aircraft_panel_vector,
+        aircraft_gamma_vector,
+        aircraft_force_grid,
+        aircraft_panel_grid,
+        aircraft_gamma_grid,
+        influence_coef_matrix,
+    ) = aero.vlm.aero_loads(
+        aircraft_aero_mesh=aircraft_macrosurfaces_aero_grids,
+        velocity_vector=flight_condition_data["translation_velocity"],
+        rotation_vector=flight_condition_data["rotation_velocity"],
+        attitude_vector=flight_condition_data["attitude_angles_deg"],
+        altitude=flight_condition_data["altitude"],
+        center=flight_condition_data["center_of_rotation"],
+        turbulence_function=flight_condition_data.get("atm_turbulenc_function"),
+        influence_coef_matrix=influence_coef_matrix,
+    )
+
+    aero_stiffness_matrix = calculate_aerodynamic_stiffness_matrix(
+        aircraft_macrosurfaces_aero_grids,
+        aircraft_macrosurfaces_struct_grids,
+        loads_to_nodes_weight_matrices,
+        deformation_to_aero_grid_weight_matrices,
+        aircraft_gamma_grid,
+        flight_condition_data,
+        n_nodes,
+        influence_coef_matrix,
+    )
+
+    # Eigenvalue solution
+    dynamic_pressures, mode_shapes = solve_divergence_eigenproblem(
+        structural_model["K_global"],
+        aero_stiffness_matrix,
+        structural_model["constrained_dof"],
+        n_eigenvalues,
+        shift,
+    )
+
+    air_density, air_pressure, air_temperature = aero.functions.ISA(
+        flight_condition_data["altitude"]
+    )
+
+    divergence_speeds = np.sqrt(2 * dynamic_pressures / air_density)
+
+    if len(dynamic_pressures) > 0:
+        divergence_dynamic_pressure = dynamic_pressures[0]
+        divergence_speed = divergence_speeds[0]
+    else:
+        divergence_dynamic_pressure = np.inf
+        divergence_speed = np.inf
+
+    end_time = time.time()
+
+    if status:
+        print(f"- Divergence dynamic pressure: {divergence_dynamic_pressure} Pa")
+        print(f"- Divergence speed: {divergence_speed} m/s")
+        print(
+            f"# Divergence analysis completed in {str(datetime.timedelta(seconds=(end_time - start_time)))}"
+        )
+
+    results = {
+        "divergence_dynamic_pressure": divergence_dynamic_pressure,
+        "divergence_speed": divergence_speed,
+        "dynamic_pressures": dynamic_pressures,
+        "divergence_speeds": divergence_speeds,
+        "mode_shapes": [
+            np.reshape(mode_shape, (n_nodes, 6)) for mode_shape in mode_shapes.transpose()
+        ],
+        "aero_stiffness_matrix": aero_stiffness_matrix,
+    }
+
+    return results
+
+
+# ==================================================================================================
+
+
 def find_control_node_number(aircraft, aircraft_grids, control_node_string):
 
+    # Number saved when the nodes were numbered
+    if control_node_string in aircraft_grids.get("node_numbers", dict()):
+        return aircraft_grids["node_numbers"][control_node_string]
+
     component_identifier, node_position = control_node_string.split("-")
 
     # Run trought all surfaces in the aircraft searching for the identifier in each
@@ -947,7 +2431,7 @@ def find_control_node_number(aircraft, aircraft_grids, control_node_string):
 
 # ==================================================================================================
 
-@jit
+
 def calculate_deformation_table(aircraft_original_grids, aircraft_struct_deformations):
 
     aircraft_macrosurfaces_deformed_nodes = []
@@ -956,15 +2440,8 @@ def calculate_deformation_table(aircraft_original_grids, aircraft_struct_deforma
 
         node_vector = geo.functions.create_structure_node_vector(macrosurface_struct_grid)
 
-        deformed_nodes = np.zeros((len(node_vector), 6))
-
-        for i, node in enumerate(node_vector):
-            deformed_nodes[i][0] = node.x + aircraft_struct_deformations[node.number][0]
-            deformed_nodes[i][1] = node.y + aircraft_struct_deformations[node.number][1]
-            deformed_nodes[i][2] = node.z + aircraft_struct_deformations[node.number][2]
-            deformed_nodes[i][3] = aircraft_struct_deformations[node.number][3]
-            deformed_nodes[i][4] = aircraft_struct_deformations[node.number][4]
-            deformed_nodes[i][5] = aircraft_struct_deformations[node.number][5]
+        deformed_nodes = np.array(aircraft_struct_deformations, dtype=float)[node_vector.numbers]
+        deformed_nodes[:, :3] += node_vector.positions
 
         aircraft_macrosurfaces_deformed_nodes.append(deformed_nodes)
 
@@ -0,0 +1,304 @@
+"""
+objects.py
+
+Objects used in the aeroelastic calculations
+
+Author: João Paulo Monteiro Cruvinel da Costa
+"""
+
+import time
+import datetime
+
+import numpy as np
+
+from . import functions as f
+from .. import structures as struct
+
+# ==================================================================================================
+# OBJECTS
+
+
+class AeroelasticModel(object):
+    """Precompiled aeroelastic model of an aircraft. Everything that depends only on the aircraft
+    and not on the flight condition is created once and reused by every call to solve: the
+    aircraft grids, finite elements and constraints, the fluid/structure interaction matrices,
+    the structural model with the factorized reduced stiffness matrix and the influence
+    coefficient matrix of the undeformed aircraft.
+
+    Args:
+        aircraft_object (geometry.objects.Aircraft): aircraft
+        aircraft_grid_data (dict): aircraft grid description
+        aircraft_constraints_data (list): aircraft constraints description
+        fem_prop_choice (string): "ROOT", "MIDDLE" or "TIP", section used by the finite elements
+        interaction_algorithm (string): fluid/structure interaction algorithm
+        control_node_string (string): default control node, "component_identifier-ROOT|TIP"
+        n_modes (int): number of vibration modes of the reduced order structural model, the
+                       full structural model is used if None
+        superelements (bool): condense each aircraft component into a superelement
+        status (bool): print status messages while the model is created
+
+    Attributes:
+        aircraft_object (geometry.objects.Aircraft): aircraft
+        aircraft_grids (dict): aircraft grids, as created by generate_aircraft_grids
+        aircraft_fem_elements (dict): aircraft finite elements
+        aircraft_constraints (list): aircraft structural constraints
+        interaction_algorithm (string): fluid/structure interaction algorithm
+        loads_to_nodes_weight_matrices (list): loads to nodes weight matrix of each macrosurface
+        deformation_to_aero_grid_weight_matrices (list): deformation to aero grid weight matrix of
+                                                         each macrosurface
+        structural_model (dict): aircraft structural model, see
+                                 functions.create_aircraft_structural_model
+        loads_transfer_matrix (scipy.sparse.csr_matrix): aircraft loads transfer matrix
+        control_node_string (string): default control node
+        control_node_numbers (dict): cache of the control nodes numbers
+        influence_coef_matrix (np.array): influence coefficient matrix of the undeformed aircraft,
+                                          None until the first call to solve
+    """
+
+    def __init__(
+        self,
+        aircraft_object,
+        aircraft_grid_data,
+        aircraft_constraints_data,
+        fem_prop_choice="ROOT",
+        interaction_algorithm="closest",
+        control_node_string=None,
+        n_modes=None,
+        superelements=False,
+        status=False,
+    ):
+
+        start_time = time.time()
+
+        if status:
+            print("# Creating aeroelastic model ...")
+
+        self.aircraft_object = aircraft_object
+        self.interaction_algorithm = interaction_algorithm
+
+        self.aircraft_grids = f.generate_aircraft_grids(
+            aircraft_object=aircraft_object, aircraft_grid_data=aircraft_grid_data
+        )
+
+        self.aircraft_fem_elements = struct.fem.generate_aircraft_fem_elements(
+            aircraft=aircraft_object,
+            aircraft_grids=self.aircraft_grids,
+            prop_choice=fem_prop_choice,
+        )
+
+        self.aircraft_constraints = f.generate_aircraft_constraints(
+            aircraft=aircraft_object,
+            aircraft_grids=self.aircraft_grids,
+            constraints_data_list=aircraft_constraints_data,
+        )
+
+        (
+            self.loads_to_nodes_weight_matrices,
+            self.deformation_to_aero_grid_weight_matrices,
+        ) = f.calculate_fsi_weight_matrices(
+            aircraft_object, self.aircraft_grids, interaction_algorithm
+        )
+
+        self.structural_model = f.create_aircraft_structural_model(
+            aircraft_object,
+            self.aircraft_grids,
+            self.aircraft_fem_elements,
+            self.aircraft_constraints,
+            n_modes=n_modes,
+            superelements=superelements,
+        )
+
+        self.loads_transfer_matrix = f.calculate_aircraft_loads_transfer_matrix(
+            self.aircraft_grids,
+            self.loads_to_nodes_weight_matrices,
+            self.structural_model["n_nodes"],
+        )
+
+        self.control_node_string = control_node_string
+        self.control_node_numbers = dict()
+
+        if control_node_string is not None:
+            self.control_node_number(control_node_string)
+
+        self.influence_coef_matrix = None
+
+        end_time = time.time()
+
+        if status:
+            print(
+                f"# Creating aeroelastic model - Completed in {str(datetime.timedelta(seconds=(end_time - start_time)))}"
+            )
+
+    def __getstate__(self):
+
+        # The sparse factorizations can not be pickled, they are calculated again when needed
+        state = self.__dict__.copy()
+        state["structural_model"] = struct.fem.remove_factorizations(self.structural_model)
+
+        return state
+
+    def control_node_number(self, control_node_string=None):
+        """Returns the number of the control node, the search is done only once per node.
+
+        Args:
+            control_node_string (string): control node, the default of the model if None
+
+        Returns:
+            control_node_number (int): number of the control node
+        """
+
+        if control_node_string is None:
+            control_node_string = self.control_node_string
+
+        if control_node_string not in self.control_node_numbers:
+            self.control_node_numbers[control_node_string] = f.find_control_node_number(
+                self.aircraft_object, self.aircraft_grids, control_node_string
+            )
+
+        return self.control_node_numbers[control_node_string]
+
+    def solve(self, flight_condition_data, simulation_options, initial_deformations=None):
+        """Calculates the aircraft loads and deformations at a flight condition.
+
+        Args:
+            flight_condition_data (dict): flight condition description
+            simulation_options (dict): same options as functions.calculate_aircraft_loads, the
+                                       grid, finite elements and interaction options are
+                                       defined when the model is created and are ignored
+            initial_deformations (np.array([n_nodes, 6])): starting point of the iterative
+                                                           coupling, undeformed if None
+
+        Returns:
+            final_results (dict): same results as functions.calculate_aircraft_loads
+            iteration_results (list): only if output_iteration_results is True
+        """
+
+        status = simulation_options["status_messages"]
+        output_iter = simulation_options["output_iteration_results"]
+
+        control_node_number = self.control_node_number(
+            simulation_options.get("control_node_string")
+        )
+
+        start_time = time.time()
+
+        if status:
+            print(f"# Running simulation")
+
+        if simulation_options.get("coupling", "iterative") == "monolithic":
+
+            monolithic_results = f.monolithic_aeroelastic_solver(
+                aircraft_object=self.aircraft_object,
+                aircraft_grids=self.aircraft_grids,
+                aircraft_fem_elements=self.aircraft_fem_elements,
+                aircraft_constraints=self.aircraft_constraints,
+                loads_to_nodes_weight_matrices=self.loads_to_nodes_weight_matrices,
+                deformation_to_aero_grid_weight_matrices=self.deformation_to_aero_grid_weight_matrices,
+                flight_condition_data=flight_condition_data,
+                interaction_algorithm=self.interaction_algorithm,
+                influence_coef_matrix=self.influence_coef_matrix,
+                status=status,
+                structural_model=self.structural_model,
+                loads_transfer_matrix=self.loads_transfer_matrix,
+            )
+
+            final_results, iteration_results = f.monolithic_results_to_loop_results(
+                monolithic_results, control_node_number
+            )
+
+        else:
+
+            final_results, iteration_results = f.iterative_aeroelastic_solver(
+                aircraft_grids=self.aircraft_grids,
+                structural_model=self.structural_model,
+                loads_transfer_matrix=self.loads_transfer_matrix,
+                deformation_to_aero_grid_weight_matrices=self.deformation_to_aero_grid_weight_matrices,
+                control_node_number=control_node_number,
+                flight_condition_data=flight_condition_data,
+                simulation_options=simulation_options,
+                influence_coef_matrix=self.influence_coef_matrix,
+                initial_deformations=initial_deformations,
+            )
+
+        # The influence coefficient matrix depends only on the undeformed geometry
+        self.influence_coef_matrix = final_results["influence_coef_matrix"]
+
+        final_results["aircraft_original_grids"] = self.aircraft_grids
+        final_results["aircraft_struct_fem_elements"] = self.aircraft_fem_elements
+
+        end_time = time.time()
+
+        if status:
+            print(
+                f"# Running simulation - Completed in {str(datetime.timedelta(seconds=(end_time - start_time)))}"
+            )
+
+        if output_iter:
+
+            return final_results, iteration_results
+
+        else:
+
+            return final_results
+
+    def solve_batch(
+        self, flight_conditions_list, simulation_options, initial_deformations_list=None
+    ):
+        """Calculates the aircraft loads and deformations at several flight conditions, iterated
+        in lockstep, see functions.batch_aeroelastic_solver.
+
+        Args:
+            flight_conditions_list (list): list of flight conditions descriptions
+            simulation_options (dict): same options as solve, iteration results are not stored
+            initial_deformations_list (list): starting deformations of each condition
+
+        Returns:
+            cases_results (list): results of each flight condition
+        """
+
+        control_node_number = self.control_node_number(
+            simulation_options.get("control_node_string")
+        )
+
+        cases_results = f.batch_aeroelastic_solver(
+            aircraft_grids=self.aircraft_grids,
+            structural_model=self.structural_model,
+            loads_transfer_matrix=self.loads_transfer_matrix,
+            deformation_to_aero_grid_weight_matrices=self.deformation_to_aero_grid_weight_matrices,
+            control_node_number=control_node_number,
+            flight_conditions_list=flight_conditions_list,
+            simulation_options=simulation_options,
+            influence_coef_matrix=self.influence_coef_matrix,
+            initial_deformations_list=initial_deformations_list,
+        )
+
+        if cases_results and cases_results[0] is not None:
+            self.influence_coef_matrix = cases_results[0]["influence_coef_matrix"]
+
+        for case_results in cases_results:
+            if case_results is not None:
+                case_results["aircraft_original_grids"] = self.aircraft_grids
+                case_results["aircraft_struct_fem_elements"] = self.aircraft_fem_elements
+
+        return cases_results
+
+    def sweep(
+        self,
+        flight_conditions_list,
+        simulation_options,
+        warm_start="extrapolation",
+        order_conditions=True,
+        compare_cold_start=False,
+    ):
+        """Solves a list of flight conditions with warm started deformations, see
+        functions.aeroelastic_sweep.
+        """
+
+        return f.aeroelastic_sweep(
+            self,
+            flight_conditions_list,
+            simulation_options,
+            warm_start=warm_start,
+            order_conditions=order_conditions,
+            compare_cold_start=compare_cold_start,
+        )
@@ -2,6 +2,7 @@ import numpy as np
 from numpy import sin, cos, tan, arccos, arcsin, arctan
 from pyquaternion import Quaternion
 
+from . import objects
 from .. import mathematics as m
 from numba import jit
 
@@ -10,7 +11,7 @@ import sys
 # --------------------------------------------------------------------------------------------------
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def distance_point_to_line(line_point_1, line_point_2, point):
     """
     reference: http://mathworld.wolfram.com/Point-LineDistance3-Dimensional.html
@@ -27,7 +28,7 @@ def distance_point_to_line(line_point_1, line_point_2, point):
 # --------------------------------------------------------------------------------------------------
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def distance_between_points(point_1, point_2):
 
     distance = (
@@ -433,8 +434,22 @@ def connect_surface_nodes(
 
 
 def velocity_field_function_generator(
-    velocity_vector, rotation_vector, attitude_vector, center
+    velocity_vector, rotation_vector, attitude_vector, center, turbulence_function=None
 ):
+    """Generates the flow velocity field of the aircraft flight condition.
+
+    Args:
+        velocity_vector (np.array): aircraft velocity, only the true airspeed is used
+        rotation_vector (np.array): aircraft rotation velocity [rad/s]
+        attitude_vector (np.array): aircraft attitude angles [deg]
+        center (np.array): center of rotation
+        turbulence_function (function): atmospheric turbulence velocity function, receives the
+                                        point coordinates, None if there is no turbulence
+
+    Returns:
+        velocity_field_function (geometry.objects.FlowField): evaluates the flow velocity at one
+                                                             point or at an array of points
+    """
 
     # This is a horrible hack
 
@@ -470,16 +485,41 @@ def velocity_field_function_generator(
 
     cg_velocity = cg_velocity.transpose()[0]
 
-    def velocity_field_function(point_location):
+    velocity_field_function = objects.FlowField(
+        cg_velocity, rotation_vector, center, turbulence_function
+    )
+
+    return velocity_field_function
+
 
-        r = point_location - center
-        tangential_velocity = -m.cross(rotation_vector, r)
+# --------------------------------------------------------------------------------------------------
 
-        flow_velocity = cg_velocity + tangential_velocity
 
-        return flow_velocity
+def evaluate_velocity_field(velocity_field_function, points):
+    """Evaluates a velocity field at several points. Functions that do not accept arrays of points
+    are evaluated point by point.
 
-    return velocity_field_function
+    Args:
+        velocity_field_function (function): receives point coordinates and returns the velocity
+        points (np.array([n_points, 3], dtype=float)): points coordinates
+
+    Returns:
+        velocities (np.array([n_points, 3], dtype=float)): velocity at each point
+    """
+
+    points = np.reshape(np.asarray(points, dtype=float), (-1, 3))
+
+    try:
+        velocities = np.asarray(velocity_field_function(points), dtype=float)
+    except (TypeError, ValueError, IndexError):
+        velocities = None
+
+    if velocities is None or np.shape(velocities) != np.shape(points):
+        velocities = np.array(
+            [velocity_field_function(point) for point in points], dtype=float
+        ).reshape(-1, 3)
+
+    return velocities
 
 
 # --------------------------------------------------------------------------------------------------
@@ -507,21 +547,31 @@ def cos_between(vector_1, vector_2):
 
 
 def interpolate_nodes(node_1, node_2, n_nodes):
+    """Interpolates two nodes, the positions are linearly interpolated and the orientations are
+    spherically interpolated.
 
-    node_list = []
+    Args:
+        node_1 (geometry.objects.Node): first node
+        node_2 (geometry.objects.Node): last node
+        n_nodes (int): number of nodes, including node_1 and node_2
 
-    for i, quaternion in enumerate(
-        Quaternion.intermediates(
-            node_1.quaternion, node_2.quaternion, (n_nodes - 2), include_endpoints=True
-        )
-    ):
+    Returns:
+        node_list (list): [xyz, quaternion] of each node
+    """
 
-        vector = node_2.xyz - node_1.xyz
+    amounts = np.arange(n_nodes) / (n_nodes - 1)
 
-        node_xyz = node_1.xyz + i * vector / (n_nodes - 1)
-        node_quaternion = quaternion
+    nodes_xyz = node_1.xyz + amounts[:, np.newaxis] * (node_2.xyz - node_1.xyz)
+    nodes_quaternions = m.rotations.slerp(
+        np.tile(node_1.quaternion.q, (n_nodes, 1)),
+        np.tile(node_2.quaternion.q, (n_nodes, 1)),
+        amounts,
+    )
 
-        node_list.append([node_xyz, node_quaternion])
+    node_list = [
+        [node_xyz, Quaternion(node_quaternion)]
+        for node_xyz, node_quaternion in zip(nodes_xyz, nodes_quaternions)
+    ]
 
     return node_list
 
@@ -560,194 +610,526 @@ def decompose_rotation(rotation_axis, rotation_angle, axis_1, axis_2, axis_3):
 
 
 def apply_torsion_to_grid(grid_dict, torsion_center, torsion_function, surface):
+    """Rotates the sections of a surface grid around the surface torsion center, the sections of
+    all the span stations are rotated at once.
 
-    xx = grid_dict["xx"]
-    yy = grid_dict["yy"]
-    zz = grid_dict["zz"]
+    Args:
+        grid_dict (dict): surface grid, xx, yy and zz arrays with shape (n_chord, n_span)
+        torsion_center (float): position relative to the chord of the rotation center
+        torsion_function (function): receives the span position, between 0 and 1, and returns
+                                     the section rotation angle in radians
+        surface (geometry.objects.Surface): surface of the grid
 
-    n_span_points = len(xx[0, :])
-    n_chord_points = len(xx[:, 0])
+    Returns:
+        grid_dict (dict): rotated surface grid
+    """
 
-    grid_points_xx = np.zeros(np.shape(xx))
-    grid_points_yy = np.zeros(np.shape(yy))
-    grid_points_zz = np.zeros(np.shape(zz))
+    # Grid points, [3, n_chord, n_span]
+    points = np.stack([grid_dict["xx"], grid_dict["yy"], grid_dict["zz"]]).astype(float)
 
-    for i in range(n_span_points):
-        # Extract section points from grid
-        section_points_x = xx[:, i]
-        section_points_y = yy[:, i]
-        section_points_z = zz[:, i]
+    span_positions = np.abs(points[1, 0, :]) / (
+        surface.length * np.cos(surface.dihedral_angle_rad)
+    )
+    rot_angles = evaluate_span_function(torsion_function, span_positions)
 
-        # Convert points from grid to list
-        section_points = grid_to_vector(
-            section_points_x, section_points_y, section_points_z
-        )
+    # Rotation centers of the sections
+    local_chords = surface.root_chord + span_positions * (surface.tip_chord - surface.root_chord)
 
-        # Calculate rotation characteristics and apply rotation
-        span_position = abs(section_points_y[0]) / (
-            surface.length * np.cos(surface.dihedral_angle_rad)
-        )
-        rot_angle = torsion_function(span_position)
-        rot_axis = np.array([0, 1, 0])  # Y axis
-
-        # Calculate Rotation center
-        section_point_1 = section_points[:, 0]
-        section_point_2 = section_points[:, 1]
-        local_chord = surface.root_chord + span_position * (
-            surface.tip_chord - surface.root_chord
-        )
+    section_vectors = points[:, 1, :] - points[:, 0, :]
+    section_vectors = section_vectors / np.linalg.norm(section_vectors, axis=0)
+    rot_centers = points[:, 0, :] + torsion_center * section_vectors * local_chords
 
-        section_vector = m.normalize(section_point_2 - section_point_1)
-        rot_center = section_point_1 + torsion_center * section_vector * local_chord
+    # Rotation around the Y axis
+    rotation_matrices = m.rotations.axis_angle_to_matrix(
+        np.tile([0.0, 1.0, 0.0], (len(rot_angles), 1)), rot_angles
+    )
 
-        rot_section_points = rotate_point(
-            section_points, rot_axis, rot_center, rot_angle
-        )
+    rot_points = np.einsum(
+        "sij,jcs->ics", rotation_matrices, points - rot_centers[:, np.newaxis, :]
+    )
+    rot_points += rot_centers[:, np.newaxis, :]
 
-        # Convert section points from list to grid
-        shape = (n_chord_points, 1)
-        rot_section_points_x, rot_section_points_y, rot_section_points_z = vector_to_grid(
-            rot_section_points, shape
-        )
+    return {"xx": rot_points[0], "yy": rot_points[1], "zz": rot_points[2]}
 
-        # Paste rotated section into grid
-        grid_points_xx[:, i] = rot_section_points_x[:, 0]
-        grid_points_yy[:, i] = rot_section_points_y[:, 0]
-        grid_points_zz[:, i] = rot_section_points_z[:, 0]
 
-    return {"xx": grid_points_xx, "yy": grid_points_yy, "zz": grid_points_zz}
+# --------------------------------------------------------------------------------------------------
+
+
+def apply_torsion_to_nodes(nodes_list, torsion_center, torsion_function, surface):
+    """Rotates the nodes of a surface around the surface torsion center, all the nodes are
+    rotated at once. The nodes orientation is rotated only by the component of the torsion
+    around the node x axis.
+
+    Args:
+        nodes_list (list(Node)): surface nodes
+        torsion_center (float): position relative to the chord of the rotation center
+        torsion_function (function): receives the span position, between 0 and 1, and returns
+                                     the section rotation angle in radians
+        surface (geometry.objects.Surface): surface of the nodes
+
+    Returns:
+        rot_nodes_prop_list (list): [xyz, quaternion] of each rotated node
+    """
+
+    positions = np.array([node.xyz for node in nodes_list], dtype=float)
+    quaternions = np.array([node.quaternion.q for node in nodes_list], dtype=float)
+
+    # Calculate wing properties at node location
+    span_positions = np.abs(positions[:, 1]) / (
+        surface.length * np.cos(surface.dihedral_angle_rad)
+    )
+    rot_angles = evaluate_span_function(torsion_function, span_positions)
+
+    local_chords = surface.root_chord + span_positions * (surface.tip_chord - surface.root_chord)
+
+    # Calculate position of the torsion center
+    rot_centers = np.stack(
+        [
+            span_positions * surface.length * tan(surface.leading_edge_sweep_angle_rad)
+            + local_chords * torsion_center,
+            span_positions * surface.span,
+            span_positions * surface.span * tan(surface.dihedral_angle_rad),
+        ],
+        axis=1,
+    )
+
+    # Rotate nodes around torsion center, Y axis
+    rotation_matrices = m.rotations.axis_angle_to_matrix(
+        np.tile([0.0, 1.0, 0.0], (len(rot_angles), 1)), rot_angles
+    )
+    rot_positions = np.einsum("nij,nj->ni", rotation_matrices, positions - rot_centers)
+    rot_positions += rot_centers
+
+    # Decompose the torsion in the node axes and keep the roll, the rotation around the node
+    # x axis. The columns of the node matrices are the node axes, so the torsion axis in the
+    # node coordinate system is the second row.
+    node_matrices = m.rotations.quaternion_to_matrix(quaternions)
+
+    torsion_quaternions = m.rotations.axis_angle_to_quaternion(
+        np.ascontiguousarray(node_matrices[:, 1, :]), rot_angles
+    )
+    w, x, y, z = torsion_quaternions.transpose()
+    roll = np.arctan2(2 * (w * x - y * z), 1 - 2 * (x ** 2 + y ** 2))
+
+    roll_quaternions = m.rotations.axis_angle_to_quaternion(
+        np.ascontiguousarray(node_matrices[:, :, 0]), roll
+    )
+    rot_quaternions = m.rotations.quaternion_multiply(roll_quaternions, quaternions)
+
+    rot_nodes_prop_list = [
+        [xyz, Quaternion(quaternion)] for xyz, quaternion in zip(rot_positions, rot_quaternions)
+    ]
+
+    return rot_nodes_prop_list
 
 
 # --------------------------------------------------------------------------------------------------
 
 
-def apply_torsion_to_nodes(nodes_list, torsion_center, torsion_function, surface):
+def evaluate_span_function(span_function, span_positions):
+    """Evaluates a function of the span position at several span stations. Functions that do not
+    accept arrays are evaluated station by station.
 
-    n_span_points = len(nodes_list)
+    Args:
+        span_function (function): receives a span position and returns a float
+        span_positions (np.array([n], dtype=float)): span positions
 
-    rot_nodes_prop_list = []
+    Returns:
+        values (np.array([n], dtype=float)): function values
+    """
 
-    for i, node in enumerate(nodes_list):
+    try:
+        values = np.asarray(span_function(span_positions), dtype=float)
+    except (TypeError, ValueError):
+        values = None
 
-        # Calculate wing properties at node location
-        span_position = abs(node.xyz[1]) / (
-            surface.length * np.cos(surface.dihedral_angle_rad)
-        )
+    if values is None or np.shape(values) != np.shape(span_positions):
+        values = np.array([span_function(position) for position in span_positions], dtype=float)
 
-        local_chord = surface.root_chord + span_position * (
-            surface.tip_chord - surface.root_chord
-        )
+    return values
 
-        # Calculate position of the torsion center and rotation properties
-        leading_edge_x = (
-            span_position * surface.length * tan(surface.leading_edge_sweep_angle_rad)
-        )
-        leading_edge_y = span_position * surface.span
-        leading_edge_z = span_position * surface.span * tan(surface.dihedral_angle_rad)
-
-        rot_angle = torsion_function(span_position)
-        rot_axis = np.array([0, 1, 0])  # Y axis
-        rot_center = np.array(
-            [
-                leading_edge_x + local_chord * torsion_center,
-                leading_edge_y,
-                leading_edge_z,
-            ]
-        )
-        rot_quaternion = Quaternion(axis=rot_axis, angle=rot_angle)
 
-        # Rotate Node around torsion center
+# --------------------------------------------------------------------------------------------------
 
-        node_location = node.rotate(
-            rotation_quaternion=rot_quaternion, rotation_center=rot_center
-        )
 
-        yaw_pitch_row = decompose_rotation(
-            rot_axis, rot_angle, node.x_axis, node.y_axis, node.z_axis
-        )
+def nodes_arrays(nodes):
+    """Positions and orientations of a list of nodes.
 
-        rot_quaternion = Quaternion(axis=node.x_axis, angle=yaw_pitch_row[2])
-        rot_center = node.xyz
+    Args:
+        nodes (list(geometry.objects.Node)): nodes
 
-        node_rotation = node.rotate(
-            rotation_quaternion=rot_quaternion, rotation_center=rot_center
-        )
+    Returns:
+        positions (np.array([n_nodes, 3], dtype=float)): nodes x, y and z coordinates
+        quaternions (np.array([n_nodes, 4], dtype=float)): nodes orientation quaternions
+    """
 
-        rot_node_prop = [node_location.xyz, node_rotation.quaternion]
+    positions = np.array([node.xyz for node in nodes], dtype=float).reshape(-1, 3)
+    quaternions = np.array([node.quaternion.q for node in nodes], dtype=float).reshape(-1, 4)
 
-        rot_nodes_prop_list.append(rot_node_prop)
+    return positions, quaternions
 
-    return rot_nodes_prop_list
+
+# --------------------------------------------------------------------------------------------------
+
+
+def create_nodes(positions, quaternions):
+    """Creates new nodes, not numbered, from their positions and orientations.
+
+    Args:
+        positions (np.array([n_nodes, 3], dtype=float)): nodes x, y and z coordinates
+        quaternions (np.array([n_nodes, 4], dtype=float)): nodes orientation quaternions
+
+    Returns:
+        nodes (list(geometry.objects.Node)): nodes
+    """
+
+    return [objects.Node(xyz, Quaternion(q)) for xyz, q in zip(positions, quaternions)]
 
 
 # --------------------------------------------------------------------------------------------------
 
 
 def create_structure_node_vector(structure_struct_grid):
+    """Creates a table with all the nodes of a structure, sorted by node number and without
+    duplicates.
+
+    Args:
+        structure_struct_grid (list(list(Node)) or NodeTable): structural grid of each
+                                                                component, a NodeTable is
+                                                                returned unchanged
+
+    Returns:
+        node_vector (geometry.objects.NodeTable): structure nodes
+    """
 
-    node_vector = []
+    if isinstance(structure_struct_grid, objects.NodeTable):
+        return structure_struct_grid
 
+    return objects.NodeTable.from_grid(structure_struct_grid)
 
-    # Add all nodes to a vector and sort then by node number and remove duplicates
 
-    for component_grid in structure_struct_grid:
-        node_vector += component_grid
+# --------------------------------------------------------------------------------------------------
+
 
-    # Sort the vector
-    node_vector.sort(key=lambda x: x.number)
+def macrosurface_aero_grid_to_single_grid(macro_surface_mesh):
+    """Joins the aerodynamic grids of the surfaces of a macrosurface side by side into a single
+    grid. When the surface grids are consecutive column ranges of the same array, as the ones
+    created by single_grid_to_macrosurface_aero_grid, the single grid is a view of that array
+    and nothing is copied.
 
-    last_node_number = None
-    remove_queue = []
+    Args:
+        macro_surface_mesh (list(dict)): list with the aerodynamic grids of the macrosurface
+
+    Returns:
+        single_grid (dict): single aerodynamic grid with shape (n_chord_points, n_span_points)
+    """
 
-    # Find nodes with the same node number
-    for i, node in enumerate(node_vector):
+    single_grid = dict()
 
-        if node.number == last_node_number:
-            remove_queue.append(i)
+    for key in ("xx", "yy", "zz"):
+
+        surface_grids = [surface_mesh[key] for surface_mesh in macro_surface_mesh]
+        single_grid_view = columns_ranges_to_single_grid(surface_grids)
+
+        if single_grid_view is None:
+            single_grid[key] = np.concatenate(surface_grids, axis=1)
         else:
-            last_node_number = node.number
+            single_grid[key] = single_grid_view
 
-    # Delete duplicate nodes
-    # Iterate backwards so indice number don't change
-    for i in reversed(remove_queue):
-        del node_vector[i]
+    return single_grid
 
-    return node_vector
 
 # --------------------------------------------------------------------------------------------------
 
 
-def macrosurface_aero_grid_to_single_grid(macro_surface_mesh):
+def columns_ranges_to_single_grid(surface_grids):
+    """Returns the array of which the surface grids are consecutive column ranges, without
+    copying it. The grids must have the same number of rows and strides and each grid must start
+    in memory right after the last column of the previous one.
 
-    n_span_points = 0
-    n_chord_points = 0
+    Args:
+        surface_grids (list(np.array)): grids of the surfaces, ordered from left to right
+
+    Returns:
+        single_grid (np.array): read only view with all the columns, None if the grids are not
+                                consecutive column ranges of the same memory
+    """
+
+    first_grid = surface_grids[0]
+
+    if first_grid.ndim != 2:
+        return None
+
+    n_rows = first_grid.shape[0]
+    strides = first_grid.strides
+    start_address = first_grid.__array_interface__["data"][0]
 
-    # Count number of chord and spam points
+    n_columns = 0
+
+    for grid in surface_grids:
+
+        if not isinstance(grid, np.ndarray) or grid.ndim != 2:
+            return None
+
+        if grid.shape[0] != n_rows or grid.dtype != first_grid.dtype:
+            return None
+
+        # Single column grids have arbitrary column strides
+        if grid.strides[0] != strides[0] or (grid.shape[1] > 1 and grid.strides[1] != strides[1]):
+            return None
+
+        if grid.__array_interface__["data"][0] != start_address + n_columns * strides[1]:
+            return None
+
+        n_columns += grid.shape[1]
+
+    # Every element of the single grid belongs to one of the surface grids
+    single_grid = np.lib.stride_tricks.as_strided(
+        first_grid, shape=(n_rows, n_columns), strides=strides, writeable=False
+    )
+
+    return single_grid
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def single_grid_to_macrosurface_aero_grid(single_grid, n_span_points_list):
+    """Splits the single aerodynamic grid of a macrosurface into the grids of its surfaces, each
+    surface grid is a view of a column range of the single grid.
+
+    Args:
+        single_grid (dict): single aerodynamic grid of the macrosurface
+        n_span_points_list (list(int)): number of span points of each surface
+
+    Returns:
+        macro_surface_mesh (list(dict)): list with the aerodynamic grids of the macrosurface
+    """
+
+    columns_ends = np.cumsum(n_span_points_list)
+    columns_starts = columns_ends - np.asarray(n_span_points_list)
+
+    macro_surface_mesh = [
+        {key: single_grid[key][:, start:end] for key in ("xx", "yy", "zz")}
+        for start, end in zip(columns_starts, columns_ends)
+    ]
+
+    return macro_surface_mesh
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def macrosurface_panel_corner_indexes(macro_surface_mesh):
+    """Finds, for every panel of a macrosurface, the indexes of its corner points in the point
+    vector of the macrosurface single grid (see macrosurface_aero_grid_to_single_grid).
+
+    The panels are ordered in the same way as in the flattened panel grid created by
+    aerodynamics.vlm.create_panel_grid and the corners follow the Panel object convention, A is
+    the trailing edge left point, B the leading edge left point, C the leading edge right point
+    and D the trailing edge right point.
+
+    Args:
+        macro_surface_mesh (list(dict)): list with the aerodynamic grids of the macrosurface
+
+    Returns:
+        corner_indexes (np.array([n_panels, 4], dtype=int)): indexes of the A, B, C and D points
+                                                              of each panel
+    """
+
+    n_span_points = 0
     for surface_mesh in macro_surface_mesh:
-        i, j = np.shape(surface_mesh["xx"])
-        n_chord_points = i
+        n_chord_points, j = np.shape(surface_mesh["xx"])
         n_span_points += j
 
-    # Initialize single grid
-    single_grid_xx = np.zeros((n_chord_points, n_span_points))
-    single_grid_yy = np.zeros((n_chord_points, n_span_points))
-    single_grid_zz = np.zeros((n_chord_points, n_span_points))
-
-    # Populate Single Grid
+    # Panel grid columns are laid side by side, each surface grid has its own border points
+    panels_columns = []
     span_index = 0
     for surface_mesh in macro_surface_mesh:
-        n_x, n_y = np.shape(surface_mesh["xx"])
+        n_y = np.shape(surface_mesh["xx"])[1]
+        panels_columns.append(np.arange(span_index, span_index + n_y - 1))
+        span_index += n_y
 
-        for i in range(n_x):
-            for j in range(n_y):
-                single_grid_xx[i][j + span_index] = surface_mesh["xx"][i, j]
-                single_grid_yy[i][j + span_index] = surface_mesh["yy"][i, j]
-                single_grid_zz[i][j + span_index] = surface_mesh["zz"][i, j]
+    panels_columns = np.concatenate(panels_columns)
+    panels_rows = np.arange(n_chord_points - 1)
 
-        span_index += n_y
+    rows, columns = np.meshgrid(panels_rows, panels_columns, indexing="ij")
+    rows = rows.flatten()
+    columns = columns.flatten()
 
-    single_grid = {"xx":single_grid_xx, "yy":single_grid_yy, "zz":single_grid_zz}
+    point_a = (rows + 1) * n_span_points + columns
+    point_b = rows * n_span_points + columns
+    point_c = rows * n_span_points + columns + 1
+    point_d = (rows + 1) * n_span_points + columns + 1
+
+    corner_indexes = np.stack([point_a, point_b, point_c, point_d], axis=1)
+
+    return corner_indexes
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def macrosurface_panel_corners(macro_surface_mesh):
+    """Finds the corner points of every panel of a macrosurface, the panels are ordered as in the
+    flattened panel grid created by aerodynamics.vlm.create_panel_grid.
+
+    Args:
+        macro_surface_mesh (list(dict)): list with the aerodynamic grids of the macrosurface
+
+    Returns:
+        panel_corners (np.array([n_panels, 4, 3], dtype=float)): A, B, C and D points of each
+                                                                 panel
+    """
+
+    aero_grid = macrosurface_aero_grid_to_single_grid(macro_surface_mesh)
+    points = grid_to_vector(aero_grid["xx"], aero_grid["yy"], aero_grid["zz"]).transpose()
+
+    corner_indexes = macrosurface_panel_corner_indexes(macro_surface_mesh)
+
+    return points[corner_indexes]
 
-    return single_grid
 
 # --------------------------------------------------------------------------------------------------
+
+
+def panels_reference_points(panel_corners):
+    """Calculates the reference points of several panels at once, with the same definitions of
+    the Panel object.
+
+    Args:
+        panel_corners (np.array([n_panels, 4, 3], dtype=float)): A, B, C and D points of each
+                                                                 panel
+
+    Returns:
+        reference_points (dict): panels "aero_center", "col_point" and "bound_vortex", the bound
+                                 vortex is an array with shape (n_panels, 2, 3) with the left and
+                                 right points of the vortex
+    """
+
+    point_a = panel_corners[:, 0]
+    point_b = panel_corners[:, 1]
+    point_c = panel_corners[:, 2]
+    point_d = panel_corners[:, 3]
+
+    l_edge_1_2 = point_b + 0.5 * (point_c - point_b)
+    t_edge_1_2 = point_a + 0.5 * (point_d - point_a)
+
+    l_chord_1_4 = point_b + 0.25 * (point_a - point_b)
+    r_chord_1_4 = point_c + 0.25 * (point_d - point_c)
+
+    reference_points = {
+        "aero_center": 0.25 * (t_edge_1_2 - l_edge_1_2) + l_edge_1_2,
+        "col_point": 0.75 * (t_edge_1_2 - l_edge_1_2) + l_edge_1_2,
+        "bound_vortex": np.stack([l_chord_1_4, r_chord_1_4], axis=1),
+    }
+
+    return reference_points
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def closest_points_indexes(points, reference_points):
+    """Finds the closest reference point of each point using a spatial index. Distances are
+    calculated as in distance_between_points and ties are broken towards the last reference
+    point, so the result is the same of a linear scan over the reference points.
+
+    Args:
+        points (np.array([n_points, 3], dtype=float)): points coordinates
+        reference_points (np.array([n_reference_points, 3], dtype=float)): reference points
+                                                                           coordinates
+
+    Returns:
+        closest_indexes (np.array([n_points], dtype=int)): index of the closest reference point
+    """
+
+    points = np.reshape(np.asarray(points, dtype=float), (-1, 3))
+    reference_points = np.reshape(np.asarray(reference_points, dtype=float), (-1, 3))
+
+    spatial_index = objects.SpatialIndex(reference_points)
+    distances, _ = spatial_index.query_nearest(points, 1)
+
+    # Every reference point at the nearest distance is a candidate, the radius is slightly
+    # enlarged because the tree distances may differ from distance_between_points by round-off
+    candidates_list = spatial_index.query_radius(
+        points, distances[:, 0] * (1 + 1e-9) + 1e-12
+    )
+
+    closest_indexes = np.empty(len(points), dtype=int)
+
+    for i, candidates in enumerate(candidates_list):
+
+        delta = reference_points[candidates] - points[i]
+        distances = (delta[:, 0] ** 2 + delta[:, 1] ** 2 + delta[:, 2] ** 2) ** 0.5
+
+        closest_indexes[i] = np.max(candidates[distances == np.min(distances)])
+
+    return closest_indexes
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def ray_panels_intersection(origins, directions, panel_corners, chunk_size=256):
+    """Finds the first panel hit by each ray. Each panel is split in the triangles ABC and ACD
+    and the rays are tested against all the triangles with the Moller-Trumbore algorithm,
+    chunk_size rays at a time.
+
+    Args:
+        origins (np.array([n_rays, 3], dtype=float)): rays origins
+        directions (np.array([n_rays, 3], dtype=float)): rays directions
+        panel_corners (np.array([n_panels, 4, 3], dtype=float)): A, B, C and D points of each
+                                                                 panel
+        chunk_size (int): number of rays tested at once
+
+    Returns:
+        distances (np.array([n_rays], dtype=float)): distance from the origin to the hit point,
+                                                     inf if the ray does not hit any panel
+        panel_indexes (np.array([n_rays], dtype=int)): index of the hit panel, -1 if the ray
+                                                       does not hit any panel
+    """
+
+    origins = np.reshape(np.asarray(origins, dtype=float), (-1, 3))
+    directions = np.reshape(np.asarray(directions, dtype=float), (-1, 3))
+    directions = directions / np.linalg.norm(directions, axis=1)[:, np.newaxis]
+
+    n_rays = len(origins)
+    distances = np.full(n_rays, np.inf)
+    panel_indexes = np.full(n_rays, -1)
+
+    for first, second, third in ((0, 1, 2), (0, 2, 3)):
+
+        vertex = panel_corners[:, first]
+        edge_1 = panel_corners[:, second] - vertex
+        edge_2 = panel_corners[:, third] - vertex
+
+        for start in range(0, n_rays, chunk_size):
+
+            end = min(start + chunk_size, n_rays)
+            origin = origins[start:end, np.newaxis, :]
+            direction = directions[start:end, np.newaxis, :]
+
+            p_vector = np.cross(direction, edge_2)
+            determinant = np.sum(edge_1 * p_vector, axis=2)
+            not_parallel = np.abs(determinant) > 1e-12
+            inverse_determinant = 1 / np.where(not_parallel, determinant, 1)
+
+            t_vector = origin - vertex
+            u = np.sum(t_vector * p_vector, axis=2) * inverse_determinant
+
+            q_vector = np.cross(t_vector, edge_1)
+            v = np.sum(direction * q_vector, axis=2) * inverse_determinant
+            t = np.sum(edge_2 * q_vector, axis=2) * inverse_determinant
+
+            hit = not_parallel & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+            t = np.where(hit, t, np.inf)
+
+            closest = np.argmin(t, axis=1)
+            closest_distance = t[np.arange(end - start), closest]
+
+            is_closer = closest_distance < distances[start:end]
+            distances[start:end][is_closer] = closest_distance[is_closer]
+            panel_indexes[start:end][is_closer] = closest[is_closer]
+
+    return distances, panel_indexes
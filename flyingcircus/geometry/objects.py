@@ -119,6 +119,8 @@ class Node(object):
         number (None or int): Node number, is initialized as None
     """
 
+    __slots__ = ("x", "y", "z", "xyz", "quaternion", "number")
+
     def __init__(self, xyz, quaternion):
 
         self.x = xyz[0]
@@ -126,21 +128,37 @@ class Node(object):
         self.z = xyz[2]
         self.xyz = np.array([self.x, self.y, self.z])
         self.quaternion = quaternion
+        self.number = None
 
-        orig_x_axis = np.array([1, 0, 0])
-        orig_y_axis = np.array([0, 1, 0])
-        orig_z_axis = np.array([0, 0, 1])
+    # The node axes are only calculated when requested, most nodes are never asked for them
 
-        self.x_axis = quaternion.rotate(orig_x_axis)
-        self.y_axis = quaternion.rotate(orig_y_axis)
-        self.z_axis = quaternion.rotate(orig_z_axis)
+    @property
+    def x_axis(self):
+        return self.quaternion.rotate(np.array([1, 0, 0]))
 
-        self.x_cos = f.cos_between(orig_x_axis, self.x_axis)
-        self.y_cos = f.cos_between(orig_y_axis, self.y_axis)
-        self.z_cos = f.cos_between(orig_z_axis, self.z_axis)
-        self.direction_cos = np.array([self.x_cos, self.y_cos, self.z_cos])
+    @property
+    def y_axis(self):
+        return self.quaternion.rotate(np.array([0, 1, 0]))
 
-        self.number = None
+    @property
+    def z_axis(self):
+        return self.quaternion.rotate(np.array([0, 0, 1]))
+
+    @property
+    def x_cos(self):
+        return f.cos_between(np.array([1, 0, 0]), self.x_axis)
+
+    @property
+    def y_cos(self):
+        return f.cos_between(np.array([0, 1, 0]), self.y_axis)
+
+    @property
+    def z_cos(self):
+        return f.cos_between(np.array([0, 0, 1]), self.z_axis)
+
+    @property
+    def direction_cos(self):
+        return np.array([self.x_cos, self.y_cos, self.z_cos])
 
     def translate(self, translation_vector):
         """Applies a translation to the node, returns a new Node object with the transformed
@@ -173,11 +191,14 @@ class Node(object):
         """
 
         # Coordinate transformation to move rotation center to origin
-        temp_xyz = self.xyz - rotation_center
+        temp_xyz = np.asarray(self.xyz - rotation_center, dtype=float)
 
         # Rotate Node
-        new_quaternion = rotation_quaternion * self.quaternion
-        rot_xyz = rotation_quaternion.rotate(temp_xyz)
+        rotation_q = rotation_quaternion.q[np.newaxis]
+        new_quaternion = Quaternion(
+            m.rotations.quaternion_multiply(rotation_q, self.quaternion.q[np.newaxis])[0]
+        )
+        rot_xyz = m.rotations.rotate_vectors(rotation_q, temp_xyz[np.newaxis])[0]
 
         # Coordinate transformation to return rotation center to it's original position
         new_xyz = rot_xyz + rotation_center
@@ -188,6 +209,560 @@ class Node(object):
 # ==================================================================================================
 
 
+class NodeTable(object):
+    """Structure nodes stored in contiguous arrays, sorted by node number. Indexing a NodeTable
+    with an integer returns a NodeView, so a NodeTable can be used wherever a sorted list of
+    nodes is expected.
+
+    Args:
+        positions (np.array([n_nodes, 3], dtype=float)): nodes x, y and z coordinates
+        quaternions (np.array([n_nodes, 4], dtype=float)): nodes orientation quaternions, with
+                                                          the pyquaternion (w, x, y, z) order
+        numbers (np.array([n_nodes], dtype=int)): nodes numbers, sorted and without duplicates
+
+    Attributes:
+        positions (np.array([n_nodes, 3], dtype=float)): nodes x, y and z coordinates
+        quaternions (np.array([n_nodes, 4], dtype=float)): nodes orientation quaternions
+        numbers (np.array([n_nodes], dtype=int)): nodes numbers
+    """
+
+    __slots__ = ("positions", "quaternions", "numbers")
+
+    def __init__(self, positions, quaternions, numbers):
+
+        self.positions = np.ascontiguousarray(positions, dtype=float)
+        self.quaternions = np.ascontiguousarray(quaternions, dtype=float)
+        self.numbers = np.ascontiguousarray(numbers, dtype=int)
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """Creates a NodeTable from numbered Node objects, the nodes are sorted by number and
+        only the first node with each number is kept.
+
+        Args:
+            nodes (list(geometry.objects.Node)): numbered nodes
+
+        Returns:
+            node_table (geometry.objects.NodeTable): sorted nodes without duplicates
+        """
+
+        numbers = np.array([node.number for node in nodes], dtype=int)
+        numbers, first_index = np.unique(numbers, return_index=True)
+
+        positions = np.array([nodes[i].xyz for i in first_index], dtype=float).reshape(-1, 3)
+        quaternions = np.array([nodes[i].quaternion.q for i in first_index], dtype=float)
+
+        return cls(positions, quaternions.reshape(-1, 4), numbers)
+
+    @classmethod
+    def from_grid(cls, structure_struct_grid):
+        """Creates a NodeTable with the nodes of all the components of a structural grid.
+
+        Args:
+            structure_struct_grid (list(list(Node))): structural grid of each component
+
+        Returns:
+            node_table (geometry.objects.NodeTable): sorted nodes without duplicates
+        """
+
+        nodes = []
+
+        for component_grid in structure_struct_grid:
+            nodes += component_grid
+
+        return cls.from_nodes(nodes)
+
+    def __len__(self):
+
+        return len(self.numbers)
+
+    def __iter__(self):
+
+        for i in range(len(self.numbers)):
+            yield NodeView(self, i)
+
+    def __getitem__(self, index):
+
+        if isinstance(index, (int, np.integer)):
+
+            if index < 0:
+                index += len(self.numbers)
+
+            if not 0 <= index < len(self.numbers):
+                raise IndexError("NodeTable index out of range")
+
+            return NodeView(self, int(index))
+
+        return NodeTable(self.positions[index], self.quaternions[index], self.numbers[index])
+
+
+# ==================================================================================================
+
+
+class NodeView(Node):
+    """Node of a NodeTable, has the same attributes and methods of a Node object but reads them
+    from the table arrays instead of storing a copy. The properties of the view take the place of
+    the Node slots, which are left empty.
+
+    Args:
+        table (geometry.objects.NodeTable): table that contains the node
+        index (int): position of the node in the table
+    """
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+
+        self.table = table
+        self.index = index
+
+    def __reduce__(self):
+
+        # The inherited Node slots are replaced by read only properties, so the default slots
+        # state can not be restored
+        return (NodeView, (self.table, self.index))
+
+    @property
+    def x(self):
+        return self.table.positions[self.index, 0]
+
+    @property
+    def y(self):
+        return self.table.positions[self.index, 1]
+
+    @property
+    def z(self):
+        return self.table.positions[self.index, 2]
+
+    @property
+    def xyz(self):
+        # Read only, writing to the view would change the shared table
+        xyz = self.table.positions[self.index]
+        xyz.flags.writeable = False
+        return xyz
+
+    @property
+    def quaternion(self):
+        return Quaternion(self.table.quaternions[self.index])
+
+    @property
+    def number(self):
+        return int(self.table.numbers[self.index])
+
+
+# ==================================================================================================
+
+
+class FlowField(object):
+    """Flow velocity field seen by the aircraft, the sum of the free stream velocity, the velocity
+    due to the aircraft rotation and an optional atmospheric turbulence velocity. Calling a
+    FlowField with an array of points evaluates all of them at once.
+
+    Args:
+        cg_velocity (np.array([3], dtype=float)): free stream velocity in the aircraft system
+        rotation_vector (np.array([3], dtype=float)): aircraft rotation velocity [rad/s]
+        center (np.array([3], dtype=float)): center of rotation
+        turbulence_function (function): receives point coordinates and returns the turbulence
+                                        velocity at the point, None if there is no turbulence
+
+    Attributes:
+        cg_velocity (np.array([3], dtype=float)): free stream velocity in the aircraft system
+        rotation_vector (np.array([3], dtype=float)): aircraft rotation velocity [rad/s]
+        center (np.array([3], dtype=float)): center of rotation
+        turbulence_function (function): turbulence velocity function
+    """
+
+    __slots__ = ("cg_velocity", "rotation_vector", "center", "turbulence_function")
+
+    def __init__(self, cg_velocity, rotation_vector, center, turbulence_function=None):
+
+        self.cg_velocity = np.asarray(cg_velocity, dtype=float)
+        self.rotation_vector = np.asarray(rotation_vector, dtype=float)
+        self.center = np.asarray(center, dtype=float)
+        self.turbulence_function = turbulence_function
+
+    def __call__(self, points):
+        """Evaluates the flow velocity at one point, shape (3), or at several points, shape
+        (n_points, 3), the velocities have the same shape as the points.
+        """
+
+        points = np.asarray(points, dtype=float)
+        points_array = np.reshape(points, (-1, 3))
+
+        tangential_velocity = -np.cross(self.rotation_vector, points_array - self.center)
+        flow_velocity = self.cg_velocity + tangential_velocity
+
+        if self.turbulence_function is not None:
+            flow_velocity += f.evaluate_velocity_field(self.turbulence_function, points_array)
+
+        return np.reshape(flow_velocity, np.shape(points))
+
+
+# ==================================================================================================
+
+
+class TurbulenceTable(object):
+    """Turbulence velocity field tabulated on a regular grid and interpolated with trilinear
+    interpolation, can be used as the atm_turbulenc_function of a flight condition. Points
+    outside of the grid take the velocity of the closest point of the grid boundary.
+
+    Args:
+        x (np.array([n_x], dtype=float)): grid x coordinates, strictly increasing
+        y (np.array([n_y], dtype=float)): grid y coordinates, strictly increasing
+        z (np.array([n_z], dtype=float)): grid z coordinates, strictly increasing
+        velocities (np.array([n_x, n_y, n_z, 3], dtype=float)): turbulence velocity at each grid
+                                                                point
+
+    Attributes:
+        axes (tuple(np.array)): grid x, y and z coordinates
+        velocities (np.array([n_x, n_y, n_z, 3], dtype=float)): turbulence velocities
+    """
+
+    __slots__ = ("axes", "velocities")
+
+    def __init__(self, x, y, z, velocities):
+
+        self.axes = tuple(np.asarray(axis, dtype=float) for axis in (x, y, z))
+        self.velocities = np.ascontiguousarray(velocities, dtype=float)
+
+        shape = tuple(len(axis) for axis in self.axes)
+
+        if self.velocities.shape != shape + (3,):
+            raise ValueError(
+                f"TurbulenceTable velocities shape {self.velocities.shape} does not match the "
+                f"grid shape {shape + (3,)}"
+            )
+
+        for axis in self.axes:
+            if len(axis) < 2 or np.any(np.diff(axis) <= 0):
+                raise ValueError(
+                    "TurbulenceTable axes must have at least 2 strictly increasing coordinates"
+                )
+
+    def __call__(self, points):
+        """Interpolates the turbulence velocity at one point, shape (3), or at several points,
+        shape (n_points, 3), the velocities have the same shape as the points.
+        """
+
+        points = np.asarray(points, dtype=float)
+        points_array = np.reshape(points, (-1, 3))
+
+        # Lower grid index and interpolation weight of the points along each axis
+        indexes = []
+        weights = []
+
+        for i, axis in enumerate(self.axes):
+            coordinates = np.clip(points_array[:, i], axis[0], axis[-1])
+            index = np.clip(np.searchsorted(axis, coordinates, side="right") - 1, 0, len(axis) - 2)
+            indexes.append(index)
+            weights.append((coordinates - axis[index]) / (axis[index + 1] - axis[index]))
+
+        (i_x, i_y, i_z), (w_x, w_y, w_z) = indexes, weights
+
+        turbulence_velocity = np.zeros_like(points_array)
+
+        for d_x, f_x in ((0, 1 - w_x), (1, w_x)):
+            for d_y, f_y in ((0, 1 - w_y), (1, w_y)):
+                for d_z, f_z in ((0, 1 - w_z), (1, w_z)):
+                    turbulence_velocity += (f_x * f_y * f_z)[:, np.newaxis] * self.velocities[
+                        i_x + d_x, i_y + d_y, i_z + d_z
+                    ]
+
+        return np.reshape(turbulence_velocity, np.shape(points))
+
+
+# ==================================================================================================
+
+
+class SpatialIndex(object):
+    """kd-tree index of a set of points, answers nearest points and radius queries for several
+    query points at once.
+
+    The points can be moved with update, the tree is only rebuilt when a point moved more than
+    rebuild_distance since the last build. Until then the old tree is searched with a margin of
+    the largest displacement and the candidates are checked against the updated points, so the
+    queries results are always exact.
+
+    Args:
+        points (np.array([n_points, 3], dtype=float)): points coordinates
+        rebuild_distance (float): largest displacement before the tree is rebuilt, if None a
+                                  quarter of the median distance between neighbour points
+
+    Attributes:
+        points (np.array([n_points, 3], dtype=float)): current points coordinates
+        tree_points (np.array([n_points, 3], dtype=float)): points coordinates in the tree
+        max_displacement (float): largest displacement of a point since the last build
+        rebuild_distance (float): largest displacement before the tree is rebuilt
+        tree (scipy.spatial.cKDTree): kd-tree of tree_points
+    """
+
+    __slots__ = ("points", "tree_points", "max_displacement", "rebuild_distance", "tree")
+
+    def __init__(self, points, rebuild_distance=None):
+
+        self.points = np.reshape(np.array(points, dtype=float), (-1, 3))
+        self.rebuild_distance = rebuild_distance
+        self.build()
+
+    def build(self):
+        """Builds the tree with the current points coordinates."""
+
+        # Imported here, scipy.spatial would add to the import time of the whole package
+        from scipy.spatial import cKDTree
+
+        self.tree_points = np.copy(self.points)
+        self.tree = cKDTree(self.tree_points)
+        self.max_displacement = 0.0
+
+        if self.rebuild_distance is None:
+
+            if len(self.points) > 1:
+                distances, indexes = self.tree.query(self.tree_points, 2)
+                self.rebuild_distance = 0.25 * np.median(distances[:, 1])
+            else:
+                self.rebuild_distance = 0.0
+
+    def update(self, points):
+        """Moves the points to new coordinates, the number of points must not change.
+
+        Args:
+            points (np.array([n_points, 3], dtype=float)): new points coordinates
+        """
+
+        points = np.reshape(np.array(points, dtype=float), (-1, 3))
+
+        if np.shape(points) != np.shape(self.tree_points):
+            raise ValueError(
+                f"SpatialIndex.update: expected {len(self.tree_points)} points, "
+                f"received {len(points)}"
+            )
+
+        self.points = points
+
+        max_displacement = np.max(np.linalg.norm(points - self.tree_points, axis=1), initial=0.0)
+
+        if max_displacement > self.rebuild_distance:
+            self.build()
+        else:
+            self.max_displacement = max_displacement
+
+    def query_nearest(self, query_points, k=1):
+        """Finds the k nearest points of each query point.
+
+        Args:
+            query_points (np.array([n_queries, 3], dtype=float)): query points coordinates
+            k (int): number of nearest points
+
+        Returns:
+            distances (np.array([n_queries, k], dtype=float)): distances to the nearest points,
+                                                               sorted
+            indexes (np.array([n_queries, k], dtype=int)): indexes of the nearest points
+        """
+
+        query_points = np.reshape(np.asarray(query_points, dtype=float), (-1, 3))
+        n_queries = len(query_points)
+        k = min(k, len(self.points))
+
+        distances, indexes = self.tree.query(query_points, k)
+        distances = np.reshape(distances, (n_queries, k))
+        indexes = np.reshape(indexes, (n_queries, k))
+
+        if self.max_displacement == 0.0:
+            return distances, indexes
+
+        # The k nearest points are inside this radius of the old tree
+        radii = distances[:, -1] + 2 * self.max_displacement
+        candidates_list = self.tree.query_ball_point(query_points, radii)
+
+        for i, candidates in enumerate(candidates_list):
+            candidates = np.array(candidates, dtype=int)
+            candidates_distances = np.linalg.norm(self.points[candidates] - query_points[i], axis=1)
+            order = np.argsort(candidates_distances, kind="stable")[:k]
+            distances[i] = candidates_distances[order]
+            indexes[i] = candidates[order]
+
+        return distances, indexes
+
+    def query_radius(self, query_points, radius):
+        """Finds the points inside a sphere around each query point.
+
+        Args:
+            query_points (np.array([n_queries, 3], dtype=float)): query points coordinates
+            radius (float or np.array([n_queries], dtype=float)): spheres radii
+
+        Returns:
+            indexes_list (list(np.array(dtype=int))): sorted indexes of the points inside the
+                                                      sphere of each query point
+        """
+
+        query_points = np.reshape(np.asarray(query_points, dtype=float), (-1, 3))
+        radius = np.broadcast_to(np.asarray(radius, dtype=float), (len(query_points),))
+
+        candidates_list = self.tree.query_ball_point(
+            query_points, radius + self.max_displacement, return_sorted=True
+        )
+
+        indexes_list = []
+
+        for i, candidates in enumerate(candidates_list):
+            candidates = np.array(candidates, dtype=int)
+
+            if self.max_displacement > 0.0:
+                candidates_distances = np.linalg.norm(
+                    self.points[candidates] - query_points[i], axis=1
+                )
+                candidates = candidates[candidates_distances <= radius[i]]
+
+            indexes_list.append(candidates)
+
+        return indexes_list
+
+
+# ==================================================================================================
+
+
+class AircraftSpatialIndex(object):
+    """Spatial index of the aircraft panels, bound vortices and structural nodes, answers
+    geometric queries for several points or rays at once. The panels are ordered as in the
+    aircraft panel vector of aerodynamics.vlm and the nodes are sorted by number.
+
+    Args:
+        aircraft_grids (dict): aircraft grids, as created by
+                               aeroelasticity.functions.generate_aircraft_grids
+        rebuild_distance (float): largest displacement before the trees are rebuilt, see
+                                  SpatialIndex
+
+    Attributes:
+        panel_corners (np.array([n_panels, 4, 3], dtype=float)): A, B, C and D points of each
+                                                                 panel
+        aero_centers (np.array([n_panels, 3], dtype=float)): panels aerodynamic centers
+        bound_vortices (np.array([n_panels, 2, 3], dtype=float)): panels bound vortices points
+        node_numbers (np.array([n_nodes], dtype=int)): nodes numbers
+        node_positions (np.array([n_nodes, 3], dtype=float)): nodes coordinates
+        panels (SpatialIndex): index of the panels aerodynamic centers
+        vortices (SpatialIndex): index of the bound vortices middle points
+        nodes (SpatialIndex): index of the nodes
+    """
+
+    def __init__(self, aircraft_grids, rebuild_distance=None):
+
+        self.set_panels(aircraft_grids["macrosurfaces_aero_grids"])
+
+        struct_grid = []
+        for macrosurface_struct_grid in aircraft_grids["macrosurfaces_struct_grids"]:
+            struct_grid += macrosurface_struct_grid
+        if aircraft_grids.get("beams_struct_grids"):
+            struct_grid += aircraft_grids["beams_struct_grids"]
+
+        node_table = NodeTable.from_grid(struct_grid)
+        self.node_numbers = node_table.numbers
+        self.node_positions = node_table.positions
+
+        self.panels = SpatialIndex(self.aero_centers, rebuild_distance)
+        self.vortices = SpatialIndex(np.mean(self.bound_vortices, axis=1), rebuild_distance)
+        self.nodes = SpatialIndex(self.node_positions, rebuild_distance)
+
+    def set_panels(self, macrosurfaces_aero_grids):
+        """Calculates the panels corners, aerodynamic centers and bound vortices."""
+
+        self.panel_corners = np.concatenate(
+            [
+                f.macrosurface_panel_corners(macro_surface_mesh)
+                for macro_surface_mesh in macrosurfaces_aero_grids
+            ]
+        )
+
+        reference_points = f.panels_reference_points(self.panel_corners)
+        self.aero_centers = reference_points["aero_center"]
+        self.bound_vortices = reference_points["bound_vortex"]
+
+    def update(self, macrosurfaces_aero_grids=None, node_positions=None):
+        """Updates the index to a deformed aircraft, the grids must keep their shapes.
+
+        Args:
+            macrosurfaces_aero_grids (list): deformed aerodynamic grids of the macrosurfaces
+            node_positions (np.array([n_nodes, 3], dtype=float)): deformed nodes coordinates,
+                                                                  sorted by node number
+        """
+
+        if macrosurfaces_aero_grids is not None:
+            self.set_panels(macrosurfaces_aero_grids)
+            self.panels.update(self.aero_centers)
+            self.vortices.update(np.mean(self.bound_vortices, axis=1))
+
+        if node_positions is not None:
+            self.node_positions = np.reshape(np.array(node_positions, dtype=float), (-1, 3))
+            self.nodes.update(self.node_positions)
+
+    def nearest_panels(self, points, k=1):
+        """Finds the k panels with the nearest aerodynamic centers of each point, returns the
+        distances and panels indexes, see SpatialIndex.query_nearest."""
+
+        return self.panels.query_nearest(points, k)
+
+    def panels_within(self, points, radius):
+        """Finds the panels with aerodynamic center inside a sphere around each point, returns
+        the panels indexes, see SpatialIndex.query_radius."""
+
+        return self.panels.query_radius(points, radius)
+
+    def nearest_nodes(self, points, k=1):
+        """Finds the k nearest nodes of each point, returns the distances and the nodes indexes,
+        node_numbers[indexes] are the nodes numbers, see SpatialIndex.query_nearest."""
+
+        return self.nodes.query_nearest(points, k)
+
+    def nodes_within(self, points, radius):
+        """Finds the nodes inside a sphere around each point, returns the nodes indexes, see
+        SpatialIndex.query_radius."""
+
+        return self.nodes.query_radius(points, radius)
+
+    def bound_vortices_within(self, points, radius):
+        """Finds the bound vortices with any point inside a sphere around each point, the same
+        check of the vortex core radius in aerodynamics.functions.horse_shoe_ind_vel.
+
+        Args:
+            points (np.array([n_points, 3], dtype=float)): points coordinates
+            radius (float): spheres radius
+
+        Returns:
+            indexes_list (list(np.array(dtype=int))): sorted indexes of the panels whose bound
+                                                      vortex is inside the sphere of each point
+        """
+
+        points = np.reshape(np.asarray(points, dtype=float), (-1, 3))
+
+        vortex_vectors = self.bound_vortices[:, 1] - self.bound_vortices[:, 0]
+        half_length = 0.5 * np.max(np.linalg.norm(vortex_vectors, axis=1))
+
+        candidates_list = self.vortices.query_radius(points, radius + half_length)
+
+        indexes_list = []
+
+        for point, candidates in zip(points, candidates_list):
+
+            # Distance from the point to the vortex segments
+            start = self.bound_vortices[candidates, 0]
+            vector = vortex_vectors[candidates]
+            position = np.sum((point - start) * vector, axis=1) / np.sum(vector * vector, axis=1)
+            closest = start + np.clip(position, 0, 1)[:, np.newaxis] * vector
+            distances = np.linalg.norm(point - closest, axis=1)
+
+            indexes_list.append(candidates[distances <= radius])
+
+        return indexes_list
+
+    def ray_panels(self, origins, directions):
+        """Finds the first panel hit by each ray, returns the distances and panels indexes, see
+        functions.ray_panels_intersection."""
+
+        return f.ray_panels_intersection(origins, directions, self.panel_corners)
+
+
+# ==================================================================================================
+
+
 class Beam:
     def __init__(self, identifier, root_point, tip_point, orientation_vector, ElementProperty):
 
@@ -831,26 +1406,126 @@ class MacroSurface(object):
 
         self.mean_aero_chord = surface_list[0].root_chord
 
-        macrosurface_aero_grid, macrosurface_nodes_list = self.create_grids(
-            n_chord_panels=3,
-            n_span_panels_list=[1 for surface in surface_list],
-            n_beam_elements_list=[1 for surface in surface_list],
-            chord_discretization="linear",
-            span_discretization_list=["linear" for surface in surface_list],
-            torsion_function_list=["linear" for surface in surface_list],
+        # Grids memoized by create_grids and root and tip nodes, created when first needed, they
+        # belong to the geometry parameters stored in grids_geometry
+        self.grids_cache = dict()
+        self.end_nodes = None
+        self.grids_geometry = None
+
+    # ----------------------------------------------------------------------------------------------
+
+    @property
+    def root_nodes(self):
+        """Root nodes of the surfaces, with the same position and orientation as the first node
+        of the surfaces structure grids."""
+
+        self.check_grids_geometry()
+
+        if self.end_nodes is None:
+            self.end_nodes = [f.nodes_arrays(nodes) for nodes in self.create_end_nodes()]
+
+        return f.create_nodes(*self.end_nodes[0])
+
+    @property
+    def tip_nodes(self):
+        """Tip nodes of the surfaces, with the same position and orientation as the last node of
+        the surfaces structure grids."""
+
+        self.check_grids_geometry()
+
+        if self.end_nodes is None:
+            self.end_nodes = [f.nodes_arrays(nodes) for nodes in self.create_end_nodes()]
+
+        return f.create_nodes(*self.end_nodes[1])
+
+    # ----------------------------------------------------------------------------------------------
+
+    def invalidate_grids(self):
+        """Clears the memoized grids and end nodes."""
+
+        self.grids_cache = dict()
+        self.end_nodes = None
+        self.grids_geometry = None
+
+    # ----------------------------------------------------------------------------------------------
+
+    def geometry_parameters(self):
+        """Parameters of the macrosurface and of its surfaces used by the grids generation.
+
+        Returns:
+            geometry (tuple): macrosurface position, incidence, symmetry plane and torsion center
+                              and the parameters of each surface
+        """
+
+        surfaces_parameters = tuple(
+            (
+                surface.identifier,
+                surface.root_chord,
+                surface.tip_chord,
+                surface.length,
+                float(surface.leading_edge_sweep_angle_rad),
+                float(surface.dihedral_angle_rad),
+                float(surface.tip_torsion_angle_rad),
+                surface.control_surface_hinge_position,
+                surface.root_section.shear_center,
+                surface.tip_section.shear_center,
+            )
+            for surface in self.surface_list
+        )
+
+        return (
+            tuple(np.asarray(self.position, dtype=float)),
+            float(self.incidence_rad),
+            self.symmetry_plane,
+            self.torsion_center,
+            surfaces_parameters,
         )
 
+    # ----------------------------------------------------------------------------------------------
+
+    def check_grids_geometry(self):
+        """Clears the memoized grids and end nodes if the macrosurface or any of its surfaces was
+        modified after they were created."""
+
+        geometry = self.geometry_parameters()
+
+        if geometry != self.grids_geometry:
+            self.invalidate_grids()
+            self.grids_geometry = geometry
+
+    # ----------------------------------------------------------------------------------------------
+
+    def create_end_nodes(self):
+        """Creates the root and tip nodes of the surfaces without generating the grids, a single
+        beam element is placed in each surface.
+
+        Returns:
+            root_nodes (list(Node)): root node of each surface
+            tip_nodes (list(Node)): tip node of each surface
+        """
+
+        translation_vector_list, incidence_angle_list, middle_index = self.surfaces_placement()
+
         root_nodes = []
         tip_nodes = []
 
-        for surface_nodes in macrosurface_nodes_list:
-            root_nodes.append(surface_nodes[0])
-            tip_nodes.append(surface_nodes[-1])
+        for i, surface in enumerate(self.surface_list):
+
+            surface_nodes_list = self.create_surface_nodes(
+                surface,
+                n_beam_elements=1,
+                mirror=(i < middle_index),
+                translation_vector=translation_vector_list[i],
+                incidence_angle=incidence_angle_list[i],
+            )
 
-        self.root_nodes = root_nodes
-        self.tip_nodes = tip_nodes
+            root_nodes.append(surface_nodes_list[0])
+            tip_nodes.append(surface_nodes_list[-1])
+
+        return root_nodes, tip_nodes
 
     # ----------------------------------------------------------------------------------------------
+
     def create_grids(
         self,
         n_chord_panels,
@@ -861,9 +1536,86 @@ class MacroSurface(object):
         torsion_function_list,
         control_surface_deflection_dict=dict(),
     ):
+        """Creates the aerodynamic grids and the structure nodes of the macrosurface. The grids
+        are memoized, calls with the same geometry, discretization and control surface
+        deflections return the aerodynamic grids created by the first call, which are read only.
+        The structure nodes are numbered by the structure functions, so new nodes are created
+        in every call.
 
-        macrosurface_aero_grid = []
-        macrosurface_nodes_list = []
+        Args:
+            n_chord_panels (int): number of chord panels
+            n_span_panels_list (list(int)): number of span panels of each surface
+            n_beam_elements_list (list(int)): number of beam elements of each surface
+            chord_discretization (string): type of chord discretization
+            span_discretization_list (list(string)): type of span discretization of each surface
+            torsion_function_list (list): torsion function of each surface, not used by the
+                                          grids generation
+            control_surface_deflection_dict (dict): deflection of the control surfaces [º], keys
+                                                    are the surfaces identifiers
+
+        Returns:
+            macrosurface_aero_grid (list(dict)): aerodynamic grid of each surface
+            macrosurface_nodes_list (list(list(Node))): structure nodes of each surface
+        """
+
+        grids_key = (
+            int(n_chord_panels),
+            tuple(int(n) for n in n_span_panels_list),
+            tuple(int(n) for n in n_beam_elements_list),
+            chord_discretization,
+            tuple(span_discretization_list),
+            tuple(
+                sorted(
+                    (identifier, float(deflection))
+                    for identifier, deflection in control_surface_deflection_dict.items()
+                )
+            ),
+        )
+
+        self.check_grids_geometry()
+
+        if grids_key not in self.grids_cache:
+            macrosurface_aero_grid, macrosurface_nodes_list = self.generate_grids(
+                n_chord_panels,
+                n_span_panels_list,
+                n_beam_elements_list,
+                chord_discretization,
+                span_discretization_list,
+                control_surface_deflection_dict,
+            )
+
+            for aero_grid_dict in macrosurface_aero_grid:
+                for key in ("xx", "yy", "zz"):
+                    aero_grid_dict[key].flags.writeable = False
+
+            self.grids_cache[grids_key] = (
+                macrosurface_aero_grid,
+                [f.nodes_arrays(nodes_list) for nodes_list in macrosurface_nodes_list],
+            )
+
+        macrosurface_aero_grid, macrosurface_nodes_arrays = self.grids_cache[grids_key]
+        macrosurface_nodes_list = [
+            f.create_nodes(*nodes_arrays) for nodes_arrays in macrosurface_nodes_arrays
+        ]
+
+        return macrosurface_aero_grid, macrosurface_nodes_list
+
+    # ----------------------------------------------------------------------------------------------
+
+    def surfaces_placement(self, dihedral_angles=None):
+        """Calculates the position of the root leading edge and the incidence of each surface.
+
+        Args:
+            dihedral_angles (list(float)): dihedral angle of each surface [rad], replaces the
+                                           surfaces dihedral angles, used by
+                                           MacroSurfaceMorpher
+
+        Returns:
+            translation_vector_list (list(np.array([3]))): root leading edge of each surface
+            incidence_angle_list (list(float)): root incidence of each surface [rad]
+            middle_index (int): index of the first surface of the right side, the surfaces
+                                before it are mirrored
+        """
 
         if self.symmetry_plane == "XZ" or self.symmetry_plane == "xz":
 
@@ -879,9 +1631,14 @@ class MacroSurface(object):
 
         for i, surface in enumerate(right_side):
 
+            if dihedral_angles is None:
+                dihedral_angle = surface.dihedral_angle_rad
+            else:
+                dihedral_angle = dihedral_angles[middle_index + i]
+
             leading_edge_x = surface.length * tan(surface.leading_edge_sweep_angle_rad)
-            leading_edge_y = surface.span
-            leading_edge_z = surface.span * tan(surface.dihedral_angle_rad)
+            leading_edge_y = surface.length * cos(dihedral_angle)
+            leading_edge_z = leading_edge_y * tan(dihedral_angle)
 
             position = translation_vector_list[i] + np.array(
                 [leading_edge_x, leading_edge_y, leading_edge_z]
@@ -908,6 +1665,66 @@ class MacroSurface(object):
                 [np.flip(incidence_angle_list), incidence_angle_list]
             )
 
+        return translation_vector_list, incidence_angle_list, middle_index
+
+    # ----------------------------------------------------------------------------------------------
+
+    def create_surface_nodes(
+        self, surface, n_beam_elements, mirror, translation_vector, incidence_angle
+    ):
+        """Creates the structure nodes of one of the surfaces in the macrosurface position.
+
+        Args:
+            surface (geometry.objects.Surface): surface of the macrosurface
+            n_beam_elements (int): number of beam elements
+            mirror (bool): if True the surface tip is in the negative side of the y axis
+            translation_vector (np.array([3])): position of the surface root leading edge
+            incidence_angle (float): incidence of the surface root [rad]
+
+        Returns:
+            surface_nodes_list (list(Node)): structure nodes of the surface
+        """
+
+        # Generate planar nodes
+        surface_nodes_list = surface.generate_structure_nodes(
+            n_beam_elements=n_beam_elements, apply_torsion=False, mirror=mirror
+        )
+
+        torsion_function = (
+            lambda span_position: incidence_angle
+            + span_position * surface.tip_torsion_angle_rad
+        )
+
+        surface_nodes_list_prop = f.apply_torsion_to_nodes(
+            surface_nodes_list, self.torsion_center, torsion_function, surface
+        )
+
+        surface_nodes_list = [
+            Node(node_prop[0], node_prop[1]).translate(translation_vector)
+            for node_prop in surface_nodes_list_prop
+        ]
+
+        return surface_nodes_list
+
+    # ----------------------------------------------------------------------------------------------
+
+    def generate_grids(
+        self,
+        n_chord_panels,
+        n_span_panels_list,
+        n_beam_elements_list,
+        chord_discretization,
+        span_discretization_list,
+        control_surface_deflection_dict,
+    ):
+        """Generates the aerodynamic grids and the structure nodes of the macrosurface, see
+        create_grids."""
+
+        macrosurface_aero_grid = []
+        macrosurface_nodes_list = []
+
+        translation_vector_list, incidence_angle_list, middle_index = self.surfaces_placement()
+
         for i, surface in enumerate(self.surface_list):
 
             if i < middle_index:
@@ -933,33 +1750,17 @@ class MacroSurface(object):
                 span_discretization=span_discretization_list[i],
             )
 
-            # Generate planar nodes
-            surface_nodes_list = surface.generate_structure_nodes(
-                n_beam_elements=n_beam_elements_list[i],
-                apply_torsion=False,
-                mirror=mirror,
-            )
-
             # Create torsion function
             torsion_function = (
                 lambda span_position: incidence_angle_list[i]
                 + span_position * surface.tip_torsion_angle_rad
             )
 
-            # Apply torsion to aero grid and nodes
+            # Apply torsion to aero grid
             aero_grid_dict = f.apply_torsion_to_grid(
                 aero_grid_dict, self.torsion_center, torsion_function, surface
             )
 
-            surface_nodes_list_prop = f.apply_torsion_to_nodes(
-                surface_nodes_list, self.torsion_center, torsion_function, surface
-            )
-
-            surface_nodes_list = []
-
-            for node_prop in surface_nodes_list_prop:
-                surface_nodes_list.append(Node(node_prop[0], node_prop[1]))
-
             # Translate grid
             xx, yy, zz = f.translate_grid(
                 aero_grid_dict["xx"],
@@ -970,12 +1771,439 @@ class MacroSurface(object):
             )
             aero_grid_dict = {"xx": xx, "yy": yy, "zz": zz}
 
-            for j, node in enumerate(surface_nodes_list):
-                surface_nodes_list[j] = node.translate(translation_vector_list[i])
+            surface_nodes_list = self.create_surface_nodes(
+                surface,
+                n_beam_elements=n_beam_elements_list[i],
+                mirror=mirror,
+                translation_vector=translation_vector_list[i],
+                incidence_angle=incidence_angle_list[i],
+            )
 
             macrosurface_aero_grid.append(aero_grid_dict)
             macrosurface_nodes_list.append(surface_nodes_list)
 
+        # Surface grids are stored as column ranges of a single contiguous grid
+        macrosurface_aero_grid = f.single_grid_to_macrosurface_aero_grid(
+            f.macrosurface_aero_grid_to_single_grid(macrosurface_aero_grid),
+            [np.shape(aero_grid_dict["xx"])[1] for aero_grid_dict in macrosurface_aero_grid],
+        )
+
         return macrosurface_aero_grid, macrosurface_nodes_list
 
     # ----------------------------------------------------------------------------------------------
+
+
+# ==================================================================================================
+
+
+class MacroSurfaceMorpher(object):
+    """Morphs the aerodynamic grid of a macrosurface when its control surface deflections,
+    incidence, twist or dihedral change, without generating the grids again.
+
+    The reference grid is created once by MacroSurface.create_grids and the parameter changes
+    are applied to a copy of it as rigid displacement fields: rotation of the control surface
+    points around the hinge line, rotation of the sections around the torsion center and
+    rotation of whole surfaces around their roots, followed by the translation of the surfaces
+    outboard of them. The morphed grid is the same grid created by MacroSurface.create_grids
+    with the new parameters.
+
+    The moved grid points are tracked, so only the panels that changed, and the rows and
+    columns of the influence matrix related to them, need to be calculated again, see
+    aerodynamics.vlm.update_panel_vector and aerodynamics.vlm.update_influence_matrix. Only the
+    aerodynamic grid is morphed, the structure nodes must be created by
+    MacroSurface.create_grids after twist or dihedral changes.
+
+    Args:
+        macrosurface (MacroSurface): macrosurface of the grid, it is not modified
+        grid_data (dict): macrosurface grid data, with the same keys used by
+                          aeroelasticity.functions.generate_aircraft_grids
+        first_panel_index (int): index of the first macrosurface panel in the aircraft panel
+                                 vector
+
+    Attributes:
+        macrosurface (MacroSurface): macrosurface of the grid
+        first_panel_index (int): index of the first macrosurface panel in the aircraft panel
+                                 vector
+        points (np.array([3, n_chord_points, n_span_points])): points of the morphed single grid
+                                                                of the macrosurface
+        n_span_points_list (list(int)): number of span points of each surface
+        deflections (dict): control surfaces deflections [º], keys are the surfaces identifiers
+        incidence_rad (float): incidence of the macrosurface [rad]
+        dihedral_angles (np.array([n_surfaces])): dihedral angle of each surface [rad]
+        section_angles (list(np.array)): rotation around the Y axis of the sections of each
+                                         surface [rad]
+        changed_points (np.array([n_chord_points, n_span_points], dtype=bool)): grid points
+                                                                                moved since the
+                                                                                last call of
+                                                                                collect_changed_panels
+    """
+
+    def __init__(self, macrosurface, grid_data, first_panel_index=0):
+
+        self.macrosurface = macrosurface
+        self.first_panel_index = int(first_panel_index)
+
+        self.deflections = {identifier: 0.0 for identifier in macrosurface.control_surfaces}
+        self.deflections.update(
+            {
+                identifier: float(deflection)
+                for identifier, deflection in grid_data["control_surface_deflection_dict"].items()
+            }
+        )
+
+        aero_grids, _ = macrosurface.create_grids(
+            n_chord_panels=grid_data["n_chord_panels"],
+            n_span_panels_list=grid_data["n_span_panels_list"],
+            n_beam_elements_list=grid_data["n_beam_elements_list"],
+            chord_discretization=grid_data["chord_discretization"],
+            span_discretization_list=grid_data["span_discretization_list"],
+            torsion_function_list=grid_data["torsion_function_list"],
+            control_surface_deflection_dict=grid_data["control_surface_deflection_dict"],
+        )
+
+        # The memoized grids must not be modified, the points are copied
+        single_grid = f.macrosurface_aero_grid_to_single_grid(aero_grids)
+        self.points = np.stack([single_grid["xx"], single_grid["yy"], single_grid["zz"]]).astype(
+            float
+        )
+        self.n_span_points_list = [np.shape(aero_grid["xx"])[1] for aero_grid in aero_grids]
+        self.corner_indexes = f.macrosurface_panel_corner_indexes(aero_grids)
+        self.changed_points = np.zeros(np.shape(self.points[0]), dtype=bool)
+
+        translation_vector_list, incidence_angle_list, middle_index = (
+            macrosurface.surfaces_placement()
+        )
+        self.translations = [np.array(vector, dtype=float) for vector in translation_vector_list]
+        self.middle_index = middle_index
+        self.incidence_rad = float(macrosurface.incidence_rad)
+        self.dihedral_angles = np.array(
+            [surface.dihedral_angle_rad for surface in macrosurface.surface_list], dtype=float
+        )
+
+        self.surface_indexes = dict()
+        self.columns = []
+        self.span_positions = []
+        self.section_angles = []
+        self.twists = []
+        self.tip_twists = []
+        self.hinge_indexes = []
+        self.planar_hinge_axes = []
+
+        n_chord_points = np.shape(self.points)[1]
+        columns_ends = np.cumsum(self.n_span_points_list)
+
+        for i, surface in enumerate(macrosurface.surface_list):
+
+            self.surface_indexes[surface.identifier] = i
+
+            columns = slice(columns_ends[i] - self.n_span_points_list[i], columns_ends[i])
+            span_positions = np.abs(self.points[1, 0, columns] - self.translations[i][1]) / (
+                surface.length * np.cos(surface.dihedral_angle_rad)
+            )
+
+            self.columns.append(columns)
+            self.span_positions.append(span_positions)
+            self.section_angles.append(
+                incidence_angle_list[i] + span_positions * surface.tip_torsion_angle_rad
+            )
+            self.twists.append(np.zeros(len(span_positions)))
+            self.tip_twists.append(0.0)
+
+            # Control surface hinge line in the planar surface, see Surface.generate_aero_grid
+            if surface.control_surface_hinge_position is None:
+                self.hinge_indexes.append(None)
+                self.planar_hinge_axes.append(None)
+
+            else:
+                chord_points, hinge_index = f.discretization(
+                    grid_data["chord_discretization"],
+                    n_chord_points,
+                    surface.control_surface_hinge_position,
+                )
+                hinge_x = chord_points[hinge_index] * (surface.tip_chord - surface.root_chord)
+                hinge_x += surface.length * tan(surface.leading_edge_sweep_angle_rad)
+
+                self.hinge_indexes.append(hinge_index)
+                self.planar_hinge_axes.append(
+                    m.normalize(np.array([hinge_x, surface.length, 0.0]))
+                )
+
+    # ----------------------------------------------------------------------------------------------
+
+    def grids(self):
+        """Aerodynamic grid of each surface, views of the morphed points, so they follow the
+        next parameter changes.
+
+        Returns:
+            macrosurface_aero_grid (list(dict)): aerodynamic grid of each surface
+        """
+
+        single_grid = {"xx": self.points[0], "yy": self.points[1], "zz": self.points[2]}
+
+        return f.single_grid_to_macrosurface_aero_grid(single_grid, self.n_span_points_list)
+
+    # ----------------------------------------------------------------------------------------------
+
+    def collect_changed_panels(self):
+        """Finds the panels with corners moved since the last call, the moved points are then
+        forgotten.
+
+        Returns:
+            panel_indexes (np.array(dtype=int)): indexes of the changed panels in the aircraft
+                                                 panel vector, they are also the influence matrix
+                                                 rows and columns that must be calculated again
+        """
+
+        changed_panels = np.any(self.changed_points.reshape(-1)[self.corner_indexes], axis=1)
+        self.changed_points[:] = False
+
+        return self.first_panel_index + np.flatnonzero(changed_panels)
+
+    # ----------------------------------------------------------------------------------------------
+
+    def set_control_surface_deflection(self, identifier, deflection):
+        """Rotates the control surface of a surface around its hinge line.
+
+        Args:
+            identifier (string): identifier of the surface
+            deflection (float): control surface deflection, same convention of
+                                MacroSurface.create_grids [º]
+        """
+
+        i = self.surface_indexes[identifier]
+        hinge_index = self.hinge_indexes[i]
+
+        if hinge_index is None:
+            raise ValueError(f"Surface {identifier} does not have a control surface")
+
+        rot_angle = np.radians(float(deflection)) - np.radians(self.deflections[identifier])
+        self.deflections[identifier] = float(deflection)
+
+        if rot_angle == 0:
+            return
+
+        columns = self.columns[i]
+        hinge_points = self.points[:, hinge_index, columns]
+        rot_axes = self.hinge_axes(i)
+
+        rotation_matrices = m.rotations.axis_angle_to_matrix(
+            rot_axes, np.full(len(rot_axes), rot_angle)
+        )
+
+        points = self.points[:, (hinge_index + 1) :, columns]
+        rot_points = np.einsum(
+            "sij,jcs->ics", rotation_matrices, points - hinge_points[:, np.newaxis, :]
+        )
+        self.points[:, (hinge_index + 1) :, columns] = rot_points + hinge_points[:, np.newaxis, :]
+        self.changed_points[(hinge_index + 1) :, columns] = True
+
+    # ----------------------------------------------------------------------------------------------
+
+    def set_incidence(self, incidence):
+        """Rotates all the macrosurface sections to a new incidence.
+
+        Args:
+            incidence (float): incidence of the macrosurface [º]
+        """
+
+        rot_angle = np.radians(float(incidence)) - self.incidence_rad
+        self.incidence_rad = float(np.radians(float(incidence)))
+
+        if rot_angle == 0:
+            return
+
+        for i in range(len(self.columns)):
+            self.rotate_sections(i, np.full(len(self.span_positions[i]), rot_angle))
+
+    # ----------------------------------------------------------------------------------------------
+
+    def set_twist(self, identifier, twist_function):
+        """Adds a twist distribution to a surface, on top of the surface tip torsion. As with the
+        tip torsion, the twist at the surface tip is added to the incidence of the surfaces
+        outboard of it.
+
+        Args:
+            identifier (string): identifier of the surface
+            twist_function (function): receives the span position, between 0 and 1, and returns
+                                       the twist angle of the section [rad], None removes the
+                                       twist
+        """
+
+        i = self.surface_indexes[identifier]
+        outboard_indexes = self.outboard_surfaces(i)
+
+        if twist_function is None:
+            twist = np.zeros(len(self.span_positions[i]))
+            tip_twist = 0.0
+        else:
+            twist = f.evaluate_span_function(twist_function, self.span_positions[i])
+            tip_twist = float(f.evaluate_span_function(twist_function, np.array([1.0]))[0])
+
+        rot_angles = twist - self.twists[i]
+        tip_rot_angle = tip_twist - self.tip_twists[i]
+
+        self.twists[i] = twist
+        self.tip_twists[i] = tip_twist
+
+        if np.any(rot_angles):
+            self.rotate_sections(i, rot_angles)
+
+        if tip_rot_angle != 0:
+            for k in outboard_indexes:
+                self.rotate_sections(k, np.full(len(self.span_positions[k]), tip_rot_angle))
+
+    # ----------------------------------------------------------------------------------------------
+
+    def set_dihedral(self, identifier, dihedral):
+        """Rotates a surface around its root to a new dihedral angle, the surfaces outboard of
+        it are translated to its new tip. In symmetric macrosurfaces the position of the
+        surfaces is defined by the right side, as in MacroSurface.surfaces_placement.
+
+        Args:
+            identifier (string): identifier of the surface
+            dihedral (float): dihedral angle of the surface [º]
+        """
+
+        i = self.surface_indexes[identifier]
+        dihedral_rad = float(np.radians(float(dihedral)))
+        rot_angle = dihedral_rad - self.dihedral_angles[i]
+
+        if rot_angle == 0:
+            return
+
+        # Mirrored surfaces are rotated in the opposite direction
+        if i < self.middle_index:
+            rot_angle = -rot_angle
+
+        rotation_matrix = m.rotations.axis_angle_to_matrix(
+            np.array([[1.0, 0.0, 0.0]]), np.array([rot_angle])
+        )[0]
+
+        # The dihedral rotation is applied before the sections rotation, so the surface points
+        # are rotated back to the sections plane, rotated around the root, and rotated again
+        columns = self.columns[i]
+        translation = self.translations[i][:, np.newaxis]
+        section_matrices = self.section_matrices(i)
+        rotation_matrices = np.einsum(
+            "sij,jk,slk->sil", section_matrices, rotation_matrix, section_matrices
+        )
+
+        rot_centers = self.section_centers(i) - translation
+        points = self.points[:, :, columns] - translation[:, :, np.newaxis]
+
+        rot_points = np.einsum(
+            "sij,jcs->ics", rotation_matrices, points - rot_centers[:, np.newaxis, :]
+        )
+        rot_points += (rotation_matrix @ rot_centers)[:, np.newaxis, :]
+
+        self.points[:, :, columns] = rot_points + translation[:, :, np.newaxis]
+        self.changed_points[:, columns] = True
+        self.dihedral_angles[i] = dihedral_rad
+
+        # Translate the surfaces whose roots moved
+        translation_vector_list, _, _ = self.macrosurface.surfaces_placement(self.dihedral_angles)
+
+        for k, vector in enumerate(translation_vector_list):
+
+            displacement = vector - self.translations[k]
+
+            if np.any(displacement):
+                self.points[:, :, self.columns[k]] += displacement[:, np.newaxis, np.newaxis]
+                self.changed_points[:, self.columns[k]] = True
+                self.translations[k] = np.array(vector, dtype=float)
+
+    # ----------------------------------------------------------------------------------------------
+
+    def outboard_surfaces(self, i):
+        """Indexes of the surfaces outboard of a surface, in the same side of the macrosurface."""
+
+        if i < self.middle_index:
+            return list(range(i))
+
+        return list(range(i + 1, len(self.columns)))
+
+    # ----------------------------------------------------------------------------------------------
+
+    def section_centers(self, i):
+        """Rotation centers of the sections of a surface, the points at the torsion center of
+        the sections chords, see geometry.functions.apply_torsion_to_grid.
+
+        Returns:
+            rot_centers (np.array([3, n_span_points])): rotation centers
+        """
+
+        surface = self.macrosurface.surface_list[i]
+        points = self.points[:, :, self.columns[i]]
+
+        # The chord direction is taken from points that are not moved by the control surface
+        chord_index = self.hinge_indexes[i] or 1
+
+        local_chords = surface.root_chord + self.span_positions[i] * (
+            surface.tip_chord - surface.root_chord
+        )
+        section_vectors = points[:, chord_index, :] - points[:, 0, :]
+        section_vectors = section_vectors / np.linalg.norm(section_vectors, axis=0)
+
+        return points[:, 0, :] + self.macrosurface.torsion_center * section_vectors * local_chords
+
+    # ----------------------------------------------------------------------------------------------
+
+    def section_matrices(self, i):
+        """Rotation matrices of the sections of a surface, rotations around the Y axis by the
+        sections angles.
+
+        Returns:
+            section_matrices (np.array([n_span_points, 3, 3])): rotation matrices
+        """
+
+        section_angles = self.section_angles[i]
+
+        return m.rotations.axis_angle_to_matrix(
+            np.tile([0.0, 1.0, 0.0], (len(section_angles), 1)), section_angles
+        )
+
+    # ----------------------------------------------------------------------------------------------
+
+    def hinge_axes(self, i):
+        """Hinge line direction of the control surface of a surface at each span station.
+
+        Returns:
+            hinge_axes (np.array([n_span_points, 3])): hinge line directions
+        """
+
+        rotation_matrix = m.rotations.axis_angle_to_matrix(
+            np.array([[1.0, 0.0, 0.0]]), np.array([self.dihedral_angles[i]])
+        )[0]
+        hinge_axis = rotation_matrix @ self.planar_hinge_axes[i]
+
+        # Mirroring changes the rotation direction, the mirrored axis is reversed
+        if i < self.middle_index:
+            hinge_axis = -hinge_axis * np.array([1, -1, 1])
+
+        return self.section_matrices(i) @ hinge_axis
+
+    # ----------------------------------------------------------------------------------------------
+
+    def rotate_sections(self, i, rot_angles):
+        """Rotates the sections of a surface around the Y axis and the sections rotation centers.
+
+        Args:
+            i (int): index of the surface
+            rot_angles (np.array([n_span_points])): rotation of each section [rad]
+        """
+
+        columns = self.columns[i]
+        rot_centers = self.section_centers(i)
+
+        rotation_matrices = m.rotations.axis_angle_to_matrix(
+            np.tile([0.0, 1.0, 0.0], (len(rot_angles), 1)), np.asarray(rot_angles, dtype=float)
+        )
+
+        rot_points = np.einsum(
+            "sij,jcs->ics",
+            rotation_matrices,
+            self.points[:, :, columns] - rot_centers[:, np.newaxis, :],
+        )
+        self.points[:, :, columns] = rot_points + rot_centers[:, np.newaxis, :]
+        self.changed_points[:, columns] |= rot_angles != 0
+        self.section_angles[i] = self.section_angles[i] + rot_angles
@@ -32,17 +32,16 @@ def calc_aero_loads_at_point(point, aircraft_force_grid, aircraft_panel_grid):
         )
 
         # Compute forces
-        aero_forces = np.zeros(3)
-        aero_moments = np.zeros(3)
+        forces = np.array(list(macrosurface_force_vector), dtype=float)
+        aero_forces = np.sum(forces, axis=0)
 
-        for force, panel in zip(macrosurface_force_vector, macrosurface_panel_vector):
-            aero_forces += force
-
-            # Moment lever calculation
-            force_application_point = panel.aero_center
-            lever_arm = point - force_application_point
+        # Moment lever calculation
+        forces_application_points = np.array(
+            [panel.aero_center for panel in macrosurface_panel_vector], dtype=float
+        )
+        lever_arms = point - forces_application_points
 
-            aero_moments += m.cross(lever_arm, force)
+        aero_moments = np.sum(m.cross_many(lever_arms, forces), axis=0)
 
         macrosurfaces_aero_loads.append([np.copy(aero_forces), np.copy(aero_moments)])
 
@@ -87,6 +86,39 @@ def calc_engine_loads_at_point(aircraft, point, throtle_list, parameters_list):
 # --------------------------------------------------------------------------------------------------
 
 
+def calc_wind_coord_sys(alpha, beta, gamma):
+    """Calculates the wind coordinate system in relation to the aircraft coordinate system, a
+    YAW rotation of -beta followed by a PITCH rotation of -alpha and a ROLL rotation of -gamma,
+    each one around the axis of the already rotated coordinate system.
+
+    Args:
+        alpha (float): angle of attack [rad]
+        beta (float): sideslip angle [rad]
+        gamma (float): roll angle [rad]
+
+    Returns:
+        wind_coord_sys (geometry.objects.Node): node with the wind coordinate system axes
+    """
+
+    # Rotations around the rotated axes are composed in the reverse order of the fixed axes
+    rotation_quaternions = m.rotations.axis_angle_to_quaternion(
+        np.identity(3)[::-1], np.array([-beta, -alpha, -gamma])
+    )
+
+    quaternion = rotation_quaternions[[0]]
+    for rotation_quaternion in rotation_quaternions[1:]:
+        quaternion = m.rotations.quaternion_multiply(quaternion, rotation_quaternion[np.newaxis])
+
+    wind_coord_sys = geo.objects.Node(
+        xyz=np.array([0.0, 0.0, 0.0]), quaternion=Quaternion(quaternion[0])
+    )
+
+    return wind_coord_sys
+
+
+# --------------------------------------------------------------------------------------------------
+
+
 def calc_lift_drag(
     aircraft,
     point,
@@ -105,22 +137,7 @@ def calc_lift_drag(
     beta = np.radians(attitude_vector[1])
     gamma = np.radians(attitude_vector[2])
 
-    wind_coord_sys = geo.objects.Node(xyz=np.array([0, 0, 0]), quaternion=Quaternion())
-
-    # Apply YAW rotation
-    wind_coord_sys = wind_coord_sys.rotate(
-        rotation_quaternion=Quaternion(axis=wind_coord_sys.z_axis, angle=-beta)
-    )
-
-    # Apply PITCH rotation
-    wind_coord_sys = wind_coord_sys.rotate(
-        rotation_quaternion=Quaternion(axis=wind_coord_sys.y_axis, angle=-alpha)
-    )
-
-    # Apply ROLL rotation
-    wind_coord_sys = wind_coord_sys.rotate(
-        rotation_quaternion=Quaternion(axis=wind_coord_sys.x_axis, angle=-gamma)
-    )
+    wind_coord_sys = calc_wind_coord_sys(alpha, beta, gamma)
 
     # Calculate aerodynamic forces in the aircraft coordinates system
     total_cg_aero_force, total_cg_aero_moment, component_cg_aero_loads = calc_aero_loads_at_point(
@@ -191,24 +208,7 @@ def calc_load_distribution(
         beta = np.radians(attitude_vector[1])
         gamma = np.radians(attitude_vector[2])
 
-        wind_coord_sys = geo.objects.Node(
-            xyz=np.array([0, 0, 0]), quaternion=Quaternion()
-        )
-
-        # Apply YAW rotation
-        wind_coord_sys = wind_coord_sys.rotate(
-            rotation_quaternion=Quaternion(axis=wind_coord_sys.z_axis, angle=-beta)
-        )
-
-        # Apply PITCH rotation
-        wind_coord_sys = wind_coord_sys.rotate(
-            rotation_quaternion=Quaternion(axis=wind_coord_sys.y_axis, angle=-alpha)
-        )
-
-        # Apply ROLL rotation
-        wind_coord_sys = wind_coord_sys.rotate(
-            rotation_quaternion=Quaternion(axis=wind_coord_sys.x_axis, angle=-gamma)
-        )
+        wind_coord_sys = calc_wind_coord_sys(alpha, beta, gamma)
 
         n_chord_panels, n_span_panels = np.shape(component_force_grid)
 
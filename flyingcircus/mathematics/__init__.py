@@ -0,0 +1,29 @@
+from . import vectors
+from . import rotations
+
+from .vectors import (
+    sum2,
+    sum3,
+    sub2,
+    sub3,
+    mul2,
+    mul3,
+    div2,
+    div3,
+    neg_sum,
+    copy2,
+    cross,
+    cross_,
+    cross3,
+    dot,
+    norm,
+    normalize,
+    normalize1,
+    normalize2,
+    cross_many,
+    dot_many,
+    norm_many,
+    normalize_many,
+    cross_product_matrices,
+    init,
+)
@@ -0,0 +1,400 @@
+"""
+rotations.py
+
+Batched rotation kernels. Every function receives and returns arrays with one rotation per row,
+quaternions are (n, 4) arrays with the pyquaternion [w, x, y, z] order, rotation matrices are
+(n, 3, 3) arrays, R @ v rotates the vector v, and rotation vectors are (n, 3) arrays, axis times
+angle [rad].
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+
+# ==================================================================================================
+# IMPORTS
+
+import math
+
+import numpy as np
+
+from numba import jit
+
+# ==================================================================================================
+# QUATERNIONS
+
+
+@jit(nopython=True, cache=True)
+def axis_angle_to_quaternion(axes, angles):
+    """Calculates the quaternions of several axis-angle rotations, same quaternions as
+    pyquaternion.Quaternion(axis=axis, angle=angle). Null axes return the identity.
+
+    Args:
+        axes (np.array([n, 3], dtype=float)): rotation axes, normalized inside the function
+        angles (np.array([n], dtype=float)): rotation angles [rad]
+
+    Returns:
+        quaternions (np.array([n, 4], dtype=float)): quaternions
+    """
+
+    n = angles.shape[0]
+    quaternions = np.zeros((n, 4))
+
+    for i in range(n):
+
+        axis_norm = math.sqrt(axes[i, 0] ** 2 + axes[i, 1] ** 2 + axes[i, 2] ** 2)
+
+        if axis_norm == 0.0:
+            quaternions[i, 0] = 1.0
+            continue
+
+        sin_half = math.sin(0.5 * angles[i]) / axis_norm
+
+        quaternions[i, 0] = math.cos(0.5 * angles[i])
+        quaternions[i, 1] = axes[i, 0] * sin_half
+        quaternions[i, 2] = axes[i, 1] * sin_half
+        quaternions[i, 3] = axes[i, 2] * sin_half
+
+    return quaternions
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def quaternion_multiply(quaternions_1, quaternions_2):
+    """Hamilton product of several pairs of quaternions, quaternions_1 * quaternions_2, the
+    rotation of quaternions_2 followed by the rotation of quaternions_1.
+
+    Args:
+        quaternions_1 (np.array([n, 4], dtype=float)): quaternions
+        quaternions_2 (np.array([n, 4], dtype=float)): quaternions
+
+    Returns:
+        quaternions (np.array([n, 4], dtype=float)): product quaternions
+    """
+
+    n = quaternions_1.shape[0]
+    quaternions = np.empty((n, 4))
+
+    for i in range(n):
+
+        w1, x1, y1, z1 = quaternions_1[i]
+        w2, x2, y2, z2 = quaternions_2[i]
+
+        quaternions[i, 0] = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+        quaternions[i, 1] = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
+        quaternions[i, 2] = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
+        quaternions[i, 3] = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+
+    return quaternions
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def quaternion_to_matrix(quaternions):
+    """Calculates the rotation matrices of several quaternions, R @ v = quaternion.rotate(v), the
+    columns of R are the rotated x, y and z axis. The quaternions are normalized.
+
+    Args:
+        quaternions (np.array([n, 4], dtype=float)): quaternions
+
+    Returns:
+        rotation_matrices (np.array([n, 3, 3], dtype=float)): rotation matrices
+    """
+
+    n = quaternions.shape[0]
+    rotation_matrices = np.empty((n, 3, 3))
+
+    for i in range(n):
+
+        w, x, y, z = quaternions[i]
+        norm = math.sqrt(w * w + x * x + y * y + z * z)
+        w, x, y, z = w / norm, x / norm, y / norm, z / norm
+
+        rotation_matrices[i, 0, 0] = 1 - 2 * (y * y + z * z)
+        rotation_matrices[i, 0, 1] = 2 * (x * y - w * z)
+        rotation_matrices[i, 0, 2] = 2 * (x * z + w * y)
+        rotation_matrices[i, 1, 0] = 2 * (x * y + w * z)
+        rotation_matrices[i, 1, 1] = 1 - 2 * (x * x + z * z)
+        rotation_matrices[i, 1, 2] = 2 * (y * z - w * x)
+        rotation_matrices[i, 2, 0] = 2 * (x * z - w * y)
+        rotation_matrices[i, 2, 1] = 2 * (y * z + w * x)
+        rotation_matrices[i, 2, 2] = 1 - 2 * (x * x + y * y)
+
+    return rotation_matrices
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def rotate_vectors(quaternions, vectors):
+    """Rotates several vectors, each one by its quaternion, same result as
+    quaternion.rotate(vector).
+
+    Args:
+        quaternions (np.array([n, 4], dtype=float)): quaternions
+        vectors (np.array([n, 3], dtype=float)): vectors
+
+    Returns:
+        rotated_vectors (np.array([n, 3], dtype=float)): rotated vectors
+    """
+
+    rotation_matrices = quaternion_to_matrix(quaternions)
+
+    n = vectors.shape[0]
+    rotated_vectors = np.empty((n, 3))
+
+    for i in range(n):
+        for j in range(3):
+            rotated_vectors[i, j] = (
+                rotation_matrices[i, j, 0] * vectors[i, 0]
+                + rotation_matrices[i, j, 1] * vectors[i, 1]
+                + rotation_matrices[i, j, 2] * vectors[i, 2]
+            )
+
+    return rotated_vectors
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def slerp(quaternions_0, quaternions_1, amounts):
+    """Spherical linear interpolation of several pairs of quaternions along the shortest path,
+    same algorithm as pyquaternion.Quaternion.slerp.
+
+    Args:
+        quaternions_0 (np.array([n, 4], dtype=float)): start quaternions
+        quaternions_1 (np.array([n, 4], dtype=float)): end quaternions
+        amounts (np.array([n], dtype=float)): interpolation parameters, between 0 and 1
+
+    Returns:
+        quaternions (np.array([n, 4], dtype=float)): interpolated unit quaternions
+    """
+
+    n = amounts.shape[0]
+    quaternions = np.empty((n, 4))
+
+    for i in range(n):
+
+        q0 = quaternions_0[i] / math.sqrt(np.sum(quaternions_0[i] ** 2))
+        q1 = quaternions_1[i] / math.sqrt(np.sum(quaternions_1[i] ** 2))
+        amount = min(max(amounts[i], 0.0), 1.0)
+
+        dot = np.sum(q0 * q1)
+
+        # The shortest path is found reversing one of the quaternions
+        if dot < 0.0:
+            q0 = -q0
+            dot = -dot
+
+        # Nearly parallel quaternions are linearly interpolated, sin_theta_0 can not be zero
+        if dot > 0.9995:
+            q = q0 + amount * (q1 - q0)
+
+        else:
+            theta_0 = math.acos(dot)
+            sin_theta_0 = math.sin(theta_0)
+            theta = theta_0 * amount
+            sin_theta = math.sin(theta)
+
+            q = (math.cos(theta) - dot * sin_theta / sin_theta_0) * q0
+            q = q + (sin_theta / sin_theta_0) * q1
+
+        quaternions[i] = q / math.sqrt(np.sum(q ** 2))
+
+    return quaternions
+
+
+# ==================================================================================================
+# ROTATION MATRICES AND VECTORS
+
+
+@jit(nopython=True, cache=True)
+def axis_angle_to_matrix(axes, angles):
+    """Calculates the rotation matrices of several axis-angle rotations, Rodrigues formula. Null
+    axes return the identity.
+
+    Args:
+        axes (np.array([n, 3], dtype=float)): rotation axes, normalized inside the function
+        angles (np.array([n], dtype=float)): rotation angles [rad]
+
+    Returns:
+        rotation_matrices (np.array([n, 3, 3], dtype=float)): rotation matrices
+    """
+
+    n = angles.shape[0]
+    rotation_matrices = np.zeros((n, 3, 3))
+
+    for i in range(n):
+
+        axis_norm = math.sqrt(axes[i, 0] ** 2 + axes[i, 1] ** 2 + axes[i, 2] ** 2)
+
+        if axis_norm == 0.0:
+            rotation_matrices[i, 0, 0] = 1.0
+            rotation_matrices[i, 1, 1] = 1.0
+            rotation_matrices[i, 2, 2] = 1.0
+            continue
+
+        x, y, z = axes[i, 0] / axis_norm, axes[i, 1] / axis_norm, axes[i, 2] / axis_norm
+        c = math.cos(angles[i])
+        s = math.sin(angles[i])
+        t = 1.0 - c
+
+        rotation_matrices[i, 0, 0] = c + t * x * x
+        rotation_matrices[i, 0, 1] = t * x * y - s * z
+        rotation_matrices[i, 0, 2] = t * x * z + s * y
+        rotation_matrices[i, 1, 0] = t * x * y + s * z
+        rotation_matrices[i, 1, 1] = c + t * y * y
+        rotation_matrices[i, 1, 2] = t * y * z - s * x
+        rotation_matrices[i, 2, 0] = t * x * z - s * y
+        rotation_matrices[i, 2, 1] = t * y * z + s * x
+        rotation_matrices[i, 2, 2] = c + t * z * z
+
+    return rotation_matrices
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def rotation_vector_to_matrix(rotation_vectors):
+    """Calculates the rotation matrices of several rotation vectors.
+
+    Args:
+        rotation_vectors (np.array([n, 3], dtype=float)): rotation vectors
+
+    Returns:
+        rotation_matrices (np.array([n, 3, 3], dtype=float)): rotation matrices
+    """
+
+    n = rotation_vectors.shape[0]
+    rotation_matrices = np.zeros((n, 3, 3))
+
+    for i in range(n):
+
+        x, y, z = rotation_vectors[i, 0], rotation_vectors[i, 1], rotation_vectors[i, 2]
+        angle = math.sqrt(x * x + y * y + z * z)
+
+        # Series expansion for small angles avoids the division by zero
+        if angle < 1e-6:
+            coef_1 = 1.0 - angle ** 2 / 6
+            coef_2 = 0.5 - angle ** 2 / 24
+        else:
+            coef_1 = math.sin(angle) / angle
+            coef_2 = (1.0 - math.cos(angle)) / angle ** 2
+
+        rotation_matrices[i, 0, 0] = 1.0 - coef_2 * (y * y + z * z)
+        rotation_matrices[i, 0, 1] = coef_2 * x * y - coef_1 * z
+        rotation_matrices[i, 0, 2] = coef_2 * x * z + coef_1 * y
+        rotation_matrices[i, 1, 0] = coef_2 * x * y + coef_1 * z
+        rotation_matrices[i, 1, 1] = 1.0 - coef_2 * (x * x + z * z)
+        rotation_matrices[i, 1, 2] = coef_2 * y * z - coef_1 * x
+        rotation_matrices[i, 2, 0] = coef_2 * x * z - coef_1 * y
+        rotation_matrices[i, 2, 1] = coef_2 * y * z + coef_1 * x
+        rotation_matrices[i, 2, 2] = 1.0 - coef_2 * (x * x + y * y)
+
+    return rotation_matrices
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def rotation_vector_to_quaternion(rotation_vectors):
+    """Calculates the quaternions of several rotation vectors.
+
+    Args:
+        rotation_vectors (np.array([n, 3], dtype=float)): rotation vectors
+
+    Returns:
+        quaternions (np.array([n, 4], dtype=float)): unit quaternions
+    """
+
+    n = rotation_vectors.shape[0]
+    quaternions = np.empty((n, 4))
+
+    for i in range(n):
+
+        angle = math.sqrt(np.sum(rotation_vectors[i] ** 2))
+
+        # sin(angle / 2) / angle, series expansion for small angles
+        if angle < 1e-6:
+            coef = 0.5 - angle ** 2 / 48
+        else:
+            coef = math.sin(0.5 * angle) / angle
+
+        quaternions[i, 0] = math.cos(0.5 * angle)
+        quaternions[i, 1:] = coef * rotation_vectors[i]
+
+    return quaternions
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def quaternion_to_rotation_vector(quaternions):
+    """Calculates the rotation vectors of several quaternions, the rotation angles are between 0
+    and pi.
+
+    Args:
+        quaternions (np.array([n, 4], dtype=float)): quaternions
+
+    Returns:
+        rotation_vectors (np.array([n, 3], dtype=float)): rotation vectors
+    """
+
+    n = quaternions.shape[0]
+    rotation_vectors = np.empty((n, 3))
+
+    for i in range(n):
+
+        q = quaternions[i] / math.sqrt(np.sum(quaternions[i] ** 2))
+
+        # q and -q are the same rotation, the one with positive w has the smallest angle
+        if q[0] < 0.0:
+            q = -q
+
+        sin_half = math.sqrt(q[1] ** 2 + q[2] ** 2 + q[3] ** 2)
+        angle = 2.0 * math.atan2(sin_half, q[0])
+
+        if sin_half < 1e-12:
+            coef = 2.0 / q[0]
+        else:
+            coef = angle / sin_half
+
+        rotation_vectors[i] = coef * q[1:]
+
+    return rotation_vectors
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@jit(nopython=True, cache=True)
+def compose_rotation_vectors(rotation_vectors_1, rotation_vectors_2):
+    """Composes several pairs of rotation vectors, the result is the rotation of
+    rotation_vectors_2 followed by the rotation of rotation_vectors_1, R = R1 @ R2.
+
+    Args:
+        rotation_vectors_1 (np.array([n, 3], dtype=float)): rotation vectors
+        rotation_vectors_2 (np.array([n, 3], dtype=float)): rotation vectors
+
+    Returns:
+        rotation_vectors (np.array([n, 3], dtype=float)): composed rotation vectors
+    """
+
+    quaternions = quaternion_multiply(
+        rotation_vector_to_quaternion(rotation_vectors_1),
+        rotation_vector_to_quaternion(rotation_vectors_2),
+    )
+
+    return quaternion_to_rotation_vector(quaternions)
+
+
+# ==================================================================================================
@@ -23,6 +23,7 @@
 """ Fast implementation of the following linear algebra functions for 3-dimensional arrays:
     sum2, sum3, sub2, sub3, mul2, mul3, div2, div3, neg_sum, copy2
     cross, cross3, dot, norm, normalize, normalize1, normalize2
+    and the array-wise cross_many, dot_many, norm_many and normalize_many.
     The number behind the name is the number of parameters for the functions, that do
     not allocate memory. These functions always store the result in the last parameter.
     Average speed-up factor compared to numpy between 2 and 50, heavily machine dependant,
@@ -32,32 +33,32 @@
     This version was tested with Numba 0.18. """
 # TODO: add test case for dot with 3x3 rotation matrix
 # pylint: disable=E0611
-from numba import jit, double
+from numba import jit, double, guvectorize
 import math
 import numpy as np
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def sum2(vec, result):
     """ Calculate the sum of two 3d vectors and store the result in the second parameter. """
     result[0] = vec[0] + result[0]
     result[1] = vec[1] + result[1]
     result[2] = vec[2] + result[2]
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def sum3(vec1, vec2, result):
     """ Calculate the sum of two 3d vectors and store the result in the third parameter. """
     result[0] = vec1[0] + vec2[0]
     result[1] = vec1[1] + vec2[1]
     result[2] = vec1[2] + vec2[2]
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def sub2(vec, result):
     """ Calculate the difference of two 3d vectors and store the result in the second parameter. """
     result[0] = result[0] - vec[0]
     result[1] = result[1] - vec[1]
     result[2] = result[2] - vec[2]
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def sub3(vec1, vec2, result):
     """ Calculate the difference of two 3d vectors and store the result in the third parameter. """
     result[0] = vec1[0] - vec2[0]
@@ -65,55 +66,55 @@ def sub3(vec1, vec2, result):
     result[2] = vec1[2] - vec2[2]
 
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def mul2(a, result):
     """ Calculate the product of a scalar and a 3d vector and store the result in the second parameter."""
     result[0] = a * result[0]
     result[1] = a * result[1]
     result[2] = a * result[2]
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def mul3(a, vec, result):
     """ Calculate the product of a scalar and a 3d vector. """
     result[0] = a * vec[0]
     result[1] = a * vec[1]
     result[2] = a * vec[2]
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def div2(a, result):
     """ Divide a 3d vector by a scalar and store the result in the second parameter."""
     result[0] = result[0] / a
     result[1] = result[1] / a
     result[2] = result[2] / a
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def div3(a, vec, result):
     """ Divide a 3d vector by a scalar and store the result in the third parameter. """
     result[0] = vec[0] / a
     result[1] = vec[1] / a
     result[2] = vec[2] / a
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def neg_sum(a, b, c, result):
     """ Calculate the sum of three vectors and multiply the result with -1. """
     result[0] = -(a[0] + b[0] + c[0])
     result[1] = -(a[1] + b[1] + c[1])
     result[2] = -(a[2] + b[2] + c[2])
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def copy2(a, result):
     """ Calculate the difference of two 3d vectors. """
     result[0] = a[0]
     result[1] = a[1]
     result[2] = a[2]
 
-@jit
+@jit(cache=True)
 def cross(vec1, vec2):
     """ Calculate the cross product of two 3d vectors. """
     result = np.zeros(3)
     return cross_(vec1, vec2, result)
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def cross_(vec1, vec2, result):
     """ Calculate the cross product of two 3d vectors. """
     a1, a2, a3 = double(vec1[0]), double(vec1[1]), double(vec1[2])
@@ -123,7 +124,7 @@ def cross_(vec1, vec2, result):
     result[2] = a1 * b2 - a2 * b1
     return result
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def cross3(vec1, vec2, result):
     """ Calculate the cross product of two 3d vectors. """
     a1, a2, a3 = double(vec1[0]), double(vec1[1]), double(vec1[2])
@@ -133,23 +134,23 @@ def cross3(vec1, vec2, result):
     result[2] = a1 * b2 - a2 * b1
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def dot(vec1, vec2):
     """ Calculate the dot product of two 3d vectors. """
     return vec1[0] * vec2[0] + vec1[1] * vec2[1] + vec1[2] * vec2[2]
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def norm(vec):
     """ Calculate the norm of a 3d vector. """
     return math.sqrt(vec[0]*vec[0] + vec[1]*vec[1] + vec[2]*vec[2])
 
-@jit()
+@jit(cache=True)
 def normalize(vec):
     """ Calculate the normalized vector (norm: one). """
     result = np.copy(vec)
     return normalize1(result)
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def normalize1(vec):
     norm_=norm(vec)
     if norm_ < 1e-6:
@@ -162,7 +163,7 @@ def normalize1(vec):
         vec[2] = vec[2] / norm_
     return vec
 
-@jit(nopython = True)
+@jit(nopython=True, cache=True)
 def normalize2(vec, result):
     norm_=norm(vec)
     if norm_ < 1e-6:
@@ -174,8 +175,89 @@ def normalize2(vec, result):
         result[1] = vec[1] / norm_
         result[2] = vec[2] / norm_
 
+# The array-wise kernels are generalized ufuncs, they work on the last axis of arrays of vectors,
+# broadcast like numpy ufuncs and accept an out= buffer. The target is parallel, the vectors are
+# split between threads. Building a parallel gufunc takes a fraction of a second even when it is
+# loaded from the cache, so each one is only built on its first call.
+
+_gufuncs = dict()
+
+def _gufunc(kernel, signature, layout):
+    """ Return the parallel gufunc of a kernel, building it on the first call. """
+    if kernel not in _gufuncs:
+        _gufuncs[kernel] = guvectorize([signature], layout, target="parallel", cache=True)(kernel)
+    return _gufuncs[kernel]
+
+def _cross_many(vec1, vec2, result):
+    if vec1.shape[0] != 3:
+        result[:] = np.nan
+        return
+    a1, a2, a3 = vec1[0], vec1[1], vec1[2]
+    b1, b2, b3 = vec2[0], vec2[1], vec2[2]
+    result[0] = a2 * b3 - a3 * b2
+    result[1] = a3 * b1 - a1 * b3
+    result[2] = a1 * b2 - a2 * b1
+
+def _dot_many(vec1, vec2, result):
+    result[0] = 0.
+    for i in range(vec1.shape[0]):
+        result[0] += vec1[i] * vec2[i]
+
+def _norm_many(vec, result):
+    norm_ = 0.
+    for i in range(vec.shape[0]):
+        norm_ += vec[i] * vec[i]
+    result[0] = math.sqrt(norm_)
+
+def _normalize_many(vec, result):
+    norm_ = 0.
+    for i in range(vec.shape[0]):
+        norm_ += vec[i] * vec[i]
+    norm_ = math.sqrt(norm_)
+    for i in range(vec.shape[0]):
+        if norm_ < 1e-6:
+            result[i] = 0.
+        else:
+            result[i] = vec[i] / norm_
+
+def cross_many(vec1, vec2, out=None):
+    """ Calculate the cross products of two arrays of 3d vectors, shape (..., 3). Vectors that
+    are not 3d give NaN. """
+    gufunc = _gufunc(_cross_many, "void(float64[:], float64[:], float64[:])", "(n),(n)->(n)")
+    return gufunc(vec1, vec2, out=out)
+
+def dot_many(vec1, vec2, out=None):
+    """ Calculate the dot products of two arrays of vectors, shape (..., n). """
+    gufunc = _gufunc(_dot_many, "void(float64[:], float64[:], float64[:])", "(n),(n)->()")
+    return gufunc(vec1, vec2, out=out)
+
+def norm_many(vec, out=None):
+    """ Calculate the norms of an array of vectors, shape (..., n). """
+    gufunc = _gufunc(_norm_many, "void(float64[:], float64[:])", "(n)->()")
+    return gufunc(vec, out=out)
+
+def normalize_many(vec, out=None):
+    """ Calculate the normalized vectors of an array of vectors, shape (..., n), vectors with
+    norm smaller than 1e-6 become zero, as in normalize1. """
+    gufunc = _gufunc(_normalize_many, "void(float64[:], float64[:])", "(n)->(n)")
+    return gufunc(vec, out=out)
+
+def cross_product_matrices(vectors):
+    """ Calculate the cross product matrices of an array of 3d vectors, shape (..., 3), for each
+    vector a the matrix [a] is such that [a] @ b = a x b. A single vector gives shape (1, 3, 3). """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=float))
+    matrices = np.zeros(vectors.shape[:-1] + (3, 3))
+    matrices[..., 0, 1] = -vectors[..., 2]
+    matrices[..., 0, 2] = vectors[..., 1]
+    matrices[..., 1, 0] = vectors[..., 2]
+    matrices[..., 1, 2] = -vectors[..., 0]
+    matrices[..., 2, 0] = -vectors[..., 1]
+    matrices[..., 2, 1] = vectors[..., 0]
+    return matrices
+
 def init():
-    """ call all functions once to compile them """
+    """ call all functions once to compile them, or to load them from the on-disk cache. It is
+    not called on import, the functions are compiled on their first call otherwise. """
     vec1, vec2 = np.array((1.0, 2.0, 3.0)), np.array((2.0, 3.0, 4.0))
     result = np.zeros(3)
     a = 1.24
@@ -194,8 +276,10 @@ def init():
     cross3(vec1, vec2, result)
     dot(vec1, vec2)
     norm(vec1)
-
-init()
+    cross_many(vec1, vec2)
+    dot_many(vec1, vec2)
+    norm_many(vec1)
+    normalize_many(vec1)
 
 
 """
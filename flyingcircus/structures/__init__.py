@@ -1,3 +1,4 @@
 from . import objects
 from . import functions
-from . import fem
\ No newline at end of file
+from . import fem
+from . import nonlinear
@@ -1,5 +1,9 @@
 import numpy as np
 import scipy as sc
+import scipy.linalg as sla
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+import scipy.sparse.csgraph as csgraph
 
 from numpy import sin, cos, tan, pi
 from pyquaternion import Quaternion
@@ -11,135 +15,99 @@ from .. import mathematics as m
 
 
 def number_nodes(components_list, components_nodes_list, connections_list):
-    """This function modifies the number attribute in the nodes of the componentes nodes lists
+    """This function modifies the number attribute in the nodes of the componentes nodes lists.
+    The nodes are numbered in a single pass, in the order of the components. The ROOT and TIP
+    nodes that are connected, directly or through other connections, share the number of the
+    first of them to be numbered.
+
+    Args:
+        components_list (list): components, objects with an identifier
+        components_nodes_list (list): nodes of each component
+        connections_list (list): list of structures.objects.Connection
+
+    Returns:
+        node_numbers (dict): number of the ROOT and TIP nodes of the components, keys are
+                             "component_identifier-ROOT" or "component_identifier-TIP"
     """
 
-    # Generate the connection matrix
-    connection_matrix = []
-    for connection in connections_list:
-        connection_matrix.append(connection.descriptor)
+    node_equivalence = create_connection_graph(connections_list)
 
+    group_numbers = dict()
+    node_numbers = dict()
     node_counter = 0
 
-    for i, component in enumerate(components_list):
+    for component, component_nodes in zip(components_list, components_nodes_list):
+
+        tip_index = len(component_nodes) - 1
 
-        for j, node in enumerate(components_nodes_list[i]):
+        for j, node in enumerate(component_nodes):
 
-            # If the node is the root of the component check if it is connected to a node that has
-            # already been numbered
+            # Nodes that are not at the ROOT or the TIP get the next avaiable number
             if j == 0:
-                # Check if node is part of a connection
                 node_identifier = component.identifier + "-ROOT"
-                connections = check_connections(
-                    connections_list, components_list, node_identifier
-                )
-
-                # Run through the connections and selects connected nodes
-                connected_nodes = []
-                for connection in connections:
-
-                    connected_comp_index = components_list.index(connection[0])
-                    connected_comp_nodes = components_nodes_list[connected_comp_index]
-
-                    if connection[1] == "ROOT":
-                        connected_node = connected_comp_nodes[0]
-
-                    elif connection[1] == "TIP":
-                        last_index = len(connected_comp_nodes) - 1
-                        connected_node = connected_comp_nodes[last_index]
-
-                    connected_nodes.append(connected_node)
+            elif j == tip_index:
+                node_identifier = component.identifier + "-TIP"
+            else:
+                node.number = node_counter
+                node_counter += 1
+                continue
 
-                # Run through the connected nodes and checks if one of the is numbered
-                node_number = None
-                for connected_node in connected_nodes:
-                    if connected_node.number is not None:
-                        node_number = connected_node.number
+            # Connected nodes get the number of their group
+            group = node_equivalence.get(node_identifier, node_identifier)
 
-                if node_number is not None:
-                    node.number = node_number
-                else:
-                    node.number = node_counter
-                    node_counter += 1
+            if group not in group_numbers:
+                group_numbers[group] = node_counter
+                node_counter += 1
 
-            # If the node is the tip of the component check if it is connected to a node tha has
-            # already been numbered, same as the root
-            elif j == len(components_nodes_list[i]) - 1:
-                # Check if node is part of a connection
-                node_identifier = component.identifier + "-TIP"
-                connections = check_connections(
-                    connections_list, components_list, node_identifier
-                )
+            node.number = group_numbers[group]
+            node_numbers[node_identifier] = node.number
 
-                # Run through the connections and selects connected nodes
-                connected_nodes = []
-                for connection in connections:
+    return node_numbers
 
-                    connected_comp_index = components_list.index(connection[0])
-                    connected_comp_nodes = components_nodes_list[connected_comp_index]
 
-                    if connection[1] == "ROOT":
-                        connected_node = connected_comp_nodes[0]
+# ==================================================================================================
 
-                    elif connection[1] == "TIP":
-                        last_index = len(connected_comp_nodes) - 1
-                        connected_node = connected_comp_nodes[last_index]
 
-                    connected_nodes.append(connected_node)
+def create_connection_graph(connections_list):
+    """Creates the connectivity graph of the components ROOT and TIP nodes with a union-find
+    structure, nodes connected directly or through other connections are in the same group.
 
-                # Run through the connected nodes and checks if one of the is numbered
-                node_number = None
-                for connected_node in connected_nodes:
-                    if connected_node.number is not None:
-                        node_number = connected_node.number
+    Args:
+        connections_list (list): list of structures.objects.Connection
 
-                if node_number is not None:
-                    node.number = node_number
-                else:
-                    node.number = node_counter
-                    node_counter += 1
+    Returns:
+        node_equivalence (dict): representative node of the group of each connected node, keys and
+                                 values are "component_identifier-ROOT|TIP" strings
+    """
 
-            # If the node is not at the ROOT or the TIP give it the next avaiable number:
-            else:
-                node.number = node_counter
-                node_counter += 1
+    parent = dict()
 
+    def find(node_identifier):
 
-# ==================================================================================================
+        root = node_identifier
+        while parent[root] != root:
+            root = parent[root]
 
+        # Path compression
+        while parent[node_identifier] != root:
+            parent[node_identifier], node_identifier = root, parent[node_identifier]
 
-def check_connections(connections_list, components_list, node_identifier):
-    """This function returns all the connections to a node
-    """
-    connections = []
+        return root
 
-    # Create a list with all the connection identifiers
-    connection_matrix = []
     for connection in connections_list:
-        connection_matrix.append(connection.descriptor)
 
-    # Run through the connections
-    for i, connection in enumerate(connection_matrix):
+        for node_identifier in connection.descriptor:
+            parent.setdefault(node_identifier, node_identifier)
 
-        # Finds a connection that contains the node identifier
-        if node_identifier in connection:
+        root_1 = find(connection.descriptor[0])
+        root_2 = find(connection.descriptor[1])
 
-            # Connections contains two components, index tells if it is the first or second
-            # component
-            index = connection.index(node_identifier)
-            connected_component_index = abs(index - 1)
+        if root_1 != root_2:
+            parent[root_2] = root_1
 
-            if connected_component_index == 0:
-                connected_component = connections_list[i].component1
-                connected_node = connections_list[i].component1_node
+    node_equivalence = {node_identifier: find(node_identifier) for node_identifier in parent}
 
-            elif connected_component_index == 1:
-                connected_component = connections_list[i].component2
-                connected_node = connections_list[i].component2_node
-
-            connections.append([connected_component, connected_node])
-
-    return connections
+    return node_equivalence
 
 
 # ==================================================================================================
@@ -229,6 +197,7 @@ def generate_macrosurface_fem_elements(
         root_J = surface.root_section.J
         root_E = surface.root_section.material.elasticity_modulus
         root_G = surface.root_section.material.rigidity_modulus
+        root_rho = surface.root_section.material.density or 0
 
         root_A_sqside = np.sqrt(root_A)
         root_Iyy_sqside = (12 * root_Iyy) ** (1 / 4)
@@ -241,6 +210,7 @@ def generate_macrosurface_fem_elements(
         tip_J = surface.tip_section.J
         tip_E = surface.root_section.material.elasticity_modulus
         tip_G = surface.root_section.material.rigidity_modulus
+        tip_rho = surface.tip_section.material.density or 0
 
         tip_A_sqside = np.sqrt(tip_A)
         tip_Iyy_sqside = (12 * tip_Iyy) ** (1 / 4)
@@ -254,6 +224,7 @@ def generate_macrosurface_fem_elements(
         Js = np.zeros(n_nodes)
         Es = np.zeros(n_nodes)
         Gs = np.zeros(n_nodes)
+        rhos = np.zeros(n_nodes)
 
         root_y = surface_nodes_list[0].y
         tip_y = surface_nodes_list[-1].y
@@ -273,6 +244,7 @@ def generate_macrosurface_fem_elements(
 
             node_E = interpolation(root_E, tip_E, node_y)
             node_G = interpolation(root_G, tip_G, node_y)
+            node_rho = interpolation(root_rho, tip_rho, node_y)
             node_A = A_sqside ** 2
             node_Iyy = (Iyy_sqside ** 4) / 12
             node_Izz = (Izz_sqside ** 4) / 12
@@ -284,6 +256,7 @@ def generate_macrosurface_fem_elements(
             Js[i] = node_J
             Es[i] = node_E
             Gs[i] = node_G
+            rhos[i] = node_rho
 
         # Create FEM elements
 
@@ -298,6 +271,7 @@ def generate_macrosurface_fem_elements(
                 J = Js[i]
                 E = Es[i]
                 G = Gs[i]
+                rho = rhos[i]
 
             elif prop_choice == "TIP":
                 A = As[i + 1]
@@ -306,6 +280,7 @@ def generate_macrosurface_fem_elements(
                 J = Js[i + 1]
                 E = Es[i + 1]
                 G = Gs[i + 1]
+                rho = rhos[i + 1]
 
             elif prop_choice == "MIDDLE":
                 A = (As[i] + As[i + 1]) / 2
@@ -314,6 +289,7 @@ def generate_macrosurface_fem_elements(
                 J = (Js[i] + Js[i + 1]) / 2
                 E = (Es[i] + Es[i + 1]) / 2
                 G = (Gs[i] + Gs[i + 1]) / 2
+                rho = (rhos[i] + rhos[i + 1]) / 2
 
             else:
                 print(
@@ -330,6 +306,7 @@ def generate_macrosurface_fem_elements(
                 E=E,
                 G=G,
                 prop_choice=prop_choice,
+                rho=rho,
             )
 
             surface_elements.append(element)
@@ -356,6 +333,7 @@ def generate_beam_fem_elements(beam, beam_nodes_list, prop_choice="MIDDLE"):
         J = beam.ElementProperty.J
         E = beam.ElementProperty.E
         G = beam.ElementProperty.G
+        rho = beam.ElementProperty.rho
 
         element = o.EulerBeamElement(
             node_A=beam_nodes_list[i],
@@ -367,6 +345,7 @@ def generate_beam_fem_elements(beam, beam_nodes_list, prop_choice="MIDDLE"):
             E=E,
             G=G,
             prop_choice=prop_choice,
+            rho=rho,
         )
 
         beam_elements.append(element)
@@ -425,131 +404,688 @@ def generate_aircraft_fem_elements(
 # ==================================================================================================
 
 
-def structural_solver(struct_grid, struct_elements, struct_loads, struct_constraints):
+def structural_solver(
+    struct_grid, struct_elements, struct_loads, struct_constraints, structural_model=None
+):
+    """Calculates the structure deformations and internal loads.
+
+    Args:
+        struct_grid (list): structure nodes grids
+        struct_elements (list): structure finite elements
+        struct_loads (list): list of structures.objects.Load
+        struct_constraints (list): list of structures.objects.Constraint
+        structural_model (dict): structural model created by create_structural_model, if not None
+                                 the stiffness matrix is not assembled and its factorization is
+                                 reused
+
+    Returns:
+        deformations (np.array([n_nodes, 6])): nodes deformations
+        internal_loads (np.array([n_nodes, 6])): nodes internal loads
+    """
+
+    if structural_model is None:
+        structural_model = create_structural_model(
+            struct_grid, struct_elements, struct_constraints
+        )
+
+    F_global = create_global_load_vector(structural_model["n_nodes"], struct_loads)
+
+    cases_deformations, cases_internal_loads = solve_load_cases(structural_model, F_global)
+
+    return cases_deformations[0], cases_internal_loads[0]
+
+
+# ==================================================================================================
+
+
+def solve_load_cases(structural_model, loads_matrix):
+    """Solves several load cases of the same structure, the factorization of the reduced
+    stiffness matrix is reused by every load case.
+
+    Args:
+        structural_model (dict): structural model created by create_structural_model
+        loads_matrix (np.array([n_dof, n_cases])): global load vectors, one load case per column,
+                                                   see create_global_load_vector
+
+    Returns:
+        deformations (np.array([n_cases, n_nodes, 6])): nodes deformations of each load case
+        internal_loads (np.array([n_cases, n_nodes, 6])): nodes internal loads of each load case,
+                                                          K_global @ X_global
+    """
+
+    n_nodes = structural_model["n_nodes"]
+
+    X_global = factorized_FEM_solver(structural_model, loads_matrix)
+
+    # Find support reactions
+    force_vector = structural_model["K_global"] @ X_global
+
+    deformations = np.reshape(X_global.transpose(), (-1, n_nodes, 6))
+    internal_loads = np.reshape(force_vector.transpose(), (-1, n_nodes, 6))
+
+    return deformations, internal_loads
+
+
+# ==================================================================================================
+
+
+def create_structural_model(
+    struct_grid,
+    struct_elements,
+    struct_constraints,
+    n_modes=None,
+    ordering="rcm",
+    superelements=False,
+    factorize=True,
+):
+    """Creates the parts of the structural problem that do not depend on the loads: the node
+    vector, the global stiffness matrix, the constrained degrees of freedom and the sparse
+    factorization of the reduced stiffness matrix, see factorize_stiffness_matrix.
+
+    If n_modes is given the structural model is reduced to the first n_modes vibration modes
+    of the structure, see create_modal_basis, and the full system is not factorized.
+
+    If superelements is True each component is condensed onto its boundary nodes and only the
+    condensed system is factorized, see create_superelements.
+
+    Args:
+        struct_grid (list): structure nodes grids
+        struct_elements (list): structure finite elements
+        struct_constraints (list): list of structures.objects.Constraint
+        n_modes (int): number of vibration modes of the reduced order model
+        ordering (string): "rcm" or "amd", reordering of the reduced stiffness matrix
+        superelements (bool): condense the components into superelements
+        factorize (bool): if False the reduced stiffness matrix is not factorized, for problems
+                          that only need K_global and the constrained degrees of freedom, it is
+                          factorized by the first solve, see stiffness_matrix_factor
+
+    Returns:
+        structural_model (dict): node_vector, n_nodes, K_global, constrained_dof, free_dof,
+                                 X_prescribed, ordering and K_factor, and if n_modes is given,
+                                 M_global, modal_basis, natural_frequencies and modal_K_factor,
+                                 if superelements is True the superelements data is added, K_factor
+                                 is None if n_modes is given, superelements is True or factorize
+                                 is False
+    """
 
     node_vector = geo.functions.create_structure_node_vector(struct_grid)
+    n_nodes = len(node_vector)
 
     elements_vector = []
     # Add all elements to a vector
     for component_elements in struct_elements:
         elements_vector += component_elements
 
-    K_global, F_global = create_global_FEM_matrices(
-        node_vector, elements_vector, struct_loads
+    K_global, F_global = create_global_FEM_matrices(node_vector, elements_vector, [])
+
+    constrained_dof, X_prescribed = find_constrained_dof(struct_constraints, 6 * n_nodes)
+    free_dof = np.flatnonzero(~constrained_dof)
+
+    # The modal and the superelements solvers do not use the factorization of the full system
+    if superelements or n_modes is not None or not factorize:
+        K_factor = None
+    else:
+        K_factor = factorize_stiffness_matrix(K_global, free_dof, ordering)
+
+    structural_model = {
+        "node_vector": node_vector,
+        "n_nodes": n_nodes,
+        "K_global": K_global,
+        "constrained_dof": constrained_dof,
+        "free_dof": free_dof,
+        "X_prescribed": X_prescribed,
+        "ordering": ordering,
+        "K_factor": K_factor,
+    }
+
+    if superelements:
+        structural_model.update(
+            create_superelements(struct_grid, struct_elements, constrained_dof, ordering)
+        )
+
+    if n_modes is not None:
+        M_global = create_global_mass_matrix(node_vector, elements_vector)
+        structural_model["M_global"] = M_global
+        structural_model.update(create_modal_basis(K_global, M_global, free_dof, n_modes))
+
+    return structural_model
+
+
+# ==================================================================================================
+
+
+def create_global_mass_matrix(nodes, fem_elements):
+    """Assembles the global consistent mass matrix of the structure.
+
+    Args:
+        nodes (list): structure nodes, sorted by number
+        fem_elements (list): structure finite elements
+
+    Returns:
+        M_global (scipy.sparse.csr_matrix([6 * n_nodes, 6 * n_nodes])): global mass matrix
+    """
+
+    M_global = assemble_global_matrix(
+        calc_fem_elements_M_global(fem_elements),
+        np.stack([fem_element.correlation_vector for fem_element in fem_elements]),
+        6 * len(nodes),
     )
 
-    X_global = FEM_solver(K_global, F_global, struct_constraints)
+    return M_global
 
-    # Find support reactions
-    force_vector = K_global @ X_global
-
-    # Deformed grid
-    deformations = np.reshape(X_global, (len(node_vector), 6))
-    internal_loads = np.reshape(force_vector, (len(node_vector), 6))
-
-    deformed_grid = []
-    for i, node in enumerate(node_vector):
-        deformed_grid.append(
-            [
-                node.x + deformations[i][0],
-                node.y + deformations[i][1],
-                node.z + deformations[i][2],
-                deformations[i][3],
-                deformations[i][4],
-                deformations[i][5],
-            ]
+
+# ==================================================================================================
+
+
+def create_modal_basis(K_global, M_global, free_dof, n_modes):
+    """Calculates the first vibration modes of the constrained structure, K @ phi = w² M @ phi,
+    with a sparse symmetric shift-invert eigen solver. The modes are normalized by the mass
+    matrix and the modal stiffness matrix is factorized, so the structure deformations can be
+    found by a n_modes x n_modes solve.
+
+    Args:
+        K_global (scipy.sparse.csr_matrix): global stiffness matrix
+        M_global (scipy.sparse.csr_matrix): global mass matrix
+        free_dof (np.array(dtype=int)): indexes of the free degrees of freedom
+        n_modes (int): number of vibration modes
+
+    Returns:
+        modal_data (dict): modal_basis (np.array([n_free_dof, n_modes])), natural_frequencies
+                           [rad/s] and modal_K_factor
+    """
+
+    red_K = sps.csc_matrix(K_global)[free_dof, :][:, free_dof]
+    red_M = sps.csc_matrix(M_global)[free_dof, :][:, free_dof]
+
+    eigenvalues, modal_basis = spla.eigsh(red_K, k=n_modes, M=red_M, sigma=0, which="LM")
+
+    order = np.argsort(eigenvalues)
+    eigenvalues = eigenvalues[order]
+    modal_basis = modal_basis[:, order]
+
+    # Mass normalization, phi.T @ M @ phi = I
+    modal_mass = np.sum(modal_basis * (red_M @ modal_basis), axis=0)
+    modal_basis = modal_basis / np.sqrt(modal_mass)
+
+    modal_K = modal_basis.transpose() @ (red_K @ modal_basis)
+
+    modal_data = {
+        "modal_basis": modal_basis,
+        "natural_frequencies": np.sqrt(np.abs(eigenvalues)),
+        "modal_K_factor": sla.cho_factor(modal_K),
+    }
+
+    return modal_data
+
+
+# ==================================================================================================
+
+
+def factorized_FEM_solver(structural_model, F_global):
+    """Solves the structural problem reusing the factorization of the reduced stiffness matrix.
+    If the structural model has a modal basis the loads are projected on it and only the
+    n_modes x n_modes modal system is solved. If it has superelements only the condensed
+    system is solved, see superelement_FEM_solver.
+
+    Args:
+        structural_model (dict): structural model created by create_structural_model
+        F_global (np.array([n_dof, n_cases])): global load vectors, one load case per column
+
+    Returns:
+        X_global (np.array([n_dof, n_cases])): global deformation vectors
+    """
+
+    F_global = np.reshape(F_global, (len(F_global), -1))
+    free_dof = structural_model["free_dof"]
+
+    X_global = np.repeat(structural_model["X_prescribed"], F_global.shape[1], axis=1)
+
+    if "modal_basis" in structural_model:
+        modal_basis = structural_model["modal_basis"]
+        modal_loads = modal_basis.transpose() @ F_global[free_dof]
+        modal_coordinates = sla.cho_solve(structural_model["modal_K_factor"], modal_loads)
+        X_global[free_dof] = modal_basis @ modal_coordinates
+
+    elif "superelements" in structural_model:
+        X_global = superelement_FEM_solver(structural_model, F_global)
+
+    else:
+        X_global[free_dof] = solve_factorized_stiffness_matrix(
+            stiffness_matrix_factor(structural_model), F_global[free_dof]
         )
 
-    deformed_struct_grid = []
-    struct_internal_loads = []
-    struct_strains = []
+    return X_global
+
 
-    for component_grid in struct_grid:
+# ==================================================================================================
 
-        deformed_component_grid = []
-        component_internal_loads = []
-        component_strains = []
 
-        for node in component_grid:
+def factorize_stiffness_matrix(
+    K_global, free_dof, ordering="rcm", symmetric=True, permutation=None
+):
+    """Factorizes the stiffness matrix reduced to the free degrees of freedom. The constrained
+    degrees of freedom are removed by indexing the sparse matrix and the reduced matrix is
+    reordered to decrease the fill-in of the factorization:
+
+        - "rcm": reverse Cuthill-McKee, reduces the bandwidth of the matrix
+        - "amd": approximate minimum degree ordering of K + K.T
+
+    The structural stiffness matrix is symmetric positive definite, so the factorization is done
+    without pivoting and the factor is equivalent to a LDL.T decomposition. Non symmetric
+    matrices, like the aeroelastic stiffness matrix, must set symmetric to False so the rows are
+    pivoted.
+
+    Args:
+        K_global (np.array or scipy.sparse matrix): global stiffness matrix
+        free_dof (np.array(dtype=int)): indexes of the free degrees of freedom
+        ordering (string): "rcm" or "amd"
+        symmetric (bool): if True the matrix is assumed symmetric positive definite
+        permutation (np.array(dtype=int)): ordering of the free degrees of freedom found by a
+                                           previous factorization of a matrix with the same
+                                           sparsity pattern, the ordering is not recalculated
+
+    Returns:
+        K_factor (dict): factor, scipy.sparse.linalg.SuperLU object, and permutation of the
+                         free degrees of freedom
+    """
 
-            # Create deformed grid
-            x_delta = deformations[node.number][0]
-            y_delta = deformations[node.number][1]
-            z_delta = deformations[node.number][2]
-            rx_delta = deformations[node.number][3]
-            ry_delta = deformations[node.number][4]
-            rz_delta = deformations[node.number][5]
+    red_K = sps.csr_matrix(K_global)[free_dof, :][:, free_dof]
 
-            x_axis = np.array([1.0, 0.0, 0.0])
-            y_axis = np.array([0.0, 1.0, 0.0])
-            z_axis = np.array([0.0, 0.0, 1.0])
+    if permutation is not None:
+        red_K = red_K[permutation, :][:, permutation]
+        permc_spec = "NATURAL"
 
-            # Apply translation
-            translation_vector = np.array([x_delta, y_delta, z_delta])
-            deformed_node = node.translate(translation_vector)
+    elif ordering == "rcm":
+        permutation = csgraph.reverse_cuthill_mckee(red_K, symmetric_mode=True)
+        red_K = red_K[permutation, :][:, permutation]
+        permc_spec = "NATURAL"
 
-            # Apply rotation
-            rot_quaternion = Quaternion(axis=x_axis, angle=rx_delta)
-            deformed_node = node.rotate(rot_quaternion)
+    elif ordering == "amd":
+        permutation = None
+        permc_spec = "MMD_AT_PLUS_A"
 
-            rot_quaternion = Quaternion(axis=y_axis, angle=ry_delta)
-            deformed_node = node.rotate(rot_quaternion)
+    else:
+        raise ValueError(f"Unknown ordering: {ordering}")
+
+    if symmetric:
+        factor = spla.splu(
+            red_K.tocsc(),
+            permc_spec=permc_spec,
+            diag_pivot_thresh=0,
+            options={"SymmetricMode": True},
+        )
 
-            rot_quaternion = Quaternion(axis=z_axis, angle=rz_delta)
-            deformed_node = node.rotate(rot_quaternion)
+    else:
+        factor = spla.splu(red_K.tocsc(), permc_spec=permc_spec)
 
-            deformed_component_grid.append(deformed_node)
+    K_factor = {"factor": factor, "permutation": permutation}
 
-            # Create internal forces vector
-            node_internal_load = internal_loads[node.number]
-            component_internal_loads.append(node_internal_load)
+    return K_factor
 
-            # Create struct strains vector
-            node_strain = deformations[node.number]
-            component_strains.append(node_strain)
 
-        deformed_struct_grid.append(deformed_component_grid)
-        struct_internal_loads.append(component_internal_loads)
-        struct_strains.append(component_strains)
+# ==================================================================================================
+
+
+def solve_factorized_stiffness_matrix(K_factor, red_F_global):
+    """Solves the reduced structural problem by back-substitution with the factor created by
+    factorize_stiffness_matrix.
+
+    Args:
+        K_factor (dict): reduced stiffness matrix factor
+        red_F_global (np.array([n_free_dof, n_cases])): reduced load vectors
+
+    Returns:
+        red_X_global (np.array([n_free_dof, n_cases])): reduced deformation vectors
+    """
+
+    permutation = K_factor["permutation"]
+
+    if permutation is None:
+        return K_factor["factor"].solve(red_F_global)
+
+    red_X_global = np.empty_like(red_F_global, dtype=float)
+    red_X_global[permutation] = K_factor["factor"].solve(
+        np.ascontiguousarray(red_F_global[permutation], dtype=float)
+    )
+
+    return red_X_global
 
-    return deformations, internal_loads
-    #return deformed_struct_grid, struct_internal_loads, struct_strains, node_vector, deformations
 
 # ==================================================================================================
 
 
-def create_global_FEM_matrices(nodes, fem_elements, loads):
+def stiffness_matrix_factor(structural_model, superelement=None):
+    """Returns the factorization of the reduced stiffness matrix of a structural model, or of the
+    interior stiffness matrix of one of its superelements. Factorizations that are missing, like
+    the ones removed by remove_factorizations, are calculated and stored on the first call.
 
-    n_nodes = len(nodes)
+    Args:
+        structural_model (dict): structural model created by create_structural_model
+        superelement (dict): superelement of the structural model, the factor of the full
+                             system is returned if None
 
-    # Generate global stiffness matrix
-    K_global = np.zeros((n_nodes * 6, n_nodes * 6))
-    F_global = np.zeros((n_nodes * 6, 1))
+    Returns:
+        K_factor (dict): reduced stiffness matrix factor, see factorize_stiffness_matrix
+    """
+
+    if superelement is None:
+        model_part = structural_model
+        free_dof = structural_model["free_dof"]
+    else:
+        # Interior nodes belong to a single component, so its interior stiffness matrix is the
+        # same in the global stiffness matrix
+        model_part = superelement
+        free_dof = superelement["interior_dof"]
+
+    if model_part["K_factor"] is None:
+        model_part["K_factor"] = factorize_stiffness_matrix(
+            structural_model["K_global"], free_dof, structural_model.get("ordering", "rcm")
+        )
+
+    return model_part["K_factor"]
+
+
+# ==================================================================================================
+
+
+def remove_factorizations(structural_model):
+    """Copies a structural model without the sparse factorizations, which can not be pickled.
+    They are calculated again by stiffness_matrix_factor when needed.
+
+    Args:
+        structural_model (dict): structural model created by create_structural_model
+
+    Returns:
+        structural_model (dict): shallow copy of the structural model without the SuperLU
+                                 factorizations
+    """
+
+    structural_model = dict(structural_model, K_factor=None)
+
+    if "superelements" in structural_model:
+        structural_model["superelements"] = [
+            dict(superelement, K_factor=None)
+            for superelement in structural_model["superelements"]
+        ]
+
+    return structural_model
+
+
+# ==================================================================================================
+
+
+def nodes_dof(node_numbers):
+    """Indexes of the degrees of freedom of the nodes in the global vectors.
+
+    Args:
+        node_numbers (np.array(dtype=int)): nodes numbers
+
+    Returns:
+        dof (np.array([6 * n_nodes], dtype=int)): degrees of freedom of the nodes
+    """
+
+    dof = 6 * np.reshape(node_numbers, (-1, 1)) + np.arange(6)
+
+    return np.ravel(dof)
+
+
+# ==================================================================================================
+
+
+def create_superelements(struct_grid, struct_elements, constrained_dof, ordering="rcm"):
+    """Condenses each component of the structure onto its boundary nodes, the nodes shared with
+    other components and the constrained nodes (static or Guyan condensation). With the
+    interior degrees of freedom i and the boundary degrees of freedom b of a component:
+
+        K_condensed = K_bb - K_bi @ inv(K_ii) @ K_ib
+        F_condensed = F_b - K_bi @ inv(K_ii) @ F_i
+
+    The condensed matrices of the components are assembled into the boundary system, which is
+    much smaller than the global system. The condensation is exact for static problems.
+
+    Args:
+        struct_grid (list): structure nodes grids, one per component
+        struct_elements (list): structure finite elements, one list per component
+        constrained_dof (np.array([n_dof], dtype=bool)): True for the constrained degrees of
+                                                          freedom
+        ordering (string): "rcm" or "amd", reordering of the interior stiffness matrices
+
+    Returns:
+        superelements_data (dict): superelements (list of dicts created by
+                                   create_superelement), boundary_dof, K_condensed, the global
+                                   condensed stiffness matrix, and condensed_K_factor
+    """
+
+    n_dof = len(constrained_dof)
+    n_nodes = n_dof // 6
+
+    components_nodes = [
+        np.unique([node.number for node in component_grid]) for component_grid in struct_grid
+    ]
+
+    # Nodes of more than one component and constrained nodes are boundary nodes
+    boundary_nodes = np.bincount(np.concatenate(components_nodes), minlength=n_nodes) > 1
+    boundary_nodes |= np.any(np.reshape(constrained_dof, (n_nodes, 6)), axis=1)
+
+    boundary_dof = nodes_dof(np.flatnonzero(boundary_nodes))
+
+    boundary_index = np.full(n_dof, -1)
+    boundary_index[boundary_dof] = np.arange(len(boundary_dof))
+
+    K_condensed = np.zeros((len(boundary_dof), len(boundary_dof)))
+    superelements = []
+
+    for component_nodes, component_elements in zip(components_nodes, struct_elements):
+
+        K_component = assemble_global_matrix(
+            calc_fem_elements_K_global(component_elements),
+            np.stack([fem_element.correlation_vector for fem_element in component_elements]),
+            n_dof,
+        )
+
+        superelement = create_superelement(
+            K_component,
+            nodes_dof(component_nodes[~boundary_nodes[component_nodes]]),
+            nodes_dof(component_nodes[boundary_nodes[component_nodes]]),
+            ordering,
+        )
+
+        superelement["boundary_index"] = boundary_index[superelement["boundary_dof"]]
+        superelements.append(superelement)
+
+        index = superelement["boundary_index"]
+        K_condensed[np.ix_(index, index)] += superelement["K_condensed"]
+
+    boundary_free = np.flatnonzero(~constrained_dof[boundary_dof])
+
+    if len(boundary_free) > 0:
+        condensed_K_factor = sla.cho_factor(K_condensed[np.ix_(boundary_free, boundary_free)])
+    else:
+        condensed_K_factor = None
+
+    superelements_data = {
+        "superelements": superelements,
+        "boundary_dof": boundary_dof,
+        "K_condensed": K_condensed,
+        "condensed_K_factor": condensed_K_factor,
+    }
+
+    return superelements_data
 
-    for fem_element in fem_elements:
-        K_element = fem_element.calc_K_global()
-        correlation_vector = fem_element.correlation_vector
 
-        for i in range(len(correlation_vector)):
-            for j in range(len(correlation_vector)):
-                K_global[correlation_vector[i]][correlation_vector[j]] += K_element[i][
-                    j
-                ]
+# ==================================================================================================
+
+
+def create_superelement(K_component, interior_dof, boundary_dof, ordering="rcm"):
+    """Condenses the stiffness matrix of a component onto its boundary degrees of freedom. The
+    factorization of the interior stiffness matrix is kept to condense the interior loads and
+    to recover the interior deformations.
+
+    Args:
+        K_component (scipy.sparse matrix([n_dof, n_dof])): global stiffness matrix with only the
+                                                           elements of the component
+        interior_dof (np.array(dtype=int)): interior degrees of freedom of the component
+        boundary_dof (np.array(dtype=int)): boundary degrees of freedom of the component
+        ordering (string): "rcm" or "amd", reordering of the interior stiffness matrix
+
+    Returns:
+        superelement (dict): interior_dof, boundary_dof, K_factor, factor of the interior
+                             stiffness matrix, guyan_modes, interior deformations caused by
+                             unitary boundary deformations, -inv(K_ii) @ K_ib, and K_condensed
+    """
+
+    K_component = sps.csr_matrix(K_component)
+    K_bb = K_component[boundary_dof, :][:, boundary_dof].toarray()
+
+    if len(interior_dof) > 0:
+        K_factor = factorize_stiffness_matrix(K_component, interior_dof, ordering)
+        K_ib = K_component[interior_dof, :][:, boundary_dof].toarray()
+        guyan_modes = -solve_factorized_stiffness_matrix(K_factor, K_ib)
+        K_condensed = K_bb + K_ib.transpose() @ guyan_modes
+
+    else:
+        K_factor = None
+        guyan_modes = np.zeros((0, len(boundary_dof)))
+        K_condensed = K_bb
+
+    superelement = {
+        "interior_dof": interior_dof,
+        "boundary_dof": boundary_dof,
+        "K_factor": K_factor,
+        "guyan_modes": guyan_modes,
+        "K_condensed": K_condensed,
+    }
+
+    return superelement
+
+
+# ==================================================================================================
+
+
+def superelement_FEM_solver(structural_model, F_global, components=None):
+    """Solves the structural problem with the superelements created by create_superelements.
+    The interior loads are condensed onto the boundary, the boundary system is solved and the
+    interior deformations are recovered only for the required components:
+
+        X_i = inv(K_ii) @ F_i + guyan_modes @ X_b
+
+    Args:
+        structural_model (dict): structural model created by create_structural_model with
+                                 superelements
+        F_global (np.array([n_dof, n_cases])): global load vectors, one load case per column
+        components (list(int)): indexes of the components whose interior deformations are
+                                recovered, all components if None
+
+    Returns:
+        X_global (np.array([n_dof, n_cases])): global deformation vectors, the interior
+                                               deformations of the components that were not
+                                               recovered are NaN
+    """
+
+    F_global = np.reshape(F_global, (len(F_global), -1))
+    superelements = structural_model["superelements"]
+    boundary_dof = structural_model["boundary_dof"]
+
+    if components is None:
+        components = range(len(superelements))
+
+    # Condense the interior loads
+    F_condensed = np.array(F_global[boundary_dof], dtype=float)
+
+    for superelement in superelements:
+        F_condensed[superelement["boundary_index"]] += (
+            superelement["guyan_modes"].transpose() @ F_global[superelement["interior_dof"]]
+        )
+
+    # Solve the boundary system
+    X_boundary = np.repeat(
+        structural_model["X_prescribed"][boundary_dof], F_global.shape[1], axis=1
+    )
+
+    boundary_constrained = structural_model["constrained_dof"][boundary_dof]
+    boundary_free = np.flatnonzero(~boundary_constrained)
+
+    if len(boundary_free) > 0:
+        K_free_constrained = structural_model["K_condensed"][boundary_free][
+            :, boundary_constrained
+        ]
+        red_F_condensed = (
+            F_condensed[boundary_free] - K_free_constrained @ X_boundary[boundary_constrained]
+        )
+
+        X_boundary[boundary_free] = sla.cho_solve(
+            structural_model["condensed_K_factor"], red_F_condensed
+        )
+
+    X_global = np.full(F_global.shape, np.nan)
+    X_global[boundary_dof] = X_boundary
+
+    # Recover the interior deformations
+    for i in components:
+
+        superelement = superelements[i]
+        F_interior = F_global[superelement["interior_dof"]]
+
+        X_interior = superelement["guyan_modes"] @ X_boundary[superelement["boundary_index"]]
+
+        if np.any(F_interior):
+            X_interior += solve_factorized_stiffness_matrix(
+                stiffness_matrix_factor(structural_model, superelement), F_interior
+            )
+
+        X_global[superelement["interior_dof"]] = X_interior
+
+    return X_global
+
+
+# ==================================================================================================
+
+
+def create_global_load_vector(n_nodes, loads):
+    """Creates the global load vector.
+
+    Args:
+        n_nodes (int): number of nodes of the structure
+        loads (list): list of structures.objects.Load
+
+    Returns:
+        F_global (np.array([6 * n_nodes, 1])): global load vector
+    """
+
+    F_global = np.zeros((n_nodes * 6, 1))
 
-    # Generate Force Matrix
     for load in loads:
         node_index = load.application_node.number * 6
-        correlation_vector = [
-            node_index,
-            node_index + 1,
-            node_index + 2,
-            node_index + 3,
-            node_index + 4,
-            node_index + 5,
-        ]
+        F_global[node_index : node_index + 6, 0] += np.reshape(load.load, 6)
+
+    return F_global
+
+
+# ==================================================================================================
+
+
+def create_global_FEM_matrices(nodes, fem_elements, loads):
+    """Assembles the global stiffness matrix and the global load vector of the structure.
+
+    Args:
+        nodes (list): structure nodes, sorted by number
+        fem_elements (list): structure finite elements
+        loads (list): list of structures.objects.Load
+
+    Returns:
+        K_global (scipy.sparse.csr_matrix([6 * n_nodes, 6 * n_nodes])): global stiffness matrix
+        F_global (np.array([6 * n_nodes, 1])): global load vector
+    """
+
+    n_nodes = len(nodes)
 
-        for i in range(len(correlation_vector)):
-            F_global[correlation_vector[i]] += load.load[i]
+    K_global = assemble_global_matrix(
+        calc_fem_elements_K_global(fem_elements),
+        np.stack([fem_element.correlation_vector for fem_element in fem_elements]),
+        6 * n_nodes,
+    )
+
+    F_global = create_global_load_vector(n_nodes, loads)
 
     return K_global, F_global
 
@@ -557,51 +1093,289 @@ def create_global_FEM_matrices(nodes, fem_elements, loads):
 # ==================================================================================================
 
 
-def FEM_solver(K_global, F_global, constraints):
+def calc_fem_elements_triads(fem_elements):
+    """Calculates the rotation matrices of all the finite elements at once, same matrices as
+    EulerBeamElement.calc_rotation_matrix. The "MIDDLE" orientation is the spherical linear
+    interpolation of the nodes quaternions at half the element, which is the normalized sum of
+    the quaternions along the shortest path.
 
-    n_dof = len(F_global)
-    X_global = np.zeros((n_dof, 1))
+    Args:
+        fem_elements (list): structure finite elements
 
-    # Find constrained degrees of freedom
-    constrained_dof = [False for i in range(n_dof)]
+    Returns:
+        triads (np.array([n_elements, 3, 3])): rows are the element x, y and z axis in global
+                                               coordinates
+    """
+
+    quaternions_A = np.array([fem_element.node_A.quaternion.q for fem_element in fem_elements])
+    quaternions_B = np.array([fem_element.node_B.quaternion.q for fem_element in fem_elements])
+    prop_choices = np.array([fem_element.prop_choice for fem_element in fem_elements])
+
+    quaternions_A = quaternions_A / np.linalg.norm(quaternions_A, axis=1)[:, np.newaxis]
+    quaternions_B = quaternions_B / np.linalg.norm(quaternions_B, axis=1)[:, np.newaxis]
+
+    quaternions = np.where((prop_choices == "TIP")[:, np.newaxis], quaternions_B, quaternions_A)
+
+    middle = prop_choices == "MIDDLE"
+    shortest_path = np.where(np.sum(quaternions_A * quaternions_B, axis=1) < 0, -1.0, 1.0)
+    quaternions[middle] = (quaternions_A + shortest_path[:, np.newaxis] * quaternions_B)[middle]
+
+    # The triads rows are the node axes, the columns of the quaternions rotation matrices
+    triads = np.transpose(m.rotations.quaternion_to_matrix(quaternions), (0, 2, 1))
+
+    return triads
+
+
+# ==================================================================================================
+
+
+def calc_fem_elements_K_global(fem_elements):
+    """Calculates the global stiffness matrices of all the finite elements at once.
+
+    Args:
+        fem_elements (list): structure finite elements
+
+    Returns:
+        K_elements (np.array([n_elements, 12, 12])): elements stiffness matrices in global
+                                                      coordinates
+    """
+
+    K_elements = f.rotate_element_matrices(
+        calc_fem_elements_K_local(fem_elements), calc_fem_elements_triads(fem_elements)
+    )
+
+    return K_elements
+
+
+# ==================================================================================================
+
+
+def calc_fem_elements_K_local(fem_elements):
+    """Calculates the local stiffness matrices of all the finite elements at once.
+
+    Args:
+        fem_elements (list): structure finite elements
+
+    Returns:
+        K_elements (np.array([n_elements, 12, 12])): elements stiffness matrices in local
+                                                      coordinates
+    """
+
+    properties = [
+        np.array([getattr(fem_element, name) for fem_element in fem_elements], dtype=float)
+        for name in ["E", "A", "L", "G", "J", "Iyy", "Izz"]
+    ]
+
+    return f.euler_beam_stiff_batch(*properties)
+
+
+# ==================================================================================================
+
+# Section forces and stresses at the element ends, index 0 is node A and index 1 is node B
+ELEMENT_FORCES_DTYPE = np.dtype(
+    [(name, float, (2,)) for name in ["N", "Vy", "Vz", "T", "My", "Mz"]]
+)
+
+ELEMENT_STRESSES_DTYPE = np.dtype(
+    [
+        (name, float, (2,))
+        for name in ["axial", "bending", "normal_max", "normal_min", "shear", "von_mises"]
+    ]
+)
+
+
+def calc_fem_elements_forces(fem_elements, deformations):
+    """Calculates the section forces at the ends of all the finite elements, for all the load
+    cases at once. The element end forces in local coordinates are K_local @ T @ u_e and the
+    section forces act on the positive face of the section, so they are the end forces at node
+    B and minus the end forces at node A.
+
+    Args:
+        fem_elements (list): structure finite elements
+        deformations (np.array([n_nodes, 6]) or np.array([n_cases, n_nodes, 6])): nodes
+                                                                                  deformations
+
+    Returns:
+        element_forces (np.array([n_elements]) or np.array([n_cases, n_elements])): structured
+            array with ELEMENT_FORCES_DTYPE, section forces in local coordinates
+    """
+
+    deformations = np.asarray(deformations, dtype=float)
+    cases_shape = np.shape(deformations)[:-2]
+    n_dof = 6 * np.shape(deformations)[-2]
+
+    correlation_vectors = np.stack(
+        [fem_element.correlation_vector for fem_element in fem_elements]
+    )
+
+    # Element deformations, [n_elements, n_cases, 12]
+    X_cases = np.reshape(deformations, (-1, n_dof))
+    elements_deformations = np.moveaxis(X_cases[:, correlation_vectors], 0, 1)
+
+    local_deformations = f.rotate_element_vectors(
+        elements_deformations, calc_fem_elements_triads(fem_elements)
+    )
+
+    K_local = calc_fem_elements_K_local(fem_elements)
+    end_forces = np.moveaxis(local_deformations @ np.swapaxes(K_local, 1, 2), 0, 1)
+    end_forces = np.reshape(end_forces, (len(X_cases), len(fem_elements), 2, 6))
+    end_forces[:, :, 0] *= -1
+
+    element_forces = np.empty((len(X_cases), len(fem_elements)), dtype=ELEMENT_FORCES_DTYPE)
+
+    for i, name in enumerate(ELEMENT_FORCES_DTYPE.names):
+        element_forces[name] = end_forces[..., i]
+
+    return np.reshape(element_forces, cases_shape + (len(fem_elements),))
+
+
+# ==================================================================================================
+
+
+def calc_fem_elements_stresses(fem_elements, element_forces):
+    """Calculates the section stresses at the ends of all the finite elements from their
+    section forces, see structures.functions.euler_beam_section_stresses.
+
+    Args:
+        fem_elements (list): structure finite elements
+        element_forces (np.array): structured array created by calc_fem_elements_forces
+
+    Returns:
+        element_stresses (np.array): structured array with ELEMENT_STRESSES_DTYPE and the shape
+                                     of element_forces
+    """
+
+    A, Iyy, Izz, J = [
+        np.array([getattr(fem_element, name) for fem_element in fem_elements], dtype=float)[
+            :, np.newaxis
+        ]
+        for name in ["A", "Iyy", "Izz", "J"]
+    ]
+
+    section_forces = np.stack(
+        [element_forces[name] for name in ELEMENT_FORCES_DTYPE.names], axis=-1
+    )
+
+    stresses = f.euler_beam_section_stresses(section_forces, A, Iyy, Izz, J)
+
+    element_stresses = np.empty(np.shape(element_forces), dtype=ELEMENT_STRESSES_DTYPE)
+
+    for name in ELEMENT_STRESSES_DTYPE.names:
+        element_stresses[name] = stresses[name]
+
+    return element_stresses
+
+
+# ==================================================================================================
+
+
+def calc_fem_elements_M_global(fem_elements):
+    """Calculates the global mass matrices of all the finite elements at once.
+
+    Args:
+        fem_elements (list): structure finite elements
+
+    Returns:
+        M_elements (np.array([n_elements, 12, 12])): elements mass matrices in global coordinates
+    """
+
+    M_elements = f.rotate_element_matrices(
+        np.stack([fem_element.calc_M_local() for fem_element in fem_elements]),
+        calc_fem_elements_triads(fem_elements),
+    )
+
+    return M_elements
+
+
+# ==================================================================================================
+
+
+def assemble_global_matrix(element_matrices, correlation_vectors, n_dof):
+    """Assembles the element matrices in a sparse global matrix, the contributions of the elements
+    that share a degree of freedom are summed.
+
+    Args:
+        element_matrices (np.array([n_elements, 12, 12])): elements matrices in global coordinates
+        correlation_vectors (np.array([n_elements, 12], dtype=int)): global degrees of freedom of
+                                                                   each element
+        n_dof (int): total number of degrees of freedom
+
+    Returns:
+        global_matrix (scipy.sparse.csr_matrix([n_dof, n_dof])): global matrix
+    """
+
+    n_element_dof = correlation_vectors.shape[1]
+
+    rows = np.repeat(correlation_vectors, n_element_dof, axis=1)
+    columns = np.tile(correlation_vectors, (1, n_element_dof))
+
+    global_matrix = sps.coo_matrix(
+        (element_matrices.ravel(), (rows.ravel(), columns.ravel())), shape=(n_dof, n_dof)
+    ).tocsr()
+
+    return global_matrix
+
+
+# ==================================================================================================
+
+
+def find_constrained_dof(constraints, n_dof):
+    """Finds the degrees of freedom prescribed by the structural constraints.
+
+    Args:
+        constraints (list): list of structures.objects.Constraint
+        n_dof (int): total number of degrees of freedom
+
+    Returns:
+        constrained_dof (np.array([n_dof], dtype=bool)): True for the constrained degrees of
+                                                          freedom
+        X_prescribed (np.array([n_dof, 1])): prescribed deformations, zero for the free degrees
+                                             of freedom
+    """
+
+    constrained_dof = np.zeros(n_dof, dtype=bool)
+    X_prescribed = np.zeros((n_dof, 1))
 
     for constraint in constraints:
         node_index = constraint.application_node.number * 6
-        correlation_vector = [
-            node_index,
-            node_index + 1,
-            node_index + 2,
-            node_index + 3,
-            node_index + 4,
-            node_index + 5,
-        ]
 
-        for i in range(len(correlation_vector)):
+        for i in range(6):
             if constraint.dof_constraints[i] is not None:
-                constrained_dof[correlation_vector[i]] = True
-                X_global[correlation_vector[i]] += constraint.dof_constraints[i]
+                constrained_dof[node_index + i] = True
+                X_prescribed[node_index + i] += constraint.dof_constraints[i]
 
-    # Created reduced stiffess and force matrices
-    red_K_global = np.copy(K_global)
-    red_F_global = np.copy(F_global)
+    return constrained_dof, X_prescribed
 
-    dof_to_delete = []
-    for i, dof in enumerate(constrained_dof):
-        if dof:
-            dof_to_delete.append(i)
 
-    red_F_global = np.delete(red_F_global, dof_to_delete, 0)
-    red_K_global = np.delete(red_K_global, dof_to_delete, 0)
-    red_K_global = np.delete(red_K_global, dof_to_delete, 1)
+# ==================================================================================================
+
+
+def FEM_solver(K_global, F_global, constraints):
+    """Solves the structural problem K @ X = F with the constrained degrees of freedom removed.
+
+    Args:
+        K_global (np.array or scipy.sparse matrix): global stiffness matrix
+        F_global (np.array([n_dof, 1])): global load vector
+        constraints (list): list of structures.objects.Constraint
+
+    Returns:
+        X_global (np.array([n_dof, 1])): global deformation vector
+    """
+
+    n_dof = len(F_global)
+
+    # Find constrained degrees of freedom
+    constrained_dof, X_global = find_constrained_dof(constraints, n_dof)
+    free_dof = np.flatnonzero(~constrained_dof)
+
+    # Created reduced force matrix
+    red_F_global = np.reshape(F_global, (n_dof, -1))[free_dof]
 
-    # Solve linear System
-    red_X_global = np.linalg.solve(red_K_global, red_F_global)
+    # Solve linear System, K_global is not necessarily symmetric
+    K_factor = factorize_stiffness_matrix(K_global, free_dof, symmetric=False)
+    red_X_global = solve_factorized_stiffness_matrix(K_factor, red_F_global)
 
     # Copy results do deformation vector
-    counter = 0
-    for i, dof in enumerate(constrained_dof):
-        if not dof:
-            X_global[i] = red_X_global[counter]
-            counter += 1
+    X_global[~constrained_dof] = red_X_global
 
     return X_global
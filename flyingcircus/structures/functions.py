@@ -84,3 +84,274 @@ def euler_beam_stiff(E, A, L, G, J, Iyy, Izz):
     K[11][11] = 4 * E * Izz / L
 
     return K
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def euler_beam_mass(rho, A, L, Iyy, Izz):
+    """ Calculates the local consistent mass matrix of a beam finite element.
+
+    Args:
+        rho (float): density of the material
+        A (float): Area of the section
+        L (float): length of the element
+        Iyy (float): Moment of inertia of the section in the Y axis
+        Izz (float): Moment of inertia of the section in the Z axis
+
+    Returns:
+        M (np.array(dtype=float)): local consistent mass matrix of a beam element
+    """
+
+    M = np.zeros((12, 12))
+
+    mass = rho * A * L
+    torsion_inertia = rho * (Iyy + Izz) * L
+
+    # Axial and torsion, linear shape functions
+    for i, value in [(0, mass), (3, torsion_inertia)]:
+        M[i][i] = value / 3
+        M[i + 6][i + 6] = value / 3
+        M[i][i + 6] = value / 6
+        M[i + 6][i] = value / 6
+
+    # Bending, cubic shape functions
+    bending = (mass / 420) * np.array(
+        [
+            [156, 22 * L, 54, -13 * L],
+            [22 * L, 4 * L ** 2, 13 * L, -3 * L ** 2],
+            [54, 13 * L, 156, -22 * L],
+            [-13 * L, -3 * L ** 2, -22 * L, 4 * L ** 2],
+        ]
+    )
+
+    # Plane XY, v and rotation around Z
+    xy_dof = [1, 5, 7, 11]
+    M[np.ix_(xy_dof, xy_dof)] = bending
+
+    # Plane XZ, w and rotation around Y, the rotation has the opposite sign of dw/dx
+    xz_dof = [2, 4, 8, 10]
+    xz_sign = np.array([1, -1, 1, -1])
+    M[np.ix_(xz_dof, xz_dof)] = bending * np.outer(xz_sign, xz_sign)
+
+    return M
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def euler_beam_stiff_batch(E, A, L, G, J, Iyy, Izz):
+    """ Calculates the local stiffness matrices of several beam finite elements at once, same
+    matrix as euler_beam_stiff.
+
+    Args:
+        E (np.array([n_elements])): Elastic modulus of the material
+        A (np.array([n_elements])): Area of the section
+        L (np.array([n_elements])): length of the element
+        G (np.array([n_elements])): Shear modulus of the material
+        J (np.array([n_elements])): Polar moment of inertia of the section
+        Iyy (np.array([n_elements])): Moment of inertia of the section in the Y axis
+        Izz (np.array([n_elements])): Moment of inertia of the section in the Z axis
+
+    Returns:
+        K (np.array([n_elements, 12, 12])): local stiffness matrices of the beam elements
+    """
+
+    E, A, L, G, J, Iyy, Izz = np.broadcast_arrays(
+        *[np.asarray(value, dtype=float) for value in [E, A, L, G, J, Iyy, Izz]]
+    )
+
+    K = np.zeros((len(L), 12, 12))
+
+    axial = E * A / L
+    torsion = G * J / L
+
+    # Axial and torsion
+    for i, value in [(0, axial), (3, torsion)]:
+        K[:, i, i] = value
+        K[:, i + 6, i + 6] = value
+        K[:, i, i + 6] = -value
+        K[:, i + 6, i] = -value
+
+    # Bending, plane XY uses Izz and plane XZ uses Iyy with the opposite rotation sign
+    for dof, inertia, sign in [([1, 5, 7, 11], Izz, 1), ([2, 4, 8, 10], Iyy, -1)]:
+
+        EI = E * inertia
+        k_1 = 12 * EI / L ** 3
+        k_2 = sign * 6 * EI / L ** 2
+        k_3 = 4 * EI / L
+        k_4 = 2 * EI / L
+
+        bending = np.stack(
+            [
+                [k_1, k_2, -k_1, k_2],
+                [k_2, k_3, -k_2, k_4],
+                [-k_1, -k_2, k_1, -k_2],
+                [k_2, k_4, -k_2, k_3],
+            ]
+        )
+
+        K[:, np.array(dof)[:, np.newaxis], np.array(dof)] = np.moveaxis(bending, -1, 0)
+
+    return K
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def rotate_element_matrices(local_matrices, triads):
+    """ Transforms several element matrices from the local to the global coordinate system,
+    T.T @ K @ T with T the 12 x 12 block diagonal matrix of each element triad, without building
+    T.
+
+    Args:
+        local_matrices (np.array([n_elements, 12, 12])): element matrices in local coordinates
+        triads (np.array([n_elements, 3, 3])): element rotation matrices
+
+    Returns:
+        global_matrices (np.array([n_elements, 12, 12])): element matrices in global coordinates
+    """
+
+    n_elements = len(local_matrices)
+
+    global_matrices = np.einsum(
+        "npa,nipjq,nqb->niajb",
+        triads,
+        np.reshape(local_matrices, (n_elements, 4, 3, 4, 3)),
+        triads,
+        optimize=True,
+    )
+
+    return np.reshape(global_matrices, (n_elements, 12, 12))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def rotate_element_vectors(global_vectors, triads):
+    """ Transforms several element vectors from the global to the local coordinate system,
+    T @ u with T the 12 x 12 block diagonal matrix of each element triad, without building T.
+
+    Args:
+        global_vectors (np.array([n_elements, n_cases, 12])): element vectors in global
+                                                              coordinates
+        triads (np.array([n_elements, 3, 3])): element rotation matrices
+
+    Returns:
+        local_vectors (np.array([n_elements, n_cases, 12])): element vectors in local coordinates
+    """
+
+    n_elements, n_cases = np.shape(global_vectors)[:2]
+
+    local_vectors = np.einsum(
+        "nab,ncib->ncia", triads, np.reshape(global_vectors, (n_elements, n_cases, 4, 3))
+    )
+
+    return np.reshape(local_vectors, (n_elements, n_cases, 12))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def euler_beam_section_stresses(section_forces, A, Iyy, Izz, J):
+    """ Calculates the maximum stresses of beam sections from their internal forces. The fiber
+    distances are the ones of the equivalent square sections, the same hypothesis used to
+    interpolate the sections properties of the finite elements.
+
+    Args:
+        section_forces (np.array([..., 6])): section internal forces, [N, Vy, Vz, T, My, Mz]
+        A (np.array): Area of the section
+        Iyy (np.array): Moment of inertia of the section in the Y axis
+        Izz (np.array): Moment of inertia of the section in the Z axis
+        J (np.array): Polar moment of inertia of the section
+
+    Returns:
+        stresses (dict): axial, bending, normal_max, normal_min, shear and von_mises stresses,
+                         arrays with the shape of section_forces without the last axis
+    """
+
+    N, Vy, Vz, T, My, Mz = np.moveaxis(section_forces, -1, 0)
+
+    # Extreme fiber distances of the equivalent square sections
+    z_max = (12 * Iyy) ** (1 / 4) / 2
+    y_max = (12 * Izz) ** (1 / 4) / 2
+    r_max = (6 * J) ** (1 / 4) / np.sqrt(2)
+
+    axial = N / A
+    bending = np.abs(My) * z_max / Iyy + np.abs(Mz) * y_max / Izz
+
+    # Torsion at the section corner and maximum transverse shear of a rectangle
+    shear = np.abs(T) * r_max / J + 1.5 * np.hypot(Vy, Vz) / A
+
+    normal_max = axial + bending
+    normal_min = axial - bending
+
+    von_mises = np.sqrt(np.maximum(normal_max ** 2, normal_min ** 2) + 3 * shear ** 2)
+
+    stresses = {
+        "axial": axial,
+        "bending": bending,
+        "normal_max": normal_max,
+        "normal_min": normal_min,
+        "shear": shear,
+        "von_mises": von_mises,
+    }
+
+    return stresses
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def rotation_vectors_to_matrices(rotation_vectors):
+    """ Calculates the rotation matrices of several rotation vectors, Rodrigues formula.
+
+    Args:
+        rotation_vectors (np.array([n, 3])): rotation vectors, axis times angle [rad]
+
+    Returns:
+        rotation_matrices (np.array([n, 3, 3])): rotation matrices
+    """
+
+    rotation_vectors = np.asarray(rotation_vectors, dtype=float)
+
+    rotation_matrices = m.rotations.rotation_vector_to_matrix(
+        np.ascontiguousarray(rotation_vectors.reshape(-1, 3))
+    ).reshape(rotation_vectors.shape[:-1] + (3, 3))
+
+    return rotation_matrices
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def rotation_matrices_to_vectors(rotation_matrices):
+    """ Calculates the rotation vectors of several rotation matrices, inverse of
+    rotation_vectors_to_matrices for rotation angles smaller than pi.
+
+    Args:
+        rotation_matrices (np.array([n, 3, 3])): rotation matrices
+
+    Returns:
+        rotation_vectors (np.array([n, 3])): rotation vectors, axis times angle [rad]
+    """
+
+    skew_part = 0.5 * np.stack(
+        [
+            rotation_matrices[..., 2, 1] - rotation_matrices[..., 1, 2],
+            rotation_matrices[..., 0, 2] - rotation_matrices[..., 2, 0],
+            rotation_matrices[..., 1, 0] - rotation_matrices[..., 0, 1],
+        ],
+        axis=-1,
+    )
+
+    sin_angles = np.linalg.norm(skew_part, axis=-1)
+    cos_angles = 0.5 * (np.trace(rotation_matrices, axis1=-2, axis2=-1) - 1)
+    angles = np.arctan2(sin_angles, cos_angles)
+
+    small = sin_angles < 1e-12
+    factor = np.where(small, 1.0, angles / np.where(small, 1.0, sin_angles))
+
+    rotation_vectors = factor[..., np.newaxis] * skew_part
+
+    return rotation_vectors
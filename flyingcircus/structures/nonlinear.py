@@ -0,0 +1,562 @@
+"""
+nonlinear.py
+
+Geometrically nonlinear static analysis of beam structures with corotational finite elements.
+
+The element motion is split in a rigid body motion, described by a frame that follows the
+element chord, and small deformations measured in that frame. The deformations are applied to the
+same linear stiffness matrix used by the linear EulerBeamElement, so large displacements and
+rotations are possible as long as the strains are small.
+
+Author: João Paulo Monteiro Cruvinel da Costa
+"""
+
+import time
+import datetime
+
+import numpy as np
+
+from .. import geometry as geo
+from .. import mathematics as m
+from . import fem
+from . import functions as f
+
+# ==================================================================================================
+
+
+def create_corotational_model(struct_grid, struct_elements, struct_constraints):
+    """Creates the parts of the nonlinear structural problem that do not change during the
+    solution: initial node positions, elements connectivity, local stiffness matrices and
+    initial frames, constrained degrees of freedom and the ordering of the sparse tangent matrix.
+
+    Args:
+        struct_grid (list): structure nodes grids
+        struct_elements (list): structure finite elements
+        struct_constraints (list): list of structures.objects.Constraint
+
+    Returns:
+        corotational_model (dict): structure description used by corotational_structural_solver
+    """
+
+    node_vector = geo.functions.create_structure_node_vector(struct_grid)
+    n_nodes = len(node_vector)
+
+    elements_vector = []
+    for component_elements in struct_elements:
+        elements_vector += component_elements
+
+    node_positions = node_vector.positions
+    nodes_A = np.array([fem_element.node_A.number for fem_element in elements_vector])
+    nodes_B = np.array([fem_element.node_B.number for fem_element in elements_vector])
+
+    properties = [
+        np.array([getattr(fem_element, name) for fem_element in elements_vector], dtype=float)
+        for name in ["E", "A", "L", "G", "J", "Iyy", "Izz"]
+    ]
+
+    K_local = f.euler_beam_stiff_batch(*properties)
+
+    # The element y axis is made orthogonal to the element chord
+    element_frames = np.transpose(fem.calc_fem_elements_triads(elements_vector), (0, 2, 1))
+    identity = np.broadcast_to(np.eye(3), (len(elements_vector), 3, 3))
+
+    initial_chords = node_positions[nodes_B] - node_positions[nodes_A]
+
+    initial_frames, initial_lengths, q_A, q_B = calc_corotated_frames(
+        initial_chords, identity, identity, element_frames
+    )
+
+    correlation_vectors = np.stack(
+        [fem_element.correlation_vector for fem_element in elements_vector]
+    )
+
+    constrained_dof, X_prescribed = fem.find_constrained_dof(struct_constraints, 6 * n_nodes)
+    free_dof = np.flatnonzero(~constrained_dof)
+
+    # The tangent matrix has the same sparsity pattern as the linear stiffness matrix, its
+    # ordering is found only once
+    K_global = fem.assemble_global_matrix(
+        fem.calc_fem_elements_K_global(elements_vector), correlation_vectors, 6 * n_nodes
+    )
+    permutation = fem.factorize_stiffness_matrix(K_global, free_dof)["permutation"]
+
+    corotational_model = {
+        "node_vector": node_vector,
+        "n_nodes": n_nodes,
+        "node_positions": node_positions,
+        "nodes_A": nodes_A,
+        "nodes_B": nodes_B,
+        "correlation_vectors": correlation_vectors,
+        "K_local": K_local,
+        "initial_chords": initial_chords,
+        "initial_frames": initial_frames,
+        "initial_lengths": initial_lengths,
+        "constrained_dof": constrained_dof,
+        "free_dof": free_dof,
+        "X_prescribed": X_prescribed,
+        "permutation": permutation,
+    }
+
+    return corotational_model
+
+
+# ==================================================================================================
+
+
+def calc_corotated_frames(chords, rotations_A, rotations_B, initial_frames):
+    """Calculates the corotated frame of the elements. The x axis follows the element chord and
+    the y axis is the mean of the initial y axis rotated by each node, made orthogonal to the
+    chord.
+
+    Args:
+        chords (np.array([n_elements, 3])): vectors from the first to the second node of the
+                                            elements
+        rotations_A (np.array([n_elements, 3, 3])): rotation of the first nodes from the initial
+                                                    configuration
+        rotations_B (np.array([n_elements, 3, 3])): rotation of the second nodes from the initial
+                                                    configuration
+        initial_frames (np.array([n_elements, 3, 3])): initial frames, columns are the x, y and z
+                                                       axis
+
+    Returns:
+        frames (np.array([n_elements, 3, 3])): corotated frames, columns are the x, y and z axis
+        lengths (np.array([n_elements])): current elements lengths
+        q_A (np.array([n_elements, 3])): initial y axis rotated by the first node
+        q_B (np.array([n_elements, 3])): initial y axis rotated by the second node
+    """
+
+    lengths = np.linalg.norm(chords, axis=1)
+    e_1 = chords / lengths[:, np.newaxis]
+
+    q_A = np.einsum("nij,nj->ni", rotations_A, initial_frames[:, :, 1])
+    q_B = np.einsum("nij,nj->ni", rotations_B, initial_frames[:, :, 1])
+    p = 0.5 * (q_A + q_B)
+
+    e_3 = np.cross(e_1, p)
+    e_3 = e_3 / np.linalg.norm(e_3, axis=1)[:, np.newaxis]
+    e_2 = np.cross(e_3, e_1)
+
+    frames = np.stack([e_1, e_2, e_3], axis=-1)
+
+    return frames, lengths, q_A, q_B
+
+
+# ==================================================================================================
+
+
+def inverse_tangent_operators(rotation_vectors):
+    """Calculates the inverse of the tangent operators of several rotation vectors, the variation
+    of the rotation vector is given by d_theta = T_inv @ d_w, with d_w the spatial spin of the
+    rotation matrix.
+
+    Args:
+        rotation_vectors (np.array([n, 3])): rotation vectors
+
+    Returns:
+        T_inv (np.array([n, 3, 3])): inverse tangent operators
+    """
+
+    angles = np.linalg.norm(rotation_vectors, axis=1)
+    skew = m.cross_product_matrices(rotation_vectors)
+
+    small = angles < 1e-4
+    half = 0.5 * np.where(small, 1.0, angles)
+    eta = np.where(
+        small,
+        1 / 12 + angles ** 2 / 720,
+        (1 - half / np.tan(half)) / np.where(small, 1.0, angles) ** 2,
+    )
+
+    T_inv = np.eye(3) - 0.5 * skew + eta[:, np.newaxis, np.newaxis] * (skew @ skew)
+
+    return T_inv
+
+
+# ==================================================================================================
+
+
+def calc_corotational_element_forces(
+    displacements_A,
+    displacements_B,
+    rotations_A,
+    rotations_B,
+    initial_chords,
+    initial_frames,
+    initial_lengths,
+    K_local,
+):
+    """Calculates the internal forces of the corotational beam elements in global coordinates.
+
+    The local deformations, elongation and rotations of the nodes relative to the corotated
+    frame, are multiplied by the linear element stiffness matrix and transformed back to the
+    global coordinate system by the variation of the local deformations in relation to the
+    nodes displacements and spins.
+
+    Args:
+        displacements_A (np.array([n_elements, 3])): displacements of the elements first nodes
+        displacements_B (np.array([n_elements, 3])): displacements of the elements second nodes
+        rotations_A (np.array([n_elements, 3, 3])): rotation of the first nodes from the initial
+                                                    configuration
+        rotations_B (np.array([n_elements, 3, 3])): rotation of the second nodes from the initial
+                                                    configuration
+        initial_chords (np.array([n_elements, 3])): initial vectors from the first to the second
+                                                    node of the elements
+        initial_frames (np.array([n_elements, 3, 3])): initial corotated frames
+        initial_lengths (np.array([n_elements])): initial elements lengths
+        K_local (np.array([n_elements, 12, 12])): elements local stiffness matrices
+
+    Returns:
+        element_forces (np.array([n_elements, 12])): elements internal forces and moments at the
+                                                     nodes, in global coordinates
+    """
+
+    n_elements = len(K_local)
+
+    chords_displacements = displacements_B - displacements_A
+
+    frames, lengths, q_A, q_B = calc_corotated_frames(
+        initial_chords + chords_displacements, rotations_A, rotations_B, initial_frames
+    )
+
+    # Local deformations
+    theta_A = f.rotation_matrices_to_vectors(
+        np.einsum("nji,njk,nkl->nil", frames, rotations_A, initial_frames)
+    )
+    theta_B = f.rotation_matrices_to_vectors(
+        np.einsum("nji,njk,nkl->nil", frames, rotations_B, initial_frames)
+    )
+
+    local_deformations = np.zeros((n_elements, 12))
+    local_deformations[:, 3:6] = theta_A
+    # Elongation without the cancellation error of lengths - initial_lengths
+    local_deformations[:, 6] = np.sum(
+        (2 * initial_chords + chords_displacements) * chords_displacements, axis=1
+    ) / (lengths + initial_lengths)
+    local_deformations[:, 9:12] = theta_B
+
+    local_loads = np.einsum("nij,nj->ni", K_local, local_deformations)
+    local_loads = np.concatenate(
+        [local_loads[:, 6:7], local_loads[:, 3:6], local_loads[:, 9:12]], axis=1
+    )
+
+    # Spin of the corotated frame, in local coordinates, G_T @ [u_A, w_A, u_B, w_B]
+    local_q_A = np.einsum("nji,nj->ni", frames, q_A)
+    local_q_B = np.einsum("nji,nj->ni", frames, q_B)
+    local_p = 0.5 * (local_q_A + local_q_B)
+
+    eta = local_p[:, 0] / local_p[:, 1]
+    eta_11 = local_q_A[:, 0] / local_p[:, 1]
+    eta_12 = local_q_A[:, 1] / local_p[:, 1]
+    eta_21 = local_q_B[:, 0] / local_p[:, 1]
+    eta_22 = local_q_B[:, 1] / local_p[:, 1]
+
+    G_T = np.zeros((n_elements, 3, 12))
+    G_T[:, 0, 2] = eta / lengths
+    G_T[:, 0, 3] = 0.5 * eta_12
+    G_T[:, 0, 4] = -0.5 * eta_11
+    G_T[:, 0, 8] = -eta / lengths
+    G_T[:, 0, 9] = 0.5 * eta_22
+    G_T[:, 0, 10] = -0.5 * eta_21
+    G_T[:, 1, 2] = 1 / lengths
+    G_T[:, 1, 8] = -1 / lengths
+    G_T[:, 2, 1] = -1 / lengths
+    G_T[:, 2, 7] = 1 / lengths
+
+    # Variation of the local deformations
+    B = np.zeros((n_elements, 7, 12))
+    B[:, 0, 0] = -1
+    B[:, 0, 6] = 1
+
+    P_A = -G_T
+    P_A[:, :, 3:6] += np.eye(3)
+    P_B = -G_T
+    P_B[:, :, 9:12] += np.eye(3)
+
+    B[:, 1:4] = inverse_tangent_operators(theta_A) @ P_A
+    B[:, 4:7] = inverse_tangent_operators(theta_B) @ P_B
+
+    element_forces = np.einsum("nji,nj->ni", B, local_loads)
+    element_forces = np.einsum(
+        "nij,nbj->nbi", frames, np.reshape(element_forces, (n_elements, 4, 3))
+    )
+
+    return np.reshape(element_forces, (n_elements, 12))
+
+
+# ==================================================================================================
+
+
+def calc_corotational_element_tangents(
+    displacements_A,
+    displacements_B,
+    rotations_A,
+    rotations_B,
+    initial_chords,
+    initial_frames,
+    initial_lengths,
+    K_local,
+    step=1e-6,
+):
+    """Calculates the tangent stiffness matrices of the corotational beam elements, derivative of
+    the internal forces in relation to the nodes displacements and spins. The derivatives are
+    found by central differences of calc_corotational_element_forces, done for all elements at
+    once, the translations steps are scaled by the elements lengths.
+
+    Args:
+        displacements_A, displacements_B, rotations_A, rotations_B, initial_chords,
+        initial_frames, initial_lengths, K_local: same as calc_corotational_element_forces
+        step (float): relative step of the central differences
+
+    Returns:
+        element_tangents (np.array([n_elements, 12, 12])): elements tangent stiffness matrices in
+                                                           global coordinates
+    """
+
+    n_elements = len(K_local)
+    element_tangents = np.zeros((n_elements, 12, 12))
+
+    state = [displacements_A, displacements_B, rotations_A, rotations_B]
+
+    for k in range(12):
+
+        node = k // 6
+        component = k % 6
+
+        if component < 3:
+            h = step * initial_lengths
+        else:
+            h = np.full(n_elements, step)
+
+        forces = []
+
+        for sign in [1, -1]:
+
+            perturbed_state = list(state)
+            perturbation = np.zeros((n_elements, 3))
+            perturbation[:, component % 3] = sign * h
+
+            if component < 3:
+                perturbed_state[node] = state[node] + perturbation
+            else:
+                perturbed_state[2 + node] = (
+                    f.rotation_vectors_to_matrices(perturbation) @ state[2 + node]
+                )
+
+            forces.append(
+                calc_corotational_element_forces(
+                    *perturbed_state, initial_chords, initial_frames, initial_lengths, K_local
+                )
+            )
+
+        element_tangents[:, :, k] = (forces[0] - forces[1]) / (2 * h[:, np.newaxis])
+
+    return element_tangents
+
+
+# ==================================================================================================
+
+
+def corotational_structural_solver(
+    struct_grid,
+    struct_elements,
+    struct_loads,
+    struct_constraints,
+    n_load_steps=1,
+    max_iterations=20,
+    tolerance=1e-8,
+    min_load_step=1e-3,
+    max_rotation_increment=0.5,
+    corotational_model=None,
+    status=False,
+):
+    """Calculates the structure deformations and internal loads with large displacements and
+    rotations, Newton-Raphson iterations with load stepping.
+
+    The loads are applied in n_load_steps equal increments. A load step that does not converge
+    in max_iterations is restarted with half the increment. A load step that converges in less
+    than a quarter of max_iterations doubles the next increment. Each Newton iteration
+    assembles the sparse tangent matrix and factorizes it. The sparsity pattern and the
+    ordering of the degrees of freedom do not change, so they are found only once. Newton
+    increments that rotate a node by more than max_rotation_increment are scaled down. The loads
+    keep their direction in the global coordinate system.
+
+    Args:
+        struct_grid (list): structure nodes grids
+        struct_elements (list): structure finite elements
+        struct_loads (list): list of structures.objects.Load
+        struct_constraints (list): list of structures.objects.Constraint
+        n_load_steps (int): initial number of load steps
+        max_iterations (int): maximum number of Newton iterations per load step
+        tolerance (float): convergence criteria, norm of the residual relative to the norm of the
+                           applied loads
+        min_load_step (float): smallest load factor increment before the solution is aborted
+        max_rotation_increment (float): largest node rotation of a Newton iteration [rad]
+        corotational_model (dict): model created by create_corotational_model, created if None
+        status (bool): print the convergence of each load step
+
+    Returns:
+        deformations (np.array([n_nodes, 6])): nodes displacements and rotation vectors
+        internal_loads (np.array([n_nodes, 6])): nodes internal loads, equal to the applied loads
+                                                 plus the support reactions
+        solver_results (dict): converged, load_factors, iterations of each load step and
+                               n_factorizations
+    """
+
+    start_time = time.time()
+
+    if corotational_model is None:
+        corotational_model = create_corotational_model(
+            struct_grid, struct_elements, struct_constraints
+        )
+
+    n_nodes = corotational_model["n_nodes"]
+    nodes_A = corotational_model["nodes_A"]
+    nodes_B = corotational_model["nodes_B"]
+    free_dof = corotational_model["free_dof"]
+    correlation_vectors = corotational_model["correlation_vectors"]
+    element_data = [
+        corotational_model["initial_chords"],
+        corotational_model["initial_frames"],
+        corotational_model["initial_lengths"],
+        corotational_model["K_local"],
+    ]
+
+    F_global = fem.create_global_load_vector(n_nodes, struct_loads)[:, 0]
+    reference_norm = np.linalg.norm(F_global[free_dof])
+    if reference_norm == 0:
+        reference_norm = 1.0
+
+    # Prescribed deformations are applied from the start
+    X_prescribed = np.reshape(corotational_model["X_prescribed"], (n_nodes, 6))
+    displacements = X_prescribed[:, :3]
+    rotations = f.rotation_vectors_to_matrices(X_prescribed[:, 3:])
+
+    def internal_forces(displacements, rotations):
+
+        element_forces = calc_corotational_element_forces(
+            displacements[nodes_A],
+            displacements[nodes_B],
+            rotations[nodes_A],
+            rotations[nodes_B],
+            *element_data
+        )
+
+        return np.bincount(
+            correlation_vectors.ravel(), element_forces.ravel(), minlength=6 * n_nodes
+        )
+
+    load_factor = 0.0
+    load_step = 1 / n_load_steps
+    load_factors = []
+    step_iterations = []
+    n_factorizations = 0
+    converged = True
+
+    while load_factor < 1 - 1e-12:
+
+        load_step = min(load_step, 1 - load_factor)
+        target_load_factor = load_factor + load_step
+
+        trial_displacements = displacements.copy()
+        trial_rotations = rotations.copy()
+        step_converged = False
+
+        for iteration in range(max_iterations + 1):
+
+            residual = target_load_factor * F_global - internal_forces(
+                trial_displacements, trial_rotations
+            )
+            residual_norm = np.linalg.norm(residual[free_dof])
+
+            if not np.isfinite(residual_norm):
+                break
+
+            if residual_norm <= tolerance * reference_norm:
+                step_converged = True
+                break
+
+            if iteration == max_iterations:
+                break
+
+            element_tangents = calc_corotational_element_tangents(
+                trial_displacements[nodes_A],
+                trial_displacements[nodes_B],
+                trial_rotations[nodes_A],
+                trial_rotations[nodes_B],
+                *element_data
+            )
+
+            K_tangent = fem.assemble_global_matrix(
+                element_tangents, correlation_vectors, 6 * n_nodes
+            )
+
+            try:
+                K_factor = fem.factorize_stiffness_matrix(
+                    K_tangent,
+                    free_dof,
+                    symmetric=False,
+                    permutation=corotational_model["permutation"],
+                )
+            except RuntimeError:
+                break
+
+            n_factorizations += 1
+
+            delta = np.zeros(6 * n_nodes)
+            delta[free_dof] = fem.solve_factorized_stiffness_matrix(K_factor, residual[free_dof])
+            delta = np.reshape(delta, (n_nodes, 6))
+
+            # Large rotation increments are scaled down, they usually overshoot the solution
+            max_rotation = np.max(np.linalg.norm(delta[:, 3:], axis=1))
+            if max_rotation > max_rotation_increment:
+                delta = delta * max_rotation_increment / max_rotation
+
+            trial_displacements = trial_displacements + delta[:, :3]
+            trial_rotations = f.rotation_vectors_to_matrices(delta[:, 3:]) @ trial_rotations
+
+        if step_converged:
+
+            displacements = trial_displacements
+            rotations = trial_rotations
+            load_factor = target_load_factor
+            load_factors.append(load_factor)
+            step_iterations.append(iteration)
+
+            if status:
+                print(f"    . Load factor {load_factor:.4f} converged in {iteration} iterations")
+
+            if iteration <= max_iterations // 4:
+                load_step = 2 * load_step
+
+        else:
+
+            load_step = 0.5 * load_step
+
+            if status:
+                print(f"    . Load factor {target_load_factor:.4f} failed, new step {load_step}")
+
+            if load_step < min_load_step:
+                converged = False
+                break
+
+    deformations = np.zeros((n_nodes, 6))
+    deformations[:, :3] = displacements
+    deformations[:, 3:] = f.rotation_matrices_to_vectors(rotations)
+
+    internal_loads = np.reshape(internal_forces(displacements, rotations), (n_nodes, 6))
+
+    solver_results = {
+        "converged": converged,
+        "load_factors": np.array(load_factors),
+        "iterations": np.array(step_iterations),
+        "n_factorizations": n_factorizations,
+    }
+
+    end_time = time.time()
+
+    if status:
+        print(
+            f"- Nonlinear structural solution - Completed in {str(datetime.timedelta(seconds=(end_time - start_time)))}"
+        )
+
+    return deformations, internal_loads, solver_results
@@ -85,6 +85,7 @@ class ElementProperty(object):
         Izz (float): Moment of inertia of the section in the Z axis
         E (float): Elastic modulus of the material
         G (float): Shear modulus of the material
+        rho (float): Density of the material, zero if not defined
     """
 
     def __init__(self, section, material):
@@ -97,6 +98,7 @@ class ElementProperty(object):
         self.Izz = section.Izz
         self.E = material.elasticity_modulus
         self.G = material.rigidity_modulus
+        self.rho = material.density if material.density is not None else 0
 
 
 # ==================================================================================================
@@ -114,6 +116,7 @@ class RigidConnection(object):
         Izz (float): Moment of inertia of the section in the Z axis
         E (float): Elastic modulus of the material
         G (float): Shear modulus of the material
+        rho (float): Density of the material, rigid connections are massless
     """
 
     def __init__(self):
@@ -126,6 +129,7 @@ class RigidConnection(object):
         self.Izz = 1
         self.E = 1e100
         self.G = 1e100
+        self.rho = 0
 
 
 # ==================================================================================================
@@ -149,11 +153,12 @@ class EulerBeamElement(object):
         Izz (float): Moment of inertia of the section in the Z axis
         E (float): Elastic modulus of the material
         G (float): Shear modulus of the material
+        rho (float): Density of the material
         correlation_vector (np.array): Vector with the indexes of the global DOF that correspond
                                        to the element local DOF
     """
 
-    def __init__(self, node_A, node_B, A, Iyy, Izz, J, E, G, prop_choice="MIDDLE"):
+    def __init__(self, node_A, node_B, A, Iyy, Izz, J, E, G, prop_choice="MIDDLE", rho=0):
 
         self.node_A = node_A
         self.node_B = node_B
@@ -163,6 +168,7 @@ class EulerBeamElement(object):
         self.J = J
         self.E = E
         self.G = G
+        self.rho = rho
         self.L = m.norm(node_B.xyz - node_A.xyz)
         self.prop_choice = prop_choice
 
@@ -275,6 +281,32 @@ class EulerBeamElement(object):
 
         return K_global
 
+    def calc_M_local(self):
+        """ Calculates the local consistent mass matrix of the element.
+
+        Returns:
+            M_local (np.array(dtype=float)): element local mass matrix
+        """
+
+        M_local = f.euler_beam_mass(self.rho, self.A, self.L, self.Iyy, self.Izz)
+
+        return M_local
+
+    def calc_M_global(self):
+        """ Apply the rotation matrix to the local mass matrix and calculate the element global
+            mass matrix.
+
+        Returns:
+            M_global (np.array(dtype=float)): element global mass matrix
+        """
+
+        rotation_matrix = self.calc_rotation_matrix()
+        M_local = self.calc_M_local()
+
+        M_global = rotation_matrix.transpose() @ (M_local @ rotation_matrix)
+
+        return M_global
+
 
 # ==================================================================================================
 
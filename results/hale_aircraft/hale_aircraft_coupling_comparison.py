@@ -0,0 +1,250 @@
+"""
+====================================================================================================
+Comparisson between the iterative aeroelastic loop and the monolithic linear solution, where the
+coupled system (K - q * As) @ u = F_rigid is solved in a single step, for the HALE aircraft.
+
+Author: João Paulo Monteiro Cruvinel da Costa
+====================================================================================================
+"""
+
+# ==================================================================================================
+# IMPORTS
+
+# Import python scientific libraries
+import numpy as np
+import time
+
+# Import code sub packages
+from context import flyingcircus
+from flyingcircus import aeroelasticity as aelast
+
+# ==================================================================================================
+# GEOMETRY DEFINITION
+
+print("# Importing geometric data...")
+from hale_aircraft_data import hale_aircraft
+
+# WING GRID DATA
+N_CHORD_PANELS = 5
+
+STUB_N_SPAN_PANELS = 5
+STUB_N_BEAM_ELEMENTS = 2 * STUB_N_SPAN_PANELS
+
+WING_N_SPAN_PANELS = 23
+WING_N_BEAM_ELEMENTS = 2 * WING_N_SPAN_PANELS
+
+AILERON_N_SPAN_PANELS = 4
+AILERON_N_BEAM_ELEMENTS = 2 * AILERON_N_SPAN_PANELS
+
+CHORD_DISCRETIZATION = "linear"
+SPAN_DISCRETIZATION = "linear"
+TORSION_FUNCTION = "linear"
+CONTROL_SURFACE_DEFLECTION_DICT = {"left_aileron": 0, "right_aileron": 0}
+
+wing_grid_data = {
+    "n_chord_panels": N_CHORD_PANELS,
+    "n_span_panels_list": [
+        AILERON_N_SPAN_PANELS,
+        WING_N_SPAN_PANELS,
+        STUB_N_SPAN_PANELS,
+        STUB_N_SPAN_PANELS,
+        WING_N_SPAN_PANELS,
+        AILERON_N_SPAN_PANELS,
+    ],
+    "n_beam_elements_list": [
+        AILERON_N_BEAM_ELEMENTS,
+        WING_N_BEAM_ELEMENTS,
+        STUB_N_BEAM_ELEMENTS,
+        STUB_N_BEAM_ELEMENTS,
+        WING_N_BEAM_ELEMENTS,
+        AILERON_N_BEAM_ELEMENTS,
+    ],
+    "chord_discretization": CHORD_DISCRETIZATION,
+    "span_discretization_list": [
+        SPAN_DISCRETIZATION,
+        SPAN_DISCRETIZATION,
+        SPAN_DISCRETIZATION,
+        SPAN_DISCRETIZATION,
+        SPAN_DISCRETIZATION,
+        SPAN_DISCRETIZATION,
+    ],
+    "torsion_function_list": [
+        TORSION_FUNCTION,
+        TORSION_FUNCTION,
+        TORSION_FUNCTION,
+        TORSION_FUNCTION,
+        TORSION_FUNCTION,
+        TORSION_FUNCTION,
+    ],
+    "control_surface_deflection_dict": CONTROL_SURFACE_DEFLECTION_DICT,
+}
+
+# --------------------------------------------------------------------------------------------------
+
+# HTAIL GRID DATA
+HTAIL_N_CHORD_PANELS = 5
+
+HTAIL_N_SPAN_PANELS = 5
+HTAIL_N_BEAM_ELEMENTS = 2 * HTAIL_N_SPAN_PANELS
+
+HTAIL_CHORD_DISCRETIZATION = "linear"
+HTAIL_SPAN_DISCRETIZATION = "linear"
+HTAIL_TORSION_FUNCTION = "linear"
+HTAIL_CONTROL_SURFACE_DEFLECTION_DICT = {"left_elevator": 0, "right_elevator": 0}
+
+htail_grid_data = {
+    "n_chord_panels": HTAIL_N_CHORD_PANELS,
+    "n_span_panels_list": [
+        HTAIL_N_SPAN_PANELS,
+        HTAIL_N_SPAN_PANELS,
+    ],
+    "n_beam_elements_list": [
+        HTAIL_N_BEAM_ELEMENTS,
+        HTAIL_N_BEAM_ELEMENTS,
+    ],
+    "chord_discretization": HTAIL_CHORD_DISCRETIZATION,
+    "span_discretization_list": [
+        HTAIL_SPAN_DISCRETIZATION,
+        HTAIL_SPAN_DISCRETIZATION,
+    ],
+    "torsion_function_list": [
+        HTAIL_TORSION_FUNCTION,
+        HTAIL_TORSION_FUNCTION,
+    ],
+    "control_surface_deflection_dict": HTAIL_CONTROL_SURFACE_DEFLECTION_DICT,
+}
+
+# --------------------------------------------------------------------------------------------------
+
+# VTAIL GRID DATA
+VTAIL_N_CHORD_PANELS = 5
+
+VTAIL_N_SPAN_PANELS = 5
+VTAIL_N_BEAM_ELEMENTS = 2 * VTAIL_N_SPAN_PANELS
+
+VTAIL_CHORD_DISCRETIZATION = "linear"
+VTAIL_SPAN_DISCRETIZATION = "linear"
+VTAIL_TORSION_FUNCTION = "linear"
+VTAIL_CONTROL_SURFACE_DEFLECTION_DICT = {"rudder": 0}
+
+vtail_grid_data = {
+    "n_chord_panels": VTAIL_N_CHORD_PANELS,
+    "n_span_panels_list": [
+        VTAIL_N_SPAN_PANELS,
+    ],
+    "n_beam_elements_list": [
+        VTAIL_N_BEAM_ELEMENTS,
+    ],
+    "chord_discretization": VTAIL_CHORD_DISCRETIZATION,
+    "span_discretization_list": [
+        VTAIL_SPAN_DISCRETIZATION,
+    ],
+    "torsion_function_list": [
+        VTAIL_TORSION_FUNCTION,
+    ],
+    "control_surface_deflection_dict": VTAIL_CONTROL_SURFACE_DEFLECTION_DICT,
+}
+# --------------------------------------------------------------------------------------------------
+# FUSELAGE AND TAIL BOOM GRID DATA
+
+fuselage_grid_data = {"n_elements": 2}
+
+tail_boom_grid_data = {"n_elements": 40}
+
+# --------------------------------------------------------------------------------------------------
+# HALE AIRCRAFT GRID DATA
+
+hale_aircraft_grid_data = {
+    "macrosurfaces_grid_data": [wing_grid_data, htail_grid_data, vtail_grid_data],
+    "beams_grid_data": [fuselage_grid_data, tail_boom_grid_data],
+}
+
+# ==================================================================================================
+# STRUCTURE DEFINITION
+
+# Generate Constraints
+cg_fixation = {
+    "component_identifier": "fuselage",
+    "fixation_point": "TIP",
+    "dof_constraints": np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
+}
+
+hale_aircraft_constrains_data = [cg_fixation]
+
+# ==================================================================================================
+# COMPARISSON
+
+# Flight Conditions definition
+V_X = 25
+ALTITUDE = 20000
+CENTER_OF_ROTATION = hale_aircraft.inertial_properties.position
+
+comparisson_results = []
+
+for ALPHA in [1, 2, 3, 4, 5]:
+
+    FLIGHT_CONDITIONS_DATA = {
+        "translation_velocity": np.array([V_X, 0, 0]),
+        "rotation_velocity": np.array([0, 0, 0]),
+        "attitude_angles_deg": np.array([ALPHA, 0, 0]),
+        "center_of_rotation": CENTER_OF_ROTATION,
+        "altitude": ALTITUDE,
+    }
+
+    case_results = {"alpha": ALPHA}
+
+    for COUPLING in ["iterative", "monolithic"]:
+
+        SIMULATION_OPTIONS = {
+            "flexible_aircraft": True,
+            "coupling": COUPLING,
+            "status_messages": False,
+            "control_node_string": "left_elevator-TIP",
+            "max_iterations": 100,
+            "bending_convergence_criteria": 0.01,
+            "torsion_convergence_criteria": 0.01,
+            "fem_prop_choice": "ROOT",
+            "interaction_algorithm": "closest",
+            "output_iteration_results": False,
+        }
+
+        start_time = time.time()
+
+        results = aelast.functions.calculate_aircraft_loads(
+            aircraft_object=hale_aircraft,
+            aircraft_grid_data=hale_aircraft_grid_data,
+            aircraft_constraints_data=hale_aircraft_constrains_data,
+            flight_condition_data=FLIGHT_CONDITIONS_DATA,
+            simulation_options=SIMULATION_OPTIONS,
+            influence_coef_matrix=None,
+        )
+
+        end_time = time.time()
+
+        case_results[COUPLING] = {
+            "tip_deformation": results["deformation_at_control_node"],
+            "run_time": end_time - start_time,
+        }
+
+    comparisson_results.append(case_results)
+
+print()
+print("# Elevator tip deformation, iterative x monolithic coupling")
+print()
+print(
+    f"{'alpha':>6} | {'dz iter':>10} {'dz mono':>10} {'diff %':>8} | {'ry iter':>10} {'ry mono':>10} {'diff %':>8} | {'t iter':>8} {'t mono':>8}"
+)
+
+for case_results in comparisson_results:
+
+    iterative = case_results["iterative"]
+    monolithic = case_results["monolithic"]
+
+    dz_iter = iterative["tip_deformation"][2]
+    dz_mono = monolithic["tip_deformation"][2]
+    ry_iter = iterative["tip_deformation"][4]
+    ry_mono = monolithic["tip_deformation"][4]
+
+    print(
+        f"{case_results['alpha']:6.2f} | {dz_iter:10.4f} {dz_mono:10.4f} {100 * (dz_mono - dz_iter) / dz_iter:8.2f} | {ry_iter:10.4f} {ry_mono:10.4f} {100 * (ry_mono - ry_iter) / ry_iter:8.2f} | {iterative['run_time']:8.2f} {monolithic['run_time']:8.2f}"
+    )
@@ -0,0 +1,146 @@
+"""
+====================================================================================================
+CFD-Based Analysis of Nonlinear Aeroelastic Behavior of High-Aspect Ratio Wings
+
+M. J. Smith, M. J. Patil, D. H. Hodges
+
+Georgia Institute fo Technology, Atlanta
+
+====================================================================================================
+
+Comparisson between the iterative aeroelastic loop and the monolithic linear solution, where the
+coupled system (K - q * As) @ u = F_rigid is solved in a single step.
+
+Author: João Paulo Monteiro Cruvinel da Costa
+"""
+
+# ==================================================================================================
+# IMPORTS
+
+# Import python scientific libraries
+import numpy as np
+import time
+
+# Import code sub packages
+from context import flyingcircus
+from flyingcircus import aeroelasticity as aelast
+
+# ==================================================================================================
+# GEOMETRY DEFINITION
+
+print("# Importing geometric data...")
+from smith_wing_data import smith_wing
+
+# ==================================================================================================
+# GRID CREATION
+
+# Number of panels and finite elements
+N_CHORD_PANELS = 5
+N_SPAN_PANELS = 40
+N_BEAM_ELEMENTS = 2 * N_SPAN_PANELS
+CHORD_DISCRETIZATION = "linear"
+SPAN_DISCRETIZATION = "linear"
+TORSION_FUNCTION = "linear"
+CONTROL_SURFACE_DEFLECTION_DICT = dict()
+
+wing_grid_data = {
+    "n_chord_panels": N_CHORD_PANELS,
+    "n_span_panels_list": [N_SPAN_PANELS, N_SPAN_PANELS],
+    "n_beam_elements_list": [N_BEAM_ELEMENTS, N_BEAM_ELEMENTS],
+    "chord_discretization": CHORD_DISCRETIZATION,
+    "span_discretization_list": [SPAN_DISCRETIZATION, SPAN_DISCRETIZATION],
+    "torsion_function_list": [TORSION_FUNCTION, TORSION_FUNCTION],
+    "control_surface_deflection_dict": CONTROL_SURFACE_DEFLECTION_DICT,
+}
+
+smith_wing_grid_data = {
+    "macrosurfaces_grid_data": [wing_grid_data],
+    "beams_grid_data": None,
+}
+
+# Generate Constraints
+wing_fixation = {
+    "component_identifier": "left_wing",
+    "fixation_point": "ROOT",
+    "dof_constraints": np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
+}
+
+smith_wing_constrains_data = [wing_fixation]
+
+# ==================================================================================================
+# COMPARISSON
+
+# Flight Conditions definition
+V_X = 25
+ALTITUDE = 20000
+CENTER_OF_ROTATION = np.array([0, 0, 0])
+
+comparisson_results = []
+
+for ALPHA in [0.5, 1, 2, 4]:
+
+    FLIGHT_CONDITIONS_DATA = {
+        "translation_velocity": np.array([V_X, 0, 0]),
+        "rotation_velocity": np.array([0, 0, 0]),
+        "attitude_angles_deg": np.array([ALPHA, 0, 0]),
+        "center_of_rotation": CENTER_OF_ROTATION,
+        "altitude": ALTITUDE,
+    }
+
+    case_results = {"alpha": ALPHA}
+
+    for COUPLING in ["iterative", "monolithic"]:
+
+        SIMULATION_OPTIONS = {
+            "flexible_aircraft": True,
+            "coupling": COUPLING,
+            "status_messages": False,
+            "control_node_string": "left_wing-TIP",
+            "max_iterations": 100,
+            "bending_convergence_criteria": 0.001,
+            "torsion_convergence_criteria": 0.001,
+            "fem_prop_choice": "ROOT",
+            "interaction_algorithm": "closest",
+            "output_iteration_results": False,
+        }
+
+        start_time = time.time()
+
+        results = aelast.functions.calculate_aircraft_loads(
+            aircraft_object=smith_wing,
+            aircraft_grid_data=smith_wing_grid_data,
+            aircraft_constraints_data=smith_wing_constrains_data,
+            flight_condition_data=FLIGHT_CONDITIONS_DATA,
+            simulation_options=SIMULATION_OPTIONS,
+            influence_coef_matrix=None,
+        )
+
+        end_time = time.time()
+
+        case_results[COUPLING] = {
+            "tip_deformation": results["deformation_at_control_node"],
+            "run_time": end_time - start_time,
+        }
+
+    comparisson_results.append(case_results)
+
+print()
+print("# Wing tip deformation, iterative x monolithic coupling")
+print()
+print(
+    f"{'alpha':>6} | {'dz iter':>10} {'dz mono':>10} {'diff %':>8} | {'rx iter':>10} {'rx mono':>10} {'diff %':>8} | {'t iter':>8} {'t mono':>8}"
+)
+
+for case_results in comparisson_results:
+
+    iterative = case_results["iterative"]
+    monolithic = case_results["monolithic"]
+
+    dz_iter = iterative["tip_deformation"][2]
+    dz_mono = monolithic["tip_deformation"][2]
+    rx_iter = iterative["tip_deformation"][3]
+    rx_mono = monolithic["tip_deformation"][3]
+
+    print(
+        f"{case_results['alpha']:6.2f} | {dz_iter:10.4f} {dz_mono:10.4f} {100 * (dz_mono - dz_iter) / dz_iter:8.2f} | {rx_iter:10.4f} {rx_mono:10.4f} {100 * (rx_mono - rx_iter) / rx_iter:8.2f} | {iterative['run_time']:8.2f} {monolithic['run_time']:8.2f}"
+    )
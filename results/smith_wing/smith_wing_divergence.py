@@ -0,0 +1,123 @@
+"""
+====================================================================================================
+CFD-Based Analysis of Nonlinear Aeroelastic Behavior of High-Aspect Ratio Wings
+
+M. J. Smith, M. J. Patil, D. H. Hodges
+
+Georgia Institute fo Technology, Atlanta
+
+====================================================================================================
+
+Static divergence analysis, the divergence dynamic pressures are the eigenvalues of the
+generalized problem K @ u = q * As @ u.
+
+Author: João Paulo Monteiro Cruvinel da Costa
+"""
+
+# ==================================================================================================
+# IMPORTS
+
+# Import python scientific libraries
+import numpy as np
+import time
+
+# Import code sub packages
+from context import flyingcircus
+from flyingcircus import aeroelasticity as aelast
+
+# ==================================================================================================
+# GEOMETRY DEFINITION
+
+print("# Importing geometric data...")
+from smith_wing_data import smith_wing
+
+# ==================================================================================================
+# GRID CREATION
+
+# Number of panels and finite elements
+N_CHORD_PANELS = 5
+N_SPAN_PANELS = 40
+N_BEAM_ELEMENTS = 2 * N_SPAN_PANELS
+CHORD_DISCRETIZATION = "linear"
+SPAN_DISCRETIZATION = "linear"
+TORSION_FUNCTION = "linear"
+CONTROL_SURFACE_DEFLECTION_DICT = dict()
+
+wing_grid_data = {
+    "n_chord_panels": N_CHORD_PANELS,
+    "n_span_panels_list": [N_SPAN_PANELS, N_SPAN_PANELS],
+    "n_beam_elements_list": [N_BEAM_ELEMENTS, N_BEAM_ELEMENTS],
+    "chord_discretization": CHORD_DISCRETIZATION,
+    "span_discretization_list": [SPAN_DISCRETIZATION, SPAN_DISCRETIZATION],
+    "torsion_function_list": [TORSION_FUNCTION, TORSION_FUNCTION],
+    "control_surface_deflection_dict": CONTROL_SURFACE_DEFLECTION_DICT,
+}
+
+smith_wing_grid_data = {
+    "macrosurfaces_grid_data": [wing_grid_data],
+    "beams_grid_data": None,
+}
+
+# Generate Constraints
+wing_fixation = {
+    "component_identifier": "left_wing",
+    "fixation_point": "ROOT",
+    "dof_constraints": np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
+}
+
+smith_wing_constrains_data = [wing_fixation]
+
+# ==================================================================================================
+# DIVERGENCE ANALYSIS
+
+# Flight Conditions definition, used only to linearize the aerodynamic loads
+FLIGHT_CONDITIONS_DATA = {
+    "translation_velocity": np.array([25, 0, 0]),
+    "rotation_velocity": np.array([0, 0, 0]),
+    "attitude_angles_deg": np.array([2, 0, 0]),
+    "center_of_rotation": np.array([0, 0, 0]),
+    "altitude": 20000,
+}
+
+SIMULATION_OPTIONS = {
+    "status_messages": True,
+    "fem_prop_choice": "ROOT",
+    "interaction_algorithm": "closest",
+}
+
+start_time = time.time()
+
+results = aelast.functions.divergence(
+    aircraft_object=smith_wing,
+    aircraft_grid_data=smith_wing_grid_data,
+    aircraft_constraints_data=smith_wing_constrains_data,
+    flight_condition_data=FLIGHT_CONDITIONS_DATA,
+    simulation_options=SIMULATION_OPTIONS,
+)
+
+end_time = time.time()
+
+print()
+print("# Lowest divergence dynamic pressures - dense solver")
+print(f"{results['dynamic_pressures'][:4]} Pa")
+print(f"{results['divergence_speeds'][:4]} m/s")
+print(f"Run time: {end_time - start_time} s")
+
+start_time = time.time()
+
+sparse_results = aelast.functions.divergence(
+    aircraft_object=smith_wing,
+    aircraft_grid_data=smith_wing_grid_data,
+    aircraft_constraints_data=smith_wing_constrains_data,
+    flight_condition_data=FLIGHT_CONDITIONS_DATA,
+    simulation_options=SIMULATION_OPTIONS,
+    n_eigenvalues=4,
+)
+
+end_time = time.time()
+
+print()
+print("# Lowest divergence dynamic pressures - sparse shift-invert solver")
+print(f"{sparse_results['dynamic_pressures']} Pa")
+print(f"{sparse_results['divergence_speeds']} m/s")
+print(f"Run time: {end_time - start_time} s")
@@ -0,0 +1,54 @@
+"""
+performance_atmosphere.py
+
+Benchmark of the ISA atmosphere for many altitudes, scalar calls against a single array call and
+the AtmosphereTable interpolation
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import time
+
+import numpy as np
+
+from context import flyingcircus
+from flyingcircus import aerodynamics
+
+# ==================================================================================================
+# BENCHMARK
+
+N_ALTITUDES = 100000
+
+altitudes = np.random.default_rng(0).uniform(0, 20000, N_ALTITUDES)
+
+start_time = time.perf_counter()
+scalar_properties = np.array(
+    [aerodynamics.functions.ISA_properties(altitude) for altitude in altitudes]
+)
+scalar_time = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+array_properties = np.array(aerodynamics.functions.ISA_properties(altitudes)).transpose()
+array_time = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+atmosphere_table = aerodynamics.objects.AtmosphereTable(tolerance=1e-8)
+table_build_time = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+table_properties = np.array(atmosphere_table(altitudes)).transpose()
+table_time = time.perf_counter() - start_time
+
+print(f"# ISA properties of {N_ALTITUDES} altitudes")
+print(f"- scalar calls: {scalar_time:.4f} s")
+print(f"- array call: {array_time:.4f} s, speed-up {scalar_time / array_time:.0f}x")
+print(
+    f"- table: {table_time:.4f} s, build {table_build_time:.4f} s, "
+    f"{len(atmosphere_table.altitudes)} points"
+)
+print(f"- array max relative difference: {np.max(np.abs(array_properties / scalar_properties - 1))}")
+print(f"- table max relative error: {np.max(np.abs(table_properties / array_properties - 1))}")
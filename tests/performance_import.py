@@ -0,0 +1,67 @@
+"""
+performance_import.py
+
+Benchmark of the import time of flyingcircus in fresh python processes, the time a new worker
+process spends before doing any work
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import os
+import subprocess
+import sys
+
+# ==================================================================================================
+# BENCHMARK
+
+N_RUNS = 5
+
+PACKAGE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STATEMENTS = {
+    "import flyingcircus": "import flyingcircus",
+    "import flyingcircus.aeroelasticity": "import flyingcircus.aeroelasticity",
+    "first kernels call": (
+        "import numpy as np\n"
+        "from flyingcircus import mathematics as m\n"
+        "m.rotations.slerp(np.ones((1, 4)), np.ones((1, 4)), np.ones(1))\n"
+        "m.cross_many(np.ones(3), np.ones(3))"
+    ),
+}
+
+TIMER = """
+import sys
+import time
+start_time = time.perf_counter()
+exec(sys.argv[1])
+end_time = time.perf_counter()
+print(end_time - start_time, "matplotlib" in sys.modules)
+"""
+
+env = dict(os.environ, PYTHONPATH=PACKAGE_PATH)
+
+# The first run fills the numba on-disk cache
+subprocess.run(
+    [sys.executable, "-c", TIMER, STATEMENTS["first kernels call"]], env=env, capture_output=True
+)
+
+print(f"# Import time in a fresh process, best of {N_RUNS} runs")
+
+for name, statement in STATEMENTS.items():
+
+    runs = []
+
+    for _ in range(N_RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER, statement], env=env, capture_output=True, text=True
+        ).stdout.split()
+        runs.append((float(output[0]), output[1] == "True"))
+
+    best_time = min(run[0] for run in runs)
+    matplotlib_imported = any(run[1] for run in runs)
+
+    print(f"- {name}: {best_time:.3f} s, matplotlib imported: {matplotlib_imported}")
@@ -0,0 +1,69 @@
+"""
+performance_rotations.py
+
+Benchmark of the batched rotation kernels of mathematics.rotations against pyquaternion objects
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import time
+
+import numpy as np
+
+from pyquaternion import Quaternion
+
+from context import flyingcircus
+from flyingcircus import mathematics as m
+
+# ==================================================================================================
+# BENCHMARK
+
+N_ROTATIONS = 100000
+
+rng = np.random.default_rng(0)
+axes = rng.normal(size=(N_ROTATIONS, 3))
+angles = rng.uniform(-np.pi, np.pi, N_ROTATIONS)
+vectors = rng.normal(size=(N_ROTATIONS, 3))
+amounts = rng.uniform(0.0, 1.0, N_ROTATIONS)
+
+# Compile the kernels before timing them, reversed arrays have their own compiled version
+warm_up_quaternions = m.rotations.axis_angle_to_quaternion(axes[:2], angles[:2])
+m.rotations.rotate_vectors(warm_up_quaternions, vectors[:2])
+m.rotations.quaternion_multiply(warm_up_quaternions, warm_up_quaternions[::-1])
+m.rotations.slerp(warm_up_quaternions, warm_up_quaternions[::-1], amounts[:2])
+
+start_time = time.time()
+quaternions = [Quaternion(axis=axis, angle=angle) for axis, angle in zip(axes, angles)]
+rotated = np.array([q.rotate(vector) for q, vector in zip(quaternions, vectors)])
+products = np.array([(q1 * q2).q for q1, q2 in zip(quaternions, quaternions[::-1])])
+interpolated = np.array(
+    [
+        Quaternion.slerp(q1, q2, amount).q
+        for q1, q2, amount in zip(quaternions, quaternions[::-1], amounts)
+    ]
+)
+pyquaternion_time = time.time() - start_time
+
+start_time = time.time()
+quaternions_array = m.rotations.axis_angle_to_quaternion(axes, angles)
+rotated_batch = m.rotations.rotate_vectors(quaternions_array, vectors)
+products_batch = m.rotations.quaternion_multiply(quaternions_array, quaternions_array[::-1])
+interpolated_batch = m.rotations.slerp(quaternions_array, quaternions_array[::-1], amounts)
+kernels_time = time.time() - start_time
+
+print(f"# Axis-angle, rotate, multiply and slerp, {N_ROTATIONS} rotations")
+print(f"- pyquaternion objects: {pyquaternion_time:.3f} s")
+print(f"- Batched kernels: {kernels_time:.3f} s ({pyquaternion_time / kernels_time:.1f}x)")
+print(f"- Maximum rotated vector difference: {np.max(np.abs(rotated_batch - rotated))}")
+print(f"- Maximum product difference: {np.max(np.abs(products_batch - products))}")
+
+# pyquaternion.Quaternion.slerp may change the sign of its arguments, q and -q are the same rotation
+slerp_difference = np.minimum(
+    np.max(np.abs(interpolated_batch - interpolated), axis=1),
+    np.max(np.abs(interpolated_batch + interpolated), axis=1),
+)
+print(f"- Maximum slerp difference: {np.max(slerp_difference)}")
@@ -0,0 +1,46 @@
+"""
+performance_structures_fem.py
+
+Benchmark of the finite elements matrices calculation, element by element against the batched
+kernel used by structures.fem.create_global_FEM_matrices
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import time
+
+import numpy as np
+
+from context import flyingcircus
+from flyingcircus import structures as struct
+
+from test_structures_fem import random_fem_elements
+
+# ==================================================================================================
+# BENCHMARK
+
+N_ELEMENTS = 10000
+
+nodes, fem_elements = random_fem_elements(n_elements=N_ELEMENTS)
+
+start_time = time.time()
+K_loop = np.stack([fem_element.calc_K_global() for fem_element in fem_elements])
+loop_time = time.time() - start_time
+
+start_time = time.time()
+K_batch = struct.fem.calc_fem_elements_K_global(fem_elements)
+batch_time = time.time() - start_time
+
+start_time = time.time()
+K_global, F_global = struct.fem.create_global_FEM_matrices(nodes, fem_elements, [])
+assembly_time = time.time() - start_time
+
+print(f"# Element stiffness matrices, {N_ELEMENTS} elements")
+print(f"- Element by element: {loop_time:.3f} s")
+print(f"- Batched kernel: {batch_time:.3f} s ({loop_time / batch_time:.1f}x)")
+print(f"- Global sparse assembly: {assembly_time:.3f} s")
+print(f"- Maximum relative difference: {np.max(np.abs(K_batch - K_loop)) / np.max(np.abs(K_loop))}")
@@ -38,6 +38,58 @@ def test_horse_shoe_aero_force():
     print(aero_force)
 
 
+def test_ISA_arrays():
+
+    altitudes = np.array([[-1000.0, 0.0, 5000.0], [11019.0, 20000.0, 80000.0]])
+
+    density, pressure, temperature = aerodynamics.functions.ISA(altitudes)
+
+    print(f"Density: {density}")
+
+    # Array results are the scalar results of each altitude
+    assert np.shape(density) == (2, 3)
+    for i, altitude in np.ndenumerate(altitudes):
+        scalar_density, scalar_pressure, scalar_temperature = aerodynamics.functions.ISA(altitude)
+        assert np.isclose(density[i], scalar_density, rtol=1e-14)
+        assert np.isclose(pressure[i], scalar_pressure, rtol=1e-14)
+        assert np.isclose(temperature[i], scalar_temperature, rtol=1e-14)
+
+    assert isinstance(aerodynamics.functions.ISA(5000)[0], float)
+    assert np.allclose(aerodynamics.functions.ISA(0), (1.225, 101325, 288.15))
+
+
+def test_atmosphere_table():
+
+    tolerance = 1e-8
+    atmosphere_table = aerodynamics.objects.AtmosphereTable(
+        min_altitude=-1000, max_altitude=30000, tolerance=tolerance
+    )
+
+    altitudes = np.random.default_rng(0).uniform(-1000, 30000, 10000)
+
+    exact_properties = np.array(aerodynamics.functions.ISA_properties(altitudes))
+    table_properties = np.array(atmosphere_table(altitudes))
+    relative_error = np.max(np.abs(table_properties / exact_properties - 1))
+
+    print(f"Table points: {len(atmosphere_table.altitudes)}")
+    print(f"Relative error: {relative_error}")
+
+    assert atmosphere_table.max_relative_error <= tolerance
+    assert relative_error <= tolerance
+
+    # Interpolated density decreases with altitude
+    density = atmosphere_table(np.linspace(-1000, 30000, 100001))[0]
+    assert np.all(np.diff(density) < 0)
+
+    assert np.allclose(atmosphere_table(5000.0), aerodynamics.functions.ISA_properties(5000.0))
+
+    try:
+        atmosphere_table(40000.0)
+        assert False
+    except ValueError:
+        pass
+
+
 # ==================================================================================================
 # TESTS
 
@@ -56,3 +108,10 @@ if __name__ == "__main__":
     test_horse_shoe_aero_force()
     print()
 
+    print("- Testing ISA_arrays")
+    test_ISA_arrays()
+    print()
+
+    print("- Testing atmosphere_table")
+    test_atmosphere_table()
+    print()
@@ -0,0 +1,406 @@
+"""
+test_aeroelasticity_functions.py
+
+Testing suite for aeroelasticity functions module
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import numpy as np
+
+from context import flyingcircus
+from flyingcircus import aeroelasticity as aelast
+from flyingcircus import aerodynamics as aero
+from flyingcircus import geometry as geo
+from flyingcircus import structures as struct
+
+# ==================================================================================================
+# TEST WING
+
+# Small version of the Smith wing, a very flexible rectangular wing clamped at the root
+
+MATERIAL = struct.objects.Material("material", 0.75, 1, 1, 1, 1, 1, 1, 1)
+WING_SECTION = geo.objects.Section("NACA 0012", MATERIAL, 2e6, 2e4, 5e6, 1e4, 0.5)
+
+wing_aircraft = geo.objects.Aircraft(
+    name="Test Wing",
+    macrosurfaces=[
+        geo.objects.MacroSurface(
+            position=np.array([0, 0, 0]),
+            incidence=0,
+            surface_list=[
+                geo.objects.Surface(
+                    f"{side}_wing", 1, WING_SECTION, 1, WING_SECTION, 16, 0, 0, 0
+                )
+                for side in ("left", "right")
+            ],
+            symmetry_plane="XZ",
+            torsion_center=0.5,
+        )
+    ],
+    inertial_properties=geo.objects.MaterialPoint(position=np.array([0.25, 0, 0])),
+    ref_area=32,
+    mean_aero_chord=1,
+)
+
+wing_grid_data = {
+    "macrosurfaces_grid_data": [
+        {
+            "n_chord_panels": 2,
+            "n_span_panels_list": [4, 4],
+            "n_beam_elements_list": [4, 4],
+            "chord_discretization": "linear",
+            "span_discretization_list": ["linear", "linear"],
+            "torsion_function_list": ["linear", "linear"],
+            "control_surface_deflection_dict": dict(),
+        }
+    ],
+    "beams_grid_data": None,
+}
+
+wing_constraints_data = [
+    {
+        "component_identifier": "left_wing",
+        "fixation_point": "ROOT",
+        "dof_constraints": np.zeros(6),
+    }
+]
+
+wing_simulation_options = {
+    "flexible_aircraft": True,
+    "status_messages": False,
+    "control_node_string": "right_wing-TIP",
+    "max_iterations": 50,
+    "bending_convergence_criteria": 1e-9,
+    "torsion_convergence_criteria": 1e-9,
+    "fem_prop_choice": "ROOT",
+    "interaction_algorithm": "closest",
+    "output_iteration_results": False,
+}
+
+
+def wing_flight_condition(alpha):
+
+    return {
+        "translation_velocity": np.array([25, 0, 0]),
+        "rotation_velocity": np.array([0, 0, 0]),
+        "attitude_angles_deg": np.array([alpha, 0, 0]),
+        "center_of_rotation": np.array([0, 0, 0]),
+        "altitude": 20000,
+    }
+
+
+# ==================================================================================================
+# TESTS
+
+
+def test_sparse_block_matrix():
+
+    blocks = np.array([np.ones((2, 2)), 2 * np.ones((2, 2))])
+    row_starts = np.array([0, 1])
+    column_starts = np.array([0, 1])
+
+    matrix = aelast.functions.sparse_block_matrix(row_starts, column_starts, blocks, (3, 3))
+
+    print()
+    print("TESTING sparse_block_matrix")
+    print(f"Matrix:")
+    print(f"{matrix.toarray()}")
+
+    expected = np.array([[1.0, 1.0, 0.0], [1.0, 3.0, 2.0], [0.0, 2.0, 2.0]])
+
+    assert np.allclose(matrix.toarray(), expected)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_solve_divergence_eigenproblem():
+
+    K_global = np.diag([1.0, 2.0, 8.0, 3.0])
+    aero_stiffness_matrix = np.diag([5.0, 1.0, 1.0, -1.0])
+    constrained_dof = np.array([True, False, False, False])
+
+    dynamic_pressures, mode_shapes = aelast.functions.solve_divergence_eigenproblem(
+        K_global, aero_stiffness_matrix, constrained_dof
+    )
+
+    print()
+    print("TESTING solve_divergence_eigenproblem")
+    print(f"Dynamic pressures: {dynamic_pressures}")
+
+    assert np.allclose(dynamic_pressures, [2.0, 8.0])
+    assert np.allclose(np.abs(mode_shapes[:, 0]), [0.0, 1.0, 0.0, 0.0])
+
+    sparse_dynamic_pressures, sparse_mode_shapes = aelast.functions.solve_divergence_eigenproblem(
+        K_global, aero_stiffness_matrix, constrained_dof, n_eigenvalues=1
+    )
+
+    assert np.allclose(sparse_dynamic_pressures, [2.0])
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_order_flight_conditions():
+
+    flight_conditions_list = [
+        {
+            "translation_velocity": np.array([25, 0, 0]),
+            "rotation_velocity": np.array([0, 0, 0]),
+            "attitude_angles_deg": np.array([alpha, 0, 0]),
+            "center_of_rotation": np.array([0, 0, 0]),
+            "altitude": 20000,
+        }
+        for alpha in [3, 0.5, 2.5, 1, 2, 1.5]
+    ]
+
+    order, features = aelast.functions.order_flight_conditions(flight_conditions_list)
+
+    print()
+    print("TESTING order_flight_conditions")
+    print(f"Order: {order}")
+
+    assert np.array_equal(order, [1, 3, 5, 4, 2, 0])
+
+    # Only the angle of attack changes, normalized between 0 and 1
+    assert np.array_equal(
+        features,
+        aelast.functions.normalized_flight_conditions_features(flight_conditions_list),
+    )
+    assert np.allclose(features[:, 6], [1, 0, 0.8, 0.2, 0.6, 0.4])
+    assert np.count_nonzero(np.delete(features, 6, axis=1)) == 0
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_aerodynamic_stiffness_matrix():
+
+    flight_condition = wing_flight_condition(0.05)
+
+    aircraft_grids = aelast.functions.generate_aircraft_grids(wing_aircraft, wing_grid_data)
+    aircraft_fem_elements = struct.fem.generate_aircraft_fem_elements(
+        wing_aircraft, aircraft_grids
+    )
+    aircraft_constraints = aelast.functions.generate_aircraft_constraints(
+        wing_aircraft, aircraft_grids, wing_constraints_data
+    )
+    loads_weight_matrices, deformation_weight_matrices = (
+        aelast.functions.calculate_fsi_weight_matrices(wing_aircraft, aircraft_grids, "closest")
+    )
+    n_nodes = aelast.functions.create_aircraft_structural_model(
+        wing_aircraft, aircraft_grids, aircraft_fem_elements, aircraft_constraints
+    )["n_nodes"]
+    loads_transfer_matrix = aelast.functions.calculate_aircraft_loads_transfer_matrix(
+        aircraft_grids, loads_weight_matrices, n_nodes
+    )
+
+    def nodal_loads(aero_grids, influence_coef_matrix=None):
+        aero_results = aero.vlm.aero_loads(
+            aircraft_aero_mesh=aero_grids,
+            velocity_vector=flight_condition["translation_velocity"],
+            rotation_vector=flight_condition["rotation_velocity"],
+            attitude_vector=flight_condition["attitude_angles_deg"],
+            altitude=flight_condition["altitude"],
+            center=flight_condition["center_of_rotation"],
+            influence_coef_matrix=influence_coef_matrix,
+        )
+        force_vector = aelast.functions.force_grid_to_vector(aero_results[3])
+        return loads_transfer_matrix @ force_vector, aero_results
+
+    rigid_loads, aero_results = nodal_loads(aircraft_grids["macrosurfaces_aero_grids"])
+    influence_coef_matrix = aero_results[6]
+
+    aero_stiffness_matrix = aelast.functions.calculate_aerodynamic_stiffness_matrix(
+        aircraft_grids["macrosurfaces_aero_grids"],
+        aircraft_grids["macrosurfaces_struct_grids"],
+        loads_weight_matrices,
+        deformation_weight_matrices,
+        aero_results[5],
+        flight_condition,
+        n_nodes,
+        influence_coef_matrix,
+    )
+    dynamic_pressure = aelast.functions.calculate_dynamic_pressure(flight_condition)
+
+    print()
+    print("TESTING calculate_aerodynamic_stiffness_matrix")
+    print(f"Matrix shape: {aero_stiffness_matrix.shape}")
+
+    assert aero_stiffness_matrix.shape == (6 * n_nodes, 6 * n_nodes)
+
+    # Central finite differences of the nodal loads, the tip node is moved along z, y and
+    # rotated around y
+    tip_node_number = aircraft_grids["macrosurfaces_struct_grids"][0][1][-1].number
+    step = 1e-5
+
+    for dof in [2, 1, 4]:
+
+        perturbed_loads = []
+
+        for signal in [1, -1]:
+            deformations = np.zeros((n_nodes, 6))
+            deformations[tip_node_number, dof] = signal * step
+            deformed_grids, _ = aelast.functions.deform_aircraft_aero_grids(
+                aircraft_grids, deformations, deformation_weight_matrices
+            )
+            perturbed_loads.append(nodal_loads(deformed_grids, influence_coef_matrix)[0])
+
+        finite_difference = (perturbed_loads[0] - perturbed_loads[1]) / (2 * step)
+        finite_difference /= dynamic_pressure
+        column = aero_stiffness_matrix[:, 6 * tip_node_number + dof]
+
+        error = np.max(np.abs(finite_difference - column)) / np.max(np.abs(finite_difference))
+        print(f"DOF {dof} relative error: {error}")
+
+        # As neglects the induced velocity in the Kutta-Joukowski kernel, the error grows with
+        # the circulation
+        assert error < 1e-3
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_monolithic_aeroelastic_solver():
+
+    flight_condition = wing_flight_condition(0.05)
+
+    results = dict()
+
+    for coupling in ["iterative", "monolithic"]:
+        simulation_options = dict(wing_simulation_options, coupling=coupling)
+        results[coupling] = aelast.functions.calculate_aircraft_loads(
+            wing_aircraft,
+            wing_grid_data,
+            flight_condition,
+            simulation_options,
+            wing_constraints_data,
+        )
+
+    iterative_deformations = results["iterative"]["aircraft_struct_deformations"]
+    monolithic_deformations = results["monolithic"]["aircraft_struct_deformations"]
+
+    difference = np.max(np.abs(monolithic_deformations - iterative_deformations))
+    difference /= np.max(np.abs(iterative_deformations))
+
+    print()
+    print("TESTING monolithic_aeroelastic_solver")
+    print(f"Tip deformation: {results['monolithic']['deformation_at_control_node']}")
+    print(f"Relative difference to the iterative solver: {difference}")
+
+    # The monolithic solution is linear, the difference grows with the square of the deflection
+    assert np.max(np.abs(iterative_deformations)) > 0.05
+    assert difference < 1e-3
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_batch_aeroelastic_solver():
+
+    model = aelast.objects.AeroelasticModel(
+        wing_aircraft,
+        wing_grid_data,
+        wing_constraints_data,
+        control_node_string="right_wing-TIP",
+    )
+
+    simulation_options = dict(
+        wing_simulation_options,
+        bending_convergence_criteria=1e-5,
+        torsion_convergence_criteria=1e-5,
+    )
+
+    flight_conditions = [wing_flight_condition(alpha) for alpha in [0.5, 2, 1]]
+
+    sequential_results = [
+        model.solve(flight_condition, simulation_options)
+        for flight_condition in flight_conditions
+    ]
+    batch_results = model.solve_batch(flight_conditions, simulation_options)
+
+    print()
+    print("TESTING batch_aeroelastic_solver")
+
+    for sequential, batch in zip(sequential_results, batch_results):
+
+        sequential_deformations = sequential["aircraft_struct_deformations"]
+        batch_deformations = batch["aircraft_struct_deformations"]
+
+        difference = np.max(np.abs(batch_deformations - sequential_deformations))
+        difference /= np.max(np.abs(sequential_deformations))
+
+        print(f"Tip deformation: {batch['deformation_at_control_node']}")
+        print(
+            f"Iterations: {batch['number_of_iterations']} "
+            f"(sequential {sequential['number_of_iterations']})"
+        )
+        print(f"Relative difference to the sequential solver: {difference}")
+
+        # The sequential solver finds the circulations with GMRES, the batch solver with LU
+        assert difference < 1e-4
+        assert batch["number_of_iterations"] == sequential["number_of_iterations"]
+
+    # The conditions leave the batch at different iterations
+    assert len(set(batch["number_of_iterations"] for batch in batch_results)) > 1
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_divergence():
+
+    grid_data = dict(
+        wing_grid_data["macrosurfaces_grid_data"][0],
+        n_chord_panels=4,
+        n_span_panels_list=[8, 8],
+        n_beam_elements_list=[8, 8],
+    )
+
+    results = aelast.functions.divergence(
+        wing_aircraft,
+        {"macrosurfaces_grid_data": [grid_data], "beams_grid_data": None},
+        wing_constraints_data,
+        wing_flight_condition(1.0),
+        {"status_messages": False},
+    )
+
+    # Strip theory divergence of an unswept clamped wing, q_D = pi² GJ / (4 e c a L²), with the
+    # aerodynamic center a quarter chord ahead of the elastic axis and the lift slope of a high
+    # aspect ratio wing
+    GJ = MATERIAL.rigidity_modulus * WING_SECTION.J
+    aspect_ratio = 32
+    lift_slope = 2 * np.pi * aspect_ratio / (aspect_ratio + 2)
+    strip_theory_dynamic_pressure = np.pi ** 2 * GJ / (4 * 0.25 * 1 * lift_slope * 16 ** 2)
+
+    print()
+    print("TESTING divergence")
+    print(f"Divergence dynamic pressure: {results['divergence_dynamic_pressure']}")
+    print(f"Strip theory divergence dynamic pressure: {strip_theory_dynamic_pressure}")
+
+    assert np.isclose(
+        results["divergence_dynamic_pressure"], strip_theory_dynamic_pressure, rtol=0.05
+    )
+
+    # Symmetric divergence mode, the wing twist grows towards the tips
+    twist = results["mode_shapes"][0][:, 4]
+    assert np.isclose(twist[8], twist[16])
+    assert np.isclose(np.abs(twist[8]), np.max(np.abs(twist)))
+
+
+# ==================================================================================================
+
+if __name__ == "__main__":
+
+    test_sparse_block_matrix()
+    test_solve_divergence_eigenproblem()
+    test_order_flight_conditions()
+    test_aerodynamic_stiffness_matrix()
+    test_monolithic_aeroelastic_solver()
+    test_batch_aeroelastic_solver()
+    test_divergence()
@@ -10,6 +10,9 @@ github: joaopaulomcc
 # ==================================================================================================
 # IMPORTS
 
+import copy
+import pickle
+
 import numpy as np
 import scipy as sc
 import matplotlib.pyplot as plt
@@ -17,6 +20,7 @@ from mpl_toolkits.mplot3d import axes3d
 
 from numpy import sin, cos, tan, pi, dot, cross
 from numpy.linalg import norm
+from pyquaternion import Quaternion
 
 from context import flyingcircus
 from flyingcircus import geometry as geo
@@ -154,6 +158,482 @@ def test_velocity_field_function_generator():
     plt.show()
 
 
+# --------------------------------------------------------------------------------------------------
+
+
+def test_apply_torsion():
+
+    section = geo.objects.Section("section", None, 1e-3, 1e-6, 2e-6, 5e-7, 0.4)
+    surface = geo.objects.Surface("surface", 2.0, section, 1.2, section, 5.0, 30.0, 20.0, 15.0)
+
+    torsion_function = lambda span_position: 0.1 + span_position * surface.tip_torsion_angle_rad
+
+    grid_dict = surface.generate_aero_grid(8, 4, apply_torsion=False)
+    nodes = surface.generate_structure_nodes(6, apply_torsion=False)
+
+    rot_grid_dict = geo.functions.apply_torsion_to_grid(grid_dict, 0.25, torsion_function, surface)
+    rot_nodes_props = geo.functions.apply_torsion_to_nodes(nodes, 0.25, torsion_function, surface)
+
+    print()
+    print("TESTING apply_torsion_to_grid and apply_torsion_to_nodes")
+
+    # Section by section reference
+    for i in range(np.shape(grid_dict["xx"])[1]):
+
+        section_points = geo.functions.grid_to_vector(
+            grid_dict["xx"][:, i], grid_dict["yy"][:, i], grid_dict["zz"][:, i]
+        )
+        span_position = abs(section_points[1, 0]) / surface.span
+        local_chord = surface.root_chord + span_position * (surface.tip_chord - surface.root_chord)
+        section_vector = section_points[:, 1] - section_points[:, 0]
+        rot_center = section_points[:, 0] + 0.25 * local_chord * section_vector / norm(
+            section_vector
+        )
+
+        rot_section_points = geo.functions.rotate_point(
+            section_points, np.array([0, 1, 0]), rot_center, torsion_function(span_position)
+        )
+
+        assert np.allclose(rot_grid_dict["xx"][:, i], rot_section_points[0])
+        assert np.allclose(rot_grid_dict["yy"][:, i], rot_section_points[1])
+        assert np.allclose(rot_grid_dict["zz"][:, i], rot_section_points[2])
+
+    # Node by node reference, the node orientation only rolls around its x axis
+    for node, (xyz, quaternion) in zip(nodes, rot_nodes_props):
+
+        span_position = abs(node.y) / surface.span
+        rot_angle = torsion_function(span_position)
+
+        yaw_pitch_roll = geo.functions.decompose_rotation(
+            np.array([0, 1, 0]), rot_angle, node.x_axis, node.y_axis, node.z_axis
+        )
+        reference_quaternion = Quaternion(axis=node.x_axis, angle=yaw_pitch_roll[2]) * (
+            node.quaternion
+        )
+
+        assert np.isclose(abs(np.dot(quaternion.q, reference_quaternion.q)), 1.0)
+        assert np.isclose(xyz[1], node.y)
+        assert np.allclose(quaternion.rotate([1.0, 0.0, 0.0]), node.x_axis)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_create_structure_node_vector():
+
+    quaternion = Quaternion(axis=[0.0, 0.0, 1.0], angle=0.3)
+
+    component_grids = []
+    for numbers in ([2, 3, 4], [0, 1, 2], [4, 5]):
+        component_grid = []
+        for number in numbers:
+            node = geo.objects.Node(np.array([number, 2.0 * number, 0.0]), quaternion)
+            node.number = number
+            component_grid.append(node)
+        component_grids.append(component_grid)
+
+    node_vector = geo.functions.create_structure_node_vector(component_grids)
+
+    print()
+    print("TESTING create_structure_node_vector")
+    print(f"Node numbers: {node_vector.numbers}")
+
+    assert len(node_vector) == 6
+    assert np.array_equal(node_vector.numbers, np.arange(6))
+    assert np.allclose(node_vector.positions[:, 1], 2.0 * np.arange(6))
+    assert [node.number for node in node_vector] == list(range(6))
+
+    # Views behave as the original nodes
+    node = node_vector[-1]
+    assert isinstance(node, geo.objects.Node)
+    assert not hasattr(node, "__dict__")
+    assert not hasattr(component_grids[0][0], "__dict__")
+    assert node.number == 5
+    assert np.allclose(node.xyz, [5.0, 10.0, 0.0])
+    assert np.allclose(node.x_axis, quaternion.rotate([1.0, 0.0, 0.0]))
+    assert np.allclose(node.translate(np.ones(3)).xyz, [6.0, 11.0, 1.0])
+    assert not node.xyz.flags.writeable
+
+    # Views can be copied and pickled
+    for copied_node in [pickle.loads(pickle.dumps(node)), copy.deepcopy(node), copy.copy(node)]:
+        assert isinstance(copied_node, geo.objects.NodeView)
+        assert copied_node.number == 5
+        assert np.allclose(copied_node.xyz, node.xyz)
+
+    # Tables are returned unchanged
+    assert geo.functions.create_structure_node_vector(node_vector) is node_vector
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_macrosurface_create_grids():
+
+    section = geo.objects.Section("NACA0012", "Aluminium", 1e-3, 1e-6, 2e-6, 5e-7, 0.4)
+
+    surface_list = [
+        geo.objects.Surface(
+            f"surface_{i}", 2, section, 1.2, section, 5, 30, 10 * i - 10, 5, None
+        )
+        for i in range(3)
+    ]
+
+    macrosurface = geo.objects.MacroSurface(
+        np.array([1.0, 0.0, 0.3]), 4.0, surface_list, torsion_center=0.3
+    )
+
+    # End nodes are available before any grid is created
+    root_nodes = macrosurface.root_nodes
+    tip_nodes = macrosurface.tip_nodes
+
+    grids_args = (4, [5, 6, 5], [3, 4, 3], "linear", ["cos"] * 3, ["linear"] * 3)
+
+    aero_grids, nodes_list = macrosurface.create_grids(*grids_args)
+
+    print()
+    print("TESTING MacroSurface.create_grids")
+    print(f"Memoized grids: {len(macrosurface.grids_cache)}")
+
+    for root_node, tip_node, surface_nodes in zip(root_nodes, tip_nodes, nodes_list):
+        assert np.allclose(root_node.xyz, surface_nodes[0].xyz)
+        assert np.allclose(tip_node.xyz, surface_nodes[-1].xyz)
+        assert np.allclose(tip_node.direction_cos, surface_nodes[-1].direction_cos)
+
+    # Same arguments return the memoized grids, new deflections create new grids
+    assert macrosurface.create_grids(*grids_args)[0] is aero_grids
+    assert macrosurface.create_grids(*grids_args, {"surface_1": 0.0})[0] is not aero_grids
+    assert len(macrosurface.grids_cache) == 2
+
+    # Memoized grids are read only and the nodes are new in every call, they are numbered by the
+    # structure functions
+    assert not aero_grids[0]["xx"].flags.writeable
+    new_nodes_list = macrosurface.create_grids(*grids_args)[1]
+    new_nodes_list[0][0].number = 10
+    assert new_nodes_list[0][0] is not nodes_list[0][0]
+    assert nodes_list[0][0].number is None
+    assert np.array_equal(new_nodes_list[2][-1].xyz, nodes_list[2][-1].xyz)
+
+    macrosurface.invalidate_grids()
+    assert not macrosurface.grids_cache
+
+    new_aero_grids, new_nodes_list = macrosurface.create_grids(*grids_args)
+    assert new_aero_grids is not aero_grids
+    assert np.allclose(new_aero_grids[1]["xx"], aero_grids[1]["xx"])
+
+    # Changes of the geometry discard the memoized grids
+    surface_list[2].tip_torsion_angle_rad = np.radians(3)
+    torsion_aero_grids = macrosurface.create_grids(*grids_args)[0]
+    assert torsion_aero_grids is not new_aero_grids
+    assert not np.allclose(torsion_aero_grids[2]["zz"], new_aero_grids[2]["zz"])
+    assert np.array_equal(torsion_aero_grids[1]["zz"], new_aero_grids[1]["zz"])
+
+    macrosurface.position = np.array([1.0, 0.0, 0.5])
+    assert np.allclose(macrosurface.root_nodes[0].xyz[2] - root_nodes[0].xyz[2], 0.2)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_macrosurface_single_grid():
+
+    xx, yy = np.meshgrid(np.arange(9.0), np.arange(4.0))
+    single_grid = {"xx": xx, "yy": yy, "zz": xx * yy}
+
+    macro_surface_mesh = geo.functions.single_grid_to_macrosurface_aero_grid(
+        single_grid, [2, 4, 3]
+    )
+
+    joined_grid = geo.functions.macrosurface_aero_grid_to_single_grid(macro_surface_mesh)
+
+    print()
+    print("TESTING macrosurface_aero_grid_to_single_grid")
+    print(f"Surface grids shapes: {[np.shape(mesh['xx']) for mesh in macro_surface_mesh]}")
+
+    # Surface grids are views of the single grid and joining them does not copy
+    assert np.shape(macro_surface_mesh[1]["xx"]) == (4, 4)
+    assert np.array_equal(macro_surface_mesh[2]["zz"], single_grid["zz"][:, 6:])
+    for key in ("xx", "yy", "zz"):
+        assert np.shares_memory(joined_grid[key], single_grid[key])
+        assert np.array_equal(joined_grid[key], single_grid[key])
+
+    # Independent grids are copied
+    copied_mesh = [{key: np.copy(mesh[key]) for key in mesh} for mesh in macro_surface_mesh]
+    copied_grid = geo.functions.macrosurface_aero_grid_to_single_grid(copied_mesh)
+    assert not np.shares_memory(copied_grid["xx"], copied_mesh[0]["xx"])
+    assert np.array_equal(copied_grid["xx"], single_grid["xx"])
+
+    # Grids out of order are not consecutive column ranges
+    swapped_grid = geo.functions.macrosurface_aero_grid_to_single_grid(macro_surface_mesh[::-1])
+    assert np.array_equal(swapped_grid["xx"][:, :3], single_grid["xx"][:, 6:])
+
+
+def test_flow_field_turbulence():
+
+    velocity_vector = np.array([100, 0, 0])
+    rotation_vector = np.array([0.1, 0.2, -0.3])
+    attitude_vector = np.array([5, 2, 0])
+    center = np.array([1, 0, 0])
+
+    points = np.random.default_rng(0).uniform(-10, 10, (50, 3))
+
+    # Linear turbulence field, trilinear interpolation reproduces it inside the grid
+    def linear_turbulence(point):
+        return np.array([0.1, -0.2, 0.3]) * point[..., [1, 2, 0]]
+
+    x = np.linspace(-10, 10, 5)
+    y = np.linspace(-10, 10, 4)
+    z = np.linspace(-10, 10, 3)
+    grid_points = np.stack(np.meshgrid(x, y, z, indexing="ij"), axis=-1)
+    turbulence_table = geo.objects.TurbulenceTable(x, y, z, linear_turbulence(grid_points))
+
+    still_air = geo.functions.velocity_field_function_generator(
+        velocity_vector, rotation_vector, attitude_vector, center
+    )
+    turbulent_air = geo.functions.velocity_field_function_generator(
+        velocity_vector, rotation_vector, attitude_vector, center, turbulence_table
+    )
+
+    # Turbulence function that only accepts a single point is evaluated point by point
+    point_turbulent_air = geo.functions.velocity_field_function_generator(
+        velocity_vector, rotation_vector, attitude_vector, center, lambda point: np.zeros(3)
+    )
+
+    print()
+    print("TESTING FlowField and TurbulenceTable")
+    print(f"Velocity at first point: {turbulent_air(points[0])}")
+
+    # Array evaluation matches point by point evaluation
+    still_velocity = still_air(points)
+    assert np.shape(still_velocity) == (50, 3)
+    for point, velocity in zip(points, still_velocity):
+        expected = still_air.cg_velocity - np.cross(rotation_vector, point - center)
+        assert np.allclose(velocity, expected)
+        assert np.allclose(still_air(point), expected)
+
+    assert np.allclose(turbulent_air(points) - still_velocity, linear_turbulence(points))
+    assert np.allclose(turbulence_table(points[0]), linear_turbulence(points[0]))
+    assert np.allclose(point_turbulent_air(points), still_velocity)
+
+    # Points outside of the grid take the velocity of the grid boundary
+    assert np.allclose(
+        turbulence_table(np.array([20.0, 0.0, -15.0])),
+        linear_turbulence(np.array([10.0, 0.0, -10.0])),
+    )
+
+
+def test_spatial_index():
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1, 1, (500, 3))
+    query_points = rng.uniform(-1, 1, (50, 3))
+
+    spatial_index = geo.objects.SpatialIndex(points)
+
+    def brute_force_nearest(points, k):
+        distances = np.linalg.norm(points[np.newaxis] - query_points[:, np.newaxis], axis=2)
+        return np.sort(distances, axis=1)[:, :k], distances
+
+    # Small displacements do not rebuild the tree and the queries stay exact
+    moved_points = points + rng.uniform(-1, 1, (500, 3)) * 0.2 * spatial_index.rebuild_distance
+    spatial_index.update(moved_points)
+
+    print()
+    print("TESTING SpatialIndex")
+    print(f"Max displacement: {spatial_index.max_displacement}")
+    assert spatial_index.max_displacement > 0
+
+    nearest_distances, indexes = spatial_index.query_nearest(query_points, 5)
+    expected_distances, distances = brute_force_nearest(moved_points, 5)
+    assert np.allclose(nearest_distances, expected_distances)
+
+    for i, indexes in enumerate(spatial_index.query_radius(query_points, 0.3)):
+        assert np.array_equal(indexes, np.flatnonzero(distances[i] <= 0.3))
+
+    # Large displacements rebuild the tree
+    spatial_index.update(moved_points + 1)
+    assert spatial_index.max_displacement == 0
+
+    # Ties are broken towards the last reference point, as in a linear scan
+    reference_points = np.array([[0.0, -1.0, 0.0], [0.0, 1.0, 0.0], [5.0, 0.0, 0.0]])
+    closest_indexes = geo.functions.closest_points_indexes(
+        np.array([[0.0, 0.0, 0.0], [4.0, 0.0, 0.0]]), reference_points
+    )
+    assert np.array_equal(closest_indexes, [1, 2])
+
+    # More ties than the nearest neighbours of a default query, duplicated junction nodes
+    reference_points = np.concatenate([np.zeros((6, 3)), np.ones((6, 3))])
+    closest_indexes = geo.functions.closest_points_indexes(
+        np.array([[0.1, 0.0, 0.0], [0.9, 1.0, 1.0]]), reference_points
+    )
+    assert np.array_equal(closest_indexes, [5, 11])
+
+
+def test_aircraft_spatial_index():
+
+    # Flat wing with 2 chord panels and 4 span panels in two surfaces
+    yy, xx = np.meshgrid([0.0, 1.0, 2.0, 2.0, 3.0, 4.0], np.arange(3.0))
+    single_grid = {"xx": xx, "yy": yy, "zz": np.zeros_like(xx)}
+    macro_surface_mesh = geo.functions.single_grid_to_macrosurface_aero_grid(single_grid, [3, 3])
+
+    nodes = []
+    for i, y in enumerate(np.arange(5.0)):
+        node = geo.objects.Node(np.array([0.5, y, 0.0]), Quaternion())
+        node.number = i
+        nodes.append(node)
+
+    aircraft_grids = {
+        "macrosurfaces_aero_grids": [macro_surface_mesh],
+        "macrosurfaces_struct_grids": [[nodes[:3], nodes[2:]]],
+        "beams_struct_grids": None,
+    }
+
+    spatial_index = geo.objects.AircraftSpatialIndex(aircraft_grids)
+
+    print()
+    print("TESTING AircraftSpatialIndex")
+    print(f"Number of panels: {len(spatial_index.panel_corners)}")
+
+    # Panels are ordered as in the aircraft panel vector
+    panel_vector = flyingcircus.aerodynamics.vlm.flatten(
+        flyingcircus.aerodynamics.vlm.create_panel_grid(macro_surface_mesh)
+    )
+    assert len(panel_vector) == 8
+    for panel, aero_center in zip(panel_vector, spatial_index.aero_centers):
+        assert np.allclose(panel.aero_center, aero_center)
+
+    distances, indexes = spatial_index.nearest_nodes(np.array([[0.0, 2.9, 1.0]]))
+    assert spatial_index.node_numbers[indexes[0, 0]] == 3
+
+    distances, indexes = spatial_index.nearest_panels(np.array([[1.25, 3.5, 0.0]]))
+    assert np.allclose(panel_vector[indexes[0, 0]].aero_center, [1.25, 3.5, 0.0])
+
+    # Rays hit the first panel in their way
+    distances, indexes = spatial_index.ray_panels(
+        np.array([[1.5, 0.5, 2.0], [1.5, 0.5, 2.0], [9.0, 9.0, 2.0]]),
+        np.array([[0.0, 0.0, -1.0], [0.0, 0.0, 1.0], [0.0, 0.0, -1.0]]),
+    )
+    assert np.allclose(distances, [2.0, np.inf, np.inf])
+    assert np.allclose(panel_vector[indexes[0]].aero_center, [1.25, 0.5, 0.0])
+    assert np.array_equal(indexes[1:], [-1, -1])
+
+    # Bound vortices at x = 0.25 and 1.25
+    indexes_list = spatial_index.bound_vortices_within(np.array([[0.25, 1.5, 0.05]]), 0.1)
+    assert np.allclose(spatial_index.bound_vortices[indexes_list[0]][:, :, 0], 0.25)
+    assert len(indexes_list[0]) == 1
+
+    # Deformed grid, the wing moves up
+    deformed_mesh = [
+        {"xx": mesh["xx"], "yy": mesh["yy"], "zz": mesh["zz"] + 0.01} for mesh in macro_surface_mesh
+    ]
+    spatial_index.update([deformed_mesh], spatial_index.node_positions + [0.0, 0.0, 0.01])
+    distances, indexes = spatial_index.ray_panels(
+        np.array([[1.5, 0.5, 2.0]]), np.array([[0.0, 0.0, -1.0]])
+    )
+    assert np.allclose(distances, [1.99])
+    assert len(spatial_index.nodes_within(np.array([[0.5, 2.0, 0.0]]), 0.02)[0]) == 1
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_macrosurface_morpher():
+
+    section = geo.objects.Section("NACA0012", "Aluminium", 1e-3, 1e-6, 2e-6, 5e-7, 0.4)
+
+    def create_macrosurface(incidence, dihedral, tip_torsion):
+        surface_list = [
+            geo.objects.Surface("left_tip", 1.0, section, 0.6, section, 3, 10, 5, -2, 0.7),
+            geo.objects.Surface("left", 1.2, section, 1.0, section, 4, 10, dihedral, tip_torsion),
+            geo.objects.Surface("right", 1.2, section, 1.0, section, 4, 10, dihedral, tip_torsion),
+            geo.objects.Surface("right_tip", 1.0, section, 0.6, section, 3, 10, 5, -2, 0.7),
+        ]
+
+        return geo.objects.MacroSurface(
+            np.array([1.0, 0.0, 0.3]), incidence, surface_list, "XZ", torsion_center=0.3
+        )
+
+    grid_data = {
+        "n_chord_panels": 5,
+        "n_span_panels_list": [4, 5, 5, 4],
+        "n_beam_elements_list": [2, 2, 2, 2],
+        "chord_discretization": "cos",
+        "span_discretization_list": ["linear"] * 4,
+        "torsion_function_list": ["linear"] * 4,
+        "control_surface_deflection_dict": {"right_tip": 3.0},
+    }
+
+    def create_grids(macrosurface, control_surface_deflection_dict):
+        grids_args = [grid_data[key] for key in list(grid_data)[:-1]]
+        return macrosurface.create_grids(*grids_args, control_surface_deflection_dict)[0]
+
+    def max_difference(mesh_1, mesh_2):
+        return max(
+            np.max(np.abs(grid_1[key] - grid_2[key]))
+            for grid_1, grid_2 in zip(mesh_1, mesh_2)
+            for key in ("xx", "yy", "zz")
+        )
+
+    macrosurface = create_macrosurface(2.0, 10.0, 1.0)
+    morpher = geo.objects.MacroSurfaceMorpher(macrosurface, grid_data)
+    mesh = morpher.grids()
+
+    print()
+    print("TESTING MacroSurfaceMorpher")
+
+    # The reference grid is not the memoized grid
+    reference_mesh = create_grids(macrosurface, {"right_tip": 3.0})
+    assert not np.shares_memory(mesh[0]["xx"], reference_mesh[0]["xx"])
+    assert max_difference(mesh, reference_mesh) == 0
+
+    vlm = flyingcircus.aerodynamics.vlm
+    panel_vector, _, _, _ = vlm.create_aircraft_panel_vector([mesh])
+    n_panels = len(panel_vector)
+    influence_coef_matrix = vlm.update_influence_matrix(
+        np.zeros((n_panels, n_panels)), panel_vector, range(n_panels)
+    )
+
+    # Control surfaces deflections only move the panels behind the hinge lines
+    morpher.set_control_surface_deflection("right_tip", -8.0)
+    morpher.set_control_surface_deflection("left_tip", 5.0)
+    deflections = {"right_tip": -8.0, "left_tip": 5.0}
+    panel_indexes = morpher.collect_changed_panels()
+    print(f"Changed panels: {len(panel_indexes)} of {n_panels}")
+    assert max_difference(mesh, create_grids(macrosurface, deflections)) < 1e-12
+    assert len(panel_indexes) == 8
+    assert len(morpher.collect_changed_panels()) == 0
+
+    vlm.update_panel_vector(panel_vector, [mesh], panel_indexes)
+    vlm.update_influence_matrix(influence_coef_matrix, panel_vector, panel_indexes)
+    new_panel_vector, _, _, _ = vlm.create_aircraft_panel_vector(
+        [create_grids(macrosurface, deflections)]
+    )
+    new_influence_coef_matrix = vlm.update_influence_matrix(
+        np.zeros((n_panels, n_panels)), new_panel_vector, range(n_panels)
+    )
+    assert np.allclose(influence_coef_matrix, new_influence_coef_matrix, rtol=0, atol=1e-12)
+    assert np.allclose(
+        new_influence_coef_matrix,
+        vlm.calc_influence_matrix(new_panel_vector),
+        rtol=0,
+        atol=1e-12,
+    )
+
+    # Incidence, twist and dihedral changes
+    morpher.set_incidence(-1.5)
+    morpher.set_twist("right", lambda span_position: np.radians(1.5) * span_position)
+    morpher.set_twist("left", lambda span_position: np.radians(1.5) * span_position)
+    morpher.set_dihedral("right", 20.0)
+    morpher.set_dihedral("left", 20.0)
+    assert len(morpher.collect_changed_panels()) == n_panels
+
+    new_macrosurface = create_macrosurface(-1.5, 20.0, 2.5)
+    assert max_difference(mesh, create_grids(new_macrosurface, deflections)) < 1e-12
+
+    morpher.set_control_surface_deflection("right_tip", 6.0)
+    deflections["right_tip"] = 6.0
+    assert max_difference(mesh, create_grids(new_macrosurface, deflections)) < 1e-12
+
+
 # ==================================================================================================
 # TESTS
 
@@ -182,3 +662,35 @@ if __name__ == "__main__":
     print("# velocity_field_function_generator")
     test_velocity_field_function_generator()
     print()
+
+    print("# apply_torsion")
+    test_apply_torsion()
+    print()
+
+    print("# create_structure_node_vector")
+    test_create_structure_node_vector()
+    print()
+
+    print("# macrosurface_create_grids")
+    test_macrosurface_create_grids()
+    print()
+
+    print("# macrosurface_single_grid")
+    test_macrosurface_single_grid()
+    print()
+
+    print("# flow_field_turbulence")
+    test_flow_field_turbulence()
+    print()
+
+    print("# spatial_index")
+    test_spatial_index()
+    print()
+
+    print("# aircraft_spatial_index")
+    test_aircraft_spatial_index()
+    print()
+
+    print("# macrosurface_morpher")
+    test_macrosurface_morpher()
+    print()
@@ -0,0 +1,121 @@
+"""
+test_mathematics_rotations.py
+
+Testing suite for mathematics rotations module
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import numpy as np
+
+from pyquaternion import Quaternion
+
+from context import flyingcircus
+from flyingcircus import mathematics as m
+
+# ==================================================================================================
+# TESTS
+
+
+def random_rotations(n_rotations=50, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    axes = rng.normal(size=(n_rotations, 3))
+    angles = rng.uniform(-np.pi, np.pi, n_rotations)
+
+    return axes, angles
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_quaternion_kernels():
+
+    axes, angles = random_rotations()
+    axes_2, angles_2 = random_rotations(seed=1)
+    vectors = np.random.default_rng(2).normal(size=(len(angles), 3))
+    amounts = np.linspace(0.0, 1.0, len(angles))
+
+    quaternions = m.rotations.axis_angle_to_quaternion(axes, angles)
+    quaternions_2 = m.rotations.axis_angle_to_quaternion(axes_2, angles_2)
+
+    ref_quaternions = [Quaternion(axis=axis, angle=angle) for axis, angle in zip(axes, angles)]
+    ref_quaternions_2 = [
+        Quaternion(axis=axis, angle=angle) for axis, angle in zip(axes_2, angles_2)
+    ]
+    ref_products = [(q1 * q2).q for q1, q2 in zip(ref_quaternions, ref_quaternions_2)]
+
+    products = m.rotations.quaternion_multiply(quaternions, quaternions_2)
+    matrices = m.rotations.quaternion_to_matrix(quaternions)
+    rotated_vectors = m.rotations.rotate_vectors(quaternions, vectors)
+    interpolated = m.rotations.slerp(quaternions, quaternions_2, amounts)
+
+    print()
+    print("TESTING quaternion kernels")
+    print(f"Maximum product difference: {np.max(np.abs(products - ref_products))}")
+
+    assert np.allclose(quaternions, [q.q for q in ref_quaternions])
+    assert np.allclose(products, ref_products)
+    assert np.allclose(matrices, [q.rotation_matrix for q in ref_quaternions])
+    assert np.allclose(
+        rotated_vectors, [q.rotate(vector) for q, vector in zip(ref_quaternions, vectors)]
+    )
+    assert np.allclose(
+        interpolated,
+        [
+            Quaternion.slerp(q1, q2, amount).q
+            for q1, q2, amount in zip(ref_quaternions, ref_quaternions_2, amounts)
+        ],
+    )
+
+    # Null axes are the identity
+    assert np.allclose(
+        m.rotations.axis_angle_to_quaternion(np.zeros((1, 3)), np.ones(1)), [[1, 0, 0, 0]]
+    )
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_rotation_vector_kernels():
+
+    axes, angles = random_rotations()
+    rotation_vectors = axes / np.linalg.norm(axes, axis=1)[:, np.newaxis] * angles[:, np.newaxis]
+    rotation_vectors_2 = np.flip(rotation_vectors, axis=0)
+
+    matrices = m.rotations.rotation_vector_to_matrix(rotation_vectors)
+    composed = m.rotations.compose_rotation_vectors(rotation_vectors, rotation_vectors_2)
+
+    print()
+    print("TESTING rotation vector kernels")
+    print(f"Maximum composition angle: {np.max(np.linalg.norm(composed, axis=1))}")
+
+    assert np.allclose(matrices, m.rotations.axis_angle_to_matrix(axes, angles))
+    assert np.allclose(
+        m.rotations.quaternion_to_rotation_vector(
+            m.rotations.rotation_vector_to_quaternion(rotation_vectors)
+        ),
+        rotation_vectors,
+    )
+    assert np.allclose(
+        m.rotations.rotation_vector_to_matrix(composed),
+        matrices @ m.rotations.rotation_vector_to_matrix(rotation_vectors_2),
+    )
+    assert np.all(np.linalg.norm(composed, axis=1) <= np.pi + 1e-12)
+
+    # Small rotations use the series expansion
+    small_vectors = np.array([[0.0, 0.0, 0.0], [1e-9, 0.0, 0.0]])
+    assert np.allclose(m.rotations.rotation_vector_to_matrix(small_vectors), np.identity(3))
+
+
+# ==================================================================================================
+
+if __name__ == "__main__":
+
+    test_quaternion_kernels()
+    test_rotation_vector_kernels()
@@ -0,0 +1,87 @@
+"""
+test_mathematics_vectors.py
+
+Testing suite for mathematics vectors module
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import numpy as np
+
+from context import flyingcircus
+from flyingcircus import mathematics as m
+
+# ==================================================================================================
+# TESTS
+
+
+def test_array_wise_kernels():
+
+    rng = np.random.default_rng(0)
+    vectors_1 = rng.normal(size=(200, 3))
+    vectors_2 = rng.normal(size=(200, 3))
+
+    cross_products = m.cross_many(vectors_1, vectors_2)
+    dot_products = m.dot_many(vectors_1, vectors_2)
+    norms = m.norm_many(vectors_1)
+    normalized = m.normalize_many(vectors_1)
+
+    print()
+    print("TESTING array-wise vector kernels")
+    print(f"Maximum norm difference: {np.max(np.abs(norms - np.linalg.norm(vectors_1, axis=1)))}")
+
+    assert np.allclose(cross_products, [m.cross(a, b) for a, b in zip(vectors_1, vectors_2)])
+    assert np.allclose(dot_products, [m.dot(a, b) for a, b in zip(vectors_1, vectors_2)])
+    assert np.allclose(norms, [m.norm(a) for a in vectors_1])
+    assert np.allclose(normalized, [m.normalize(a) for a in vectors_1])
+
+    # Results are written to the out buffers, single vectors are broadcast
+    out = np.empty((200, 3))
+    result = m.cross_many(vectors_1, vectors_2[0], out=out)
+    assert result is out
+    assert np.allclose(out, np.cross(vectors_1, vectors_2[0]))
+
+    out = np.empty(200)
+    m.norm_many(vectors_2, out=out)
+    assert np.allclose(out, np.linalg.norm(vectors_2, axis=1))
+
+    # Null vectors are not normalized and only 3d vectors have cross products
+    assert np.array_equal(m.normalize_many(np.zeros((2, 3))), np.zeros((2, 3)))
+    assert np.all(np.isnan(m.cross_many(np.ones(2), np.ones(2))))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_cross_product_matrices():
+
+    vectors = np.array([[1.0, 2.0, 3.0], [-4.0, 0.5, 2.0]])
+    other_vectors = np.array([[0.5, -1.0, 2.0], [3.0, 1.0, -2.0]])
+
+    matrices = m.cross_product_matrices(vectors)
+
+    print()
+    print("TESTING cross_product_matrices")
+    print(f"Matrices shape: {matrices.shape}")
+
+    for matrix, a, b in zip(matrices, vectors, other_vectors):
+        assert np.allclose(matrix @ b, np.cross(a, b))
+
+    # Single vectors and arrays with more dimensions keep the leading shape
+    assert m.cross_product_matrices(vectors[0]).shape == (1, 3, 3)
+
+    stacked = m.cross_product_matrices(np.stack([vectors, other_vectors]))
+    assert stacked.shape == (2, 2, 3, 3)
+    assert np.allclose(stacked[1, 0] @ vectors[0], np.cross(other_vectors[0], vectors[0]))
+
+
+# ==================================================================================================
+
+if __name__ == "__main__":
+
+    test_array_wise_kernels()
+    test_cross_product_matrices()
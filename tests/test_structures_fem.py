@@ -0,0 +1,651 @@
+"""
+test_structures_fem.py
+
+Testing suite for structures fem module
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import pickle
+
+import numpy as np
+
+from pyquaternion import Quaternion
+
+from context import flyingcircus
+from flyingcircus import geometry as geo
+from flyingcircus import structures as struct
+
+# ==================================================================================================
+# SAMPLE STRUCTURE
+
+
+def cantilever_beam(n_elements=10):
+
+    material = struct.objects.Material(
+        name="material",
+        density=2700,
+        elasticity_modulus=70e9,
+        rigidity_modulus=27e9,
+    )
+
+    section = geo.objects.Section(
+        identifier="section",
+        material=material,
+        area=1e-3,
+        Iyy=1e-6,
+        Izz=2e-6,
+        J=5e-7,
+        shear_center=0.5,
+    )
+
+    beam_property = struct.objects.ElementProperty(section=section, material=material)
+
+    beam = geo.objects.Beam(
+        identifier="beam",
+        root_point=np.array([0.0, 0.0, 0.0]),
+        tip_point=np.array([0.0, 2.0, 0.0]),
+        orientation_vector=np.array([0.0, 0.0, 1.0]),
+        ElementProperty=beam_property,
+    )
+
+    beam_struct_grid = beam.create_grid(n_elements=n_elements)
+    struct_grid = [beam_struct_grid]
+
+    struct.fem.number_nodes([beam], struct_grid, [])
+
+    struct_elements = [
+        struct.fem.generate_beam_fem_elements(
+            beam=beam, beam_nodes_list=beam_struct_grid, prop_choice="ROOT"
+        )
+    ]
+
+    struct_constraints = [
+        struct.objects.Constraint(
+            application_node=beam_struct_grid[0],
+            dof_constraints=np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
+        )
+    ]
+
+    struct_loads = [
+        struct.objects.Load(
+            application_node=beam_struct_grid[-1],
+            load=np.array([0.0, 0.0, -100.0, 10.0, 0.0, 0.0]),
+        )
+    ]
+
+    return struct_grid, struct_elements, struct_constraints, struct_loads
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def random_fem_elements(n_elements=6, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    nodes = []
+    for i in range(n_elements + 1):
+        node = geo.objects.Node(rng.standard_normal(3), Quaternion(rng.standard_normal(4)))
+        node.number = i
+        nodes.append(node)
+
+    fem_elements = []
+    for i in range(n_elements):
+        fem_elements.append(
+            struct.objects.EulerBeamElement(
+                node_A=nodes[i],
+                node_B=nodes[i + 1],
+                A=rng.uniform(1e-4, 1e-2),
+                Iyy=rng.uniform(1e-7, 1e-5),
+                Izz=rng.uniform(1e-7, 1e-5),
+                J=rng.uniform(1e-7, 1e-5),
+                E=70e9,
+                G=27e9,
+                prop_choice=["ROOT", "TIP", "MIDDLE"][i % 3],
+                rho=2700,
+            )
+        )
+
+    return nodes, fem_elements
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def frame_structure(n_elements=8):
+
+    material = struct.objects.Material(
+        name="material",
+        density=2700,
+        elasticity_modulus=70e9,
+        rigidity_modulus=27e9,
+    )
+
+    section = geo.objects.Section(
+        identifier="section",
+        material=material,
+        area=1e-3,
+        Iyy=1e-6,
+        Izz=2e-6,
+        J=5e-7,
+        shear_center=0.5,
+    )
+
+    beam_property = struct.objects.ElementProperty(section=section, material=material)
+
+    # Clamped beam with two beams connected to its tip
+    beams = []
+    for identifier, root_point, tip_point in [
+        ("beam", [0.0, 0.0, 0.0], [0.0, 2.0, 0.0]),
+        ("tail", [0.0, 2.0, 0.0], [1.5, 2.0, 0.0]),
+        ("fin", [0.0, 2.0, 0.0], [0.0, 2.0, 1.0]),
+    ]:
+        beams.append(
+            geo.objects.Beam(
+                identifier=identifier,
+                root_point=np.array(root_point),
+                tip_point=np.array(tip_point),
+                orientation_vector=np.array([0.0, 1.0, 1.0]),
+                ElementProperty=beam_property,
+            )
+        )
+
+    struct_grid = [beam.create_grid(n_elements=n_elements) for beam in beams]
+
+    connections = [
+        struct.objects.Connection(beams[0], "TIP", beams[1], "ROOT"),
+        struct.objects.Connection(beams[0], "TIP", beams[2], "ROOT"),
+    ]
+
+    struct.fem.number_nodes(beams, struct_grid, connections)
+
+    struct_elements = [
+        struct.fem.generate_beam_fem_elements(
+            beam=beam, beam_nodes_list=beam_struct_grid, prop_choice="ROOT"
+        )
+        for beam, beam_struct_grid in zip(beams, struct_grid)
+    ]
+
+    struct_constraints = [
+        struct.objects.Constraint(
+            application_node=struct_grid[0][0],
+            dof_constraints=np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
+        )
+    ]
+
+    struct_loads = [
+        struct.objects.Load(
+            application_node=node, load=np.array([1.0, -2.0, -5.0, 0.5, 0.2, -0.1])
+        )
+        for beam_struct_grid in struct_grid
+        for node in beam_struct_grid[1:]
+    ]
+
+    return struct_grid, struct_elements, struct_constraints, struct_loads
+
+
+# ==================================================================================================
+# TESTS
+
+
+def test_number_nodes():
+
+    material = struct.objects.Material(
+        name="material", density=2700, elasticity_modulus=70e9, rigidity_modulus=27e9
+    )
+
+    section = geo.objects.Section(
+        identifier="section",
+        material=material,
+        area=1e-3,
+        Iyy=1e-6,
+        Izz=2e-6,
+        J=5e-7,
+        shear_center=0.5,
+    )
+
+    beam_property = struct.objects.ElementProperty(section=section, material=material)
+
+    beams_points = [
+        [[0.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+        [[0.0, 0.0, 0.0], [0.0, -1.0, 0.0]],
+        [[0.0, -1.0, 0.0], [0.0, -1.0, 1.0]],
+    ]
+
+    beams = []
+    for i, (root_point, tip_point) in enumerate(beams_points):
+        beams.append(
+            geo.objects.Beam(
+                identifier=f"beam_{i}",
+                root_point=np.array(root_point),
+                tip_point=np.array(tip_point),
+                orientation_vector=np.array([1.0, 0.0, 0.0]),
+                ElementProperty=beam_property,
+            )
+        )
+
+    beams_grids = [beam.create_grid(n_elements=3) for beam in beams]
+
+    # beam_0 and beam_1 share the root, beam_2 starts at the tip of beam_1
+    connections = [
+        struct.objects.Connection(beams[0], "ROOT", beams[1], "ROOT"),
+        struct.objects.Connection(beams[1], "TIP", beams[2], "ROOT"),
+    ]
+
+    node_numbers = struct.fem.number_nodes(beams, beams_grids, connections)
+
+    numbers = [[node.number for node in beam_grid] for beam_grid in beams_grids]
+
+    print()
+    print("TESTING number_nodes")
+    print(f"Nodes numbers: {numbers}")
+    print(f"ROOT and TIP nodes numbers: {node_numbers}")
+
+    assert numbers == [[0, 1, 2, 3], [0, 4, 5, 6], [6, 7, 8, 9]]
+    assert node_numbers["beam_1-TIP"] == node_numbers["beam_2-ROOT"] == 6
+
+    # Chained connections belong to the same group
+    node_equivalence = struct.fem.create_connection_graph(
+        connections + [struct.objects.Connection(beams[2], "ROOT", beams[0], "TIP")]
+    )
+
+    assert node_equivalence["beam_0-TIP"] == node_equivalence["beam_1-TIP"]
+    assert node_equivalence["beam_0-ROOT"] != node_equivalence["beam_1-TIP"]
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_factorized_FEM_solver():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    structural_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints
+    )
+
+    n_nodes = structural_model["n_nodes"]
+
+    F_global = struct.fem.create_global_load_vector(n_nodes, struct_loads)
+
+    X_global = struct.fem.factorized_FEM_solver(structural_model, F_global)
+    X_reference = struct.fem.FEM_solver(
+        structural_model["K_global"], F_global, struct_constraints
+    )
+
+    print()
+    print("TESTING factorized_FEM_solver")
+    print(f"Tip deformation: {X_global[-6:, 0]}")
+
+    assert np.allclose(X_global, X_reference)
+
+    # Several load cases solved with the same factorization
+    X_cases = struct.fem.factorized_FEM_solver(
+        structural_model, np.hstack([F_global, 2 * F_global])
+    )
+
+    assert np.allclose(X_cases[:, 1], 2 * X_reference[:, 0])
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_factorize_stiffness_matrix():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    reference_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints
+    )
+
+    free_dof = reference_model["free_dof"]
+    red_K = reference_model["K_global"][free_dof, :][:, free_dof].toarray()
+    red_F = np.random.default_rng(0).standard_normal((len(free_dof), 3))
+
+    print()
+    print("TESTING factorize_stiffness_matrix")
+
+    for ordering in ["rcm", "amd"]:
+
+        K_factor = struct.fem.factorize_stiffness_matrix(
+            reference_model["K_global"], free_dof, ordering
+        )
+
+        red_X = struct.fem.solve_factorized_stiffness_matrix(K_factor, red_F)
+
+        print(f"{ordering}: factor entries {K_factor['factor'].L.nnz + K_factor['factor'].U.nnz}")
+
+        assert np.allclose(red_K @ red_X, red_F)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_structural_solver():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    deformations, internal_loads = struct.fem.structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints
+    )
+
+    print()
+    print("TESTING structural_solver")
+    print(f"Tip deformation: {deformations[-1]}")
+
+    # Euler-Bernoulli cantilever beam with tip force and moment,
+    # w = - P * L ** 3 / (3 * E * I) + M * L ** 2 / (2 * E * I)
+    length = 2.0
+    bending_stiffness = 70e9 * 2e-6
+    tip_deflection = -100.0 * length ** 3 / (3 * bending_stiffness) + 10.0 * length ** 2 / (
+        2 * bending_stiffness
+    )
+
+    assert np.isclose(deformations[-1][2], tip_deflection)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_solve_load_cases():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    structural_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints
+    )
+
+    n_nodes = structural_model["n_nodes"]
+    F_global = struct.fem.create_global_load_vector(n_nodes, struct_loads)
+
+    loads_matrix = np.hstack([F_global, -F_global, np.zeros_like(F_global)])
+
+    deformations, internal_loads = struct.fem.solve_load_cases(structural_model, loads_matrix)
+
+    reference_deformations, reference_internal_loads = struct.fem.structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints
+    )
+
+    print()
+    print("TESTING solve_load_cases")
+    print(f"Deformations shape: {np.shape(deformations)}")
+
+    assert np.shape(deformations) == (3, n_nodes, 6)
+    assert np.shape(internal_loads) == (3, n_nodes, 6)
+    assert np.allclose(deformations[0], reference_deformations)
+    assert np.allclose(deformations[1], -reference_deformations)
+    assert np.allclose(internal_loads[0], reference_internal_loads)
+    assert np.allclose(deformations[2], 0)
+
+    # Support reaction balances the tip load
+    assert np.allclose(internal_loads[0][0][:3], [0.0, 0.0, 100.0])
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_calc_fem_elements_K_global():
+
+    nodes, fem_elements = random_fem_elements()
+
+    K_elements = struct.fem.calc_fem_elements_K_global(fem_elements)
+    M_elements = struct.fem.calc_fem_elements_M_global(fem_elements)
+
+    print()
+    print("TESTING calc_fem_elements_K_global")
+
+    for i, fem_element in enumerate(fem_elements):
+        K_reference = fem_element.calc_K_global()
+        M_reference = fem_element.calc_M_global()
+
+        print(f"{fem_element.prop_choice}: {np.max(np.abs(K_elements[i] - K_reference))}")
+
+        assert np.allclose(K_elements[i], K_reference, rtol=1e-9, atol=1e-9 * np.max(K_reference))
+        assert np.allclose(M_elements[i], M_reference, rtol=1e-9, atol=1e-9 * np.max(M_reference))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_calc_fem_elements_forces():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    deformations, internal_loads = struct.fem.structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints
+    )
+
+    fem_elements = struct_elements[0]
+
+    element_forces = struct.fem.calc_fem_elements_forces(fem_elements, deformations)
+    element_stresses = struct.fem.calc_fem_elements_stresses(fem_elements, element_forces)
+
+    cases_forces = struct.fem.calc_fem_elements_forces(
+        fem_elements, np.stack([deformations, -2 * deformations])
+    )
+
+    print()
+    print("TESTING calc_fem_elements_forces")
+    print(f"Root section forces: {element_forces[0]}")
+    print(f"Root section stresses: {element_stresses[0]}")
+
+    # Tip force of 100 N at 2 m of the root and tip moment of 10 N.m
+    assert np.allclose(np.hypot(element_forces["Vy"], element_forces["Vz"]), 100.0)
+    assert np.allclose(element_forces["N"], 0.0, atol=1e-9)
+    assert np.isclose(np.abs(element_forces["Mz"][0, 0]), 190.0)
+    assert np.isclose(np.abs(element_forces["Mz"][-1, 1]), 10.0)
+
+    # Section forces are continuous between elements
+    for name in struct.fem.ELEMENT_FORCES_DTYPE.names:
+        assert np.allclose(element_forces[name][1:, 0], element_forces[name][:-1, 1], atol=1e-9)
+
+    # Bending stress of the equivalent square section, Izz = 2e-6
+    root_bending = 190.0 * (12 * 2e-6) ** (1 / 4) / 2 / 2e-6
+    assert np.isclose(element_stresses["bending"][0, 0], root_bending)
+
+    assert np.shape(cases_forces) == (2, len(fem_elements))
+    assert np.allclose(cases_forces["Mz"][1], -2 * element_forces["Mz"])
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_create_global_FEM_matrices():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    node_vector = geo.functions.create_structure_node_vector(struct_grid)
+    fem_elements = struct_elements[0]
+
+    K_global, F_global = struct.fem.create_global_FEM_matrices(
+        node_vector, fem_elements, struct_loads
+    )
+
+    # Reference assembly, element by element in a dense matrix
+    K_reference = np.zeros((6 * len(node_vector), 6 * len(node_vector)))
+
+    for fem_element in fem_elements:
+        correlation_vector = fem_element.correlation_vector
+        K_reference[np.ix_(correlation_vector, correlation_vector)] += fem_element.calc_K_global()
+
+    print()
+    print("TESTING create_global_FEM_matrices")
+    print(f"Stored entries: {K_global.nnz} of {K_reference.size}")
+
+    assert K_global.format == "csr"
+    assert np.allclose(K_global.toarray(), K_reference)
+    assert np.allclose(F_global[-6:, 0], [0.0, 0.0, -100.0, 10.0, 0.0, 0.0])
+
+    # Sparse and dense stiffness matrices give the same solution
+    X_sparse = struct.fem.FEM_solver(K_global, F_global, struct_constraints)
+    X_dense = struct.fem.FEM_solver(K_reference, F_global, struct_constraints)
+
+    assert np.allclose(X_sparse, X_dense)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_create_modal_basis():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam(
+        n_elements=20
+    )
+
+    structural_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints, n_modes=4
+    )
+
+    natural_frequencies = structural_model["natural_frequencies"]
+
+    print()
+    print("TESTING create_modal_basis")
+    print(f"Natural frequencies: {natural_frequencies}")
+
+    # First bending mode of an Euler-Bernoulli cantilever beam,
+    # w = 1.8751 ** 2 * sqrt(E * I / (rho * A * L ** 4))
+    first_frequency = 1.8751 ** 2 * np.sqrt(70e9 * 1e-6 / (2700 * 1e-3 * 2.0 ** 4))
+
+    assert np.isclose(natural_frequencies[0], first_frequency, rtol=1e-3)
+
+    # Mass normalized modes
+    free_dof = structural_model["free_dof"]
+    modal_basis = structural_model["modal_basis"]
+    red_M = structural_model["M_global"][np.ix_(free_dof, free_dof)]
+
+    assert np.allclose(modal_basis.transpose() @ red_M @ modal_basis, np.eye(4))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_modal_FEM_solver():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    full_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints
+    )
+
+    modal_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints, n_modes=12
+    )
+
+    F_global = struct.fem.create_global_load_vector(full_model["n_nodes"], struct_loads)
+
+    X_full = struct.fem.factorized_FEM_solver(full_model, F_global)
+    X_modal = struct.fem.factorized_FEM_solver(modal_model, F_global)
+
+    print()
+    print("TESTING modal factorized_FEM_solver")
+    print(f"Tip deformation, full model: {X_full[-6:, 0]}")
+    print(f"Tip deformation, modal model: {X_modal[-6:, 0]}")
+
+    assert np.isclose(X_modal[-4, 0], X_full[-4, 0], rtol=1e-2)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_superelement_FEM_solver():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = frame_structure()
+
+    full_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints
+    )
+    superelements_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints, superelements=True
+    )
+
+    deformations, internal_loads = struct.fem.structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints, full_model
+    )
+    superelements_deformations, superelements_internal_loads = struct.fem.structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints, superelements_model
+    )
+
+    print()
+    print("TESTING superelement_FEM_solver")
+    print(f"Boundary degrees of freedom: {len(superelements_model['boundary_dof'])}")
+    print(f"Maximum difference: {np.max(np.abs(superelements_deformations - deformations))}")
+
+    # Clamped root and beams junction
+    assert len(superelements_model["boundary_dof"]) == 12
+    assert np.allclose(superelements_deformations, deformations)
+    assert np.allclose(superelements_internal_loads, internal_loads)
+
+    # Interior deformations are only recovered for the required components
+    F_global = struct.fem.create_global_load_vector(full_model["n_nodes"], struct_loads)
+    X_global = struct.fem.superelement_FEM_solver(superelements_model, F_global, components=[1])
+
+    tail_dof = struct.fem.nodes_dof([node.number for node in struct_grid[1]])
+    beam_dof = struct.fem.nodes_dof([node.number for node in struct_grid[0][1:-1]])
+
+    assert np.allclose(X_global[tail_dof, 0], np.ravel(deformations)[tail_dof])
+    assert np.all(np.isnan(X_global[beam_dof]))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_remove_factorizations():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = frame_structure()
+
+    full_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints
+    )
+    modal_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints, n_modes=6
+    )
+    superelements_model = struct.fem.create_structural_model(
+        struct_grid, struct_elements, struct_constraints, superelements=True
+    )
+
+    F_global = struct.fem.create_global_load_vector(full_model["n_nodes"], struct_loads)
+
+    print()
+    print("TESTING remove_factorizations")
+
+    # The modal model does not factorize the full system
+    assert modal_model["K_factor"] is None
+
+    for structural_model in [full_model, superelements_model]:
+
+        X_global = struct.fem.factorized_FEM_solver(structural_model, F_global)
+
+        loaded_model = pickle.loads(
+            pickle.dumps(struct.fem.remove_factorizations(structural_model))
+        )
+        loaded_X_global = struct.fem.factorized_FEM_solver(loaded_model, F_global)
+
+        # The loaded model calculates the factorizations again
+        assert np.allclose(loaded_X_global, X_global)
+
+    # The original models keep their factorizations
+    assert full_model["K_factor"] is not None
+    assert superelements_model["superelements"][0]["K_factor"] is not None
+
+
+# ==================================================================================================
+
+if __name__ == "__main__":
+
+    test_number_nodes()
+    test_factorized_FEM_solver()
+    test_factorize_stiffness_matrix()
+    test_structural_solver()
+    test_solve_load_cases()
+    test_calc_fem_elements_K_global()
+    test_calc_fem_elements_forces()
+    test_create_global_FEM_matrices()
+    test_create_modal_basis()
+    test_modal_FEM_solver()
+    test_superelement_FEM_solver()
+    test_remove_factorizations()
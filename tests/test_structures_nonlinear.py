@@ -0,0 +1,129 @@
+"""
+test_structures_nonlinear.py
+
+Testing suite for structures nonlinear module
+
+Author: João Paulo Monteiro Cruvinel da Costa
+email: joaopaulomcc@gmail.com / joao.cruvinel@embraer.com.br
+github: joaopaulomcc
+"""
+# ==================================================================================================
+# IMPORTS
+
+import numpy as np
+
+from context import flyingcircus
+from flyingcircus import structures as struct
+
+from test_structures_fem import cantilever_beam
+
+# ==================================================================================================
+# TESTS
+
+
+def test_calc_corotational_element_tangents():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    corotational_model = struct.nonlinear.create_corotational_model(
+        struct_grid, struct_elements, struct_constraints
+    )
+
+    nodes_A = corotational_model["nodes_A"]
+    displacements = np.zeros((len(nodes_A), 3))
+    rotations = np.broadcast_to(np.eye(3), (len(nodes_A), 3, 3))
+
+    element_tangents = struct.nonlinear.calc_corotational_element_tangents(
+        displacements,
+        displacements,
+        rotations,
+        rotations,
+        corotational_model["initial_chords"],
+        corotational_model["initial_frames"],
+        corotational_model["initial_lengths"],
+        corotational_model["K_local"],
+    )
+
+    K_elements = struct.fem.calc_fem_elements_K_global(struct_elements[0])
+
+    print()
+    print("TESTING calc_corotational_element_tangents")
+    print(f"Maximum difference: {np.max(np.abs(element_tangents - K_elements))}")
+
+    # Undeformed tangent matrix is the linear stiffness matrix
+    assert np.allclose(element_tangents, K_elements, atol=1e-8 * np.max(np.abs(K_elements)))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_corotational_structural_solver_small_loads():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam()
+
+    struct_loads[0].load = 1e-3 * struct_loads[0].load
+
+    deformations, internal_loads, solver_results = struct.nonlinear.corotational_structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints
+    )
+
+    linear_deformations, linear_internal_loads = struct.fem.structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints
+    )
+
+    print()
+    print("TESTING corotational_structural_solver with small loads")
+    print(f"Tip deformation: {deformations[-1]}")
+    print(f"Linear tip deformation: {linear_deformations[-1]}")
+
+    assert solver_results["converged"]
+    assert np.allclose(deformations, linear_deformations, rtol=1e-3, atol=1e-9)
+    assert np.allclose(internal_loads, linear_internal_loads, rtol=1e-3, atol=1e-6)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_corotational_structural_solver_elastica():
+
+    struct_grid, struct_elements, struct_constraints, struct_loads = cantilever_beam(
+        n_elements=20
+    )
+
+    # Cantilever with a tip load of P * L ** 2 / (E * I) = 1, the elastica solution is
+    # a vertical deflection of 0.3017 * L and a horizontal displacement of 0.0564 * L
+    length = 2.0
+    bending_stiffness = 70e9 * 2e-6
+    tip_load = bending_stiffness / length ** 2
+
+    struct_loads[0].load = np.array([0.0, 0.0, -tip_load, 0.0, 0.0, 0.0])
+
+    deformations, internal_loads, solver_results = struct.nonlinear.corotational_structural_solver(
+        struct_grid, struct_elements, struct_loads, struct_constraints
+    )
+
+    vertical_deflection = -deformations[-1][2] / length
+    horizontal_displacement = -deformations[-1][1] / length
+
+    print()
+    print("TESTING corotational_structural_solver elastica")
+    print(f"Vertical deflection / L: {vertical_deflection}")
+    print(f"Horizontal displacement / L: {horizontal_displacement}")
+    print(f"Factorizations: {solver_results['n_factorizations']}")
+
+    assert solver_results["converged"]
+    assert np.isclose(vertical_deflection, 0.3017, rtol=5e-3)
+    assert np.isclose(horizontal_displacement, 0.0564, rtol=1e-2)
+    assert solver_results["n_factorizations"] <= 15
+
+    # Support reactions balance the applied load
+    assert np.allclose(internal_loads[0][:3], [0.0, 0.0, tip_load])
+
+
+# ==================================================================================================
+
+if __name__ == "__main__":
+
+    test_calc_corotational_element_tangents()
+    test_corotational_structural_solver_small_loads()
+    test_corotational_structural_solver_elastica()